@@ -28,7 +28,9 @@ from .storage import clear_orphaned_file_records, file_usage, migrate_oss, remov
 from .system import convert_to_agent_apps, fix_app_site_missing, reset_encrypt_key_pair, upgrade_db
 from .vector import (
     add_qdrant_index,
+    convert_embedding_cache_format,
     migrate_annotation_vector_database,
+    migrate_keyword_postings,
     migrate_knowledge_vector_database,
     old_metadata_migration,
     vdb_migrate,
@@ -42,6 +44,7 @@ __all__ = [
     "cleanup_orphaned_draft_variables",
     "clear_free_plan_tenant_expired_logs",
     "clear_orphaned_file_records",
+    "convert_embedding_cache_format",
     "convert_to_agent_apps",
     "create_tenant",
     "delete_archived_workflow_runs",
@@ -54,6 +57,7 @@ __all__ = [
     "install_rag_pipeline_plugins",
     "migrate_annotation_vector_database",
     "migrate_data_for_plugin",
+    "migrate_keyword_postings",
     "migrate_knowledge_vector_database",
     "migrate_oss",
     "old_metadata_migration",
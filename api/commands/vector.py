@@ -9,11 +9,20 @@ from sqlalchemy.orm import sessionmaker
 from configs import dify_config
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.datasource.vdb.vector_type import VectorType
+from core.rag.embedding.embedding_codec import decode_stored_embedding, encode_embedding, is_encoded_embedding
 from core.rag.index_processor.constant.built_in_field import BuiltInField
 from core.rag.index_processor.constant.index_type import IndexStructureType, IndexTechniqueType
 from core.rag.models.document import ChildDocument, Document
 from extensions.ext_database import db
-from models.dataset import Dataset, DatasetCollectionBinding, DatasetMetadata, DatasetMetadataBinding, DocumentSegment
+from models.dataset import (
+    Dataset,
+    DatasetCollectionBinding,
+    DatasetKeywordTable,
+    DatasetMetadata,
+    DatasetMetadataBinding,
+    DocumentSegment,
+    Embedding,
+)
 from models.dataset import Document as DatasetDocument
 from models.enums import DatasetMetadataType, IndexingStatus, SegmentStatus
 from models.model import App, AppAnnotationSetting, MessageAnnotation
@@ -467,3 +476,103 @@ def old_metadata_migration():
                         db.session.commit()
         page += 1
     click.echo(click.style("Old metadata migration completed.", fg="green"))
+
+
+@click.command(
+    "convert-embedding-cache-format",
+    help="Convert cached embeddings to the compact binary format. One-way, earlier releases cannot read them.",
+)
+@click.option("--batch-size", default=500, show_default=True, help="Number of cached embeddings per batch.")
+def convert_embedding_cache_format(batch_size: int):
+    """
+    Re-encode legacy pickled rows of the embeddings table with the binary embedding codec.
+
+    There is no command converting rows back, so it only runs once EMBEDDING_CACHE_BINARY_FORMAT_ENABLED is set,
+    which must not happen before every API and worker process reads the binary format.
+    """
+    if not dify_config.EMBEDDING_CACHE_BINARY_FORMAT_ENABLED:
+        click.echo(
+            click.style(
+                "EMBEDDING_CACHE_BINARY_FORMAT_ENABLED is not set. Upgrade every API and worker process, "
+                "enable it, then run this conversion.",
+                fg="red",
+            )
+        )
+        return
+
+    click.echo(click.style("Starting embedding cache format conversion.", fg="green"))
+
+    converted_count = 0
+    skipped_count = 0
+    last_id: str | None = None
+    while True:
+        with sessionmaker(db.engine, expire_on_commit=False).begin() as session:
+            stmt = select(Embedding).order_by(Embedding.id).limit(batch_size)
+            # Embedding.id is a native UUID column on PostgreSQL, an empty string is not a valid lower bound
+            if last_id is not None:
+                stmt = stmt.where(Embedding.id > last_id)
+            embeddings = session.scalars(stmt).all()
+            if not embeddings:
+                break
+            last_id = embeddings[-1].id
+            for embedding in embeddings:
+                if is_encoded_embedding(embedding.embedding):
+                    skipped_count += 1
+                    continue
+                try:
+                    embedding.embedding = encode_embedding(
+                        decode_stored_embedding(embedding.embedding), dify_config.EMBEDDING_CACHE_STORAGE_DTYPE
+                    )
+                    converted_count += 1
+                except Exception as e:
+                    skipped_count += 1
+                    click.echo(click.style(f"Failed to convert embedding {embedding.id}: {str(e)}", fg="red"))
+        click.echo(f"Converted {converted_count} embeddings so far, skipped {skipped_count}.")
+
+    click.echo(
+        click.style(
+            f"Embedding cache format conversion complete. Converted {converted_count} embeddings. "
+            f"Skipped {skipped_count} embeddings.",
+            fg="green",
+        )
+    )
+
+
+@click.command("migrate-keyword-postings", help="Migrate dataset keyword tables to keyword postings.")
+@click.option("--dataset-id", default=None, help="Only migrate the given dataset.")
+def migrate_keyword_postings(dataset_id: str | None):
+    """
+    Copy legacy per-dataset keyword table blobs into the `jieba_postings` keyword store.
+    """
+    from core.rag.datasource.keyword.jieba.jieba_postings import JiebaPostings
+
+    click.echo(click.style("Starting keyword postings migration.", fg="green"))
+
+    migrated_count = 0
+    posting_count = 0
+    stmt = (
+        select(Dataset.id)
+        .join(DatasetKeywordTable, DatasetKeywordTable.dataset_id == Dataset.id)
+        .order_by(Dataset.created_at.desc())
+    )
+    if dataset_id:
+        stmt = stmt.where(Dataset.id == dataset_id)
+    dataset_ids = db.session.scalars(stmt).all()
+    for current_dataset_id in dataset_ids:
+        dataset = db.session.get(Dataset, current_dataset_id)
+        if not dataset:
+            continue
+        try:
+            click.echo(f"Migrating keyword table of dataset {dataset.id}.")
+            posting_count += JiebaPostings(dataset).migrate_from_keyword_table()
+            migrated_count += 1
+        except Exception as e:
+            db.session.rollback()
+            click.echo(click.style(f"Error migrating keyword table of dataset {dataset.id}: {str(e)}", fg="red"))
+
+    click.echo(
+        click.style(
+            f"Keyword postings migration complete. Migrated {migrated_count} datasets, {posting_count} postings.",
+            fg="green",
+        )
+    )
@@ -265,6 +265,21 @@ class PluginConfig(BaseSettings):
         default=60 * 60,
     )
 
+    PLUGIN_DECLARATION_CACHE_ENABLED: bool = Field(
+        description="Share plugin tool and model provider declarations across requests of a worker process",
+        default=False,
+    )
+
+    PLUGIN_DECLARATION_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of plugin provider declarations kept per process",
+        default=1000,
+    )
+
+    PLUGIN_DECLARATION_CACHE_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds of cached plugin provider declarations",
+        default=300,
+    )
+
     PLUGIN_MAX_FILE_SIZE: PositiveInt = Field(
         description="Maximum allowed size (bytes) for plugin-generated files",
         default=50 * 1024 * 1024,
@@ -655,7 +670,7 @@ class LoggingConfig(BaseSettings):
 
 class ModelLoadBalanceConfig(BaseSettings):
     """
-    Configuration for model load balancing and token counting
+    Configuration for model load balancing, token counting and provider configuration caching
     """
 
     MODEL_LB_ENABLED: bool = Field(
@@ -668,6 +683,26 @@ class ModelLoadBalanceConfig(BaseSettings):
         default=False,
     )
 
+    PROVIDER_CONFIGURATIONS_CACHE_ENABLED: bool = Field(
+        description="Share assembled model provider configurations across requests of a worker process",
+        default=False,
+    )
+
+    PROVIDER_CONFIGURATIONS_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of tenants whose provider configurations are kept per process",
+        default=1000,
+    )
+
+    PROVIDER_CONFIGURATIONS_CACHE_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds of cached provider configurations, bounds staleness of hosted quotas",
+        default=60,
+    )
+
+    PROVIDER_CONFIGURATIONS_CACHE_REDIS_ENABLED: bool = Field(
+        description="Also store assembled provider configurations in Redis so workers can share them",
+        default=False,
+    )
+
 
 class BillingConfig(BaseSettings):
     """
@@ -737,6 +772,37 @@ class WorkflowConfig(BaseSettings):
         default=400_000,
     )
 
+    WORKFLOW_GRAPH_CACHE_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum number of compiled workflow graphs kept per process for reuse across runs, 0 to disable",
+        default=256,
+    )
+
+    TEMPLATE_RENDERER: Literal["code_executor", "in_process"] = Field(
+        description="Where Jinja2 templates of workflow nodes are rendered: 'code_executor' in the code execution"
+        " sandbox, 'in_process' in a sandboxed Jinja2 environment of the running process with the limits below",
+        default="code_executor",
+    )
+
+    TEMPLATE_RENDERER_CACHE_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum number of compiled templates kept per process by the in_process renderer, 0 to disable",
+        default=512,
+    )
+
+    TEMPLATE_RENDERER_MAX_OUTPUT_LENGTH: PositiveInt = Field(
+        description="Maximum number of characters a template may render with the in_process renderer",
+        default=400_000,
+    )
+
+    TEMPLATE_RENDERER_MAX_LOOP_ITERATIONS: PositiveInt = Field(
+        description="Maximum loop iterations over lists and ranges in a template rendered by the in_process renderer",
+        default=100_000,
+    )
+
+    TEMPLATE_RENDERER_TIMEOUT: PositiveFloat = Field(
+        description="Maximum time in seconds to render a template with the in_process renderer",
+        default=5.0,
+    )
+
     # GraphEngine Worker Pool Configuration
     GRAPH_ENGINE_MIN_WORKERS: PositiveInt = Field(
         description="Minimum number of workers per GraphEngine instance",
@@ -775,6 +841,17 @@ class WorkflowNodeExecutionConfig(BaseSettings):
         description="Storage backend for WorkflowNodeExecution. Options: 'rdbms', 'hybrid'",
     )
 
+    CELERY_WORKFLOW_NODE_EXECUTION_BUFFER_SIZE: NonNegativeInt = Field(
+        description="Number of node executions the Celery node execution repository coalesces before dispatching"
+        " one bulk save task, 0 to dispatch every save immediately",
+        default=0,
+    )
+
+    CELERY_WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL: PositiveFloat = Field(
+        description="Maximum seconds buffered node executions wait before being dispatched",
+        default=2.0,
+    )
+
 
 class RepositoryConfig(BaseSettings):
     """
@@ -1081,6 +1158,37 @@ class DataSetConfig(BaseSettings):
         default=0,
     )
 
+    EMBEDDING_CACHE_BINARY_FORMAT_ENABLED: bool = Field(
+        description="Write cached embeddings in the versioned binary format instead of pickled lists and base64 text."
+        " Enable only once every API and worker process runs a release that reads it",
+        default=False,
+    )
+
+    EMBEDDING_CACHE_STORAGE_DTYPE: Literal["float32", "float16"] = Field(
+        description="Precision of cached embeddings written in the binary format ('float32' or 'float16')",
+        default="float32",
+    )
+
+    QUERY_EMBEDDING_LOCAL_CACHE_ENABLED: bool = Field(
+        description="Enable the per-process LRU cache in front of the Redis query embedding cache",
+        default=False,
+    )
+
+    QUERY_EMBEDDING_LOCAL_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of query embeddings kept in the per-process cache",
+        default=1024,
+    )
+
+    QUERY_EMBEDDING_LOCAL_CACHE_TTL: PositiveInt = Field(
+        description="Time-to-live in seconds of query embeddings in the per-process cache",
+        default=60,
+    )
+
+    DOCUMENT_KEYWORDS_CACHE_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum number of chunk keyword lists kept per process for keyword reranking, 0 to disable",
+        default=10000,
+    )
+
 
 class WorkspaceConfig(BaseSettings):
     """
@@ -1108,6 +1216,22 @@ class IndexingConfig(BaseSettings):
         default=50,
     )
 
+    INDEXING_PIPELINE_ENABLED: bool = Field(
+        description="Split, save and embed high quality documents a page at a time instead of materializing"
+        " every chunk of a document before embedding starts",
+        default=False,
+    )
+
+    INDEXING_EMBEDDING_CONCURRENCY: PositiveInt = Field(
+        description="Number of threads embedding and writing chunks to the vector store for each indexed document",
+        default=10,
+    )
+
+    INDEXING_EMBEDDING_BATCH_SIZE: PositiveInt = Field(
+        description="Number of chunks embedded and written together, rounded up to whole embedding model calls",
+        default=100,
+    )
+
 
 class MultiModalTransferConfig(BaseSettings):
     MULTIMODAL_SEND_FORMAT: Literal["base64", "url"] = Field(
@@ -1195,6 +1319,17 @@ class CeleryScheduleTasksConfig(BaseSettings):
         default=30,
     )
 
+    # Document segment hit_count batch update
+    ENABLE_SEGMENT_HIT_COUNT_FLUSH_TASK: bool = Field(
+        description="Buffer document segment hit counts in Redis and flush them periodically instead of"
+        " updating the database on every retrieval",
+        default=True,
+    )
+    SEGMENT_HIT_COUNT_FLUSH_INTERVAL: PositiveInt = Field(
+        description="Interval in seconds for flushing buffered document segment hit counts (default 60)",
+        default=60,
+    )
+
     # Trigger provider refresh (simple version)
     ENABLE_TRIGGER_PROVIDER_REFRESH_TASK: bool = Field(
         description="Enable trigger provider refresh poller",
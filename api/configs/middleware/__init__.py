@@ -80,6 +80,49 @@ class StorageConfig(BaseSettings):
         deprecated=True,
     )
 
+    STORAGE_MULTIPART_DOWNLOAD_THRESHOLD: PositiveInt = Field(
+        description="Size in bytes from which files are downloaded in parts fetched concurrently,"
+        " for storage backends that support ranged reads.",
+        default=64 * 1024 * 1024,
+    )
+
+    STORAGE_MULTIPART_DOWNLOAD_PART_SIZE: PositiveInt = Field(
+        description="Size in bytes of each part of a multipart download.",
+        default=8 * 1024 * 1024,
+    )
+
+    STORAGE_MULTIPART_DOWNLOAD_CONCURRENCY: PositiveInt = Field(
+        description="Maximum number of parts of a multipart download fetched at the same time.",
+        default=4,
+    )
+
+    STORAGE_LOCAL_CACHE_ENABLED: bool = Field(
+        description="Keep a copy of frequently read immutable files on local disk to avoid fetching them again.",
+        default=False,
+    )
+
+    STORAGE_LOCAL_CACHE_PATH: str = Field(
+        description="Directory of the local disk cache of stored files.",
+        default="storage_cache",
+    )
+
+    STORAGE_LOCAL_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum total size in bytes of the local disk cache, least recently used files are evicted first.",
+        default=1024 * 1024 * 1024,
+    )
+
+    STORAGE_LOCAL_CACHE_MAX_OBJECT_SIZE: PositiveInt = Field(
+        description="Size in bytes above which files are never kept in the local disk cache.",
+        default=32 * 1024 * 1024,
+    )
+
+    STORAGE_LOCAL_CACHE_KEY_PREFIXES: str = Field(
+        description="Comma-separated prefixes of the files kept in the local disk cache."
+        " Only list prefixes of files that are never rewritten in place, since other processes do not see"
+        " the invalidations of a save.",
+        default="upload_files/,image_files/,tools/",
+    )
+
 
 class VectorStoreConfig(BaseSettings):
     VECTOR_STORE: str | None = Field(
@@ -102,7 +145,8 @@ class VectorStoreConfig(BaseSettings):
 class KeywordStoreConfig(BaseSettings):
     KEYWORD_STORE: str = Field(
         description="Method for keyword extraction and storage."
-        " Default is 'jieba', a Chinese text segmentation library.",
+        " Default is 'jieba', a Chinese text segmentation library."
+        " 'jieba_postings' stores the keyword index as incremental per-keyword postings.",
         default="jieba",
     )
 
@@ -1,7 +1,7 @@
 from typing import Literal, Protocol, cast
 from urllib.parse import quote_plus, urlunparse
 
-from pydantic import AliasChoices, Field
+from pydantic import AliasChoices, Field, NonNegativeInt, PositiveInt
 from pydantic_settings import BaseSettings
 
 
@@ -70,6 +70,40 @@ class RedisPubSubConfig(BaseSettings):
         default=600,
     )
 
+    PUBSUB_EVENT_ENVELOPE_ENABLED: bool = Field(
+        validation_alias=AliasChoices("EVENT_BUS_EVENT_ENVELOPE_ENABLED", "PUBSUB_EVENT_ENVELOPE_ENABLED"),
+        description=(
+            "Publish events streamed by Celery workers with their event type in front of the JSON payload, so API "
+            "processes relay them without decoding and re-encoding every event. Required for coalescing. "
+            "API processes that are not upgraded cannot read these events: upgrade every API process before "
+            "enabling it on the workers. "
+            "Also accepts ENV: EVENT_BUS_EVENT_ENVELOPE_ENABLED."
+        ),
+        default=False,
+    )
+
+    PUBSUB_COALESCE_MAX_DELAY_MS: NonNegativeInt = Field(
+        validation_alias=AliasChoices("EVENT_BUS_COALESCE_MAX_DELAY_MS", "PUBSUB_COALESCE_MAX_DELAY_MS"),
+        description=(
+            "Maximum time in milliseconds a streamed text chunk published by a Celery worker is held back to be "
+            "sent together with the following ones, reducing Redis commands per token. Terminal and other "
+            "non-text events are never delayed. 0 (the default) publishes every event separately. "
+            "Requires PUBSUB_EVENT_ENVELOPE_ENABLED. API processes that are not upgraded cannot read coalesced "
+            "batches: upgrade every API process before enabling it on the workers, e.g. with 20. "
+            "Also accepts ENV: EVENT_BUS_COALESCE_MAX_DELAY_MS."
+        ),
+        default=0,
+    )
+
+    PUBSUB_COALESCE_MAX_BYTES: PositiveInt = Field(
+        validation_alias=AliasChoices("EVENT_BUS_COALESCE_MAX_BYTES", "PUBSUB_COALESCE_MAX_BYTES"),
+        description=(
+            "Publish coalesced events as soon as this many bytes are held back. "
+            "Also accepts ENV: EVENT_BUS_COALESCE_MAX_BYTES."
+        ),
+        default=16384,
+    )
+
     def _build_default_pubsub_url(self) -> str:
         defaults = _redis_defaults(self)
         if not defaults.REDIS_HOST or not defaults.REDIS_PORT:
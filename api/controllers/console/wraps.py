@@ -1,7 +1,7 @@
 import contextlib
 import json
 import os
-import time
+import uuid
 from collections.abc import Callable
 from functools import wraps
 
@@ -13,9 +13,9 @@ from controllers.console.auth.error import AuthenticationFailedError, EmailCodeE
 from controllers.console.workspace.error import AccountNotInitializedError
 from enums.cloud_plan import CloudPlan
 from extensions.ext_database import db
-from extensions.ext_redis import redis_client
 from libs.encryption import FieldEncryption
 from libs.login import current_account_with_tenant
+from libs.redis_rate_limiter import ConcurrencyLimiter, SlidingWindowRateLimiter
 from models.account import AccountStatus
 from models.dataset import RateLimitLog
 from models.model import DifySetup
@@ -166,16 +166,8 @@ def cloud_edition_billing_rate_limit_check[**P, R](resource: str) -> Callable[[C
                 _, current_tenant_id = current_account_with_tenant()
                 knowledge_rate_limit = FeatureService.get_knowledge_rate_limit(current_tenant_id)
                 if knowledge_rate_limit.enabled:
-                    current_time = int(time.time() * 1000)
-                    key = f"rate_limit_{current_tenant_id}"
-
-                    redis_client.zadd(key, {current_time: current_time})
-
-                    redis_client.zremrangebyscore(key, 0, current_time - 60000)
-
-                    request_count = redis_client.zcard(key)
-
-                    if request_count > knowledge_rate_limit.limit:
+                    rate_limiter = SlidingWindowRateLimiter(limit=knowledge_rate_limit.limit, window=60)
+                    if not rate_limiter.hit(f"rate_limit_{current_tenant_id}").allowed:
                         # add ratelimit record
                         rate_limit_log = RateLimitLog(
                             tenant_id=current_tenant_id,
@@ -345,22 +337,16 @@ def annotation_import_rate_limit[**P, R](view: Callable[P, R]) -> Callable[P, R]
     - Short-term: Configurable requests per minute (default: 5)
     - Long-term: Configurable requests per hour (default: 20)
 
-    Uses Redis ZSET for distributed rate limiting across multiple instances.
+    Uses atomic Redis sliding windows for distributed rate limiting across multiple instances.
     """
 
     @wraps(view)
     def decorated(*args: P.args, **kwargs: P.kwargs):
         _, current_tenant_id = current_account_with_tenant()
-        current_time = int(time.time() * 1000)
 
         # Check per-minute rate limit
-        minute_key = f"annotation_import_rate_limit:{current_tenant_id}:1min"
-        redis_client.zadd(minute_key, {current_time: current_time})
-        redis_client.zremrangebyscore(minute_key, 0, current_time - 60000)
-        minute_count = redis_client.zcard(minute_key)
-        redis_client.expire(minute_key, 120)  # 2 minutes TTL
-
-        if minute_count > dify_config.ANNOTATION_IMPORT_RATE_LIMIT_PER_MINUTE:
+        minute_limiter = SlidingWindowRateLimiter(limit=dify_config.ANNOTATION_IMPORT_RATE_LIMIT_PER_MINUTE, window=60)
+        if not minute_limiter.hit(f"annotation_import_rate_limit:{current_tenant_id}:1min").allowed:
             abort(
                 429,
                 f"Too many annotation import requests. Maximum {dify_config.ANNOTATION_IMPORT_RATE_LIMIT_PER_MINUTE} "
@@ -368,13 +354,8 @@ def annotation_import_rate_limit[**P, R](view: Callable[P, R]) -> Callable[P, R]
             )
 
         # Check per-hour rate limit
-        hour_key = f"annotation_import_rate_limit:{current_tenant_id}:1hour"
-        redis_client.zadd(hour_key, {current_time: current_time})
-        redis_client.zremrangebyscore(hour_key, 0, current_time - 3600000)
-        hour_count = redis_client.zcard(hour_key)
-        redis_client.expire(hour_key, 7200)  # 2 hours TTL
-
-        if hour_count > dify_config.ANNOTATION_IMPORT_RATE_LIMIT_PER_HOUR:
+        hour_limiter = SlidingWindowRateLimiter(limit=dify_config.ANNOTATION_IMPORT_RATE_LIMIT_PER_HOUR, window=3600)
+        if not hour_limiter.hit(f"annotation_import_rate_limit:{current_tenant_id}:1hour").allowed:
             abort(
                 429,
                 f"Too many annotation import requests. Maximum {dify_config.ANNOTATION_IMPORT_RATE_LIMIT_PER_HOUR} "
@@ -393,34 +374,32 @@ def annotation_import_concurrency_limit[**P, R](view: Callable[P, R]) -> Callabl
     Limits the number of concurrent import tasks per tenant to prevent
     resource exhaustion and ensure fair resource allocation.
 
-    Uses Redis ZSET to track active import jobs with automatic cleanup
-    of stale entries (jobs older than 2 minutes).
+    Takes a lease on the tenant's active imports atomically and passes its id
+    to the view as `job_id`. The import job holds the lease until its task
+    completes; leases older than 2 minutes are reclaimed once the limit is reached.
     """
 
     @wraps(view)
     def decorated(*args: P.args, **kwargs: P.kwargs):
         _, current_tenant_id = current_account_with_tenant()
-        current_time = int(time.time() * 1000)
 
-        active_jobs_key = f"annotation_import_active:{current_tenant_id}"
-
-        # Clean up stale entries (jobs that should have completed or timed out)
-        stale_threshold = current_time - 120000  # 2 minutes ago
-        redis_client.zremrangebyscore(active_jobs_key, 0, stale_threshold)
-
-        # Check current active job count
-        active_count = redis_client.zcard(active_jobs_key)
-
-        if active_count >= dify_config.ANNOTATION_IMPORT_MAX_CONCURRENT:
+        active_jobs_key = f"annotation_import_leases:{current_tenant_id}"
+        job_id = str(uuid.uuid4())
+        limiter = ConcurrencyLimiter(limit=dify_config.ANNOTATION_IMPORT_MAX_CONCURRENT, lease_timeout=120, ttl=7200)
+        if not limiter.acquire(active_jobs_key, job_id).allowed:
             abort(
                 429,
                 f"Too many concurrent import tasks. Maximum {dify_config.ANNOTATION_IMPORT_MAX_CONCURRENT} "
                 f"concurrent imports allowed per workspace. Please wait for existing imports to complete.",
             )
 
-        # Allow the request to proceed
-        # The actual job registration will happen in the service layer
-        return view(*args, **kwargs)
+        kwargs["job_id"] = job_id
+        try:
+            return view(*args, **kwargs)
+        except BaseException:
+            # the import job was not started, once it is the task releases the lease
+            limiter.release(active_jobs_key, job_id)
+            raise
 
     return decorated
 
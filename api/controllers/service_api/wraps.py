@@ -1,6 +1,5 @@
 import inspect
 import logging
-import time
 from collections.abc import Callable
 from enum import StrEnum, auto
 from functools import wraps
@@ -15,8 +14,8 @@ from werkzeug.exceptions import Forbidden, NotFound, Unauthorized
 
 from enums.cloud_plan import CloudPlan
 from extensions.ext_database import db
-from extensions.ext_redis import redis_client
 from libs.login import current_user
+from libs.redis_rate_limiter import SlidingWindowRateLimiter
 from models import Account, Tenant, TenantAccountJoin, TenantStatus
 from models.dataset import Dataset, RateLimitLog
 from models.model import ApiToken, App
@@ -203,16 +202,8 @@ def cloud_edition_billing_rate_limit_check[**P, R](
             if resource == "knowledge":
                 knowledge_rate_limit = FeatureService.get_knowledge_rate_limit(api_token.tenant_id)
                 if knowledge_rate_limit.enabled:
-                    current_time = int(time.time() * 1000)
-                    key = f"rate_limit_{api_token.tenant_id}"
-
-                    redis_client.zadd(key, {current_time: current_time})
-
-                    redis_client.zremrangebyscore(key, 0, current_time - 60000)
-
-                    request_count = redis_client.zcard(key)
-
-                    if request_count > knowledge_rate_limit.limit:
+                    rate_limiter = SlidingWindowRateLimiter(limit=knowledge_rate_limit.limit, window=60)
+                    if not rate_limiter.hit(f"rate_limit_{api_token.tenant_id}").allowed:
                         # add ratelimit record
                         rate_limit_log = RateLimitLog(
                             tenant_id=api_token.tenant_id,
@@ -26,6 +26,7 @@ from core.db.session_factory import session_factory
 from core.moderation.base import ModerationError
 from core.moderation.input_moderation import InputModeration
 from core.repositories.factory import WorkflowExecutionRepository, WorkflowNodeExecutionRepository
+from core.workflow.compiled_graph import CompiledWorkflowGraph, get_compiled_workflow_graph
 from core.workflow.node_factory import get_default_root_node_id
 from core.workflow.system_variables import (
     build_bootstrap_variables,
@@ -118,18 +119,21 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
         user_from = self._resolve_user_from(invoke_from)
 
         resume_state = self._resume_graph_runtime_state
+        compiled_graph: CompiledWorkflowGraph | None = None
 
         if resume_state is not None:
             graph_runtime_state = resume_state
             variable_pool = graph_runtime_state.variable_pool
+            compiled_graph = get_compiled_workflow_graph(self._workflow)
             graph = self._init_graph(
-                graph_config=self._workflow.graph_dict,
+                graph_config=compiled_graph.graph_config,
                 graph_runtime_state=graph_runtime_state,
                 workflow_id=self._workflow.id,
                 tenant_id=self._workflow.tenant_id,
                 user_id=self.application_generate_entity.user_id,
                 invoke_from=invoke_from,
                 user_from=user_from,
+                compiled_graph=compiled_graph,
             )
         elif self.application_generate_entity.single_iteration_run or self.application_generate_entity.single_loop_run:
             # Handle single iteration or single loop run
@@ -184,13 +188,14 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
                     conversation_variables=conversation_variables,
                 ),
             )
-            root_node_id = get_default_root_node_id(self._workflow.graph_dict)
+            compiled_graph = get_compiled_workflow_graph(self._workflow)
+            root_node_id = get_default_root_node_id(compiled_graph.graph_config)
             add_node_inputs_to_pool(variable_pool, node_id=root_node_id, inputs=new_inputs)
 
             # init graph
             graph_runtime_state = GraphRuntimeState(variable_pool=variable_pool, start_at=time.time())
             graph = self._init_graph(
-                graph_config=self._workflow.graph_dict,
+                graph_config=compiled_graph.graph_config,
                 graph_runtime_state=graph_runtime_state,
                 workflow_id=self._workflow.id,
                 tenant_id=self._workflow.tenant_id,
@@ -198,6 +203,7 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
                 user_from=user_from,
                 invoke_from=invoke_from,
                 root_node_id=root_node_id,
+                compiled_graph=compiled_graph,
             )
 
         db.session.close()
@@ -208,12 +214,13 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
         channel_key = f"workflow:{task_id}:commands"
         command_channel = RedisChannel(redis_client, channel_key)
 
+        graph_config = compiled_graph.graph_config if compiled_graph is not None else self._workflow.graph_dict
         workflow_entry = WorkflowEntry(
             tenant_id=self._workflow.tenant_id,
             app_id=self._workflow.app_id,
             workflow_id=self._workflow.id,
             graph=graph,
-            graph_config=self._workflow.graph_dict,
+            graph_config=graph_config,
             user_id=self.application_generate_entity.user_id,
             user_from=user_from,
             invoke_from=invoke_from,
@@ -221,6 +228,7 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
             variable_pool=variable_pool,
             graph_runtime_state=graph_runtime_state,
             command_channel=command_channel,
+            compiled_graph=compiled_graph,
         )
 
         self._queue_manager.graph_runtime_state = graph_runtime_state
@@ -231,7 +239,7 @@ class AdvancedChatAppRunner(WorkflowBasedAppRunner):
                 workflow_id=self._workflow.id,
                 workflow_type=WorkflowType(self._workflow.type),
                 version=self._workflow.version,
-                graph_data=self._workflow.graph_dict,
+                graph_data=graph_config,
             ),
             workflow_execution_repository=self._workflow_execution_repository,
             workflow_node_execution_repository=self._workflow_node_execution_repository,
@@ -9,6 +9,7 @@ from core.app.apps.draft_variable_saver import (
     DraftVariableSaverFactory,
     NoopDraftVariableSaver,
 )
+from core.app.apps.streaming_utils import EncodedStreamEvent
 from core.app.entities.app_invoke_entities import InvokeFrom, UserFrom
 from core.app.file_access import DatabaseFileAccessController, FileAccessScope, bind_file_access_scope
 from extensions.ext_database import db
@@ -276,7 +277,9 @@ class BaseAppGenerator:
 
             def gen():
                 for message in generator:
-                    if isinstance(message, Mapping | dict):
+                    if isinstance(message, EncodedStreamEvent):
+                        yield message.to_sse()
+                    elif isinstance(message, Mapping | dict):
                         yield f"data: {orjson_dumps(message)}\n\n"
                     else:
                         yield f"event: {message}\n\n"
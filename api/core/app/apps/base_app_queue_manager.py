@@ -1,12 +1,19 @@
+import functools
 import logging
 import queue
 import threading
 import time
+import types
 from abc import ABC, abstractmethod
-from enum import IntEnum, auto
-from typing import Any
+from collections.abc import Mapping
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum, IntEnum, auto
+from typing import Annotated, Any, Literal, Union, get_args, get_origin
+from uuid import UUID
 
 from cachetools import TTLCache, cachedmethod
+from pydantic import BaseModel
 from redis.exceptions import RedisError
 from sqlalchemy.orm import DeclarativeMeta
 
@@ -131,7 +138,11 @@ class AppQueueManager(ABC):
         :param pub_from:
         :return:
         """
-        self._check_for_sqlalchemy_models(event.model_dump())
+        if dify_config.DEBUG:
+            # model_construct and attribute assignment skip validation, so debug runs check every dumped value
+            self._check_for_sqlalchemy_models(event.model_dump())
+        else:
+            self._check_for_sqlalchemy_models(event)
         self._publish(event, pub_from)
 
     @abstractmethod
@@ -208,15 +219,69 @@ class AppQueueManager(ABC):
         return f"generate_task_stopped:{task_id}"
 
     def _check_for_sqlalchemy_models(self, data: Any):
-        # from entity to dict or list
-        if isinstance(data, dict):
+        if isinstance(data, DeclarativeMeta) or hasattr(data, "_sa_instance_state"):
+            raise TypeError(
+                "Critical Error: Passing SQLAlchemy Model instances that cause thread safety issues is not allowed."
+            )
+        if isinstance(data, BaseModel):
+            # fields whose declared types cannot hold arbitrary objects were already checked by validation
+            for field_name in _fields_accepting_arbitrary_values(type(data)):
+                self._check_for_sqlalchemy_models(getattr(data, field_name, None))
+        elif isinstance(data, Mapping):
             for value in data.values():
                 self._check_for_sqlalchemy_models(value)
-        elif isinstance(data, list):
+        elif isinstance(data, (list, tuple, set, frozenset)):
             for item in data:
                 self._check_for_sqlalchemy_models(item)
-        else:
-            if isinstance(data, DeclarativeMeta) or hasattr(data, "_sa_instance_state"):
-                raise TypeError(
-                    "Critical Error: Passing SQLAlchemy Model instances that cause thread safety issues is not allowed."
-                )
+
+
+_CLOSED_LEAF_TYPES = (str, bytes, int, float, bool, type(None), Enum, Decimal, UUID, datetime, date, timedelta)
+
+
+@functools.cache
+def _fields_accepting_arbitrary_values(model_class: type[BaseModel]) -> tuple[str, ...]:
+    """
+    Names of the fields of a pydantic model whose declared type can hold arbitrary objects.
+
+    Computed once per model class, so publishing an event only walks the values of fields such as
+    `Any` or `Mapping[str, Any]` instead of dumping the whole event.
+    """
+    return tuple(
+        field_name
+        for field_name, field_info in model_class.model_fields.items()
+        if _accepts_arbitrary_values(field_info.annotation, frozenset({model_class}))
+    )
+
+
+def _accepts_arbitrary_values(annotation: Any, seen: frozenset[type]) -> bool:
+    if annotation is Any or annotation is object:
+        return True
+
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return False
+    if origin is Annotated:
+        return _accepts_arbitrary_values(get_args(annotation)[0], seen)
+    if origin is not None:
+        args = get_args(annotation)
+        if origin is type or (origin not in (Union, types.UnionType) and not isinstance(origin, type)):
+            return True
+        # unparameterized generics such as `typing.List` hold Any
+        if not args:
+            return True
+        return any(_accepts_arbitrary_values(arg, seen) for arg in args if arg is not Ellipsis)
+
+    if not isinstance(annotation, type):
+        # forward references, type variables and the like are treated conservatively
+        return True
+    if issubclass(annotation, BaseModel):
+        # self-referencing models are decided by their other fields
+        if annotation in seen:
+            return False
+        return any(
+            _accepts_arbitrary_values(field_info.annotation, seen | {annotation})
+            for field_info in annotation.model_fields.values()
+        )
+    if issubclass(annotation, (list, tuple, set, frozenset, dict, Mapping)):
+        return True
+    return not issubclass(annotation, _CLOSED_LEAF_TYPES)
@@ -2,13 +2,105 @@ from __future__ import annotations
 
 import json
 import time
-from collections.abc import Callable, Generator, Iterable, Mapping
+from collections.abc import Callable, Generator, Iterable, Iterator, Mapping
 from typing import Any
 
+from configs import dify_config
 from core.app.entities.task_entities import StreamEvent
-from libs.broadcast_channel.channel import Topic
+from libs.broadcast_channel.batching import CoalescingProducer
+from libs.broadcast_channel.channel import Producer, Topic
 from libs.broadcast_channel.exc import SubscriptionClosedError
 
+# With PUBSUB_EVENT_ENVELOPE_ENABLED, events are published to a response topic as `\x1e<event type>\n<json payload>`,
+# so relays can route them by type and forward the payload without decoding it. Other messages are plain JSON.
+_ENVELOPE_MARKER = b"\x1e"
+
+# Streamed text events, which may be held back briefly to be published together with the following ones.
+_COALESCIBLE_EVENTS = frozenset(
+    {StreamEvent.MESSAGE.value, StreamEvent.AGENT_MESSAGE.value, StreamEvent.TEXT_CHUNK.value}
+)
+
+
+class EncodedStreamEvent(Mapping[str, Any]):
+    """
+    A stream event kept in the JSON encoding it was published with.
+
+    `to_sse` forwards the payload untouched, it is only decoded when the event is read as a mapping.
+    """
+
+    __slots__ = ("_decoded", "event", "payload")
+
+    def __init__(self, event: str, payload: bytes):
+        self.event = event
+        self.payload = payload
+        self._decoded: dict[str, Any] | None = None
+
+    def to_sse(self) -> bytes:
+        return b"data: " + self.payload + b"\n\n"
+
+    def _mapping(self) -> dict[str, Any]:
+        if self._decoded is None:
+            self._decoded = json.loads(self.payload)
+        return self._decoded
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "event":
+            return self.event
+        return self._mapping()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._mapping())
+
+    def __len__(self) -> int:
+        return len(self._mapping())
+
+    def __repr__(self) -> str:
+        return f"EncodedStreamEvent(event={self.event!r}, payload={self.payload!r})"
+
+
+def encode_topic_event(event: Mapping[str, Any] | str) -> bytes:
+    """Serialize an event for a response topic, see `decode_topic_event`."""
+    event_type = event.get("event") if isinstance(event, Mapping) else None
+    if not dify_config.PUBSUB_EVENT_ENVELOPE_ENABLED or not isinstance(event_type, str):
+        return json.dumps(event, ensure_ascii=False, default=str).encode()
+    payload = json.dumps(event, ensure_ascii=False, separators=(",", ":"), default=str).encode()
+    return _ENVELOPE_MARKER + event_type.encode() + b"\n" + payload
+
+
+def _is_coalescible_topic_event(message: bytes) -> bool:
+    if not message.startswith(_ENVELOPE_MARKER):
+        return False
+    event_type, _, _ = message[len(_ENVELOPE_MARKER) :].partition(b"\n")
+    return event_type.decode() in _COALESCIBLE_EVENTS
+
+
+def coalescing_topic_producer(producer: Producer) -> CoalescingProducer:
+    """
+    Wrap a response topic producer so bursts of streamed text are published as one batch message.
+
+    Only text events enveloped by `encode_topic_event` are held back, for at most
+    `PUBSUB_COALESCE_MAX_DELAY_MS`, every other event flushes them. Callers must `close` the producer.
+    """
+    return CoalescingProducer(
+        producer,
+        max_delay=dify_config.PUBSUB_COALESCE_MAX_DELAY_MS / 1000,
+        max_bytes=dify_config.PUBSUB_COALESCE_MAX_BYTES,
+        can_buffer=_is_coalescible_topic_event,
+    )
+
+
+def decode_topic_event(message: bytes) -> Any:
+    """
+    Read a message published to a response topic.
+
+    Enveloped events become an `EncodedStreamEvent` without decoding their payload, messages published as
+    plain JSON (e.g. by workers not updated yet) are decoded as before.
+    """
+    if message.startswith(_ENVELOPE_MARKER):
+        event_type, _, payload = message[len(_ENVELOPE_MARKER) :].partition(b"\n")
+        return EncodedStreamEvent(event_type.decode(), payload)
+    return json.loads(message)
+
 
 def stream_topic_events(
     *,
@@ -18,6 +110,11 @@ def stream_topic_events(
     on_subscribe: Callable[[], None] | None = None,
     terminal_events: Iterable[str | StreamEvent] | None = None,
 ) -> Generator[Mapping[str, Any] | str, None, None]:
+    """
+    Relay the events published to `topic` until a terminal event or `idle_timeout` seconds of silence.
+
+    Events are yielded as `EncodedStreamEvent`, so their payload is forwarded without being decoded.
+    """
     # send a PING event immediately to prevent the connection staying in pending state for a long time.
     #
     # This simplify the debugging process as the DevTools in Chrome does not
@@ -48,9 +145,9 @@ def stream_topic_events(
 
             last_msg_time = time.time()
             last_ping_time = last_msg_time
-            event = json.loads(msg)
+            event = decode_topic_event(msg)
             yield event
-            if not isinstance(event, dict):
+            if not isinstance(event, Mapping):
                 continue
 
             event_type = event.get("event")
@@ -9,6 +9,7 @@ from core.app.apps.workflow_app_runner import WorkflowBasedAppRunner
 from core.app.entities.app_invoke_entities import InvokeFrom, WorkflowAppGenerateEntity
 from core.app.workflow.layers.persistence import PersistenceWorkflowInfo, WorkflowPersistenceLayer
 from core.repositories.factory import WorkflowExecutionRepository, WorkflowNodeExecutionRepository
+from core.workflow.compiled_graph import CompiledWorkflowGraph, get_compiled_workflow_graph
 from core.workflow.node_factory import get_default_root_node_id
 from core.workflow.system_variables import build_bootstrap_variables, build_system_variables
 from core.workflow.variable_pool_initializer import add_node_inputs_to_pool, add_variables_to_pool
@@ -73,12 +74,14 @@ class WorkflowAppRunner(WorkflowBasedAppRunner):
         user_from = self._resolve_user_from(invoke_from)
 
         resume_state = self._resume_graph_runtime_state
+        compiled_graph: CompiledWorkflowGraph | None = None
 
         if resume_state is not None:
             graph_runtime_state = resume_state
             variable_pool = graph_runtime_state.variable_pool
+            compiled_graph = get_compiled_workflow_graph(self._workflow)
             graph = self._init_graph(
-                graph_config=self._workflow.graph_dict,
+                graph_config=compiled_graph.graph_config,
                 graph_runtime_state=graph_runtime_state,
                 workflow_id=self._workflow.id,
                 tenant_id=self._workflow.tenant_id,
@@ -86,6 +89,7 @@ class WorkflowAppRunner(WorkflowBasedAppRunner):
                 user_from=user_from,
                 invoke_from=invoke_from,
                 root_node_id=self._root_node_id,
+                compiled_graph=compiled_graph,
             )
         elif self.application_generate_entity.single_iteration_run or self.application_generate_entity.single_loop_run:
             graph, variable_pool, graph_runtime_state = self._prepare_single_node_execution(
@@ -114,12 +118,13 @@ class WorkflowAppRunner(WorkflowBasedAppRunner):
                     environment_variables=self._workflow.environment_variables,
                 ),
             )
-            root_node_id = self._root_node_id or get_default_root_node_id(self._workflow.graph_dict)
+            compiled_graph = get_compiled_workflow_graph(self._workflow)
+            root_node_id = self._root_node_id or get_default_root_node_id(compiled_graph.graph_config)
             add_node_inputs_to_pool(variable_pool, node_id=root_node_id, inputs=inputs)
 
             graph_runtime_state = GraphRuntimeState(variable_pool=variable_pool, start_at=time.perf_counter())
             graph = self._init_graph(
-                graph_config=self._workflow.graph_dict,
+                graph_config=compiled_graph.graph_config,
                 graph_runtime_state=graph_runtime_state,
                 workflow_id=self._workflow.id,
                 tenant_id=self._workflow.tenant_id,
@@ -127,6 +132,7 @@ class WorkflowAppRunner(WorkflowBasedAppRunner):
                 user_from=user_from,
                 invoke_from=invoke_from,
                 root_node_id=root_node_id,
+                compiled_graph=compiled_graph,
             )
 
         # RUN WORKFLOW
@@ -137,12 +143,13 @@ class WorkflowAppRunner(WorkflowBasedAppRunner):
 
         self._queue_manager.graph_runtime_state = graph_runtime_state
 
+        graph_config = compiled_graph.graph_config if compiled_graph is not None else self._workflow.graph_dict
         workflow_entry = WorkflowEntry(
             tenant_id=self._workflow.tenant_id,
             app_id=self._workflow.app_id,
             workflow_id=self._workflow.id,
             graph=graph,
-            graph_config=self._workflow.graph_dict,
+            graph_config=graph_config,
             user_id=self.application_generate_entity.user_id,
             user_from=user_from,
             invoke_from=invoke_from,
@@ -150,6 +157,7 @@ class WorkflowAppRunner(WorkflowBasedAppRunner):
             variable_pool=variable_pool,
             graph_runtime_state=graph_runtime_state,
             command_channel=command_channel,
+            compiled_graph=compiled_graph,
         )
 
         persistence_layer = WorkflowPersistenceLayer(
@@ -158,7 +166,7 @@ class WorkflowAppRunner(WorkflowBasedAppRunner):
                 workflow_id=self._workflow.id,
                 workflow_type=WorkflowType(self._workflow.type),
                 version=self._workflow.version,
-                graph_data=self._workflow.graph_dict,
+                graph_data=graph_config,
             ),
             workflow_execution_repository=self._workflow_execution_repository,
             workflow_node_execution_repository=self._workflow_node_execution_repository,
@@ -33,6 +33,7 @@ from core.app.entities.queue_entities import (
     QueueWorkflowSucceededEvent,
 )
 from core.rag.entities import RetrievalSourceMetadata
+from core.workflow.compiled_graph import CompiledWorkflowGraph
 from core.workflow.node_factory import (
     DifyGraphInitContext,
     DifyNodeFactory,
@@ -118,9 +119,10 @@ class WorkflowBasedAppRunner:
         tenant_id: str = "",
         user_id: str = "",
         root_node_id: str | None = None,
+        compiled_graph: CompiledWorkflowGraph | None = None,
     ) -> Graph:
         """
-        Init graph
+        Init graph, reusing the validated nodes of `compiled_graph` when it is the compiled form of `graph_config`
         """
         if "nodes" not in graph_config or "edges" not in graph_config:
             raise ValueError("nodes or edges not found in workflow graph")
@@ -151,6 +153,7 @@ class WorkflowBasedAppRunner:
         node_factory = DifyNodeFactory.from_graph_init_context(
             graph_init_context=graph_init_context,
             graph_runtime_state=graph_runtime_state,
+            compiled_graph=compiled_graph,
         )
 
         if root_node_id is None:
@@ -8,6 +8,7 @@ from typing import Any, Union
 
 from core.errors.error import AppInvokeQuotaExceededError
 from extensions.ext_redis import redis_client
+from libs.redis_rate_limiter import ConcurrencyLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -78,19 +79,26 @@ class RateLimit:
         if not request_id:
             request_id = RateLimit.gen_request_key()
 
-        active_requests_count = redis_client.hlen(self.active_requests_key)
-        if active_requests_count >= self.max_active_requests:
+        # counting and registering the request is one atomic step, so bursts cannot overshoot the limit
+        if not self._concurrency_limiter().acquire(self.active_requests_key, request_id).allowed:
             raise AppInvokeQuotaExceededError(
                 f"Too many requests. Please try again later. The current maximum concurrent requests allowed "
                 f"for {self.client_id} is {self.max_active_requests}."
             )
-        redis_client.hset(self.active_requests_key, request_id, str(time.time()))
         return request_id
 
     def exit(self, request_id: str):
         if request_id == RateLimit._UNLIMITED_REQUEST_ID:
             return
-        redis_client.hdel(self.active_requests_key, request_id)
+        self._concurrency_limiter().release(self.active_requests_key, request_id)
+
+    def _concurrency_limiter(self) -> ConcurrencyLimiter:
+        return ConcurrencyLimiter(
+            limit=self.max_active_requests,
+            lease_timeout=RateLimit._REQUEST_MAX_ALIVE_TIME,
+            ttl=int(timedelta(days=1).total_seconds()),
+            redis_client=redis_client,
+        )
 
     def disabled(self):
         return self.max_active_requests <= 0
@@ -152,7 +152,7 @@ class WorkflowPersistenceLayer(GraphEngineLayer):
             self._handle_node_pause_requested(event)
 
     def on_graph_end(self, error: Exception | None) -> None:
-        return
+        self._workflow_node_execution_repository.flush()
 
     # ------------------------------------------------------------------
     # Graph-level handlers
@@ -1813,8 +1813,8 @@ class ProviderConfigurations(BaseModel):
     tenant_id: str
     configurations: dict[str, ProviderConfiguration] = Field(default_factory=dict)
 
-    def __init__(self, tenant_id: str):
-        super().__init__(tenant_id=tenant_id)
+    def __init__(self, tenant_id: str, **data: Any):
+        super().__init__(tenant_id=tenant_id, **data)
 
     def get_models(
         self, provider: str | None = None, model_type: ModelType | None = None, only_active: bool = False
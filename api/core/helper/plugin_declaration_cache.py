@@ -0,0 +1,124 @@
+"""Process-wide cache of plugin provider declarations, invalidated through a per-tenant version counter."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from cachetools import TTLCache
+
+from configs import dify_config
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+_VERSION_KEY_PREFIX = "plugin_declarations_version"
+
+
+class PluginDeclarationCache:
+    """
+    Bounded, thread-safe cache of the provider declarations fetched from the plugin daemon.
+
+    A declaration only changes when a plugin is installed, upgraded or uninstalled, which `PluginInstaller`
+    signals by bumping a per-tenant Redis counter. Entries are keyed by ``(tenant_id, version, key)``, so a bump
+    on any worker makes all cached declarations of that tenant unreachable. Entries also expire after `ttl`
+    seconds, because the daemon installs plugins asynchronously and may finish after the bump.
+
+    Cached declarations are shared by every request of the process and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache: TTLCache[tuple[str, int, str], Any] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_version(tenant_id: str) -> int | None:
+        """
+        Get the plugin declarations version of a tenant.
+
+        :param tenant_id: workspace id
+        :return: current version, or None when it cannot be read and the cache must be bypassed
+        """
+        try:
+            version = redis_client.get(f"{_VERSION_KEY_PREFIX}:{tenant_id}")
+        except Exception:
+            logger.exception("Failed to read plugin declarations version, tenant_id: %s", tenant_id)
+            return None
+        return int(version) if version else 0
+
+    def get(self, tenant_id: str, version: int, key: str) -> Any | None:
+        with self._lock:
+            return self._cache.get((tenant_id, version, key))
+
+    def set(self, tenant_id: str, version: int, key: str, declaration: Any):
+        with self._lock:
+            self._cache[(tenant_id, version, key)] = declaration
+
+    def evict(self, tenant_id: str):
+        """Drop every locally cached declaration of a tenant."""
+        with self._lock:
+            for cache_key in [cache_key for cache_key in self._cache if cache_key[0] == tenant_id]:
+                self._cache.pop(cache_key, None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+_plugin_declaration_cache: PluginDeclarationCache | None = None
+_plugin_declaration_cache_lock = threading.Lock()
+
+
+def get_plugin_declaration_cache() -> PluginDeclarationCache | None:
+    """Return the process-wide plugin declaration cache, or None when it is disabled."""
+    global _plugin_declaration_cache
+    if not dify_config.PLUGIN_DECLARATION_CACHE_ENABLED:
+        return None
+    if _plugin_declaration_cache is None:
+        with _plugin_declaration_cache_lock:
+            if _plugin_declaration_cache is None:
+                _plugin_declaration_cache = PluginDeclarationCache(
+                    maxsize=dify_config.PLUGIN_DECLARATION_CACHE_MAX_SIZE,
+                    ttl=dify_config.PLUGIN_DECLARATION_CACHE_TTL,
+                )
+    return _plugin_declaration_cache
+
+
+def get_or_fetch_plugin_declaration[T](tenant_id: str, key: str, fetch: Callable[[], T]) -> T:
+    """
+    Return the cached declaration of a tenant, fetching and caching it on a miss.
+
+    :param tenant_id: workspace id
+    :param key: what is cached, e.g. ``tool_provider:<provider>``
+    :param fetch: fetches the declaration from the plugin daemon, errors and None are not cached
+    """
+    cache = get_plugin_declaration_cache()
+    version = cache.get_version(tenant_id) if cache is not None else None
+    if cache is None or version is None:
+        return fetch()
+
+    declaration = cache.get(tenant_id, version, key)
+    if declaration is None:
+        declaration = fetch()
+        if declaration is not None:
+            cache.set(tenant_id, version, key, declaration)
+    return declaration
+
+
+def bump_plugin_declarations_version(tenant_id: str):
+    """
+    Invalidate the cached plugin declarations of a tenant on every worker.
+
+    Must be called after any change to the plugins installed in a tenant.
+
+    :param tenant_id: workspace id
+    """
+    try:
+        redis_client.incr(f"{_VERSION_KEY_PREFIX}:{tenant_id}")
+    except Exception:
+        logger.exception("Failed to bump plugin declarations version, tenant_id: %s", tenant_id)
+
+    if _plugin_declaration_cache is not None:
+        _plugin_declaration_cache.evict(tenant_id)
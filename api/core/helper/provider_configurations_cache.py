@@ -0,0 +1,171 @@
+"""Process-wide cache of assembled provider configurations, invalidated through a per-tenant version counter."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+from cachetools import TTLCache
+from pydantic import ValidationError
+
+from configs import dify_config
+from extensions.ext_redis import redis_client
+
+if TYPE_CHECKING:
+    from core.entities.provider_configuration import ProviderConfigurations
+
+logger = logging.getLogger(__name__)
+
+_VERSION_KEY_PREFIX = "provider_configurations_version"
+_PAYLOAD_KEY_PREFIX = "provider_configurations"
+
+
+class ProviderConfigurationsCache:
+    """Bounded, thread-safe cache of ``ProviderConfigurations`` shared by every request of a worker process.
+
+    Entries are keyed by ``(tenant_id, version)``. The version is a Redis counter bumped by every write to a
+    tenant's provider settings, so a write on any worker makes all cached entries of that tenant unreachable
+    without having to broadcast deletes. Entries also expire after `ttl` seconds, which bounds the staleness
+    of state that changes without an explicit bump (hosted quota usage, installed model plugins).
+
+    When `redis_enabled` is set, assembled configurations are additionally stored in Redis so that a cold
+    worker can skip assembly for tenants already resolved by another worker.
+
+    Cached configurations are not bound to any model runtime and must be treated as read-only; callers bind
+    a copy to their own runtime.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, redis_enabled: bool = False):
+        self._cache: TTLCache[tuple[str, int], ProviderConfigurations] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._ttl = ttl
+        self._redis_enabled = redis_enabled
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_version(tenant_id: str) -> int | None:
+        """
+        Get the provider configuration version of a tenant.
+
+        :param tenant_id: workspace id
+        :return: current version, or None when it cannot be read and the cache must be bypassed
+        """
+        try:
+            version = redis_client.get(f"{_VERSION_KEY_PREFIX}:{tenant_id}")
+        except Exception:
+            logger.exception("Failed to read provider configurations version, tenant_id: %s", tenant_id)
+            return None
+        return int(version) if version else 0
+
+    def get(self, tenant_id: str, version: int) -> ProviderConfigurations | None:
+        with self._lock:
+            configurations = self._cache.get((tenant_id, version))
+            if configurations is not None:
+                self.hits += 1
+                return configurations
+
+        if self._redis_enabled:
+            configurations = self._load_from_redis(tenant_id, version)
+            if configurations is not None:
+                with self._lock:
+                    self._cache[(tenant_id, version)] = configurations
+                    self.redis_hits += 1
+                return configurations
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, tenant_id: str, version: int, configurations: ProviderConfigurations):
+        with self._lock:
+            self._cache[(tenant_id, version)] = configurations
+
+        if self._redis_enabled:
+            try:
+                redis_client.setex(
+                    f"{_PAYLOAD_KEY_PREFIX}:{tenant_id}:{version}", self._ttl, configurations.model_dump_json()
+                )
+            except Exception:
+                logger.exception("Failed to store provider configurations in redis, tenant_id: %s", tenant_id)
+
+    def evict(self, tenant_id: str):
+        """Drop every locally cached version of a tenant."""
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == tenant_id]:
+                self._cache.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.redis_hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            total = self.hits + self.redis_hits + self.misses
+            return {
+                "size": len(self._cache),
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.redis_hits) / total if total else 0.0,
+            }
+
+    @staticmethod
+    def _load_from_redis(tenant_id: str, version: int) -> ProviderConfigurations | None:
+        from core.entities.provider_configuration import ProviderConfigurations
+
+        try:
+            payload = redis_client.get(f"{_PAYLOAD_KEY_PREFIX}:{tenant_id}:{version}")
+        except Exception:
+            logger.exception("Failed to load provider configurations from redis, tenant_id: %s", tenant_id)
+            return None
+        if not payload:
+            return None
+
+        try:
+            return ProviderConfigurations.model_validate_json(payload)
+        except ValidationError:
+            logger.warning("Discarding undecodable provider configurations, tenant_id: %s", tenant_id)
+            return None
+
+
+def bump_provider_configurations_version(tenant_id: str):
+    """
+    Invalidate the cached provider configurations of a tenant on every worker.
+
+    Must be called after any write that changes what ``ProviderManager.get_configurations`` assembles.
+
+    :param tenant_id: workspace id
+    """
+    try:
+        redis_client.incr(f"{_VERSION_KEY_PREFIX}:{tenant_id}")
+    except Exception:
+        logger.exception("Failed to bump provider configurations version, tenant_id: %s", tenant_id)
+
+    if _provider_configurations_cache is not None:
+        _provider_configurations_cache.evict(tenant_id)
+
+
+_provider_configurations_cache: ProviderConfigurationsCache | None = None
+_provider_configurations_cache_lock = threading.Lock()
+
+
+def get_provider_configurations_cache() -> ProviderConfigurationsCache | None:
+    """Return the process-wide provider configurations cache, or None when it is disabled."""
+    global _provider_configurations_cache
+    if not dify_config.PROVIDER_CONFIGURATIONS_CACHE_ENABLED:
+        return None
+    if _provider_configurations_cache is None:
+        with _provider_configurations_cache_lock:
+            if _provider_configurations_cache is None:
+                _provider_configurations_cache = ProviderConfigurationsCache(
+                    maxsize=dify_config.PROVIDER_CONFIGURATIONS_CACHE_MAX_SIZE,
+                    ttl=dify_config.PROVIDER_CONFIGURATIONS_CACHE_TTL,
+                    redis_enabled=dify_config.PROVIDER_CONFIGURATIONS_CACHE_REDIS_ENABLED,
+                )
+    return _provider_configurations_cache
@@ -6,7 +6,7 @@ import threading
 import time
 import uuid
 from collections.abc import Mapping
-from typing import Any
+from typing import Any, cast
 
 from flask import Flask, current_app
 from sqlalchemy import delete, func, select, update
@@ -34,7 +34,8 @@ from core.tools.utils.web_reader_tool import get_image_upload_file_ids
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
-from graphon.model_runtime.entities.model_entities import ModelType
+from graphon.model_runtime.entities.model_entities import ModelPropertyKey, ModelType
+from graphon.model_runtime.model_providers.base.text_embedding_model import TextEmbeddingModel
 from libs import helper
 from libs.datetime_utils import naive_utc_now
 from models import Account
@@ -99,24 +100,14 @@ class IndexingRunner:
                 if not current_user:
                     raise ValueError("no current user found")
                 current_user.set_tenant_id(dataset.tenant_id)
-                documents = self._transform(
+                self._transform_and_load(
                     index_processor,
                     dataset,
+                    requeried_document,
                     text_docs,
-                    requeried_document.doc_language,
                     processing_rule.to_dict(),
                     current_user=current_user,
                 )
-                # save segment
-                self._load_segments(dataset, requeried_document, documents)
-
-                # load
-                self._load(
-                    index_processor=index_processor,
-                    dataset=dataset,
-                    dataset_document=requeried_document,
-                    documents=documents,
-                )
             except DocumentIsPausedError:
                 raise DocumentIsPausedError(f"Document paused, document id: {document_id}")
             except ProviderTokenNotInitError as e:
@@ -142,6 +133,37 @@ class IndexingRunner:
             if not dataset:
                 raise ValueError("no dataset found")
 
+            # get the process rule
+            stmt = select(DatasetProcessRule).where(DatasetProcessRule.id == requeried_document.dataset_process_rule_id)
+            processing_rule = db.session.scalar(stmt)
+            if not processing_rule:
+                raise ValueError("no process rule found")
+
+            index_type = requeried_document.doc_form
+            index_processor = IndexProcessorFactory(index_type).init_index_processor()
+            current_user = db.session.get(Account, requeried_document.created_by)
+            if not current_user:
+                raise ValueError("no current user found")
+            current_user.set_tenant_id(dataset.tenant_id)
+
+            split_page_count = requeried_document.split_page_count
+            if split_page_count is not None and self._supports_pipeline(
+                index_processor, dataset, processing_rule.to_dict()
+            ):
+                # splitting a page at a time was interrupted, keep the saved segments and continue after them
+                text_docs = self._extract(index_processor, requeried_document, processing_rule.to_dict())
+                del text_docs[:split_page_count]
+                self._run_pipeline(
+                    index_processor,
+                    dataset,
+                    requeried_document,
+                    text_docs,
+                    processing_rule.to_dict(),
+                    current_user=current_user,
+                    start_page=split_page_count,
+                )
+                return
+
             # get exist document_segment list and delete
             document_segments = db.session.scalars(
                 select(DocumentSegment).where(
@@ -156,40 +178,18 @@ class IndexingRunner:
                     # delete child chunks
                     db.session.execute(delete(ChildChunk).where(ChildChunk.segment_id == document_segment.id))
             db.session.commit()
-            # get the process rule
-            stmt = select(DatasetProcessRule).where(DatasetProcessRule.id == requeried_document.dataset_process_rule_id)
-            processing_rule = db.session.scalar(stmt)
-            if not processing_rule:
-                raise ValueError("no process rule found")
-
-            index_type = requeried_document.doc_form
-            index_processor = IndexProcessorFactory(index_type).init_index_processor()
             # extract
             text_docs = self._extract(index_processor, requeried_document, processing_rule.to_dict())
 
             # transform
-            current_user = db.session.get(Account, requeried_document.created_by)
-            if not current_user:
-                raise ValueError("no current user found")
-            current_user.set_tenant_id(dataset.tenant_id)
-            documents = self._transform(
+            self._transform_and_load(
                 index_processor,
                 dataset,
+                requeried_document,
                 text_docs,
-                requeried_document.doc_language,
                 processing_rule.to_dict(),
                 current_user=current_user,
             )
-            # save segment
-            self._load_segments(dataset, requeried_document, documents)
-
-            # load
-            self._load(
-                index_processor=index_processor,
-                dataset=dataset,
-                dataset_document=requeried_document,
-                documents=documents,
-            )
         except DocumentIsPausedError:
             raise DocumentIsPausedError(f"Document paused, document id: {document_id}")
         except ProviderTokenNotInitError as e:
@@ -213,45 +213,13 @@ class IndexingRunner:
             if not dataset:
                 raise ValueError("no dataset found")
 
-            # get exist document_segment list and delete
-            document_segments = db.session.scalars(
-                select(DocumentSegment).where(
-                    DocumentSegment.dataset_id == dataset.id,
-                    DocumentSegment.document_id == requeried_document.id,
-                )
-            ).all()
+            if requeried_document.split_page_count is not None:
+                # splitting a page at a time was interrupted, the remaining pages still have to be split
+                self.run_in_splitting_status(requeried_document)
+                return
 
-            documents = []
-            if document_segments:
-                for document_segment in document_segments:
-                    # transform segment to node
-                    if document_segment.status != SegmentStatus.COMPLETED:
-                        document = Document(
-                            page_content=document_segment.content,
-                            metadata={
-                                "doc_id": document_segment.index_node_id,
-                                "doc_hash": document_segment.index_node_hash,
-                                "document_id": document_segment.document_id,
-                                "dataset_id": document_segment.dataset_id,
-                            },
-                        )
-                        if requeried_document.doc_form == IndexStructureType.PARENT_CHILD_INDEX:
-                            child_chunks = document_segment.get_child_chunks()
-                            if child_chunks:
-                                child_documents = []
-                                for child_chunk in child_chunks:
-                                    child_document = ChildDocument(
-                                        page_content=child_chunk.content,
-                                        metadata={
-                                            "doc_id": child_chunk.index_node_id,
-                                            "doc_hash": child_chunk.index_node_hash,
-                                            "document_id": document_segment.document_id,
-                                            "dataset_id": document_segment.dataset_id,
-                                        },
-                                    )
-                                    child_documents.append(child_document)
-                                document.children = child_documents
-                        documents.append(document)
+            # segments already embedded and written to the vector store are kept
+            documents = self._get_unfinished_documents(dataset, requeried_document)
             # build index
             index_type = requeried_document.doc_form
             index_processor = IndexProcessorFactory(index_type).init_index_processor()
@@ -260,6 +228,7 @@ class IndexingRunner:
                 dataset=dataset,
                 dataset_document=requeried_document,
                 documents=documents,
+                completed_tokens=self._get_completed_tokens(requeried_document),
             )
         except DocumentIsPausedError:
             raise DocumentIsPausedError(f"Document paused, document id: {document_id}")
@@ -268,6 +237,244 @@ class IndexingRunner:
         except Exception as e:
             self._handle_indexing_error(document_id, e)
 
+    def _transform_and_load(
+        self,
+        index_processor: BaseIndexProcessor,
+        dataset: Dataset,
+        dataset_document: DatasetDocument,
+        text_docs: list[Document],
+        process_rule: Mapping[str, Any],
+        current_user: Account | None = None,
+    ):
+        """Split the extracted documents into segments, save them and build their index."""
+        if self._supports_pipeline(index_processor, dataset, process_rule):
+            self._run_pipeline(
+                index_processor, dataset, dataset_document, text_docs, process_rule, current_user=current_user
+            )
+            return
+
+        # transform
+        documents = self._transform(
+            index_processor,
+            dataset,
+            text_docs,
+            dataset_document.doc_language,
+            process_rule,
+            current_user=current_user,
+        )
+        # save segment
+        self._load_segments(dataset, dataset_document, documents)
+
+        # load
+        self._load(
+            index_processor=index_processor,
+            dataset=dataset,
+            dataset_document=dataset_document,
+            documents=documents,
+        )
+
+    @staticmethod
+    def _supports_pipeline(
+        index_processor: BaseIndexProcessor, dataset: Dataset, process_rule: Mapping[str, Any]
+    ) -> bool:
+        return (
+            dify_config.INDEXING_PIPELINE_ENABLED
+            and dataset.indexing_technique == IndexTechniqueType.HIGH_QUALITY
+            and index_processor.supports_incremental_transform(process_rule)
+        )
+
+    def _run_pipeline(
+        self,
+        index_processor: BaseIndexProcessor,
+        dataset: Dataset,
+        dataset_document: DatasetDocument,
+        text_docs: list[Document],
+        process_rule: Mapping[str, Any],
+        current_user: Account | None = None,
+        start_page: int = 0,
+    ):
+        """
+        Split, save and index the extracted documents one page at a time.
+
+        Pages are split in order on the calling thread, and their segments are saved before being handed to
+        `INDEXING_EMBEDDING_CONCURRENCY` workers that embed them and write them to the vector store. As in `_load`,
+        segments are routed to workers by content hash so that identical chunks are never embedded concurrently.
+        Each worker holds one batch at a time and the next page is only split once the batch it fills can be
+        handed over, so memory stays bounded by the batches in flight instead of growing with the document.
+        Pages are consumed from `text_docs` as they are split.
+
+        The number of pages whose segments are saved is checkpointed in `split_page_count`, in the same
+        transaction as the segments. When resuming from `start_page`, `text_docs` holds the pages after it and
+        the saved segments that are not completed yet are indexed first.
+        """
+        embedding_model_instance = self._get_embedding_model_instance(dataset)
+        batch_size = self._get_embedding_batch_size(embedding_model_instance)
+        concurrency = dify_config.INDEXING_EMBEDDING_CONCURRENCY
+        doc_store = DatasetDocumentStore(
+            dataset=dataset, user_id=dataset_document.created_by, document_id=dataset_document.id
+        )
+        save_child = dataset_document.doc_form == IndexStructureType.PARENT_CHILD_INDEX
+        flask_app = current_app._get_current_object()  # type: ignore
+
+        indexing_start_at = time.perf_counter()
+        tokens = 0
+        word_count = 0
+        if start_page:
+            tokens = self._get_completed_tokens(dataset_document)
+            word_count = (
+                db.session.scalar(
+                    select(func.sum(DocumentSegment.word_count)).where(
+                        DocumentSegment.document_id == dataset_document.id
+                    )
+                )
+                or 0
+            )
+            unfinished_documents = self._get_unfinished_documents(dataset, dataset_document)
+            self._update_segments_by_document(
+                dataset_document_id=dataset_document.id,
+                update_params={DocumentSegment.status: SegmentStatus.INDEXING},
+                pending_only=True,
+            )
+        else:
+            unfinished_documents = []
+            db.session.execute(
+                update(DatasetDocument).where(DatasetDocument.id == dataset_document.id).values(split_page_count=None)
+            )
+            db.session.commit()
+        indexing_started = bool(start_page)
+        pending: list[list[Document]] = [[] for _ in range(concurrency)]
+        running: list[concurrent.futures.Future[int] | None] = [None] * concurrency
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+
+            def submit(group: int):
+                nonlocal tokens
+                previous = running[group]
+                if previous is not None:
+                    tokens += previous.result()
+                running[group] = executor.submit(
+                    self._process_chunk,
+                    flask_app,
+                    index_processor,
+                    pending[group],
+                    dataset,
+                    dataset_document,
+                )
+                pending[group] = []
+
+            def dispatch(documents: list[Document]):
+                for document in documents:
+                    group = int(helper.generate_text_hash(document.page_content), 16) % concurrency
+                    pending[group].append(document)
+                    if len(pending[group]) >= batch_size:
+                        submit(group)
+
+            def raise_failed_batches():
+                # a group may not be submitted to again, so failures are not left for submit() to surface
+                for future in running:
+                    if future is not None and future.done():
+                        future.result()
+
+            dispatch(unfinished_documents)
+            del unfinished_documents
+
+            text_docs.reverse()
+            page_number = start_page
+            while text_docs:
+                self._check_document_paused_status(dataset_document.id)
+                raise_failed_batches()
+                page_number += 1
+                documents = index_processor.transform(
+                    [text_docs.pop()],
+                    current_user,
+                    embedding_model_instance=embedding_model_instance,
+                    process_rule=process_rule,
+                    tenant_id=dataset.tenant_id,
+                    doc_language=dataset_document.doc_language,
+                )
+                if not documents:
+                    continue
+
+                # the checkpoint and every segment of the page are committed at once, so a page is either saved
+                # completely or split again on resume
+                try:
+                    db.session.execute(
+                        update(DatasetDocument)
+                        .where(DatasetDocument.id == dataset_document.id)
+                        .values(split_page_count=page_number)
+                    )
+                    doc_store.add_documents(docs=documents, save_child=save_child, commit=False)
+                    db.session.execute(
+                        update(DocumentSegment)
+                        .where(
+                            DocumentSegment.document_id == dataset_document.id,
+                            DocumentSegment.index_node_id.in_([document.metadata["doc_id"] for document in documents]),
+                        )
+                        .values(status=SegmentStatus.INDEXING, indexing_at=naive_utc_now())
+                    )
+                    db.session.commit()
+                except Exception:
+                    # keep a partly saved page out of the commit made when the error is recorded
+                    db.session.rollback()
+                    raise
+                if not indexing_started:
+                    # segments show up as indexing progress from the first page on
+                    self._update_document_index_status(
+                        document_id=dataset_document.id, after_indexing_status=IndexingStatus.INDEXING
+                    )
+                    indexing_started = True
+                word_count += sum(len(document.page_content) for document in documents)
+                dispatch(documents)
+
+            cur_time = naive_utc_now()
+            self._update_document_index_status(
+                document_id=dataset_document.id,
+                after_indexing_status=IndexingStatus.INDEXING,
+                extra_update_params={
+                    DatasetDocument.cleaning_completed_at: cur_time,
+                    DatasetDocument.splitting_completed_at: cur_time,
+                    DatasetDocument.word_count: word_count,
+                    DatasetDocument.split_page_count: None,
+                },
+            )
+
+            for group in range(concurrency):
+                if pending[group]:
+                    submit(group)
+            for future in running:
+                if future is not None:
+                    tokens += future.result()
+        indexing_end_at = time.perf_counter()
+
+        # update document status to completed
+        self._update_document_index_status(
+            document_id=dataset_document.id,
+            after_indexing_status=IndexingStatus.COMPLETED,
+            extra_update_params={
+                DatasetDocument.tokens: tokens,
+                DatasetDocument.completed_at: naive_utc_now(),
+                DatasetDocument.indexing_latency: indexing_end_at - indexing_start_at,
+                DatasetDocument.error: None,
+            },
+        )
+
+    @staticmethod
+    def _get_embedding_batch_size(embedding_model_instance: ModelInstance | None) -> int:
+        """Round the configured batch size up to a whole number of embedding calls of the model."""
+        batch_size = dify_config.INDEXING_EMBEDDING_BATCH_SIZE
+        if embedding_model_instance is None:
+            return batch_size
+        model_type_instance = cast(TextEmbeddingModel, embedding_model_instance.model_type_instance)
+        model_schema = model_type_instance.get_model_schema(
+            embedding_model_instance.model_name, embedding_model_instance.credentials
+        )
+        max_chunks = (
+            model_schema.model_properties[ModelPropertyKey.MAX_CHUNKS]
+            if model_schema and ModelPropertyKey.MAX_CHUNKS in model_schema.model_properties
+            else 1
+        )
+        return -(-batch_size // max_chunks) * max_chunks
+
     def indexing_estimate(
         self,
         tenant_id: str,
@@ -572,23 +779,15 @@ class IndexingRunner:
         dataset: Dataset,
         dataset_document: DatasetDocument,
         documents: list[Document],
+        completed_tokens: int = 0,
     ):
         """
         insert index and update document/segment status to completed
         """
 
-        embedding_model_instance = None
-        if dataset.indexing_technique == IndexTechniqueType.HIGH_QUALITY:
-            embedding_model_instance = self._get_model_manager(dataset.tenant_id).get_model_instance(
-                tenant_id=dataset.tenant_id,
-                provider=dataset.embedding_model_provider,
-                model_type=ModelType.TEXT_EMBEDDING,
-                model=dataset.embedding_model,
-            )
-
         # chunk nodes by chunk size
         indexing_start_at = time.perf_counter()
-        tokens = 0
+        tokens = completed_tokens
         create_keyword_thread = None
         if (
             dataset_document.doc_form != IndexStructureType.PARENT_CHILD_INDEX
@@ -601,7 +800,7 @@ class IndexingRunner:
             )
             create_keyword_thread.start()
 
-        max_workers = 10
+        max_workers = dify_config.INDEXING_EMBEDDING_CONCURRENCY
         if dataset.indexing_technique == IndexTechniqueType.HIGH_QUALITY:
             with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
                 futures = []
@@ -625,7 +824,6 @@ class IndexingRunner:
                             chunk_documents,
                             dataset,
                             dataset_document,
-                            embedding_model_instance,
                         )
                     )
 
@@ -685,24 +883,18 @@ class IndexingRunner:
         chunk_documents: list[Document],
         dataset: Dataset,
         dataset_document: DatasetDocument,
-        embedding_model_instance: ModelInstance | None,
-    ):
+    ) -> int:
         with flask_app.app_context():
             # check document is paused
             self._check_document_paused_status(dataset_document.id)
 
-            tokens = 0
-            if embedding_model_instance:
-                page_content_list = [document.page_content for document in chunk_documents]
-                tokens += sum(embedding_model_instance.get_text_embedding_num_tokens(page_content_list))
-
             multimodal_documents = []
             for document in chunk_documents:
                 if document.attachments and dataset.is_multimodal:
                     multimodal_documents.extend(document.attachments)
 
-            # load index
-            index_processor.load(
+            # load index, the tokens are the ones used by the embedding calls
+            tokens = index_processor.load(
                 dataset, chunk_documents, multimodal_documents=multimodal_documents, with_keywords=False
             )
 
@@ -764,15 +956,74 @@ class IndexingRunner:
         db.session.commit()
 
     @staticmethod
-    def _update_segments_by_document(dataset_document_id: str, update_params: Mapping[Any, Any]):
+    def _update_segments_by_document(
+        dataset_document_id: str, update_params: Mapping[Any, Any], pending_only: bool = False
+    ):
         """
         Update the document segment by document id.
+        With `pending_only`, segments already completed are left untouched.
         """
-        db.session.execute(
-            update(DocumentSegment).where(DocumentSegment.document_id == dataset_document_id).values(update_params)
-        )
+        stmt = update(DocumentSegment).where(DocumentSegment.document_id == dataset_document_id)
+        if pending_only:
+            stmt = stmt.where(DocumentSegment.status != SegmentStatus.COMPLETED)
+        db.session.execute(stmt.values(update_params))
         db.session.commit()
 
+    @staticmethod
+    def _get_unfinished_documents(dataset: Dataset, dataset_document: DatasetDocument) -> list[Document]:
+        """Rebuild the documents of the saved segments that are not embedded and written to the index yet."""
+        document_segments = db.session.scalars(
+            select(DocumentSegment).where(
+                DocumentSegment.dataset_id == dataset.id,
+                DocumentSegment.document_id == dataset_document.id,
+                DocumentSegment.status != SegmentStatus.COMPLETED,
+            )
+        ).all()
+
+        documents = []
+        for document_segment in document_segments:
+            # transform segment to node
+            document = Document(
+                page_content=document_segment.content,
+                metadata={
+                    "doc_id": document_segment.index_node_id,
+                    "doc_hash": document_segment.index_node_hash,
+                    "document_id": document_segment.document_id,
+                    "dataset_id": document_segment.dataset_id,
+                },
+            )
+            if dataset_document.doc_form == IndexStructureType.PARENT_CHILD_INDEX:
+                child_chunks = document_segment.get_child_chunks()
+                if child_chunks:
+                    child_documents = []
+                    for child_chunk in child_chunks:
+                        child_document = ChildDocument(
+                            page_content=child_chunk.content,
+                            metadata={
+                                "doc_id": child_chunk.index_node_id,
+                                "doc_hash": child_chunk.index_node_hash,
+                                "document_id": document_segment.document_id,
+                                "dataset_id": document_segment.dataset_id,
+                            },
+                        )
+                        child_documents.append(child_document)
+                    document.children = child_documents
+            documents.append(document)
+        return documents
+
+    @staticmethod
+    def _get_completed_tokens(dataset_document: DatasetDocument) -> int:
+        """Sum the tokens of the segments indexed before indexing was interrupted."""
+        return (
+            db.session.scalar(
+                select(func.sum(DocumentSegment.tokens)).where(
+                    DocumentSegment.document_id == dataset_document.id,
+                    DocumentSegment.status == SegmentStatus.COMPLETED,
+                )
+            )
+            or 0
+        )
+
     def _transform(
         self,
         index_processor: BaseIndexProcessor,
@@ -782,21 +1033,7 @@ class IndexingRunner:
         process_rule: Mapping[str, Any],
         current_user: Account | None = None,
     ) -> list[Document]:
-        # get embedding model instance
-        embedding_model_instance = None
-        if dataset.indexing_technique == IndexTechniqueType.HIGH_QUALITY:
-            if dataset.embedding_model_provider:
-                embedding_model_instance = self._get_model_manager(dataset.tenant_id).get_model_instance(
-                    tenant_id=dataset.tenant_id,
-                    provider=dataset.embedding_model_provider,
-                    model_type=ModelType.TEXT_EMBEDDING,
-                    model=dataset.embedding_model,
-                )
-            else:
-                embedding_model_instance = self._get_model_manager(dataset.tenant_id).get_default_model_instance(
-                    tenant_id=dataset.tenant_id,
-                    model_type=ModelType.TEXT_EMBEDDING,
-                )
+        embedding_model_instance = self._get_embedding_model_instance(dataset)
 
         documents = index_processor.transform(
             text_docs,
@@ -809,6 +1046,21 @@ class IndexingRunner:
 
         return documents
 
+    def _get_embedding_model_instance(self, dataset: Dataset) -> ModelInstance | None:
+        if dataset.indexing_technique != IndexTechniqueType.HIGH_QUALITY:
+            return None
+        if dataset.embedding_model_provider:
+            return self._get_model_manager(dataset.tenant_id).get_model_instance(
+                tenant_id=dataset.tenant_id,
+                provider=dataset.embedding_model_provider,
+                model_type=ModelType.TEXT_EMBEDDING,
+                model=dataset.embedding_model,
+            )
+        return self._get_model_manager(dataset.tenant_id).get_default_model_instance(
+            tenant_id=dataset.tenant_id,
+            model_type=ModelType.TEXT_EMBEDDING,
+        )
+
     def _load_segments(self, dataset: Dataset, dataset_document: DatasetDocument, documents: list[Document]):
         # save node to document segment
         doc_store = DatasetDocumentStore(
@@ -829,6 +1081,7 @@ class IndexingRunner:
                 DatasetDocument.cleaning_completed_at: cur_time,
                 DatasetDocument.splitting_completed_at: cur_time,
                 DatasetDocument.word_count: sum(len(doc.page_content) for doc in documents),
+                DatasetDocument.split_page_count: None,
             },
         )
 
@@ -1,3 +1,6 @@
+import hashlib
+import logging
+from collections import defaultdict
 from collections.abc import Sequence
 
 from sqlalchemy import select
@@ -8,8 +11,9 @@ from core.app.file_access import DatabaseFileAccessController
 from core.model_manager import ModelInstance
 from core.prompt.utils.extract_thread_messages import extract_thread_messages
 from extensions.ext_database import db
+from extensions.ext_redis import redis_client
 from factories import file_factory
-from graphon.file import file_manager
+from graphon.file import FileUploadConfig, file_manager
 from graphon.model_runtime.entities import (
     AssistantPromptMessage,
     ImagePromptMessageContent,
@@ -19,13 +23,19 @@ from graphon.model_runtime.entities import (
     UserPromptMessage,
 )
 from graphon.model_runtime.entities.message_entities import PromptMessageContentUnionTypes
+from models.enums import MessageFileBelongsTo
 from models.model import AppMode, Conversation, Message, MessageFile
 from models.workflow import Workflow
 from repositories.api_workflow_run_repository import APIWorkflowRunRepository
 from repositories.factory import DifyAPIRepositoryFactory
 
+logger = logging.getLogger(__name__)
+
 _file_access_controller = DatabaseFileAccessController()
 
+# the prune position of a conversation is kept for a day after its last turn
+_PRUNE_START_CACHE_TTL = 86400
+
 
 class TokenBufferMemory:
     def __init__(
@@ -51,6 +61,7 @@ class TokenBufferMemory:
         message: Message,
         app_record,
         is_user_message: bool,
+        workflow_file_configs: dict[str, FileUploadConfig | None] | None = None,
     ) -> PromptMessage:
         """
         Build prompt message with files.
@@ -59,6 +70,7 @@ class TokenBufferMemory:
         :param message: Message object
         :param app_record: app record
         :param is_user_message: whether this is a user message
+        :param workflow_file_configs: file upload configs already resolved in this call, keyed by workflow run id
         :return: PromptMessage
         """
         match self.conversation.mode:
@@ -72,15 +84,18 @@ class TokenBufferMemory:
                 if not message.workflow_run_id:
                     raise ValueError("Workflow run ID not found")
 
-                workflow_run = self.workflow_run_repo.get_workflow_run_by_id(
-                    tenant_id=app.tenant_id, app_id=app.id, run_id=message.workflow_run_id
-                )
-                if not workflow_run:
-                    raise ValueError(f"Workflow run not found: {message.workflow_run_id}")
-                workflow = db.session.scalar(select(Workflow).where(Workflow.id == workflow_run.workflow_id))
-                if not workflow:
-                    raise ValueError(f"Workflow not found: {workflow_run.workflow_id}")
-                file_extra_config = FileUploadConfigManager.convert(workflow.features_dict, is_vision=False)
+                if workflow_file_configs is not None and message.workflow_run_id in workflow_file_configs:
+                    file_extra_config = workflow_file_configs[message.workflow_run_id]
+                else:
+                    workflow_run = self.workflow_run_repo.get_workflow_run_by_id(
+                        tenant_id=app.tenant_id, app_id=app.id, run_id=message.workflow_run_id
+                    )
+                    if not workflow_run:
+                        raise ValueError(f"Workflow run not found: {message.workflow_run_id}")
+                    workflow = db.session.scalar(select(Workflow).where(Workflow.id == workflow_run.workflow_id))
+                    if not workflow:
+                        raise ValueError(f"Workflow not found: {workflow_run.workflow_id}")
+                    file_extra_config = FileUploadConfigManager.convert(workflow.features_dict, is_vision=False)
             case _:
                 raise AssertionError(f"Invalid app mode: {self.conversation.mode}")
 
@@ -155,16 +170,21 @@ class TokenBufferMemory:
 
         messages = list(reversed(thread_messages))
 
-        curr_message_tokens = 0
+        user_files_by_message, assistant_files_by_message = self._load_message_files(messages)
+        workflow_file_configs: dict[str, FileUploadConfig | None] = {}
+        if self.conversation.mode in {AppMode.ADVANCED_CHAT, AppMode.WORKFLOW}:
+            workflow_file_configs = self._load_workflow_file_configs(
+                [
+                    message
+                    for message in messages
+                    if message.id in user_files_by_message or message.id in assistant_files_by_message
+                ]
+            )
+
         prompt_messages: list[PromptMessage] = []
         for message in messages:
             # Process user message with files
-            user_files = db.session.scalars(
-                select(MessageFile).where(
-                    MessageFile.message_id == message.id,
-                    (MessageFile.belongs_to == "user") | (MessageFile.belongs_to.is_(None)),
-                )
-            ).all()
+            user_files = user_files_by_message.get(message.id)
 
             if user_files:
                 user_prompt_message = self._build_prompt_message_with_files(
@@ -173,15 +193,14 @@ class TokenBufferMemory:
                     message=message,
                     app_record=app_record,
                     is_user_message=True,
+                    workflow_file_configs=workflow_file_configs,
                 )
                 prompt_messages.append(user_prompt_message)
             else:
                 prompt_messages.append(UserPromptMessage(content=message.query))
 
             # Process assistant message with files
-            assistant_files = db.session.scalars(
-                select(MessageFile).where(MessageFile.message_id == message.id, MessageFile.belongs_to == "assistant")
-            ).all()
+            assistant_files = assistant_files_by_message.get(message.id)
 
             if assistant_files:
                 assistant_prompt_message = self._build_prompt_message_with_files(
@@ -190,6 +209,7 @@ class TokenBufferMemory:
                     message=message,
                     app_record=app_record,
                     is_user_message=False,
+                    workflow_file_configs=workflow_file_configs,
                 )
                 prompt_messages.append(assistant_prompt_message)
             else:
@@ -199,14 +219,133 @@ class TokenBufferMemory:
             return []
 
         # prune the chat message if it exceeds the max token limit
-        curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
+        return self._prune_prompt_messages(prompt_messages, max_token_limit)
 
-        if curr_message_tokens > max_token_limit:
-            while curr_message_tokens > max_token_limit and len(prompt_messages) > 1:
-                prompt_messages.pop(0)
-                curr_message_tokens = self.model_instance.get_llm_num_tokens(prompt_messages)
+    def _prune_prompt_messages(self, prompt_messages: list[PromptMessage], max_token_limit: int) -> list[PromptMessage]:
+        """
+        Drop the oldest messages until the history fits in the token limit, keeping at least one.
+
+        Counting tokens is a plugin daemon round trip, so instead of re-counting after every dropped
+        message, the cut is searched for with whole-suffix counts: galloping from the cut of the previous
+        turn (kept in Redis), then bisecting. The cut is the same as dropping one message at a time,
+        since dropping a message never adds tokens. An unchanged history that fits costs one count, a
+        steady conversation a few, and a cold history O(log n).
+        :param prompt_messages: history prompt messages, oldest first
+        :param max_token_limit: max token limit
+        :return: pruned prompt messages
+        """
+        last = len(prompt_messages) - 1
+        counts: dict[int, int] = {}
+
+        def fits(start: int) -> bool:
+            if start >= last:
+                return True
+            if start not in counts:
+                counts[start] = self.model_instance.get_llm_num_tokens(prompt_messages[start:])
+            return counts[start] <= max_token_limit
+
+        cache_key = (
+            f"memory_prune_start:{self.conversation.id}:{self.model_instance.provider}:{self.model_instance.model_name}"
+        )
+        fields = [hashlib.sha256(message.model_dump_json().encode()).hexdigest() for message in prompt_messages]
+        guess = 0
+        try:
+            cached_field = redis_client.get(cache_key)
+            if cached_field:
+                cached_field = cached_field.decode() if isinstance(cached_field, bytes) else cached_field
+                guess = fields.index(cached_field) if cached_field in fields else 0
+        except Exception:
+            logger.exception("Failed to load memory prune position from cache")
+
+        # find the smallest start that fits, between `lo` (does not fit, -1 when all do) and `hi` (fits)
+        step = 1
+        if fits(guess):
+            lo, hi = -1, guess
+            while hi > 0:
+                candidate = max(hi - step, 0)
+                if not fits(candidate):
+                    lo = candidate
+                    break
+                hi = candidate
+                step *= 2
+        else:
+            lo = guess
+            while True:
+                candidate = min(lo + step, last)
+                if fits(candidate):
+                    hi = candidate
+                    break
+                lo = candidate
+                step *= 2
+        while hi - lo > 1:
+            middle = (lo + hi) // 2
+            if fits(middle):
+                hi = middle
+            else:
+                lo = middle
+
+        if hi != guess:
+            try:
+                redis_client.setex(cache_key, _PRUNE_START_CACHE_TTL, fields[hi])
+            except Exception:
+                logger.exception("Failed to save memory prune position to cache")
+
+        return prompt_messages[hi:]
 
-        return prompt_messages
+    @staticmethod
+    def _load_message_files(
+        messages: Sequence[Message],
+    ) -> tuple[dict[str, list[MessageFile]], dict[str, list[MessageFile]]]:
+        """
+        Load the files of all history messages in one query.
+        :param messages: history messages
+        :return: user files and assistant files, keyed by message id
+        """
+        user_files: dict[str, list[MessageFile]] = defaultdict(list)
+        assistant_files: dict[str, list[MessageFile]] = defaultdict(list)
+        if not messages:
+            return user_files, assistant_files
+
+        message_files = db.session.scalars(
+            select(MessageFile).where(MessageFile.message_id.in_([message.id for message in messages]))
+        ).all()
+        for message_file in message_files:
+            if message_file.belongs_to is None or message_file.belongs_to == MessageFileBelongsTo.USER:
+                user_files[message_file.message_id].append(message_file)
+            elif message_file.belongs_to == MessageFileBelongsTo.ASSISTANT:
+                assistant_files[message_file.message_id].append(message_file)
+        return user_files, assistant_files
+
+    def _load_workflow_file_configs(self, messages: Sequence[Message]) -> dict[str, FileUploadConfig | None]:
+        """
+        Resolve the file upload config of the workflow behind each message's workflow run.
+        Runs are fetched in one lookup and each workflow is loaded and converted once.
+        Runs that cannot be resolved are left out, so the per-message path reports them.
+        :param messages: history messages that have files
+        :return: file upload configs keyed by workflow run id
+        """
+        app = self.conversation.app
+        run_ids = list(dict.fromkeys(message.workflow_run_id for message in messages if message.workflow_run_id))
+        if not app or not run_ids:
+            return {}
+
+        workflow_runs = self.workflow_run_repo.get_workflow_runs_by_ids(
+            tenant_id=app.tenant_id, app_id=app.id, run_ids=run_ids
+        )
+        workflow_ids = {workflow_run.workflow_id for workflow_run in workflow_runs}
+        if not workflow_ids:
+            return {}
+
+        workflows = db.session.scalars(select(Workflow).where(Workflow.id.in_(workflow_ids))).all()
+        configs_by_workflow_id = {
+            workflow.id: FileUploadConfigManager.convert(workflow.features_dict, is_vision=False)
+            for workflow in workflows
+        }
+        return {
+            workflow_run.id: configs_by_workflow_id[workflow_run.workflow_id]
+            for workflow_run in workflow_runs
+            if workflow_run.workflow_id in configs_by_workflow_id
+        }
 
     def get_history_prompt_text(
         self,
@@ -53,4 +53,5 @@ class BaseTracingConfig(BaseModel):
 
 
 OPS_FILE_PATH = "ops_trace/"
+OPS_BATCH_FILE_PATH = f"{OPS_FILE_PATH}batches/"
 OPS_TRACE_FAILED_KEY = "FAILED_OPS_TRACE"
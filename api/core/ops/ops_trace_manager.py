@@ -1,10 +1,10 @@
+import atexit
 import collections
 import json
 import logging
 import os
 import queue
 import threading
-import time
 from datetime import timedelta
 from typing import TYPE_CHECKING, Any, TypedDict
 from uuid import UUID, uuid4
@@ -17,6 +17,7 @@ from sqlalchemy.orm import Session, sessionmaker
 
 from core.helper.encrypter import batch_decrypt_token, encrypt_token, obfuscated_token
 from core.ops.entities.config_entity import (
+    OPS_BATCH_FILE_PATH,
     OPS_FILE_PATH,
     BaseTracingConfig,
     TracingProviderEnum,
@@ -1453,16 +1454,42 @@ class TraceTask:
             return {}
 
 
-trace_manager_timer: threading.Timer | None = None
-trace_manager_queue: queue.Queue = queue.Queue()
 trace_manager_interval = int(os.getenv("TRACE_QUEUE_MANAGER_INTERVAL", 5))
 trace_manager_batch_size = int(os.getenv("TRACE_QUEUE_MANAGER_BATCH_SIZE", 100))
+# Upper bound on traces waiting for the flusher; 0 means unbounded.
+trace_manager_max_size = int(os.getenv("TRACE_QUEUE_MANAGER_MAX_SIZE", 10000))
+# Seconds a producer may block on a full queue before the trace is dropped.
+trace_manager_put_timeout = float(os.getenv("TRACE_QUEUE_MANAGER_PUT_TIMEOUT", 0.05))
+# Persist each flushed batch as one NDJSON object and dispatch it as one Celery message.
+trace_manager_batch_dispatch = os.getenv("TRACE_QUEUE_MANAGER_BATCH_DISPATCH", "false").lower() == "true"
+
+trace_manager_flusher: threading.Thread | None = None
+trace_manager_flusher_lock = threading.Lock()
+trace_manager_flush_event = threading.Event()
+trace_manager_queue: queue.Queue = queue.Queue(maxsize=trace_manager_max_size)
+trace_manager_stats: collections.Counter[str] = collections.Counter()
+trace_manager_stats_lock = threading.Lock()
+
+
+def _record_trace_queue_stat(name: str, value: int = 1) -> int:
+    with trace_manager_stats_lock:
+        trace_manager_stats[name] += value
+        return trace_manager_stats[name]
+
+
+def get_trace_queue_stats() -> dict[str, int]:
+    """
+    Snapshot of the trace queue counters (enqueued, dropped, flushed, failed, batches)
+    together with the current queue depth.
+    """
+    with trace_manager_stats_lock:
+        stats = dict(trace_manager_stats)
+    stats["pending"] = trace_manager_queue.qsize()
+    return stats
 
 
 class TraceQueueManager:
     def __init__(self, app_id=None, user_id=None):
-        global trace_manager_timer
-
         self.app_id = app_id
         self.user_id = user_id
         self.trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
@@ -1471,25 +1498,38 @@ class TraceQueueManager:
         from core.telemetry.gateway import is_enterprise_telemetry_enabled
 
         self._enterprise_telemetry_enabled = is_enterprise_telemetry_enabled()
-        if trace_manager_timer is None:
-            self.start_timer()
+        self.start_flusher()
 
     def add_trace_task(self, trace_task: TraceTask):
-        global trace_manager_timer, trace_manager_queue
+        global trace_manager_queue
         try:
             if self._enterprise_telemetry_enabled or self.trace_instance:
                 trace_task.app_id = self.app_id
-                trace_manager_queue.put(trace_task)
+                trace_manager_queue.put(trace_task, timeout=trace_manager_put_timeout)
+                _record_trace_queue_stat("enqueued")
+                if trace_manager_queue.qsize() >= trace_manager_batch_size:
+                    trace_manager_flush_event.set()
+        except queue.Full:
+            dropped = _record_trace_queue_stat("dropped")
+            # Log the first drop and then periodically, a saturated queue would otherwise flood the logs.
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning(
+                    "Trace queue is full (max size %s), dropped trace_type %s, %s traces dropped so far",
+                    trace_manager_max_size,
+                    trace_task.trace_type,
+                    dropped,
+                )
         except Exception:
             logger.exception("Error adding trace task, trace_type %s", trace_task.trace_type)
-        finally:
-            self.start_timer()
 
     def collect_tasks(self):
         global trace_manager_queue
         tasks: list[TraceTask] = []
-        while len(tasks) < trace_manager_batch_size and not trace_manager_queue.empty():
-            task = trace_manager_queue.get_nowait()
+        while len(tasks) < trace_manager_batch_size:
+            try:
+                task = trace_manager_queue.get_nowait()
+            except queue.Empty:
+                break
             tasks.append(task)
             trace_manager_queue.task_done()
         return tasks
@@ -1499,28 +1539,47 @@ class TraceQueueManager:
             tasks = self.collect_tasks()
             if tasks:
                 self.send_to_celery(tasks)
+            return len(tasks)
         except Exception:
             logger.exception("Error processing trace tasks")
+            return 0
+
+    def flush(self):
+        """
+        Drain the queue batch by batch until it is empty.
+        """
+        while self.run():
+            pass
+
+    def start_flusher(self):
+        global trace_manager_flusher
+        if trace_manager_flusher is not None and trace_manager_flusher.is_alive():
+            return
+        with trace_manager_flusher_lock:
+            if trace_manager_flusher is None or not trace_manager_flusher.is_alive():
+                trace_manager_flusher = threading.Thread(
+                    target=self._flush_loop, name="trace_manager_flusher", daemon=True
+                )
+                trace_manager_flusher.start()
+                atexit.register(self.flush)
 
-    def start_timer(self):
-        global trace_manager_timer
-        if trace_manager_timer is None or not trace_manager_timer.is_alive():
-            trace_manager_timer = threading.Timer(trace_manager_interval, self.run)
-            trace_manager_timer.name = f"trace_manager_timer_{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())}"
-            trace_manager_timer.daemon = False
-            trace_manager_timer.start()
+    def _flush_loop(self):
+        while True:
+            # Wake up every interval, or early once a full batch is waiting.
+            trace_manager_flush_event.wait(trace_manager_interval)
+            trace_manager_flush_event.clear()
+            self.flush()
 
     def send_to_celery(self, tasks: list[TraceTask]):
+        if trace_manager_batch_dispatch:
+            self._send_batch_to_celery(tasks)
+            return
+
         with self.flask_app.app_context():
             for task in tasks:
-                storage_id = task.app_id
+                storage_id = self._get_storage_id(task)
                 if storage_id is None:
-                    tenant_id = task.kwargs.get("tenant_id")
-                    if tenant_id:
-                        storage_id = f"tenant-{tenant_id}"
-                    else:
-                        logger.warning("Skipping trace without app_id or tenant_id, trace_type: %s", task.trace_type)
-                        continue
+                    continue
 
                 file_id = uuid4().hex
                 trace_info = task.execute()
@@ -1537,3 +1596,48 @@ class TraceQueueManager:
                     "app_id": storage_id,
                 }
                 process_trace_tasks.delay(file_info)  # type: ignore
+                _record_trace_queue_stat("flushed")
+
+    def _send_batch_to_celery(self, tasks: list[TraceTask]):
+        lines: list[str] = []
+        with self.flask_app.app_context():
+            for task in tasks:
+                storage_id = self._get_storage_id(task)
+                if storage_id is None:
+                    continue
+
+                try:
+                    trace_info = task.execute()
+                except Exception:
+                    _record_trace_queue_stat("failed")
+                    logger.exception("Error executing trace task, trace_type %s", getattr(task, "trace_type", None))
+                    continue
+                if not trace_info:
+                    # nothing to trace, e.g. the message or workflow run no longer exists
+                    continue
+
+                task_data = TaskData(
+                    app_id=storage_id,
+                    trace_info_type=type(trace_info).__name__,
+                    trace_info=trace_info.model_dump(),
+                )
+                lines.append(task_data.model_dump_json())
+
+            if not lines:
+                return
+
+            batch_id = uuid4().hex
+            storage.save(f"{OPS_BATCH_FILE_PATH}{batch_id}.ndjson", "\n".join(lines).encode("utf-8"))
+            process_trace_tasks.delay({"batch_id": batch_id, "count": len(lines)})  # type: ignore
+            _record_trace_queue_stat("flushed", len(lines))
+            _record_trace_queue_stat("batches")
+
+    @staticmethod
+    def _get_storage_id(task: TraceTask) -> str | None:
+        if task.app_id is not None:
+            return task.app_id
+        tenant_id = task.kwargs.get("tenant_id")
+        if tenant_id:
+            return f"tenant-{tenant_id}"
+        logger.warning("Skipping trace without app_id or tenant_id, trace_type: %s", task.trace_type)
+        return None
@@ -10,6 +10,7 @@ from pydantic import ValidationError
 from redis import RedisError
 
 from configs import dify_config
+from core.helper.plugin_declaration_cache import get_or_fetch_plugin_declaration
 from core.plugin.entities.plugin_daemon import PluginModelProviderEntity
 from core.plugin.impl.asset import PluginAssetManager
 from core.plugin.impl.model import PluginModelClient
@@ -53,9 +54,11 @@ class PluginModelRuntime(ModelRuntime):
 
         with self._provider_entities_lock:
             if self._provider_entities is None:
-                self._provider_entities = tuple(
-                    self._to_provider_entity(provider) for provider in self.client.fetch_model_providers(self.tenant_id)
+                # `_to_provider_entity` copies the declarations, so the cached ones are never mutated
+                providers = get_or_fetch_plugin_declaration(
+                    self.tenant_id, "model_providers", lambda: tuple(self.client.fetch_model_providers(self.tenant_id))
                 )
+                self._provider_entities = tuple(self._to_provider_entity(provider) for provider in providers)
 
         return self._provider_entities
 
@@ -3,6 +3,7 @@ from typing import Any
 
 from requests import HTTPError
 
+from core.helper.plugin_declaration_cache import bump_plugin_declarations_version
 from core.plugin.entities.bundle import PluginBundleDependency
 from core.plugin.entities.plugin import (
     MissingPluginDependency,
@@ -15,6 +16,7 @@ from core.plugin.entities.plugin_daemon import (
     PluginDecodeResponse,
     PluginInstallTask,
     PluginInstallTaskStartResponse,
+    PluginInstallTaskStatus,
     PluginListResponse,
     PluginReadmeResponse,
 )
@@ -127,7 +129,7 @@ class PluginInstaller(BasePluginClient):
         Install a plugin from an identifier.
         """
         # exception will be raised if the request failed
-        return self._request_with_plugin_daemon_response(
+        response = self._request_with_plugin_daemon_response(
             "POST",
             f"plugin/{tenant_id}/management/install/identifiers",
             PluginInstallTaskStartResponse,
@@ -138,6 +140,8 @@ class PluginInstaller(BasePluginClient):
             },
             headers={"Content-Type": "application/json"},
         )
+        bump_plugin_declarations_version(tenant_id)
+        return response
 
     def fetch_plugin_installation_tasks(self, tenant_id: str, page: int, page_size: int) -> Sequence[PluginInstallTask]:
         """
@@ -154,11 +158,15 @@ class PluginInstaller(BasePluginClient):
         """
         Fetch a plugin installation task.
         """
-        return self._request_with_plugin_daemon_response(
+        task = self._request_with_plugin_daemon_response(
             "GET",
             f"plugin/{tenant_id}/management/install/tasks/{task_id}",
             PluginInstallTask,
         )
+        # the daemon installs asynchronously, declarations cached while the task ran may be outdated
+        if task.status not in {PluginInstallTaskStatus.Pending, PluginInstallTaskStatus.Running}:
+            bump_plugin_declarations_version(tenant_id)
+        return task
 
     def delete_plugin_installation_task(self, tenant_id: str, task_id: str) -> bool:
         """
@@ -248,7 +256,7 @@ class PluginInstaller(BasePluginClient):
         """
         Uninstall a plugin.
         """
-        return self._request_with_plugin_daemon_response(
+        result = self._request_with_plugin_daemon_response(
             "POST",
             f"plugin/{tenant_id}/management/uninstall",
             bool,
@@ -257,6 +265,8 @@ class PluginInstaller(BasePluginClient):
             },
             headers={"Content-Type": "application/json"},
         )
+        bump_plugin_declarations_version(tenant_id)
+        return result
 
     def upgrade_plugin(
         self,
@@ -269,7 +279,7 @@ class PluginInstaller(BasePluginClient):
         """
         Upgrade a plugin.
         """
-        return self._request_with_plugin_daemon_response(
+        response = self._request_with_plugin_daemon_response(
             "POST",
             f"plugin/{tenant_id}/management/install/upgrade",
             PluginInstallTaskStartResponse,
@@ -281,6 +291,8 @@ class PluginInstaller(BasePluginClient):
             },
             headers={"Content-Type": "application/json"},
         )
+        bump_plugin_declarations_version(tenant_id)
+        return response
 
     def check_tools_existence(self, tenant_id: str, provider_ids: Sequence[GenericProviderID]) -> Sequence[bool]:
         """
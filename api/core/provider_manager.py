@@ -30,6 +30,7 @@ from core.entities.provider_entities import (
 from core.helper import encrypter
 from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
 from core.helper.position_helper import is_filtered
+from core.helper.provider_configurations_cache import get_provider_configurations_cache
 from extensions import ext_hosting_provider
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
@@ -76,6 +77,11 @@ class ProviderManager:
     of rebuilding it for every lookup. Call ``clear_configurations_cache()``
     when a long-lived manager needs to observe writes performed within the same
     instance scope.
+
+    When ``PROVIDER_CONFIGURATIONS_CACHE_ENABLED`` is set, assembled configurations
+    are also shared across managers of the same worker process, keyed by the
+    tenant's provider configuration version. Writes to provider settings must call
+    ``bump_provider_configurations_version()`` so every worker rebuilds them.
     """
 
     decoding_rsa_key: Any | None
@@ -138,6 +144,16 @@ class ProviderManager:
         if cached_configurations is not None:
             return cached_configurations
 
+        # Read the version before assembling, a concurrent write then only leaves an unreachable entry behind
+        shared_cache = get_provider_configurations_cache()
+        shared_version = shared_cache.get_version(tenant_id) if shared_cache is not None else None
+        if shared_cache is not None and shared_version is not None:
+            shared_configurations = shared_cache.get(tenant_id, shared_version)
+            if shared_configurations is not None:
+                provider_configurations = self._bind_model_runtime(shared_configurations, copy=True)
+                self._configurations_cache[tenant_id] = provider_configurations
+                return provider_configurations
+
         # Get all provider records of the workspace
         provider_name_to_provider_records_dict = self._get_all_providers(tenant_id)
 
@@ -293,15 +309,44 @@ class ProviderManager:
                 custom_configuration=custom_configuration,
                 model_settings=model_settings,
             )
-            provider_configuration.bind_model_runtime(self._model_runtime)
 
             provider_configurations[str(provider_id_entity)] = provider_configuration
 
+        if shared_cache is not None and shared_version is not None:
+            # The shared entry stays unbound, each manager binds its own copy to its runtime
+            shared_cache.set(tenant_id, shared_version, provider_configurations)
+            provider_configurations = self._bind_model_runtime(provider_configurations, copy=True)
+        else:
+            provider_configurations = self._bind_model_runtime(provider_configurations, copy=False)
+
         self._configurations_cache[tenant_id] = provider_configurations
 
         # Return the encapsulated object
         return provider_configurations
 
+    def _bind_model_runtime(
+        self, provider_configurations: ProviderConfigurations, copy: bool
+    ) -> ProviderConfigurations:
+        """
+        Bind provider configurations to this manager's model runtime.
+
+        :param provider_configurations: assembled provider configurations
+        :param copy: bind deep copies instead of the given objects, for configurations shared across managers
+        :return: bound provider configurations
+        """
+        if not copy:
+            for provider_configuration in provider_configurations.values():
+                provider_configuration.bind_model_runtime(self._model_runtime)
+            return provider_configurations
+
+        bound_configurations = ProviderConfigurations(tenant_id=provider_configurations.tenant_id)
+        for provider, provider_configuration in provider_configurations:
+            # deep, so nested settings mutated while serving a request are not shared with other requests
+            bound_configuration = provider_configuration.model_copy(deep=True)
+            bound_configuration.bind_model_runtime(self._model_runtime)
+            bound_configurations[provider] = bound_configuration
+        return bound_configurations
+
     def get_provider_model_bundle(self, tenant_id: str, provider: str, model_type: ModelType) -> ProviderModelBundle:
         """
         Get provider model bundle.
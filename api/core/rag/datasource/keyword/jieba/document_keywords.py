@@ -0,0 +1,55 @@
+"""Keywords of retrieved chunks for TF-IDF reranking without re-tokenizing the chunk text on every query."""
+
+import threading
+
+from cachetools import LRUCache
+
+from configs import dify_config
+from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.models.document import Document
+
+_keywords_cache: LRUCache[str, tuple[str, ...]] | None = None
+_keywords_cache_lock = threading.Lock()
+
+
+def get_document_keywords(keyword_table_handler: JiebaKeywordTableHandler, document: Document) -> list[str]:
+    """
+    Return the keywords of a retrieved chunk.
+
+    Every candidate is tokenized with the same extraction, whichever retrieval method returned it, so that
+    keyword scores stay comparable. Index-time `DocumentSegment.keywords` are deliberately not used: they are
+    capped at `keyword_number` and may be edited by users. The extraction is done once per segment hash
+    (`metadata["doc_hash"]`) and kept in a bounded per-process LRU; chunks without a hash are tokenized every
+    time.
+    """
+    segment_hash = (document.metadata or {}).get("doc_hash")
+    cache = _get_keywords_cache() if segment_hash else None
+    if cache is None:
+        return list(keyword_table_handler.extract_keywords(document.page_content, None))
+
+    with _keywords_cache_lock:
+        cached_keywords = cache.get(segment_hash)
+    if cached_keywords is not None:
+        return list(cached_keywords)
+
+    extracted_keywords = list(keyword_table_handler.extract_keywords(document.page_content, None))
+    with _keywords_cache_lock:
+        cache[segment_hash] = tuple(extracted_keywords)
+    return extracted_keywords
+
+
+def clear_document_keywords_cache():
+    with _keywords_cache_lock:
+        if _keywords_cache is not None:
+            _keywords_cache.clear()
+
+
+def _get_keywords_cache() -> LRUCache[str, tuple[str, ...]] | None:
+    global _keywords_cache
+    if not dify_config.DOCUMENT_KEYWORDS_CACHE_MAX_SIZE:
+        return None
+    if _keywords_cache is None:
+        with _keywords_cache_lock:
+            if _keywords_cache is None:
+                _keywords_cache = LRUCache(maxsize=dify_config.DOCUMENT_KEYWORDS_CACHE_MAX_SIZE)
+    return _keywords_cache
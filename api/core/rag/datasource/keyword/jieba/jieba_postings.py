@@ -0,0 +1,197 @@
+from collections.abc import Iterable
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from configs import dify_config
+from core.rag.datasource.keyword.jieba.jieba import Jieba, KeywordTableConfig
+from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
+from core.rag.datasource.keyword.keyword_base import BaseKeyword
+from core.rag.models.document import Document
+from extensions.ext_database import db
+from models.dataset import Dataset, DatasetKeywordPosting, DocumentSegment
+
+# Keywords longer than the posting column are never produced by jieba in practice and are skipped.
+_MAX_KEYWORD_LENGTH = 255
+_POSTINGS_INSERT_BATCH_SIZE = 1000
+
+
+class JiebaPostings(BaseKeyword):
+    """Jieba keyword index stored as normalized keyword -> segment postings.
+
+    Unlike `Jieba`, which rewrites one JSON blob per dataset under a lock, postings are inserted and
+    deleted incrementally and a search only reads the rows of the query keywords.
+    """
+
+    def __init__(self, dataset: Dataset):
+        super().__init__(dataset)
+        self._config = KeywordTableConfig()
+
+    def create(self, texts: list[Document], **kwargs) -> BaseKeyword:
+        self.add_texts(texts, **kwargs)
+        return self
+
+    def add_texts(self, texts: list[Document], **kwargs):
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords_list = kwargs.get("keywords_list")
+        keyword_number = self.dataset.keyword_number or self._config.max_keywords_per_chunk
+
+        node_keywords: dict[str, list[str]] = {}
+        for i, text in enumerate(texts):
+            if text.metadata is None:
+                continue
+            keywords = keywords_list[i] if keywords_list else None
+            if not keywords:
+                keywords = keyword_table_handler.extract_keywords(text.page_content, keyword_number)
+            node_keywords[text.metadata["doc_id"]] = list(keywords)
+
+        if not node_keywords:
+            return
+        self._update_segments_keywords(node_keywords)
+        self._add_postings(node_keywords)
+        db.session.commit()
+
+    def text_exists(self, id: str) -> bool:
+        posting_id = db.session.scalar(
+            select(DatasetKeywordPosting.id)
+            .where(DatasetKeywordPosting.dataset_id == self.dataset.id, DatasetKeywordPosting.index_node_id == id)
+            .limit(1)
+        )
+        return posting_id is not None
+
+    def delete_by_ids(self, ids: list[str]):
+        if not ids:
+            return
+        db.session.execute(
+            delete(DatasetKeywordPosting).where(
+                DatasetKeywordPosting.dataset_id == self.dataset.id, DatasetKeywordPosting.index_node_id.in_(ids)
+            )
+        )
+        db.session.commit()
+
+    def delete(self):
+        db.session.execute(delete(DatasetKeywordPosting).where(DatasetKeywordPosting.dataset_id == self.dataset.id))
+        db.session.commit()
+        # drop the legacy blob as well when the dataset was indexed before switching backends
+        if self.dataset.dataset_keyword_table:
+            Jieba(self.dataset).delete()
+
+    def search(self, query: str, **kwargs: Any) -> list[Document]:
+        k = kwargs.get("top_k", 4)
+        document_ids_filter = kwargs.get("document_ids_filter")
+        sorted_chunk_indices = self._retrieve_ids_by_query(query, k, document_ids_filter)
+        if not sorted_chunk_indices:
+            return []
+
+        segment_query_stmt = select(DocumentSegment).where(
+            DocumentSegment.dataset_id == self.dataset.id, DocumentSegment.index_node_id.in_(sorted_chunk_indices)
+        )
+        if document_ids_filter:
+            segment_query_stmt = segment_query_stmt.where(DocumentSegment.document_id.in_(document_ids_filter))
+
+        segments = db.session.scalars(segment_query_stmt).all()
+        segment_map = {segment.index_node_id: segment for segment in segments}
+
+        documents = []
+        for chunk_index in sorted_chunk_indices:
+            segment = segment_map.get(chunk_index)
+            if segment:
+                documents.append(
+                    Document(
+                        page_content=segment.content,
+                        metadata={
+                            "doc_id": chunk_index,
+                            "doc_hash": segment.index_node_hash,
+                            "document_id": segment.document_id,
+                            "dataset_id": segment.dataset_id,
+                        },
+                    )
+                )
+
+        return documents
+
+    def migrate_from_keyword_table(self) -> int:
+        """Copy the legacy `DatasetKeywordTable` blob of the dataset into postings.
+
+        The blob is left in place so the dataset can still be served by `Jieba`; `delete` removes both.
+        Returns the number of postings written.
+        """
+        dataset_keyword_table = self.dataset.dataset_keyword_table
+        if not dataset_keyword_table:
+            return 0
+        keyword_table_dict = dataset_keyword_table.keyword_table_dict
+        keyword_table = keyword_table_dict["__data__"]["table"] if keyword_table_dict else None
+        if not keyword_table:
+            return 0
+
+        node_keywords: dict[str, list[str]] = {}
+        for keyword, node_ids in keyword_table.items():
+            for node_id in node_ids:
+                node_keywords.setdefault(node_id, []).append(keyword)
+        posting_count = self._add_postings(node_keywords)
+        db.session.commit()
+        return posting_count
+
+    def _retrieve_ids_by_query(self, query: str, k: int, document_ids_filter: list[str] | None = None) -> list[str]:
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords = [
+            keyword
+            for keyword in keyword_table_handler.extract_keywords(query)
+            if keyword and len(keyword) <= _MAX_KEYWORD_LENGTH
+        ]
+        if not keywords:
+            return []
+
+        # rank chunks by the number of distinct query keywords they contain
+        hits = func.count(DatasetKeywordPosting.id).label("hits")
+        stmt = select(DatasetKeywordPosting.index_node_id, hits).where(
+            DatasetKeywordPosting.dataset_id == self.dataset.id, DatasetKeywordPosting.keyword.in_(keywords)
+        )
+        if document_ids_filter:
+            stmt = stmt.join(
+                DocumentSegment,
+                and_(
+                    DocumentSegment.dataset_id == DatasetKeywordPosting.dataset_id,
+                    DocumentSegment.index_node_id == DatasetKeywordPosting.index_node_id,
+                ),
+            ).where(DocumentSegment.document_id.in_(document_ids_filter))
+        stmt = stmt.group_by(DatasetKeywordPosting.index_node_id).order_by(hits.desc()).limit(k)
+
+        return [row.index_node_id for row in db.session.execute(stmt)]
+
+    def _update_segments_keywords(self, node_keywords: dict[str, list[str]]):
+        segments = db.session.scalars(
+            select(DocumentSegment).where(
+                DocumentSegment.dataset_id == self.dataset.id,
+                DocumentSegment.index_node_id.in_(list(node_keywords)),
+            )
+        ).all()
+        for segment in segments:
+            if segment.index_node_id in node_keywords:
+                segment.keywords = node_keywords[segment.index_node_id]
+
+    def _add_postings(self, node_keywords: dict[str, list[str]]) -> int:
+        rows = list(self._posting_rows(node_keywords))
+        for i in range(0, len(rows), _POSTINGS_INSERT_BATCH_SIZE):
+            batch_rows = rows[i : i + _POSTINGS_INSERT_BATCH_SIZE]
+            if dify_config.SQLALCHEMY_DATABASE_URI_SCHEME == "postgresql":
+                stmt = pg_insert(DatasetKeywordPosting).values(batch_rows)
+                stmt = stmt.on_conflict_do_nothing(index_elements=["dataset_id", "keyword", "index_node_id"])
+            else:
+                stmt = mysql_insert(DatasetKeywordPosting).values(batch_rows).prefix_with("IGNORE")  # type: ignore[assignment]
+            db.session.execute(stmt)
+        return len(rows)
+
+    def _posting_rows(self, node_keywords: dict[str, list[str]]) -> Iterable[dict[str, str]]:
+        for node_id, keywords in node_keywords.items():
+            for keyword in dict.fromkeys(keywords):
+                if keyword and len(keyword) <= _MAX_KEYWORD_LENGTH:
+                    yield {
+                        "id": str(uuid4()),
+                        "dataset_id": self.dataset.id,
+                        "keyword": keyword,
+                        "index_node_id": node_id,
+                    }
@@ -88,7 +88,9 @@ class Vector:
     def get_vector_factory(vector_type: str) -> type[AbstractVectorFactory]:
         return get_vector_factory_class(vector_type)
 
-    def create(self, texts: list | None = None, **kwargs):
+    def create(self, texts: list | None = None, **kwargs) -> int:
+        """Embed and store the documents, returning the tokens used by the embedding model."""
+        tokens = 0
         if texts:
             start = time.time()
             logger.info("start embedding %s texts %s", len(texts), start)
@@ -98,12 +100,16 @@ class Vector:
                 batch = texts[i : i + batch_size]
                 batch_start = time.time()
                 logger.info("Processing batch %s/%s (%s texts)", i // batch_size + 1, total_batches, len(batch))
-                batch_embeddings = self._embeddings.embed_documents([document.page_content for document in batch])
+                batch_embeddings, batch_tokens = self._embeddings.embed_documents_with_usage(
+                    [document.page_content for document in batch]
+                )
+                tokens += batch_tokens
                 logger.info(
                     "Embedding batch %s/%s took %s s", i // batch_size + 1, total_batches, time.time() - batch_start
                 )
                 self._vector_processor.create(texts=batch, embeddings=batch_embeddings, **kwargs)
             logger.info("Embedding %s texts took %s s", len(texts), time.time() - start)
+        return tokens
 
     def create_multimodal(self, file_documents: list | None = None, **kwargs):
         if file_documents:
@@ -146,12 +152,16 @@ class Vector:
                 self._vector_processor.create(texts=real_batch, embeddings=batch_embeddings, **kwargs)
             logger.info("Embedding %s files took %s s", len(file_documents), time.time() - start)
 
-    def add_texts(self, documents: list[Document], **kwargs):
+    def add_texts(self, documents: list[Document], **kwargs) -> int:
+        """Embed and store the documents, returning the tokens used by the embedding model."""
         if kwargs.get("duplicate_check", False):
             documents = self._filter_duplicate_texts(documents)
 
-        embeddings = self._embeddings.embed_documents([document.page_content for document in documents])
+        embeddings, tokens = self._embeddings.embed_documents_with_usage(
+            [document.page_content for document in documents]
+        )
         self._vector_processor.create(texts=documents, embeddings=embeddings, **kwargs)
+        return tokens
 
     def text_exists(self, id: str) -> bool:
         return self._vector_processor.text_exists(id)
@@ -62,7 +62,14 @@ class DatasetDocumentStore:
 
         return output
 
-    def add_documents(self, docs: Sequence[Document], allow_update: bool = True, save_child: bool = False):
+    def add_documents(
+        self, docs: Sequence[Document], allow_update: bool = True, save_child: bool = False, commit: bool = True
+    ):
+        """
+        Save documents as segments of the document.
+
+        :param commit: commit after each document, otherwise the caller commits all of them at once
+        """
         max_position = db.session.scalar(
             select(func.max(DocumentSegment.position)).where(DocumentSegment.document_id == self._document_id)
         )
@@ -178,7 +185,8 @@ class DatasetDocumentStore:
                         )
                         db.session.add(child_segment)
 
-            db.session.commit()
+            if commit:
+                db.session.commit()
 
     def document_exists(self, doc_id: str) -> bool:
         """Check if document exists."""
@@ -1,16 +1,24 @@
-import base64
 import logging
-import pickle
 from typing import Any, cast
+from uuid import uuid4
 
 import numpy as np
 from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 
 from configs import dify_config
 from core.entities.embedding_type import EmbeddingInputType
 from core.model_manager import ModelInstance
 from core.rag.embedding.embedding_base import Embeddings
+from core.rag.embedding.embedding_codec import (
+    EMBEDDING_CODEC_VERSION,
+    decode_cached_query_embedding,
+    encode_cached_query_embedding,
+    encode_stored_embedding,
+)
+from core.rag.embedding.local_cache import get_query_embedding_local_cache
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
 from graphon.model_runtime.entities.model_entities import ModelPropertyKey
@@ -20,6 +28,12 @@ from models.dataset import Embedding
 
 logger = logging.getLogger(__name__)
 
+# Upper bound of hashes per `IN (...)` lookup and rows per multi-row insert statement.
+_CACHE_LOOKUP_BATCH_SIZE = 1000
+_CACHE_INSERT_BATCH_SIZE = 500
+# Expiration in seconds of query embeddings cached in Redis, refreshed on every hit.
+_QUERY_CACHE_TTL = 600
+
 
 class CacheEmbedding(Embeddings):
     def __init__(self, model_instance: ModelInstance):
@@ -27,22 +41,19 @@ class CacheEmbedding(Embeddings):
 
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
         """Embed search docs in batches of 10."""
+        return self.embed_documents_with_usage(texts)[0]
+
+    def embed_documents_with_usage(self, texts: list[str]) -> tuple[list[list[float]], int]:
+        """Embed search docs, counting the tokens of the embedding calls. Cached embeddings cost no tokens."""
         # use doc embedding cache or store if not exists
+        tokens = 0
         text_embeddings: list[Any] = [None for _ in range(len(texts))]
+        text_hashes = [helper.generate_text_hash(text) for text in texts]
+        cached_embeddings = self._load_cached_embeddings(text_hashes)
         embedding_queue_indices = []
-        for i, text in enumerate(texts):
-            hash = helper.generate_text_hash(text)
-            embedding = db.session.scalar(
-                select(Embedding)
-                .where(
-                    Embedding.model_name == self._model_instance.model_name,
-                    Embedding.hash == hash,
-                    Embedding.provider_name == self._model_instance.provider,
-                )
-                .limit(1)
-            )
-            if embedding:
-                text_embeddings[i] = embedding.get_embedding()
+        for i, hash in enumerate(text_hashes):
+            if hash in cached_embeddings:
+                text_embeddings[i] = cached_embeddings[hash]
             else:
                 embedding_queue_indices.append(i)
 
@@ -67,6 +78,7 @@ class CacheEmbedding(Embeddings):
                     embedding_result = self._model_instance.invoke_text_embedding(
                         texts=batch_texts, input_type=EmbeddingInputType.DOCUMENT
                     )
+                    tokens += embedding_result.usage.total_tokens
 
                     for vector in embedding_result.embeddings:
                         try:
@@ -82,48 +94,28 @@ class CacheEmbedding(Embeddings):
                             db.session.rollback()
                         except Exception:
                             logger.exception("Failed transform embedding")
-                cache_embeddings = []
-                try:
-                    for i, n_embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
-                        text_embeddings[i] = n_embedding
-                        hash = helper.generate_text_hash(texts[i])
-                        if hash not in cache_embeddings:
-                            embedding_cache = Embedding(
-                                model_name=self._model_instance.model_name,
-                                hash=hash,
-                                provider_name=self._model_instance.provider,
-                                embedding=pickle.dumps(n_embedding, protocol=pickle.HIGHEST_PROTOCOL),
-                            )
-                            db.session.add(embedding_cache)
-                            cache_embeddings.append(hash)
-                    db.session.commit()
-                except IntegrityError:
-                    db.session.rollback()
+                new_embeddings: dict[str, list[float]] = {}
+                for i, n_embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
+                    text_embeddings[i] = n_embedding
+                    new_embeddings.setdefault(text_hashes[i], n_embedding)
+                self._save_cached_embeddings(new_embeddings)
             except Exception as ex:
                 db.session.rollback()
                 logger.exception("Failed to embed documents")
                 raise ex
 
-        return text_embeddings
+        return text_embeddings, tokens
 
     def embed_multimodal_documents(self, multimodel_documents: list[dict[str, Any]]) -> list[list[float]]:
         """Embed file documents."""
         # use doc embedding cache or store if not exists
         multimodel_embeddings: list[Any] = [None for _ in range(len(multimodel_documents))]
+        file_ids = [multimodel_document["file_id"] for multimodel_document in multimodel_documents]
+        cached_embeddings = self._load_cached_embeddings(file_ids)
         embedding_queue_indices = []
-        for i, multimodel_document in enumerate(multimodel_documents):
-            file_id = multimodel_document["file_id"]
-            embedding = db.session.scalar(
-                select(Embedding)
-                .where(
-                    Embedding.model_name == self._model_instance.model_name,
-                    Embedding.hash == file_id,
-                    Embedding.provider_name == self._model_instance.provider,
-                )
-                .limit(1)
-            )
-            if embedding:
-                multimodel_embeddings[i] = embedding.get_embedding()
+        for i, file_id in enumerate(file_ids):
+            if file_id in cached_embeddings:
+                multimodel_embeddings[i] = cached_embeddings[file_id]
             else:
                 embedding_queue_indices.append(i)
 
@@ -164,24 +156,11 @@ class CacheEmbedding(Embeddings):
                             db.session.rollback()
                         except Exception:
                             logger.exception("Failed transform embedding")
-                cache_embeddings = []
-                try:
-                    for i, n_embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
-                        multimodel_embeddings[i] = n_embedding
-                        file_id = multimodel_documents[i]["file_id"]
-                        if file_id not in cache_embeddings:
-                            embedding_cache = Embedding(
-                                model_name=self._model_instance.model_name,
-                                hash=file_id,
-                                provider_name=self._model_instance.provider,
-                                embedding=pickle.dumps(n_embedding, protocol=pickle.HIGHEST_PROTOCOL),
-                            )
-                            embedding_cache.set_embedding(n_embedding)
-                            db.session.add(embedding_cache)
-                            cache_embeddings.append(file_id)
-                    db.session.commit()
-                except IntegrityError:
-                    db.session.rollback()
+                new_embeddings: dict[str, list[float]] = {}
+                for i, n_embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
+                    multimodel_embeddings[i] = n_embedding
+                    new_embeddings.setdefault(file_ids[i], n_embedding)
+                self._save_cached_embeddings(new_embeddings)
             except Exception as ex:
                 db.session.rollback()
                 logger.exception("Failed to embed documents")
@@ -193,12 +172,10 @@ class CacheEmbedding(Embeddings):
         """Embed query text."""
         # use doc embedding cache or store if not exists
         hash = helper.generate_text_hash(text)
-        embedding_cache_key = f"{self._model_instance.provider}_{self._model_instance.model_name}_{hash}"
-        embedding = redis_client.get(embedding_cache_key)
-        if embedding:
-            redis_client.expire(embedding_cache_key, 600)
-            decoded_embedding = np.frombuffer(base64.b64decode(embedding), dtype="float")
-            return [float(x) for x in decoded_embedding]
+        embedding_cache_key = self._query_cache_key(hash)
+        cached_embedding = self._get_cached_query_embedding(embedding_cache_key)
+        if cached_embedding is not None:
+            return cached_embedding
         try:
             embedding_result = self._model_instance.invoke_text_embedding(
                 texts=[text], input_type=EmbeddingInputType.QUERY
@@ -215,14 +192,7 @@ class CacheEmbedding(Embeddings):
             raise ex
 
         try:
-            # encode embedding to base64
-            embedding_vector = np.array(embedding_results)
-            vector_bytes = embedding_vector.tobytes()
-            # Transform to Base64
-            encoded_vector = base64.b64encode(vector_bytes)
-            # Transform to string
-            encoded_str = encoded_vector.decode("utf-8")
-            redis_client.setex(embedding_cache_key, 600, encoded_str)
+            self._set_cached_query_embedding(embedding_cache_key, embedding_results)
         except Exception as ex:
             if dify_config.DEBUG:
                 logger.exception(
@@ -236,12 +206,10 @@ class CacheEmbedding(Embeddings):
         """Embed multimodal documents."""
         # use doc embedding cache or store if not exists
         file_id = multimodel_document["file_id"]
-        embedding_cache_key = f"{self._model_instance.provider}_{self._model_instance.model_name}_{file_id}"
-        embedding = redis_client.get(embedding_cache_key)
-        if embedding:
-            redis_client.expire(embedding_cache_key, 600)
-            decoded_embedding = np.frombuffer(base64.b64decode(embedding), dtype="float")
-            return [float(x) for x in decoded_embedding]
+        embedding_cache_key = self._query_cache_key(file_id)
+        cached_embedding = self._get_cached_query_embedding(embedding_cache_key)
+        if cached_embedding is not None:
+            return cached_embedding
         try:
             embedding_result = self._model_instance.invoke_multimodal_embedding(
                 multimodel_documents=[multimodel_document], input_type=EmbeddingInputType.QUERY
@@ -258,14 +226,7 @@ class CacheEmbedding(Embeddings):
             raise ex
 
         try:
-            # encode embedding to base64
-            embedding_vector = np.array(embedding_results)
-            vector_bytes = embedding_vector.tobytes()
-            # Transform to Base64
-            encoded_vector = base64.b64encode(vector_bytes)
-            # Transform to string
-            encoded_str = encoded_vector.decode("utf-8")
-            redis_client.setex(embedding_cache_key, 600, encoded_str)
+            self._set_cached_query_embedding(embedding_cache_key, embedding_results)
         except Exception as ex:
             if dify_config.DEBUG:
                 logger.exception(
@@ -274,3 +235,89 @@ class CacheEmbedding(Embeddings):
             raise ex
 
         return embedding_results  # type: ignore
+
+    def _query_cache_key(self, suffix: str) -> str:
+        embedding_cache_key = f"{self._model_instance.provider}_{self._model_instance.model_name}_{suffix}"
+        if dify_config.EMBEDDING_CACHE_BINARY_FORMAT_ENABLED:
+            # binary values get their own key, so processes reading only base64 values never see them
+            embedding_cache_key = f"{embedding_cache_key}:v{EMBEDDING_CODEC_VERSION}"
+        return embedding_cache_key
+
+    def _get_cached_query_embedding(self, embedding_cache_key: str) -> list[float] | None:
+        """Look up a query embedding in the in-process tier, then in Redis with one round trip."""
+        local_cache = get_query_embedding_local_cache()
+        if local_cache is not None:
+            cached_embedding = local_cache.get(embedding_cache_key)
+            if cached_embedding is not None:
+                return cached_embedding
+
+        embedding = redis_client.get_and_expire(embedding_cache_key, _QUERY_CACHE_TTL)
+        if not embedding:
+            return None
+        decoded_embedding = decode_cached_query_embedding(embedding)
+        if local_cache is not None:
+            local_cache.set(embedding_cache_key, decoded_embedding)
+        return cast(list[float], decoded_embedding.tolist())
+
+    def _set_cached_query_embedding(self, embedding_cache_key: str, embedding: list[float]):
+        encoded_vector = encode_cached_query_embedding(
+            embedding,
+            dify_config.EMBEDDING_CACHE_STORAGE_DTYPE,
+            binary=dify_config.EMBEDDING_CACHE_BINARY_FORMAT_ENABLED,
+        )
+        redis_client.setex(embedding_cache_key, _QUERY_CACHE_TTL, encoded_vector)
+        local_cache = get_query_embedding_local_cache()
+        if local_cache is not None:
+            local_cache.set(embedding_cache_key, decode_cached_query_embedding(encoded_vector))
+
+    def _load_cached_embeddings(self, hashes: list[str]) -> dict[str, list[float]]:
+        """Resolve cached document embeddings for many hashes with a few `IN (...)` queries."""
+        unique_hashes = list(dict.fromkeys(hashes))
+        cached_embeddings: dict[str, list[float]] = {}
+        for i in range(0, len(unique_hashes), _CACHE_LOOKUP_BATCH_SIZE):
+            batch_hashes = unique_hashes[i : i + _CACHE_LOOKUP_BATCH_SIZE]
+            embeddings = db.session.scalars(
+                select(Embedding).where(
+                    Embedding.model_name == self._model_instance.model_name,
+                    Embedding.provider_name == self._model_instance.provider,
+                    Embedding.hash.in_(batch_hashes),
+                )
+            ).all()
+            for embedding in embeddings:
+                cached_embeddings[embedding.hash] = embedding.get_embedding()
+        return cached_embeddings
+
+    def _save_cached_embeddings(self, embeddings: dict[str, list[float]]):
+        """Persist newly computed document embeddings with multi-row inserts.
+
+        Rows that already exist (e.g. written concurrently by another worker) are skipped
+        by the database instead of failing the whole batch with an `IntegrityError`.
+        """
+        if not embeddings:
+            return
+        rows = [
+            {
+                "id": str(uuid4()),
+                "model_name": self._model_instance.model_name,
+                "hash": hash,
+                "provider_name": self._model_instance.provider,
+                "embedding": encode_stored_embedding(
+                    embedding,
+                    dify_config.EMBEDDING_CACHE_STORAGE_DTYPE,
+                    binary=dify_config.EMBEDDING_CACHE_BINARY_FORMAT_ENABLED,
+                ),
+            }
+            for hash, embedding in embeddings.items()
+        ]
+        try:
+            for i in range(0, len(rows), _CACHE_INSERT_BATCH_SIZE):
+                batch_rows = rows[i : i + _CACHE_INSERT_BATCH_SIZE]
+                if dify_config.SQLALCHEMY_DATABASE_URI_SCHEME == "postgresql":
+                    stmt = pg_insert(Embedding).values(batch_rows)
+                    stmt = stmt.on_conflict_do_nothing(index_elements=["model_name", "hash", "provider_name"])
+                else:
+                    stmt = mysql_insert(Embedding).values(batch_rows).prefix_with("IGNORE")  # type: ignore[assignment]
+                db.session.execute(stmt)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
@@ -10,6 +10,10 @@ class Embeddings(ABC):
         """Embed search docs."""
         raise NotImplementedError
 
+    def embed_documents_with_usage(self, texts: list[str]) -> tuple[list[list[float]], int]:
+        """Embed search docs and count the tokens used by the embedding model, 0 when unknown."""
+        return self.embed_documents(texts), 0
+
     @abstractmethod
     def embed_multimodal_documents(self, multimodel_documents: list[dict[str, Any]]) -> list[list[float]]:
         """Embed file documents."""
@@ -0,0 +1,90 @@
+"""Compact binary codec for cached embedding vectors.
+
+Layout (little endian)::
+
+    magic "DEMB" | version u8 | dtype u8 | dimension u32 | raw vector buffer
+
+Payloads without the magic header are treated as legacy values: pickled
+``list[float]`` rows in the ``embeddings`` table and base64 text of a float64
+buffer in Redis. Both formats are always read, but the binary one is only
+written once ``EMBEDDING_CACHE_BINARY_FORMAT_ENABLED`` is set, because
+releases before it cannot read binary values. Roll the upgrade out to every
+API and worker process first, then enable the flag.
+"""
+
+import base64
+import pickle
+import struct
+from typing import Literal
+
+import numpy as np
+import numpy.typing as npt
+
+EmbeddingStorageDType = Literal["float32", "float16"]
+
+EMBEDDING_CODEC_MAGIC = b"DEMB"
+EMBEDDING_CODEC_VERSION = 1
+
+_HEADER = struct.Struct("<4sBBI")
+_DTYPE_CODES: dict[str, int] = {"float32": 1, "float16": 2}
+_CODE_DTYPES: dict[int, np.dtype] = {1: np.dtype("<f4"), 2: np.dtype("<f2")}
+
+
+def encode_embedding(vector: npt.ArrayLike, dtype: EmbeddingStorageDType = "float32") -> bytes:
+    """Encode a vector into the versioned binary format."""
+    code = _DTYPE_CODES.get(dtype)
+    if code is None:
+        raise ValueError(f"Unsupported embedding storage dtype: {dtype}")
+    array = np.asarray(vector, dtype=_CODE_DTYPES[code]).ravel()
+    return _HEADER.pack(EMBEDDING_CODEC_MAGIC, EMBEDDING_CODEC_VERSION, code, array.size) + array.tobytes()
+
+
+def encode_stored_embedding(vector: npt.ArrayLike, dtype: EmbeddingStorageDType, *, binary: bool) -> bytes:
+    """Encode an `embeddings.embedding` value, as a legacy pickled list unless `binary` is set."""
+    if binary:
+        return encode_embedding(vector, dtype)
+    return pickle.dumps(np.asarray(vector, dtype=np.float64).tolist(), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def encode_cached_query_embedding(vector: npt.ArrayLike, dtype: EmbeddingStorageDType, *, binary: bool) -> bytes | str:
+    """Encode a Redis query-embedding value, as legacy base64 float64 text unless `binary` is set."""
+    if binary:
+        return encode_embedding(vector, dtype)
+    return base64.b64encode(np.asarray(vector, dtype=np.float64).tobytes()).decode("utf-8")
+
+
+def is_encoded_embedding(data: bytes) -> bool:
+    """Return whether the payload was produced by `encode_embedding`."""
+    if len(data) < _HEADER.size or data[:4] != EMBEDDING_CODEC_MAGIC:
+        return False
+    _, version, code, dimension = _HEADER.unpack_from(data)
+    dtype = _CODE_DTYPES.get(code)
+    if version != EMBEDDING_CODEC_VERSION or dtype is None:
+        return False
+    return len(data) == _HEADER.size + dimension * dtype.itemsize
+
+
+def decode_embedding(data: bytes) -> npt.NDArray[np.float32]:
+    """Decode a binary payload into a float32 array.
+
+    Float16 payloads are widened to float32; the float32 buffer is read without copying.
+    """
+    if not is_encoded_embedding(data):
+        raise ValueError("Payload is not an encoded embedding")
+    _, _, code, dimension = _HEADER.unpack_from(data)
+    array = np.frombuffer(data, dtype=_CODE_DTYPES[code], count=dimension, offset=_HEADER.size)
+    return array.astype(np.float32, copy=False)
+
+
+def decode_stored_embedding(data: bytes) -> npt.NDArray[np.floating]:
+    """Decode an `embeddings.embedding` value, falling back to legacy pickled lists."""
+    if is_encoded_embedding(data):
+        return decode_embedding(data)
+    return np.asarray(pickle.loads(data), dtype=np.float64)  # noqa: S301
+
+
+def decode_cached_query_embedding(data: bytes | str) -> npt.NDArray[np.floating]:
+    """Decode a Redis query-embedding value, falling back to legacy base64 float64 text."""
+    if isinstance(data, bytes) and is_encoded_embedding(data):
+        return decode_embedding(data)
+    return np.frombuffer(base64.b64decode(data), dtype="float")
@@ -0,0 +1,75 @@
+"""Per-process LRU/TTL tier in front of the Redis query-embedding cache."""
+
+import threading
+
+import numpy as np
+import numpy.typing as npt
+from cachetools import TTLCache
+
+from configs import dify_config
+
+
+class LocalEmbeddingCache:
+    """Bounded, thread-safe in-memory cache of decoded query embeddings.
+
+    Entries are evicted least-recently-used once `maxsize` is reached and expire after `ttl` seconds,
+    so a hot query on one worker skips the Redis round trip without serving stale vectors for long.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache[str, npt.NDArray[np.floating]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> list[float] | None:
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return vector.tolist()
+
+    def set(self, key: str, vector: npt.NDArray[np.floating]):
+        # cached arrays are shared between threads, so keep a private read-only copy
+        if vector.flags.writeable:
+            vector = vector.copy()
+            vector.setflags(write=False)
+        with self._lock:
+            self._cache[key] = vector
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+_query_embedding_cache: LocalEmbeddingCache | None = None
+_query_embedding_cache_lock = threading.Lock()
+
+
+def get_query_embedding_local_cache() -> LocalEmbeddingCache | None:
+    """Return the process-wide query embedding cache, or None when the tier is disabled."""
+    global _query_embedding_cache
+    if not dify_config.QUERY_EMBEDDING_LOCAL_CACHE_ENABLED:
+        return None
+    if _query_embedding_cache is None:
+        with _query_embedding_cache_lock:
+            if _query_embedding_cache is None:
+                _query_embedding_cache = LocalEmbeddingCache(
+                    maxsize=dify_config.QUERY_EMBEDDING_LOCAL_CACHE_MAX_SIZE,
+                    ttl=dify_config.QUERY_EMBEDDING_LOCAL_CACHE_TTL,
+                )
+    return _query_embedding_cache
@@ -55,6 +55,13 @@ class BaseIndexProcessor(ABC):
     def transform(self, documents: list[Document], current_user: Account | None = None, **kwargs) -> list[Document]:
         raise NotImplementedError
 
+    def supports_incremental_transform(self, process_rule: Mapping[str, Any]) -> bool:
+        """
+        Whether `transform` splits each extracted document independently of the others under `process_rule`,
+        so that a long source can be transformed a few pages at a time with the same result.
+        """
+        return False
+
     @abstractmethod
     def generate_summary_preview(
         self,
@@ -84,7 +91,8 @@ class BaseIndexProcessor(ABC):
         multimodal_documents: list[AttachmentDocument] | None = None,
         with_keywords: bool = True,
         **kwargs,
-    ) -> None:
+    ) -> int:
+        """Index the documents and return the tokens used by the embedding model, 0 when nothing is embedded."""
         raise NotImplementedError
 
     @abstractmethod
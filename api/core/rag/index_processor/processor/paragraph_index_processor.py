@@ -3,6 +3,7 @@
 import logging
 import re
 import uuid
+from collections.abc import Mapping
 from typing import Any, TypedDict, cast
 
 logger = logging.getLogger(__name__)
@@ -120,6 +121,9 @@ class ParagraphIndexProcessor(BaseIndexProcessor):
             all_documents.extend(split_documents)
         return all_documents
 
+    def supports_incremental_transform(self, process_rule: Mapping[str, Any]) -> bool:
+        return True
+
     def load(
         self,
         dataset: Dataset,
@@ -127,10 +131,11 @@ class ParagraphIndexProcessor(BaseIndexProcessor):
         multimodal_documents: list[AttachmentDocument] | None = None,
         with_keywords: bool = True,
         **kwargs,
-    ) -> None:
+    ) -> int:
+        tokens = 0
         if dataset.indexing_technique == IndexTechniqueType.HIGH_QUALITY:
             vector = Vector(dataset)
-            vector.create(documents)
+            tokens = vector.create(documents)
             if multimodal_documents and dataset.is_multimodal:
                 vector.create_multimodal(multimodal_documents)
             with_keywords = False
@@ -141,6 +146,7 @@ class ParagraphIndexProcessor(BaseIndexProcessor):
                 keyword.add_texts(documents, keywords_list=keywords_list)
             else:
                 keyword.add_texts(documents)
+        return tokens
 
     def clean(self, dataset: Dataset, node_ids: list[str] | None, with_keywords: bool = True, **kwargs) -> None:
         # Note: Summary indexes are now disabled (not deleted) when segments are disabled.
@@ -3,6 +3,7 @@
 import json
 import logging
 import uuid
+from collections.abc import Mapping
 from typing import Any, TypedDict
 
 from sqlalchemy import delete, select
@@ -128,6 +129,12 @@ class ParentChildIndexProcessor(BaseIndexProcessor):
 
         return all_documents
 
+    def supports_incremental_transform(self, process_rule: Mapping[str, Any]) -> bool:
+        # full-doc parents are built from all pages at once
+        if not process_rule.get("rules"):
+            return False
+        return Rule.model_validate(process_rule["rules"]).parent_mode == ParentMode.PARAGRAPH
+
     def load(
         self,
         dataset: Dataset,
@@ -135,7 +142,8 @@ class ParentChildIndexProcessor(BaseIndexProcessor):
         multimodal_documents: list[AttachmentDocument] | None = None,
         with_keywords: bool = True,
         **kwargs,
-    ) -> None:
+    ) -> int:
+        tokens = 0
         if dataset.indexing_technique == IndexTechniqueType.HIGH_QUALITY:
             vector = Vector(dataset)
             for document in documents:
@@ -144,9 +152,10 @@ class ParentChildIndexProcessor(BaseIndexProcessor):
                     formatted_child_documents = [
                         Document.model_validate(child_document.model_dump()) for child_document in child_documents
                     ]
-                    vector.create(formatted_child_documents)
+                    tokens += vector.create(formatted_child_documents)
             if multimodal_documents and dataset.is_multimodal:
                 vector.create_multimodal(multimodal_documents)
+        return tokens
 
     def clean(self, dataset: Dataset, node_ids: list[str] | None, with_keywords: bool = True, **kwargs) -> None:
         # node_ids is segment's node_ids
@@ -4,6 +4,7 @@ import logging
 import re
 import threading
 import uuid
+from collections.abc import Mapping
 from typing import Any, TypedDict
 
 import pandas as pd
@@ -120,6 +121,9 @@ class QAIndexProcessor(BaseIndexProcessor):
                     thread.join()
         return all_qa_documents
 
+    def supports_incremental_transform(self, process_rule: Mapping[str, Any]) -> bool:
+        return True
+
     def format_by_template(self, file: FileStorage, **kwargs) -> list[Document]:
         # check file type
         if not file.filename or not file.filename.lower().endswith(".csv"):
@@ -146,12 +150,14 @@ class QAIndexProcessor(BaseIndexProcessor):
         multimodal_documents: list[AttachmentDocument] | None = None,
         with_keywords: bool = True,
         **kwargs,
-    ) -> None:
+    ) -> int:
+        tokens = 0
         if dataset.indexing_technique == IndexTechniqueType.HIGH_QUALITY:
             vector = Vector(dataset)
-            vector.create(documents)
+            tokens = vector.create(documents)
             if multimodal_documents and dataset.is_multimodal:
                 vector.create_multimodal(multimodal_documents)
+        return tokens
 
     def clean(self, dataset: Dataset, node_ids: list[str] | None, with_keywords: bool = True, **kwargs) -> None:
         # Note: Summary indexes are now disabled (not deleted) when segments are disabled.
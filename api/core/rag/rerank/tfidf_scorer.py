@@ -0,0 +1,73 @@
+"""Vectorized TF-IDF and embedding cosine scoring shared by keyword and weighted reranking."""
+
+from collections import Counter
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+
+def calculate_tfidf_cosine_scores(
+    query_keywords: Iterable[str],
+    documents_keywords: Sequence[Iterable[str]],
+    total_documents: int | None = None,
+) -> list[float]:
+    """
+    Score documents by cosine similarity between the TF-IDF vectors of the query and each document.
+
+    The documents are laid out once as a sparse (document, term, tf) coordinate matrix, so document
+    frequencies, document norms and query dot products are single `bincount` passes over its non-zeros.
+
+    :param query_keywords: keywords extracted from the query
+    :param documents_keywords: keywords extracted from each candidate document
+    :param total_documents: number of documents used for IDF, defaults to `len(documents_keywords)`
+    :return: one similarity per entry of `documents_keywords`
+    """
+    document_count = len(documents_keywords)
+    if not document_count:
+        return []
+    if total_documents is None:
+        total_documents = document_count
+
+    vocabulary: dict[str, int] = {}
+    term_ids: list[int] = []
+    doc_ids: list[int] = []
+    term_counts: list[int] = []
+    for doc_id, document_keywords in enumerate(documents_keywords):
+        for keyword, count in Counter(document_keywords).items():
+            term_ids.append(vocabulary.setdefault(keyword, len(vocabulary)))
+            doc_ids.append(doc_id)
+            term_counts.append(count)
+
+    term_index = np.asarray(term_ids, dtype=np.intp)
+    doc_index = np.asarray(doc_ids, dtype=np.intp)
+
+    document_frequency = np.bincount(term_index, minlength=len(vocabulary))
+    idf = np.log((1 + total_documents) / (1 + document_frequency)) + 1
+    weights = np.asarray(term_counts, dtype=np.float64) * idf[term_index]
+
+    # query terms that no document contains have an IDF of 0 and are dropped
+    query_vector = np.zeros(len(vocabulary), dtype=np.float64)
+    for keyword, count in Counter(query_keywords).items():
+        term_id = vocabulary.get(keyword)
+        if term_id is not None:
+            query_vector[term_id] = count * idf[term_id]
+
+    numerators = np.bincount(doc_index, weights=weights * query_vector[term_index], minlength=document_count)
+    document_norms = np.sqrt(np.bincount(doc_index, weights=weights * weights, minlength=document_count))
+    return _safe_divide(numerators, document_norms * np.linalg.norm(query_vector)).tolist()
+
+
+def calculate_cosine_scores(query_vector: Sequence[float], document_vectors: Sequence[Sequence[float]]) -> list[float]:
+    """
+    Cosine similarity between one query embedding and many document embeddings with a single matmul.
+    """
+    if not document_vectors:
+        return []
+    query = np.asarray(query_vector, dtype=np.float64)
+    matrix = np.asarray(document_vectors, dtype=np.float64)
+    return _safe_divide(matrix @ query, np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)).tolist()
+
+
+def _safe_divide(numerators: npt.NDArray[np.float64], denominators: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    return np.divide(numerators, denominators, out=np.zeros_like(denominators), where=denominators != 0)
@@ -1,10 +1,8 @@
 import json
 import logging
-import math
 import re
 import threading
-import time
-from collections import Counter, defaultdict
+from collections import defaultdict
 from collections.abc import Generator, Mapping
 from typing import Any, Union, cast
 
@@ -12,6 +10,7 @@ from flask import Flask, current_app
 from sqlalchemy import and_, func, literal, or_, select, update
 from sqlalchemy.orm import sessionmaker
 
+from configs import dify_config
 from core.app.app_config.entities import (
     DatasetEntity,
     DatasetRetrieveConfigEntity,
@@ -32,6 +31,7 @@ from core.prompt.advanced_prompt_transform import AdvancedPromptTransform
 from core.prompt.entities.advanced_prompt_entities import ChatModelMessage, CompletionModelPromptTemplate
 from core.prompt.simple_prompt_transform import ModelMode
 from core.rag.data_post_processor.data_post_processor import DataPostProcessor, RerankingModelDict, WeightsDict
+from core.rag.datasource.keyword.jieba.document_keywords import get_document_keywords
 from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
 from core.rag.datasource.retrieval_service import DefaultRetrievalModelDict, RetrievalService
 from core.rag.entities import Condition, DocumentContext, RetrievalSourceMetadata
@@ -40,6 +40,7 @@ from core.rag.index_processor.constant.index_type import IndexStructureType, Ind
 from core.rag.index_processor.constant.query_type import QueryType
 from core.rag.models.document import Document
 from core.rag.rerank.rerank_type import RerankMode
+from core.rag.rerank.tfidf_scorer import calculate_tfidf_cosine_scores
 from core.rag.retrieval.retrieval_methods import RetrievalMethod
 from core.rag.retrieval.router.multi_dataset_function_call_router import FunctionCallMultiDatasetRouter
 from core.rag.retrieval.router.multi_dataset_react_route import ReactMultiDatasetRouter
@@ -63,7 +64,6 @@ from core.workflow.nodes.knowledge_retrieval.retrieval import (
     SourceMetadata,
 )
 from extensions.ext_database import db
-from extensions.ext_redis import redis_client
 from graphon.file import File, FileTransferMethod, FileType
 from graphon.model_runtime.entities.llm_entities import LLMMode, LLMResult, LLMUsage
 from graphon.model_runtime.entities.message_entities import PromptMessage, PromptMessageRole, PromptMessageTool
@@ -71,6 +71,7 @@ from graphon.model_runtime.entities.model_entities import ModelFeature, ModelTyp
 from graphon.model_runtime.model_providers.base.large_language_model import LargeLanguageModel
 from libs.helper import parse_uuid_str_or_none
 from libs.json_in_md_parser import parse_and_check_json_markdown
+from libs.redis_rate_limiter import SlidingWindowRateLimiter
 from models import UploadFile
 from models.dataset import (
     ChildChunk,
@@ -86,6 +87,7 @@ from models.dataset import Document as DocumentModel
 from models.enums import CreatorUserRole, DatasetQuerySource
 from services.external_knowledge_service import ExternalDatasetService
 from services.feature_service import FeatureService
+from services.segment_hit_count_service import SegmentHitCountService
 
 default_retrieval_model: DefaultRetrievalModelDict = {
     "search_method": RetrievalMethod.SEMANTIC_SEARCH,
@@ -973,8 +975,10 @@ class DatasetRetrieval:
                         bindings = session.scalars(bindings_stmt).all()
                         segment_ids_to_update.update(str(binding.segment_id) for binding in bindings)
 
-                # Batch update hit_count for all segments
-                if segment_ids_to_update:
+                # Batch update hit_count for all segments, or buffer the hits for the scheduled flush
+                if segment_ids_to_update and dify_config.ENABLE_SEGMENT_HIT_COUNT_FLUSH_TASK:
+                    SegmentHitCountService.record_hits(segment_ids_to_update)
+                elif segment_ids_to_update:
                     session.execute(
                         update(DocumentSegment)
                         .where(DocumentSegment.id.in_(segment_ids_to_update))
@@ -1252,63 +1256,11 @@ class DatasetRetrieval:
         for document in documents:
             if document.metadata is not None:
                 # get the document keywords
-                document_keywords = keyword_table_handler.extract_keywords(document.page_content, None)
+                document_keywords = get_document_keywords(keyword_table_handler, document)
                 document.metadata["keywords"] = document_keywords
                 documents_keywords.append(document_keywords)
 
-        # Counter query keywords(TF)
-        query_keyword_counts = Counter(query_keywords)
-
-        # total documents
-        total_documents = len(documents)
-
-        # calculate all documents' keywords IDF
-        all_keywords = set()
-        for document_keywords in documents_keywords:
-            all_keywords.update(document_keywords)
-
-        keyword_idf = {}
-        for keyword in all_keywords:
-            # calculate include query keywords' documents
-            doc_count_containing_keyword = sum(1 for doc_keywords in documents_keywords if keyword in doc_keywords)
-            # IDF
-            keyword_idf[keyword] = math.log((1 + total_documents) / (1 + doc_count_containing_keyword)) + 1
-
-        query_tfidf = {}
-
-        for keyword, count in query_keyword_counts.items():
-            tf = count
-            idf = keyword_idf.get(keyword, 0)
-            query_tfidf[keyword] = tf * idf
-
-        # calculate all documents' TF-IDF
-        documents_tfidf = []
-        for document_keywords in documents_keywords:
-            document_keyword_counts = Counter(document_keywords)
-            document_tfidf = {}
-            for keyword, count in document_keyword_counts.items():
-                tf = count
-                idf = keyword_idf.get(keyword, 0)
-                document_tfidf[keyword] = tf * idf
-            documents_tfidf.append(document_tfidf)
-
-        def cosine_similarity(vec1, vec2):
-            intersection = set(vec1.keys()) & set(vec2.keys())
-            numerator = sum(vec1[x] * vec2[x] for x in intersection)
-
-            sum1 = sum(vec1[x] ** 2 for x in vec1)
-            sum2 = sum(vec2[x] ** 2 for x in vec2)
-            denominator = math.sqrt(sum1) * math.sqrt(sum2)
-
-            if not denominator:
-                return 0.0
-            else:
-                return float(numerator) / denominator
-
-        similarities = []
-        for document_tfidf in documents_tfidf:
-            similarity = cosine_similarity(query_tfidf, document_tfidf)
-            similarities.append(similarity)
+        similarities = calculate_tfidf_cosine_scores(query_keywords, documents_keywords, len(documents))
 
         for document, score in zip(documents, similarities):
             # format document
@@ -1857,12 +1809,8 @@ class DatasetRetrieval:
     def _check_knowledge_rate_limit(self, tenant_id: str):
         knowledge_rate_limit = FeatureService.get_knowledge_rate_limit(tenant_id)
         if knowledge_rate_limit.enabled:
-            current_time = int(time.time() * 1000)
-            key = f"rate_limit_{tenant_id}"
-            redis_client.zadd(key, {current_time: current_time})
-            redis_client.zremrangebyscore(key, 0, current_time - 60000)
-            request_count = redis_client.zcard(key)
-            if request_count > knowledge_rate_limit.limit:
+            rate_limiter = SlidingWindowRateLimiter(limit=knowledge_rate_limit.limit, window=60)
+            if not rate_limiter.hit(f"rate_limit_{tenant_id}").allowed:
                 with session_factory.create_session() as session:
                     rate_limit_log = RateLimitLog(
                         tenant_id=tenant_id,
@@ -6,11 +6,14 @@ providing improved performance by offloading database operations to background w
 """
 
 import logging
+import threading
+import time
 from collections.abc import Sequence
 
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
+from configs import dify_config
 from core.repositories.factory import (
     OrderConfig,
     WorkflowNodeExecutionRepository,
@@ -21,6 +24,7 @@ from models import Account, CreatorUserRole, EndUser
 from models.workflow import WorkflowNodeExecutionTriggeredFrom
 from tasks.workflow_node_execution_tasks import (
     save_workflow_node_execution_task,
+    save_workflow_node_executions_task,
 )
 
 logger = logging.getLogger(__name__)
@@ -39,6 +43,14 @@ class CeleryWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository):
     - In-memory cache for immediate reads
     - Support for multi-tenancy through tenant/app filtering
     - Automatic retry and error handling through Celery
+    - Optional write-behind buffering for workflow runs
+
+    When ``CELERY_WORKFLOW_NODE_EXECUTION_BUFFER_SIZE`` is greater than zero, saves of
+    non single-step executions are coalesced per execution id and dispatched as one bulk
+    task once the buffer is full, once ``CELERY_WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL``
+    seconds have passed since the last flush, or when ``flush()`` is called at graph end.
+    Only the latest state of each execution is persisted, so the short-lived "running"
+    snapshots of fast nodes never reach the broker.
     """
 
     _session_factory: sessionmaker
@@ -49,6 +61,11 @@ class CeleryWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository):
     _creator_user_role: CreatorUserRole
     _execution_cache: dict[str, WorkflowNodeExecution]
     _workflow_execution_mapping: dict[str, list[str]]
+    _buffer_size: int
+    _flush_interval: float
+    _pending_executions: dict[str, WorkflowNodeExecution]
+    _last_flushed_at: float
+    _buffer_lock: threading.Lock
 
     def __init__(
         self,
@@ -98,6 +115,17 @@ class CeleryWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository):
         # Cache for mapping workflow_execution_ids to execution IDs for efficient retrieval
         self._workflow_execution_mapping = {}
 
+        # Single-step runs read the execution back right after saving it and never call flush(),
+        # so only graph runs are buffered
+        if triggered_from == WorkflowNodeExecutionTriggeredFrom.SINGLE_STEP:
+            self._buffer_size = 0
+        else:
+            self._buffer_size = dify_config.CELERY_WORKFLOW_NODE_EXECUTION_BUFFER_SIZE
+        self._flush_interval = dify_config.CELERY_WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL
+        self._pending_executions = {}
+        self._last_flushed_at = time.monotonic()
+        self._buffer_lock = threading.Lock()
+
         logger.info(
             "Initialized CeleryWorkflowNodeExecutionRepository for tenant %s, app %s, triggered_from %s",
             self._tenant_id,
@@ -126,6 +154,10 @@ class CeleryWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository):
                 if execution.id not in self._workflow_execution_mapping[execution.workflow_execution_id]:
                     self._workflow_execution_mapping[execution.workflow_execution_id].append(execution.id)
 
+            if self._buffer_size > 0:
+                self._buffer(execution)
+                return
+
             # Serialize execution for Celery task
             execution_data = execution.model_dump()
 
@@ -147,6 +179,50 @@ class CeleryWorkflowNodeExecutionRepository(WorkflowNodeExecutionRepository):
             # For now, we'll re-raise the exception
             raise
 
+    def _buffer(self, execution: WorkflowNodeExecution):
+        """
+        Coalesce an execution into the pending batch and flush it when a threshold is reached.
+
+        The execution object itself is kept, so the flush serializes its latest state.
+        """
+        with self._buffer_lock:
+            self._pending_executions[execution.id] = execution
+            should_flush = (
+                len(self._pending_executions) >= self._buffer_size
+                or time.monotonic() - self._last_flushed_at >= self._flush_interval
+            )
+
+        if should_flush:
+            self.flush()
+        else:
+            logger.debug("Cached and buffered save for workflow node execution: %s", execution.id)
+
+    def flush(self):
+        """
+        Persist all buffered executions with a single bulk Celery task.
+        """
+        with self._buffer_lock:
+            executions = list(self._pending_executions.values())
+            self._pending_executions.clear()
+            self._last_flushed_at = time.monotonic()
+
+        if not executions:
+            return
+
+        try:
+            save_workflow_node_executions_task.delay(
+                executions_data=[execution.model_dump() for execution in executions],
+                tenant_id=self._tenant_id,
+                app_id=self._app_id or "",
+                triggered_from=self._triggered_from.value if self._triggered_from else "",
+                creator_user_id=self._creator_user_id,
+                creator_user_role=self._creator_user_role.value,
+            )
+            logger.debug("Queued async bulk save for %d workflow node executions", len(executions))
+        except Exception:
+            logger.exception("Failed to queue bulk save operation for %d node executions", len(executions))
+            raise
+
     def get_by_workflow_execution(
         self,
         workflow_execution_id: str,
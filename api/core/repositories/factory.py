@@ -37,6 +37,10 @@ class WorkflowNodeExecutionRepository(Protocol):
 
     def save_execution_data(self, execution: WorkflowNodeExecution): ...
 
+    def flush(self):
+        """Persist writes buffered by implementations that defer them, called once the graph run ends."""
+        return None
+
     def get_by_workflow_execution(
         self,
         workflow_execution_id: str,
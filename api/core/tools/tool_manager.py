@@ -17,6 +17,7 @@ from yarl import URL
 import contexts
 from configs import dify_config
 from core.entities import PluginCredentialType
+from core.helper.plugin_declaration_cache import get_or_fetch_plugin_declaration
 from core.helper.provider_cache import ToolProviderCredentialsCache
 from core.plugin.impl.tool import PluginToolManager
 from core.tools.__base.tool_provider import ToolProviderController
@@ -164,12 +165,15 @@ class ToolManager:
                 return plugin_tool_providers[provider]
 
             manager = PluginToolManager()
-            provider_entity = manager.fetch_tool_provider(tenant_id, provider)
+            provider_entity = get_or_fetch_plugin_declaration(
+                tenant_id, f"tool_provider:{provider}", lambda: manager.fetch_tool_provider(tenant_id, provider)
+            )
             if not provider_entity:
                 raise ToolProviderNotFoundError(f"plugin provider {provider} not found")
 
             controller = PluginToolProviderController(
-                entity=provider_entity.declaration,
+                # the cached declaration is shared across requests, the controller gets its own copy
+                entity=provider_entity.declaration.model_copy(deep=True),
                 plugin_id=provider_entity.plugin_id,
                 plugin_unique_identifier=provider_entity.plugin_unique_identifier,
                 tenant_id=tenant_id,
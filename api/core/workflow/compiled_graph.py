@@ -0,0 +1,95 @@
+"""
+Per-process cache of workflow graphs prepared for execution.
+
+Every run used to decode `Workflow.graph` again and re-validate each node's data before building the graph.
+A `CompiledWorkflowGraph` keeps the decoded graph config of one workflow version together with the validated
+data and resolved class of its nodes, so the runs of that version only create fresh node instances.
+"""
+
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from cachetools import LRUCache
+
+from configs import dify_config
+from graphon.entities.base_node_data import BaseNodeData
+from libs.helper import generate_text_hash
+
+if TYPE_CHECKING:
+    from graphon.nodes.base.node import Node
+    from models.workflow import Workflow
+
+_compiled_graphs: LRUCache[tuple[str, str], "CompiledWorkflowGraph"] | None = None
+_compiled_graphs_lock = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledNode:
+    node_id: str
+    node_class: type["Node"]
+    node_data: BaseNodeData
+
+
+class CompiledWorkflowGraph:
+    """
+    The decoded graph config of a workflow version and the nodes compiled from it.
+
+    Shared by concurrent runs, so `graph_config` must not be mutated. Nodes are added by `DifyNodeFactory`
+    the first time it creates them, a node that fails to compile is not added and fails again on every run.
+    """
+
+    __slots__ = ("_nodes", "graph_config")
+
+    def __init__(self, graph_config: Mapping[str, Any]):
+        self.graph_config = graph_config
+        self._nodes: dict[str, CompiledNode] = {}
+
+    def get_node(self, node_id: str) -> CompiledNode | None:
+        return self._nodes.get(node_id)
+
+    def add_node(self, node: CompiledNode) -> None:
+        # a node compiled concurrently by two runs is identical, whichever is kept does not matter
+        self._nodes[node.node_id] = node
+
+
+def get_compiled_workflow_graph(workflow: "Workflow") -> CompiledWorkflowGraph:
+    """
+    Return the compiled graph of a workflow, cached per process by workflow id and graph hash.
+
+    The key hashes the stored graph text rather than using `Workflow.unique_hash`, which would decode the graph
+    on every lookup. Editing a draft changes the hash, so a stale draft graph is never returned.
+    """
+    cache = _get_compiled_graphs_cache()
+    if cache is None:
+        return CompiledWorkflowGraph(workflow.graph_dict)
+
+    key = (workflow.id, generate_text_hash(workflow.graph or ""))
+    with _compiled_graphs_lock:
+        compiled_graph = cache.get(key)
+    if compiled_graph is not None:
+        return compiled_graph
+
+    compiled_graph = CompiledWorkflowGraph(workflow.graph_dict)
+    with _compiled_graphs_lock:
+        # keep the graph another run may have cached meanwhile, it may already hold compiled nodes
+        compiled_graph = cache.setdefault(key, compiled_graph)
+    return compiled_graph
+
+
+def clear_compiled_workflow_graph_cache():
+    with _compiled_graphs_lock:
+        if _compiled_graphs is not None:
+            _compiled_graphs.clear()
+
+
+def _get_compiled_graphs_cache() -> LRUCache[tuple[str, str], CompiledWorkflowGraph] | None:
+    global _compiled_graphs
+    if not dify_config.WORKFLOW_GRAPH_CACHE_MAX_SIZE:
+        return None
+    if _compiled_graphs is None:
+        with _compiled_graphs_lock:
+            if _compiled_graphs is None:
+                _compiled_graphs = LRUCache(maxsize=dify_config.WORKFLOW_GRAPH_CACHE_MAX_SIZE)
+    return _compiled_graphs
@@ -20,6 +20,7 @@ from core.memory.token_buffer_memory import TokenBufferMemory
 from core.model_manager import ModelInstance
 from core.prompt.entities.advanced_prompt_entities import MemoryConfig
 from core.trigger.constants import TRIGGER_NODE_TYPES
+from core.workflow.compiled_graph import CompiledNode, CompiledWorkflowGraph
 from core.workflow.human_input_adapter import adapt_node_config_for_graph
 from core.workflow.node_runtime import (
     DifyFileReferenceFactory,
@@ -38,7 +39,7 @@ from core.workflow.nodes.agent.plugin_strategy_adapter import (
 )
 from core.workflow.nodes.agent.runtime_support import AgentRuntimeSupport
 from core.workflow.system_variables import SystemVariableKey, get_system_text, system_variable_selector
-from core.workflow.template_rendering import CodeExecutorJinja2TemplateRenderer
+from core.workflow.template_rendering import build_jinja2_template_renderer
 from extensions.ext_database import db
 from graphon.entities.base_node_data import BaseNodeData
 from graphon.entities.graph_config import NodeConfigDict, NodeConfigDictAdapter
@@ -270,20 +271,28 @@ class DifyNodeFactory(NodeFactory):
         *,
         graph_init_context: DifyGraphInitContext,
         graph_runtime_state: "GraphRuntimeState",
+        compiled_graph: CompiledWorkflowGraph | None = None,
     ) -> "DifyNodeFactory":
         """Bridge Dify's explicit init context into the current `graphon` API."""
         return cls(
             graph_init_params=graph_init_context.to_graph_init_params(),
             graph_runtime_state=graph_runtime_state,
+            compiled_graph=compiled_graph,
         )
 
     def __init__(
         self,
         graph_init_params: "GraphInitParams",
         graph_runtime_state: "GraphRuntimeState",
+        compiled_graph: CompiledWorkflowGraph | None = None,
     ) -> None:
+        """
+        :param compiled_graph: the compiled form of `graph_init_params.graph_config`, if any. Nodes are then
+            created from its validated node data, which is shared by the runs of the same workflow version.
+        """
         self.graph_init_params = graph_init_params
         self.graph_runtime_state = graph_runtime_state
+        self._compiled_graph = compiled_graph
         self._dify_context = self._resolve_dify_context(graph_init_params.run_context)
         self._code_executor: WorkflowCodeExecutor = DefaultWorkflowCodeExecutor()
         self._code_limits = CodeNodeLimits(
@@ -296,7 +305,7 @@ class DifyNodeFactory(NodeFactory):
             max_string_array_length=dify_config.CODE_MAX_STRING_ARRAY_LENGTH,
             max_object_array_length=dify_config.CODE_MAX_OBJECT_ARRAY_LENGTH,
         )
-        self._jinja2_template_renderer = CodeExecutorJinja2TemplateRenderer()
+        self._jinja2_template_renderer = build_jinja2_template_renderer()
         self._template_transform_max_output_length = dify_config.TEMPLATE_TRANSFORM_MAX_LENGTH
         self._http_request_http_client = graphon_ssrf_proxy
         self._bound_tool_file_manager_factory = lambda: DifyToolFileManager(
@@ -365,15 +374,15 @@ class DifyNodeFactory(NodeFactory):
             (including pydantic ValidationError, which subclasses ValueError),
             if node type is unknown, or if no implementation exists for the resolved version
         """
-        typed_node_config = NodeConfigDictAdapter.validate_python(adapt_node_config_for_graph(node_config))
-        node_id = typed_node_config["id"]
-        node_data = typed_node_config["data"]
-        node_class = self._resolve_node_class(node_type=node_data.type, node_version=str(node_data.version))
-        # Graph configs are initially validated against permissive shared node data.
-        # Re-validate using the resolved node class so workflow-local node schemas
-        # stay explicit and constructors receive the concrete typed payload.
-        resolved_node_data = self._validate_resolved_node_data(node_class, node_data)
-        node_type = node_data.type
+        compiled_node = self._compiled_graph.get_node(node_config["id"]) if self._compiled_graph is not None else None
+        if compiled_node is None:
+            compiled_node = self._compile_node(node_config)
+            if self._compiled_graph is not None:
+                self._compiled_graph.add_node(compiled_node)
+        node_id = compiled_node.node_id
+        node_class = compiled_node.node_class
+        resolved_node_data = compiled_node.node_data
+        node_type = resolved_node_data.type
         node_init_kwargs_factories: Mapping[NodeType, Callable[[], dict[str, object]]] = {
             BuiltinNodeTypes.CODE: lambda: {
                 "code_executor": self._code_executor,
@@ -448,6 +457,19 @@ class DifyNodeFactory(NodeFactory):
             **node_init_kwargs,
         )
 
+    def _compile_node(self, node_config: dict[str, Any] | NodeConfigDict) -> CompiledNode:
+        typed_node_config = NodeConfigDictAdapter.validate_python(adapt_node_config_for_graph(node_config))
+        node_data = typed_node_config["data"]
+        node_class = self._resolve_node_class(node_type=node_data.type, node_version=str(node_data.version))
+        # Graph configs are initially validated against permissive shared node data.
+        # Re-validate using the resolved node class so workflow-local node schemas
+        # stay explicit and constructors receive the concrete typed payload.
+        return CompiledNode(
+            node_id=typed_node_config["id"],
+            node_class=node_class,
+            node_data=self._validate_resolved_node_data(node_class, node_data),
+        )
+
     @staticmethod
     def _validate_resolved_node_data(node_class: type[Node], node_data: BaseNodeData) -> BaseNodeData:
         """
@@ -1,11 +1,31 @@
 from __future__ import annotations
 
-from collections.abc import Mapping
+import json
+import math
+import re
+import threading
+import time
+import types
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from contextvars import ContextVar
+from functools import lru_cache, update_wrapper, wraps
 from typing import Any
 
+from cachetools import LRUCache
+from jinja2 import Template, nodes, pass_eval_context
+from jinja2.compiler import CodeGenerator, Frame
+from jinja2.filters import do_center, do_format, do_indent, do_replace, do_wordwrap, make_attrgetter, sync_do_join
+from jinja2.nodes import EvalContext
+from jinja2.runtime import Context, markup_join, str_join
+from jinja2.sandbox import MAX_RANGE, ImmutableSandboxedEnvironment, SandboxedEscapeFormatter, SandboxedFormatter
+from jinja2.visitor import NodeTransformer
+from markupsafe import Markup
+
+from configs import dify_config
 from core.helper.code_executor.code_executor import CodeExecutionError, CodeExecutor
 from graphon.nodes.code.entities import CodeLanguage
 from graphon.template_rendering import Jinja2TemplateRenderer, TemplateRenderError
+from graphon.variables.utils import dumps_with_segments
 
 
 class CodeExecutorJinja2TemplateRenderer(Jinja2TemplateRenderer):
@@ -27,3 +47,470 @@ class CodeExecutorJinja2TemplateRenderer(Jinja2TemplateRenderer):
         if not isinstance(rendered, str):
             raise TemplateRenderError("Template render result must be a string.")
         return rendered
+
+
+class _RenderLimitError(Exception):
+    pass
+
+
+class _RenderBudget:
+    """Loop iterations and time left to a single render."""
+
+    def __init__(self, *, max_loop_iterations: int, timeout: float):
+        self._iterations_left = max_loop_iterations
+        self._max_loop_iterations = max_loop_iterations
+        self._timeout = timeout
+        self._deadline = time.monotonic() + timeout
+
+    def check_time(self) -> None:
+        if time.monotonic() > self._deadline:
+            raise _RenderLimitError(f"Template rendering exceeded the time limit of {self._timeout} seconds.")
+
+    def spend_iterations(self, count: int = 1) -> None:
+        self._iterations_left -= count
+        if self._iterations_left < 0:
+            raise _RenderLimitError(
+                f"Template rendering exceeded the limit of {self._max_loop_iterations} loop iterations."
+            )
+        self.check_time()
+
+    def range(self, *args: int) -> range:
+        rng = range(*args)
+        if len(rng) > MAX_RANGE:
+            raise _RenderLimitError(f"Range too big, the sandbox allows at most {MAX_RANGE} items.")
+        self.spend_iterations(len(rng))
+        return rng
+
+
+_current_budget: ContextVar[_RenderBudget] = ContextVar("template_render_budget")
+
+# bit length of the largest integer `*` and `**` may produce
+_MAX_INTEGER_BITS = 4096
+
+# inserted around the iterable of every `for` loop
+_BUDGETED_ITER_FILTER = "budgeted_iter"
+
+
+def _budgeted_iter(iterable: Iterable[Any]) -> Iterable[Any]:
+    """Charge each item a `for` loop iterates to the budget of the current render."""
+    if isinstance(iterable, (_BudgetedList, range)):
+        # charged per item iterated, or up front by `_RenderBudget.range`
+        return iterable
+    return _iterate_budgeted(iterable, _current_budget.get())
+
+
+def _iterate_budgeted(iterable: Iterable[Any], budget: _RenderBudget) -> Iterator[Any]:
+    for item in iterable:
+        budget.spend_iterations()
+        yield item
+
+
+# joins the operands of every `~`
+_BOUNDED_CONCAT_FILTER = "bounded_concat"
+
+# `printf`-style conversion specifiers, see `str.__mod__`
+_PERCENT_CONVERSION = re.compile(
+    r"%(?:\((?P<key>[^)]*)\))?[-#0 +]*(?P<width>\*|\d+)?(?:\.(?P<precision>\*|\d+))?[hlL]?(?P<type>.)", re.DOTALL
+)
+
+# longest text a float conversion adds beyond its precision, `'%f' % 1e308` has 309 integer digits
+_MAX_FLOAT_DIGITS = 320
+
+
+def _padded_length(value: str, width: int, fillchar: str = " ") -> int:
+    return max(len(value), width)
+
+
+def _expanded_tabs_length(value: str, tabsize: int = 8) -> int:
+    return len(value) + value.count("\t") * max(tabsize, 0)
+
+
+def _replaced_length(value: str, old: str, new: str, count: int = -1) -> int:
+    occurrences = value.count(old) if old else len(value) + 1
+    if count >= 0:
+        occurrences = min(occurrences, count)
+    return len(value) + occurrences * (len(new) - len(old))
+
+
+def _joined_length(separator: str, items: list[Any]) -> int:
+    return len(separator) * max(len(items) - 1, 0) + sum(len(item) for item in items if isinstance(item, str))
+
+
+def _translated_length(value: str, table: Any) -> int:
+    if not isinstance(table, Mapping):
+        return len(value)
+    longest = max((len(replacement) for replacement in table.values() if isinstance(replacement, str)), default=1)
+    return len(value) * max(longest, 1)
+
+
+def _percent_formatted_length(template: str, values: Any) -> int:
+    """Upper bound of the length of `template % values`."""
+    positional = iter(values if isinstance(values, tuple) else (values,))
+    length = len(template)
+    for conversion in _PERCENT_CONVERSION.finditer(template):
+        if conversion["type"] == "%":
+            continue
+        width = next(positional) if conversion["width"] == "*" else int(conversion["width"] or 0)
+        precision = next(positional) if conversion["precision"] == "*" else int(conversion["precision"] or 0)
+        value = values[conversion["key"]] if conversion["key"] is not None else next(positional)
+        if conversion["type"] == "s":
+            field_length = len(str(value))
+        elif conversion["type"] in "ra":
+            field_length = len(ascii(value))
+        else:
+            field_length = len(str(value)) + precision + (_MAX_FLOAT_DIGITS if conversion["type"] in "eEfFgG" else 0)
+        length += max(width, field_length)
+    return length
+
+
+# `str` methods whose result can be much longer than the string they are called on
+_STR_METHOD_LENGTHS: dict[str, Callable[..., int]] = {
+    "center": _padded_length,
+    "expandtabs": _expanded_tabs_length,
+    "join": _joined_length,
+    "ljust": _padded_length,
+    "replace": _replaced_length,
+    "rjust": _padded_length,
+    "translate": _translated_length,
+    "zfill": _padded_length,
+}
+
+
+def _centered_filter_length(value: Any, width: int = 80) -> int:
+    return max(len(str(value)), width)
+
+
+def _indented_filter_length(value: Any, width: int | str = 4, first: bool = False, blank: bool = False) -> int:
+    text = str(value)
+    return len(text) + (text.count("\n") + 1) * (len(width) if isinstance(width, str) else width)
+
+
+def _wrapped_filter_length(
+    environment: Any,
+    value: Any,
+    width: int = 79,
+    break_long_words: bool = True,
+    wrapstring: str | None = None,
+    break_on_hyphens: bool = True,
+) -> int:
+    text = str(value)
+    lines = len(text.split()) + len(text) // max(width, 1) + text.count("\n") + 1
+    return len(text) + lines * len(environment.newline_sequence if wrapstring is None else wrapstring)
+
+
+def _replaced_filter_length(eval_ctx: EvalContext, value: Any, old: Any, new: Any, count: int | None = None) -> int:
+    return _replaced_length(str(value), str(old), str(new), -1 if count is None else count)
+
+
+def _formatted_filter_length(value: Any, *args: Any, **kwargs: Any) -> int:
+    return _percent_formatted_length(str(value), kwargs or args)
+
+
+class _BoundedFormatter(SandboxedFormatter):
+    """Formats `str.format` calls, rejecting huge field widths and results longer than `max_length`."""
+
+    def __init__(self, env: _BoundedSandboxedEnvironment, **kwargs: Any):
+        super().__init__(env, **kwargs)
+        self._max_length = env.max_result_length
+        self._length = 0
+
+    def vformat(self, format_string: str, args: Any, kwargs: Any) -> str:
+        self._length = len(format_string)
+        return super().vformat(format_string, args, kwargs)
+
+    def format_field(self, value: Any, format_spec: str) -> Any:
+        if any(int(number) > self._max_length for number in re.findall(r"\d+", format_spec)):
+            raise _RenderLimitError(f"Format spec {format_spec!r} exceeds the limit of {self._max_length} characters.")
+        formatted = super().format_field(value, format_spec)
+        self._length += len(formatted)
+        if self._length > self._max_length:
+            raise _RenderLimitError(f"Formatted string exceeds the limit of {self._max_length} characters.")
+        return formatted
+
+
+class _BoundedEscapeFormatter(_BoundedFormatter, SandboxedEscapeFormatter):
+    pass
+
+
+# a real list, so the compiled template can join it like the buffer it replaces
+class _BoundedBuffer(list[str]):  # noqa: FURB189
+    """Output captured by a `set` block, macro or `filter` block, at most `max_length` characters long."""
+
+    def __init__(self, max_length: int):
+        super().__init__()
+        self._max_length = max_length
+        self._length = 0
+
+    def append(self, chunk: str) -> None:
+        self._grow(len(chunk))
+        super().append(chunk)
+
+    def extend(self, chunks: Iterable[str]) -> None:
+        chunks = tuple(chunks)
+        self._grow(sum(len(chunk) for chunk in chunks))
+        super().extend(chunks)
+
+    def _grow(self, length: int) -> None:
+        self._length += length
+        if self._length > self._max_length:
+            raise _RenderLimitError(f"Captured output exceeds the limit of {self._max_length} characters.")
+
+
+class _BoundedCodeGenerator(CodeGenerator):
+    def buffer(self, frame: Frame) -> None:
+        frame.buffer = self.temporary_identifier()
+        self.writeline(f"{frame.buffer} = environment.new_buffer()")
+
+
+class _BoundConcat(NodeTransformer):
+    def visit_Concat(self, node: nodes.Concat) -> nodes.Filter:  # noqa: N802
+        operands = nodes.List([self.visit(operand) for operand in node.nodes], lineno=node.lineno)
+        return nodes.Filter(operands, _BOUNDED_CONCAT_FILTER, [], [], None, None, lineno=node.lineno)
+
+
+class _BoundedSandboxedEnvironment(ImmutableSandboxedEnvironment):
+    """
+    Sandbox charging every `for` loop to the render budget and bounding the size of what templates build.
+
+    No string or sequence built by `*`, `+`, `~`, `%`, a `str` method, `str.format`, a padding, joining or
+    replacing filter, or captured by a block may be longer than `max_result_length`, and integer products and
+    powers may not exceed `_MAX_INTEGER_BITS` bits. Sizes are checked before the result is built where they
+    can be computed up front.
+    """
+
+    code_generator_class = _BoundedCodeGenerator
+    intercepted_binops = frozenset({"*", "**", "+", "%"})
+
+    def __init__(self, *, max_result_length: int):
+        super().__init__()
+        self.max_result_length = max_result_length
+        # `lipsum(n, min, max)` generates text of any size
+        del self.globals["lipsum"]
+        self.filters[_BUDGETED_ITER_FILTER] = _budgeted_iter
+        self.filters[_BOUNDED_CONCAT_FILTER] = self._concat
+        self.filters.update(
+            center=self._bounded_filter(do_center, _centered_filter_length),
+            format=self._bounded_filter(do_format, _formatted_filter_length),
+            indent=self._bounded_filter(do_indent, _indented_filter_length),
+            join=self._join,
+            replace=self._bounded_filter(do_replace, _replaced_filter_length),
+            wordwrap=self._bounded_filter(do_wordwrap, _wrapped_filter_length),
+        )
+
+    def _parse(self, source: str, name: str | None, filename: str | None) -> nodes.Template:
+        tree = _BoundConcat().visit(super()._parse(source, name, filename))
+        for loop in tree.find_all(nodes.For):
+            loop.iter = nodes.Filter(loop.iter, _BUDGETED_ITER_FILTER, [], [], None, None, lineno=loop.iter.lineno)
+        return tree
+
+    def new_buffer(self) -> _BoundedBuffer:
+        return _BoundedBuffer(self.max_result_length)
+
+    def call(self, context: Context, obj: Any, /, *args: Any, **kwargs: Any) -> Any:
+        owner = getattr(obj, "__self__", None)
+        estimate = _STR_METHOD_LENGTHS.get(getattr(obj, "__name__", ""))
+        if isinstance(owner, str) and estimate is not None:
+            if obj.__name__ == "join" and args:
+                # measured before joining, so a one-shot iterator is consumed here
+                args = (list(args[0]), *args[1:])
+            self._check_length(estimate, owner, *args, **kwargs)
+        return super().call(context, obj, *args, **kwargs)
+
+    def call_binop(self, context: Context, operator: str, left: Any, right: Any) -> Any:
+        if operator == "*":
+            self._check_repetition(left, right)
+            self._check_repetition(right, left)
+            if (
+                isinstance(left, int)
+                and isinstance(right, int)
+                and left.bit_length() + right.bit_length() > _MAX_INTEGER_BITS
+            ):
+                raise _RenderLimitError(f"Integer product exceeds the limit of {_MAX_INTEGER_BITS} bits.")
+        elif operator == "**":
+            if (
+                isinstance(left, int)
+                and isinstance(right, int)
+                and abs(left) > 1
+                and right > 0
+                and right * math.log2(abs(left)) > _MAX_INTEGER_BITS
+            ):
+                raise _RenderLimitError(f"Integer power exceeds the limit of {_MAX_INTEGER_BITS} bits.")
+        elif operator == "+":
+            if (
+                isinstance(left, (str, list, tuple))
+                and isinstance(right, (str, list, tuple))
+                and len(left) + len(right) > self.max_result_length
+            ):
+                raise _RenderLimitError(f"Concatenated sequence exceeds the limit of {self.max_result_length} items.")
+        elif operator == "%" and isinstance(left, str):
+            self._check_length(_percent_formatted_length, left, right)
+        return super().call_binop(context, operator, left, right)
+
+    def wrap_str_format(self, value: Any) -> Callable[..., str] | None:
+        # as `SandboxedEnvironment.wrap_str_format`, with a formatter bounding the result
+        if not isinstance(value, (types.MethodType, types.BuiltinMethodType)) or value.__name__ not in (
+            "format",
+            "format_map",
+        ):
+            return None
+        f_self = value.__self__
+        if not isinstance(f_self, str):
+            return None
+
+        str_type = type(f_self)
+        is_format_map = value.__name__ == "format_map"
+        if isinstance(f_self, Markup):
+            formatter: _BoundedFormatter = _BoundedEscapeFormatter(self, escape=f_self.escape)
+        else:
+            formatter = _BoundedFormatter(self)
+
+        def wrapper(*args: Any, **kwargs: Any) -> str:
+            if is_format_map:
+                if kwargs:
+                    raise TypeError("format_map() takes no keyword arguments")
+                if len(args) != 1:
+                    raise TypeError(f"format_map() takes exactly one argument ({len(args)} given)")
+                kwargs = args[0]
+                args = ()
+            return str_type(formatter.vformat(f_self, args, kwargs))
+
+        return update_wrapper(wrapper, value)
+
+    def _bounded_filter(self, filter_func: Callable[..., str], estimate: Callable[..., int]) -> Callable[..., str]:
+        """Wrap `filter_func` to check the length `estimate` gives for its arguments before running it."""
+
+        @wraps(filter_func)
+        def bounded(*args: Any, **kwargs: Any) -> str:
+            self._check_length(estimate, *args, **kwargs)
+            return filter_func(*args, **kwargs)
+
+        return bounded
+
+    @pass_eval_context
+    def _join(
+        self, eval_ctx: EvalContext, value: Iterable[Any], d: str = "", attribute: str | int | None = None
+    ) -> str:
+        if attribute is not None:
+            value = map(make_attrgetter(self, attribute), value)
+        items = list(value)
+        self._check_length(_joined_length, str(d), [str(item) for item in items])
+        return sync_do_join(eval_ctx, items, d)
+
+    @pass_eval_context
+    def _concat(self, eval_ctx: EvalContext, operands: list[Any]) -> str:
+        self._check_length(_joined_length, "", [str(operand) for operand in operands])
+        return markup_join(operands) if eval_ctx.autoescape else str_join(operands)
+
+    def _check_length(self, estimate: Callable[..., int], *args: Any, **kwargs: Any) -> None:
+        try:
+            length = estimate(*args, **kwargs)
+        except (LookupError, StopIteration, TypeError, ValueError):
+            # the arguments are invalid, left to the call itself to report
+            return
+        if length > self.max_result_length:
+            raise _RenderLimitError(f"String result exceeds the limit of {self.max_result_length} characters.")
+
+    def _check_repetition(self, sequence: Any, count: Any) -> None:
+        if (
+            isinstance(sequence, (str, list, tuple))
+            and isinstance(count, int)
+            and len(sequence) * count > self.max_result_length
+        ):
+            raise _RenderLimitError(f"Repeated sequence exceeds the limit of {self.max_result_length} items.")
+
+
+# a real list, so filters such as `tojson` keep working on it
+class _BudgetedList(list[Any]):  # noqa: FURB189
+    """A list of the render inputs charging each item iterated to the render budget."""
+
+    def __init__(self, items: list[Any], budget: _RenderBudget):
+        super().__init__(items)
+        self._budget = budget
+
+    def __iter__(self) -> Iterator[Any]:
+        for item in super().__iter__():
+            self._budget.spend_iterations()
+            yield item
+
+
+def _budget_lists(value: Any, budget: _RenderBudget) -> Any:
+    if isinstance(value, list):
+        return _BudgetedList([_budget_lists(item, budget) for item in value], budget)
+    if isinstance(value, dict):
+        return {key: _budget_lists(item, budget) for key, item in value.items()}
+    return value
+
+
+class SandboxedJinja2TemplateRenderer(Jinja2TemplateRenderer):
+    """
+    In-process Jinja2 renderer, avoiding the round trip to the code sandbox.
+
+    Templates run in an `ImmutableSandboxedEnvironment`, which rejects unsafe attributes and calls that mutate
+    the inputs. Inputs are serialized to JSON first, like the code sandbox receives them. Compiled templates are
+    kept in a bounded LRU shared by all renders.
+
+    Rendering fails with a `TemplateRenderError` once it produces more than `max_output_length` characters,
+    iterates more than `max_loop_iterations` times in `for` loops, over input lists and `range`, or runs longer
+    than `timeout` seconds. The time is checked on each loop iteration and output chunk, not preemptively.
+    No string or sequence a template builds, by operators, `str` methods, filters or captured blocks, may be
+    longer than `max_output_length` either, and integer products and powers are bounded in size.
+    """
+
+    def __init__(self, *, cache_size: int, max_output_length: int, max_loop_iterations: int, timeout: float):
+        self._environment = _BoundedSandboxedEnvironment(max_result_length=max_output_length)
+        self._templates: LRUCache[str, Template] | None = LRUCache(maxsize=cache_size) if cache_size else None
+        self._templates_lock = threading.Lock()
+        self._max_output_length = max_output_length
+        self._max_loop_iterations = max_loop_iterations
+        self._timeout = timeout
+
+    def render_template(self, template: str, variables: Mapping[str, Any]) -> str:
+        budget = _RenderBudget(max_loop_iterations=self._max_loop_iterations, timeout=self._timeout)
+        budget_token = _current_budget.set(budget)
+        try:
+            compiled_template = self._get_template(template)
+            context = {"range": budget.range, **_budget_lists(json.loads(dumps_with_segments(variables)), budget)}
+            chunks: list[str] = []
+            output_length = 0
+            for chunk in compiled_template.generate(context):
+                output_length += len(chunk)
+                if output_length > self._max_output_length:
+                    raise _RenderLimitError(
+                        f"Template output exceeds the limit of {self._max_output_length} characters."
+                    )
+                budget.check_time()
+                chunks.append(chunk)
+        except Exception as exc:
+            # the code sandbox reports every error raised by a template as a failed execution
+            raise TemplateRenderError(str(exc)) from exc
+        finally:
+            _current_budget.reset(budget_token)
+        return "".join(chunks)
+
+    def _get_template(self, source: str) -> Template:
+        if self._templates is None:
+            return self._environment.from_string(source)
+        with self._templates_lock:
+            compiled_template = self._templates.get(source)
+        if compiled_template is None:
+            compiled_template = self._environment.from_string(source)
+            with self._templates_lock:
+                self._templates[source] = compiled_template
+        return compiled_template
+
+
+@lru_cache(maxsize=1)
+def _get_sandboxed_jinja2_template_renderer() -> SandboxedJinja2TemplateRenderer:
+    return SandboxedJinja2TemplateRenderer(
+        cache_size=dify_config.TEMPLATE_RENDERER_CACHE_MAX_SIZE,
+        max_output_length=dify_config.TEMPLATE_RENDERER_MAX_OUTPUT_LENGTH,
+        max_loop_iterations=dify_config.TEMPLATE_RENDERER_MAX_LOOP_ITERATIONS,
+        timeout=dify_config.TEMPLATE_RENDERER_TIMEOUT,
+    )
+
+
+def build_jinja2_template_renderer() -> Jinja2TemplateRenderer:
+    """Return the Jinja2 renderer selected by `TEMPLATE_RENDERER`."""
+    if dify_config.TEMPLATE_RENDERER == "in_process":
+        return _get_sandboxed_jinja2_template_renderer()
+    return CodeExecutorJinja2TemplateRenderer()
@@ -10,6 +10,7 @@ from core.app.entities.app_invoke_entities import InvokeFrom, UserFrom, build_di
 from core.app.file_access import DatabaseFileAccessController
 from core.app.workflow.layers.llm_quota import LLMQuotaLayer
 from core.app.workflow.layers.observability import ObservabilityLayer
+from core.workflow.compiled_graph import CompiledWorkflowGraph
 from core.workflow.node_factory import (
     DifyGraphInitContext,
     DifyNodeFactory,
@@ -46,6 +47,10 @@ _file_access_controller = DatabaseFileAccessController()
 
 
 class _WorkflowChildEngineBuilder:
+    def __init__(self, compiled_graph: CompiledWorkflowGraph | None = None):
+        # child graphs (iterations, loops) are built from the graph config of the parent run
+        self._compiled_graph = compiled_graph
+
     @staticmethod
     def _has_node_id(graph_config: Mapping[str, Any], node_id: str) -> bool | None:
         """
@@ -84,6 +89,7 @@ class _WorkflowChildEngineBuilder:
         node_factory = DifyNodeFactory(
             graph_init_params=graph_init_params,
             graph_runtime_state=child_graph_runtime_state,
+            compiled_graph=self._compiled_graph,
         )
 
         graph_config = graph_init_params.graph_config
@@ -146,6 +152,7 @@ class WorkflowEntry:
         variable_pool: VariablePool,
         graph_runtime_state: GraphRuntimeState,
         command_channel: CommandChannel | None = None,
+        compiled_graph: CompiledWorkflowGraph | None = None,
     ) -> None:
         """
         Init workflow entry
@@ -162,6 +169,7 @@ class WorkflowEntry:
         :param variable_pool: variable pool
         :param graph_runtime_state: pre-created graph runtime state
         :param command_channel: command channel for external control (optional, defaults to InMemoryChannel)
+        :param compiled_graph: compiled form of graph_config, reused to build iteration and loop child graphs
         :param thread_pool_id: thread pool id
         """
         # check call depth
@@ -176,7 +184,7 @@ class WorkflowEntry:
         self.command_channel = command_channel
         execution_context = capture_current_context()
         graph_runtime_state.execution_context = execution_context
-        self._child_engine_builder = _WorkflowChildEngineBuilder()
+        self._child_engine_builder = _WorkflowChildEngineBuilder(compiled_graph)
         self.graph_engine = GraphEngine(
             workflow_id=workflow_id,
             graph=graph,
@@ -242,6 +242,13 @@ def init_app(app: DifyApp) -> Celery:
             "schedule": timedelta(minutes=dify_config.API_TOKEN_LAST_USED_UPDATE_INTERVAL),
         }
 
+    if dify_config.ENABLE_SEGMENT_HIT_COUNT_FLUSH_TASK:
+        imports.append("schedule.flush_segment_hit_counts_task")
+        beat_schedule["flush_segment_hit_counts"] = {
+            "task": "schedule.flush_segment_hit_counts_task.flush_segment_hit_counts",
+            "schedule": timedelta(seconds=dify_config.SEGMENT_HIT_COUNT_FLUSH_INTERVAL),
+        }
+
     if dify_config.ENTERPRISE_ENABLED and dify_config.ENTERPRISE_TELEMETRY_ENABLED:
         imports.append("tasks.enterprise_telemetry_task")
     celery_app.conf.update(beat_schedule=beat_schedule, imports=imports)
@@ -10,6 +10,7 @@ def init_app(app: DifyApp):
         cleanup_orphaned_draft_variables,
         clear_free_plan_tenant_expired_logs,
         clear_orphaned_file_records,
+        convert_embedding_cache_format,
         convert_to_agent_apps,
         create_tenant,
         delete_archived_workflow_runs,
@@ -21,6 +22,7 @@ def init_app(app: DifyApp):
         install_plugins,
         install_rag_pipeline_plugins,
         migrate_data_for_plugin,
+        migrate_keyword_postings,
         migrate_oss,
         old_metadata_migration,
         remove_orphaned_files_on_storage,
@@ -68,6 +70,8 @@ def init_app(app: DifyApp):
         clean_workflow_runs,
         clean_expired_messages,
         export_app_messages,
+        convert_embedding_cache_format,
+        migrate_keyword_postings,
     ]
     for cmd in cmds_to_register:
         app.cli.add_command(cmd)
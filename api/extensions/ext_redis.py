@@ -135,6 +135,15 @@ class RedisClientWrapper:
             lt=lt,
         )
 
+    def get_and_expire(self, name: str | bytes, time: int | timedelta) -> Any:
+        """GET a key and refresh its expiration in a single pipelined round trip."""
+        key = _serialize_redis_name_arg(name, self._get_prefix())
+        pipe = self._require_client().pipeline(transaction=False)
+        pipe.get(key)
+        pipe.expire(key, time)
+        value, _ = pipe.execute()
+        return value
+
     def exists(self, *names: str | bytes) -> Any:
         return self._require_client().exists(*_serialize_redis_name_args(names, self._get_prefix()))
 
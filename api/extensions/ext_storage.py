@@ -1,12 +1,19 @@
+import hashlib
 import logging
-from collections.abc import Callable, Generator
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Generator, Iterable, Sequence
+from pathlib import Path
 from typing import Literal, Union, overload
 
 from flask import Flask
 
 from configs import dify_config
 from dify_app import DifyApp
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, _check_range
 from extensions.storage.storage_type import StorageType
 
 logger = logging.getLogger(__name__)
@@ -17,6 +24,15 @@ class Storage:
         storage_factory = self.get_storage_factory(dify_config.STORAGE_TYPE)
         with app.app_context():
             self.storage_runner = storage_factory()
+        if dify_config.STORAGE_LOCAL_CACHE_ENABLED:
+            key_prefixes = dify_config.STORAGE_LOCAL_CACHE_KEY_PREFIXES.split(",")
+            self.storage_runner = CachedStorage(
+                self.storage_runner,
+                path=dify_config.STORAGE_LOCAL_CACHE_PATH,
+                max_size=dify_config.STORAGE_LOCAL_CACHE_MAX_SIZE,
+                max_object_size=dify_config.STORAGE_LOCAL_CACHE_MAX_OBJECT_SIZE,
+                key_prefixes=[prefix.strip() for prefix in key_prefixes if prefix.strip()],
+            )
 
     @staticmethod
     def get_storage_factory(storage_type: str) -> Callable[[], BaseStorage]:
@@ -110,6 +126,12 @@ class Storage:
     def load_stream(self, filename: str) -> Generator:
         return self.storage_runner.load_stream(filename)
 
+    def load_range(self, filename: str, offset: int, length: int) -> bytes:
+        return self.storage_runner.load_range(filename, offset, length)
+
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        self.storage_runner.save_stream(filename, stream)
+
     def download(self, filename, target_filepath):
         self.storage_runner.download(filename, target_filepath)
 
@@ -123,6 +145,283 @@ class Storage:
         return self.storage_runner.scan(path, files=files, directories=directories)
 
 
+class CachedStorage(BaseStorage):
+    """
+    Read-through cache on local disk in front of another storage backend.
+
+    Only files whose name starts with one of `key_prefixes` are cached. Each is stored once under the SHA-256
+    of its name, and the least recently used ones are evicted once the cache holds more than `max_size` bytes.
+    Files larger than `max_object_size` are never cached.
+
+    Saves and deletes through this instance invalidate the affected entry, but other processes do not see
+    those invalidations, so the prefixes must only cover files that are never rewritten in place.
+    The LRU index is kept per process and rebuilt from the cache directory on start; processes sharing the
+    directory each enforce `max_size` over the entries they know of.
+    """
+
+    _CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        storage: BaseStorage,
+        path: str,
+        max_size: int,
+        max_object_size: int,
+        key_prefixes: Sequence[str],
+    ):
+        self._storage = storage
+        self._path = Path(path)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        self._max_object_size = min(max_object_size, max_size)
+        self._key_prefixes = tuple(key_prefixes)
+        # entry digest -> size in bytes, least recently used first
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        # bumped by every invalidation, so fetches that started before it do not store stale content
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.hit_bytes = 0
+        self.miss_bytes = 0
+        self.evictions = 0
+        self._load_entries()
+
+    def save(self, filename: str, data: bytes):
+        try:
+            self._storage.save(filename, data)
+        finally:
+            self._invalidate(filename)
+
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        try:
+            self._storage.save_stream(filename, stream)
+        finally:
+            self._invalidate(filename)
+
+    def load_once(self, filename: str) -> bytes:
+        if not self._is_cacheable(filename):
+            return self._storage.load_once(filename)
+
+        digest = _entry_digest(filename)
+        entry_path = self._hit(digest)
+        if entry_path is not None:
+            try:
+                data = entry_path.read_bytes()
+            except FileNotFoundError:
+                self._drop(digest)
+            else:
+                self._record_hit(len(data))
+                return data
+
+        generation = self._generation
+        data = self._storage.load_once(filename)
+        self._record_miss(len(data))
+        if len(data) <= self._max_object_size:
+            temp_path = self._temp_path(digest)
+            temp_path.write_bytes(data)
+            self._commit(digest, temp_path, len(data), generation)
+        return data
+
+    def load_stream(self, filename: str) -> Generator:
+        if not self._is_cacheable(filename):
+            yield from self._storage.load_stream(filename)
+            return
+
+        digest = _entry_digest(filename)
+        entry_path = self._hit(digest)
+        if entry_path is not None:
+            try:
+                entry = entry_path.open("rb")
+            except FileNotFoundError:
+                self._drop(digest)
+            else:
+                with entry:
+                    self._record_hit(os.fstat(entry.fileno()).st_size)
+                    while chunk := entry.read(self._CHUNK_SIZE):
+                        yield chunk
+                return
+
+        # tee the stream into the cache, giving up on caching once the file turns out to be too large
+        generation = self._generation
+        temp_path = self._temp_path(digest)
+        size = 0
+        completed = False
+        try:
+            with temp_path.open("wb") as temp_file:
+                for chunk in self._storage.load_stream(filename):
+                    size += len(chunk)
+                    if size <= self._max_object_size:
+                        temp_file.write(chunk)
+                    yield chunk
+            completed = True
+        finally:
+            self._record_miss(size)
+            if completed and size <= self._max_object_size:
+                self._commit(digest, temp_path, size, generation)
+            else:
+                temp_path.unlink(missing_ok=True)
+
+    def load_range(self, filename: str, offset: int, length: int) -> bytes:
+        if self._is_cacheable(filename):
+            _check_range(offset, length)
+            digest = _entry_digest(filename)
+            entry_path = self._hit(digest)
+            if entry_path is not None:
+                try:
+                    with entry_path.open("rb") as entry:
+                        entry.seek(offset)
+                        data = entry.read(length)
+                except FileNotFoundError:
+                    self._drop(digest)
+                else:
+                    self._record_hit(len(data))
+                    return data
+        # a range does not fill the cache, the next whole read will
+        return self._storage.load_range(filename, offset, length)
+
+    def download(self, filename: str, target_filepath: str) -> None:
+        if not self._is_cacheable(filename):
+            self._storage.download(filename, target_filepath)
+            return
+
+        digest = _entry_digest(filename)
+        entry_path = self._hit(digest)
+        if entry_path is not None:
+            try:
+                shutil.copyfile(entry_path, target_filepath)
+            except FileNotFoundError:
+                self._drop(digest)
+            else:
+                self._record_hit(os.path.getsize(target_filepath))
+                return
+
+        generation = self._generation
+        self._storage.download(filename, target_filepath)
+        size = os.path.getsize(target_filepath)
+        self._record_miss(size)
+        if size <= self._max_object_size:
+            temp_path = self._temp_path(digest)
+            shutil.copyfile(target_filepath, temp_path)
+            self._commit(digest, temp_path, size, generation)
+
+    def exists(self, filename: str) -> bool:
+        # a local entry may outlive a delete made by another process, so only the backend is authoritative
+        return self._storage.exists(filename)
+
+    def delete(self, filename: str):
+        try:
+            self._storage.delete(filename)
+        finally:
+            self._invalidate(filename)
+
+    def scan(self, path: str, files: bool = True, directories: bool = False) -> list[str]:
+        return self._storage.scan(path, files=files, directories=directories)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            for digest in self._entries:
+                (self._path / digest).unlink(missing_ok=True)
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+            self.hit_bytes = 0
+            self.miss_bytes = 0
+            self.evictions = 0
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_bytes": self.hit_bytes,
+                "miss_bytes": self.miss_bytes,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def _is_cacheable(self, filename: str) -> bool:
+        return filename.startswith(self._key_prefixes)
+
+    def _hit(self, digest: str) -> Path | None:
+        """Mark an entry as recently used and return its path, or None when it is not cached."""
+        with self._lock:
+            if digest not in self._entries:
+                return None
+            self._entries.move_to_end(digest)
+        return self._path / digest
+
+    def _record_hit(self, size: int):
+        with self._lock:
+            self.hits += 1
+            self.hit_bytes += size
+
+    def _record_miss(self, size: int):
+        with self._lock:
+            self.misses += 1
+            self.miss_bytes += size
+
+    def _temp_path(self, digest: str) -> Path:
+        return self._path / f"{digest}.{uuid.uuid4().hex}.tmp"
+
+    def _commit(self, digest: str, temp_path: Path, size: int, generation: int):
+        """Move a fully written temporary file into the cache, unless the file was invalidated meanwhile."""
+        with self._lock:
+            if generation != self._generation:
+                temp_path.unlink(missing_ok=True)
+                return
+            os.replace(temp_path, self._path / digest)
+            self._size += size - self._entries.pop(digest, 0)
+            self._entries[digest] = size
+            self._evict()
+
+    def _evict(self):
+        while self._size > self._max_size and self._entries:
+            digest, size = self._entries.popitem(last=False)
+            (self._path / digest).unlink(missing_ok=True)
+            self._size -= size
+            self.evictions += 1
+
+    def _drop(self, digest: str):
+        """Forget an entry whose file disappeared, e.g. evicted by another process sharing the directory."""
+        with self._lock:
+            self._size -= self._entries.pop(digest, 0)
+
+    def _invalidate(self, filename: str):
+        if not self._is_cacheable(filename):
+            return
+        digest = _entry_digest(filename)
+        with self._lock:
+            self._generation += 1
+            self._size -= self._entries.pop(digest, 0)
+            (self._path / digest).unlink(missing_ok=True)
+
+    def _load_entries(self):
+        """Index the entries left by previous processes, oldest first."""
+        entries = []
+        with os.scandir(self._path) as scanned:
+            for entry in scanned:
+                # temporary files may belong to another process still writing them
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+        with self._lock:
+            for _, digest, size in sorted(entries):
+                self._entries[digest] = size
+                self._size += size
+            self._evict()
+
+
+def _entry_digest(filename: str) -> str:
+    return hashlib.sha256(filename.encode("utf-8")).hexdigest()
+
+
 storage = Storage()
 
 
@@ -364,6 +364,25 @@ class LogstoreAPIWorkflowRunRepository(APIWorkflowRunRepository):
             )
             return session.scalar(stmt)
 
+    def get_workflow_runs_by_ids(
+        self,
+        tenant_id: str,
+        app_id: str,
+        run_ids: Sequence[str],
+    ) -> Sequence[WorkflowRun]:
+        """
+        Get workflow runs by IDs with tenant and app isolation.
+
+        Each run is resolved through get_workflow_run_by_id so the log_version selection
+        and PostgreSQL fallback stay identical to single lookups.
+        """
+        workflow_runs = []
+        for run_id in dict.fromkeys(run_ids):
+            workflow_run = self.get_workflow_run_by_id(tenant_id=tenant_id, app_id=app_id, run_id=run_id)
+            if workflow_run:
+                workflow_runs.append(workflow_run)
+        return workflow_runs
+
     def get_workflow_run_by_id_without_tenant(
         self,
         run_id: str,
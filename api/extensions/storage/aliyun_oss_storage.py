@@ -1,10 +1,10 @@
 import posixpath
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 
 import oss2 as aliyun_s3
 
 from configs import dify_config
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, _check_range
 
 
 class AliyunOssStorage(BaseStorage):
@@ -44,8 +44,42 @@ class AliyunOssStorage(BaseStorage):
         while chunk := obj.read(4096):
             yield chunk
 
+    def load_range(self, filename: str, offset: int, length: int) -> bytes:
+        _check_range(offset, length)
+        if length == 0:
+            return b""
+        try:
+            # standard range behavior makes OSS clip ranges running past the end of the object instead of
+            # ignoring them and returning the whole object
+            obj = self.client.get_object(
+                self.__wrapper_folder_filename(filename),
+                byte_range=(offset, offset + length - 1),
+                headers={"x-oss-range-behavior": "standard"},
+            )
+        except aliyun_s3.exceptions.ServerError as ex:
+            # the range starts at or past the end of the object
+            if ex.status == 416:
+                return b""
+            raise
+        data = obj.read()
+        if not isinstance(data, bytes):
+            return b""
+        return data
+
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        # an iterable body is uploaded with chunked transfer encoding
+        self.client.put_object(self.__wrapper_folder_filename(filename), stream)
+
     def download(self, filename: str, target_filepath):
-        self.client.get_object_to_file(self.__wrapper_folder_filename(filename), target_filepath)
+        # objects below the threshold are fetched with a single get_object_to_file
+        aliyun_s3.resumable_download(
+            self.client,
+            self.__wrapper_folder_filename(filename),
+            target_filepath,
+            multiget_threshold=dify_config.STORAGE_MULTIPART_DOWNLOAD_THRESHOLD,
+            part_size=dify_config.STORAGE_MULTIPART_DOWNLOAD_PART_SIZE,
+            num_threads=dify_config.STORAGE_MULTIPART_DOWNLOAD_CONCURRENCY,
+        )
 
     def exists(self, filename: str):
         return self.client.object_exists(self.__wrapper_folder_filename(filename))
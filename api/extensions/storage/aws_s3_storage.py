@@ -1,12 +1,14 @@
+import io
 import logging
-from collections.abc import Generator
+from collections.abc import Generator, Iterable, Iterator
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 from botocore.exceptions import ClientError
 
 from configs import dify_config
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, _check_range
 
 logger = logging.getLogger(__name__)
 
@@ -73,8 +75,44 @@ class AwsS3Storage(BaseStorage):
             else:
                 raise
 
+    def load_range(self, filename: str, offset: int, length: int) -> bytes:
+        _check_range(offset, length)
+        if length == 0:
+            return b""
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket_name, Key=filename, Range=f"bytes={offset}-{offset + length - 1}"
+            )
+        except ClientError as ex:
+            code = ex.response.get("Error", {}).get("Code")
+            if code == "NoSuchKey":
+                raise FileNotFoundError("File not found")
+            # the range starts at or past the end of the object
+            elif code == "InvalidRange":
+                return b""
+            else:
+                raise
+        data: bytes = response["Body"].read()
+        return data
+
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        self.client.upload_fileobj(
+            io.BufferedReader(_IterableReader(stream)),
+            self.bucket_name,
+            filename,
+            Config=self._transfer_config(),
+        )
+
     def download(self, filename, target_filepath):
-        self.client.download_file(self.bucket_name, filename, target_filepath)
+        self.client.download_file(self.bucket_name, filename, target_filepath, Config=self._transfer_config())
+
+    @staticmethod
+    def _transfer_config() -> TransferConfig:
+        return TransferConfig(
+            multipart_threshold=dify_config.STORAGE_MULTIPART_DOWNLOAD_THRESHOLD,
+            multipart_chunksize=dify_config.STORAGE_MULTIPART_DOWNLOAD_PART_SIZE,
+            max_concurrency=dify_config.STORAGE_MULTIPART_DOWNLOAD_CONCURRENCY,
+        )
 
     def exists(self, filename):
         try:
@@ -85,3 +123,25 @@ class AwsS3Storage(BaseStorage):
 
     def delete(self, filename: str):
         self.client.delete_object(Bucket=self.bucket_name, Key=filename)
+
+
+class _IterableReader(io.RawIOBase):
+    """Read-only file object over an iterable of byte chunks, for APIs that only accept file objects."""
+
+    def __init__(self, stream: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter(stream)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = memoryview(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
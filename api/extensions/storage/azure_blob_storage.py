@@ -1,12 +1,13 @@
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 from datetime import timedelta
 
+from azure.core.exceptions import HttpResponseError
 from azure.identity import ChainedTokenCredential, DefaultAzureCredential
 from azure.storage.blob import AccountSasPermissions, BlobServiceClient, ResourceTypes, generate_account_sas
 
 from configs import dify_config
 from extensions.ext_redis import redis_client
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, _check_range
 from libs.datetime_utils import naive_utc_now
 
 
@@ -55,6 +56,34 @@ class AzureBlobStorage(BaseStorage):
         blob_data = blob.download_blob()
         yield from blob_data.chunks()
 
+    def load_range(self, filename: str, offset: int, length: int) -> bytes:
+        _check_range(offset, length)
+        if not self.bucket_name:
+            raise FileNotFoundError("Azure bucket name is not configured.")
+        if length == 0:
+            return b""
+
+        client = self._sync_client()
+        blob = client.get_blob_client(container=self.bucket_name, blob=filename)
+        try:
+            data = blob.download_blob(offset=offset, length=length).readall()
+        except HttpResponseError as ex:
+            # the range starts at or past the end of the blob
+            if ex.status_code == 416:
+                return b""
+            raise
+        if not isinstance(data, bytes):
+            raise TypeError(f"Expected bytes from blob.readall(), got {type(data).__name__}")
+        return data
+
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        if not self.bucket_name:
+            return
+
+        client = self._sync_client()
+        blob_container = client.get_container_client(container=self.bucket_name)
+        blob_container.upload_blob(filename, stream)
+
     def download(self, filename, target_filepath):
         if not self.bucket_name:
             return
@@ -63,7 +92,8 @@ class AzureBlobStorage(BaseStorage):
 
         blob = client.get_blob_client(container=self.bucket_name, blob=filename)
         with open(target_filepath, "wb") as my_blob:
-            blob_data = blob.download_blob()
+            # blobs larger than max_single_get_size are fetched in max_chunk_get_size parts
+            blob_data = blob.download_blob(max_concurrency=dify_config.STORAGE_MULTIPART_DOWNLOAD_CONCURRENCY)
             blob_data.readinto(my_blob)
 
     def exists(self, filename):
@@ -86,7 +116,11 @@ class AzureBlobStorage(BaseStorage):
 
     def _sync_client(self):
         if self.account_key == "managedidentity":
-            return BlobServiceClient(account_url=self.account_url, credential=self.credential)  # type: ignore
+            return BlobServiceClient(
+                account_url=self.account_url,  # type: ignore
+                credential=self.credential,
+                **self._download_settings(),
+            )
 
         cache_key = f"azure_blob_sas_token_{self.account_name}_{self.account_key}"
         cache_result = redis_client.get(cache_key)
@@ -101,4 +135,11 @@ class AzureBlobStorage(BaseStorage):
                 expiry=naive_utc_now() + timedelta(hours=1),
             )
             redis_client.set(cache_key, sas_token, ex=3000)
-        return BlobServiceClient(account_url=self.account_url or "", credential=sas_token)
+        return BlobServiceClient(account_url=self.account_url or "", credential=sas_token, **self._download_settings())
+
+    @staticmethod
+    def _download_settings() -> dict[str, int]:
+        return {
+            "max_single_get_size": dify_config.STORAGE_MULTIPART_DOWNLOAD_THRESHOLD,
+            "max_chunk_get_size": dify_config.STORAGE_MULTIPART_DOWNLOAD_PART_SIZE,
+        }
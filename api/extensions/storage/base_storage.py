@@ -1,7 +1,11 @@
 """Abstract interface for file storage implementations."""
 
+import threading
 from abc import ABC, abstractmethod
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+from configs import dify_config
 
 
 class BaseStorage(ABC):
@@ -19,6 +23,37 @@ class BaseStorage(ABC):
     def load_stream(self, filename: str) -> Generator:
         raise NotImplementedError
 
+    def load_range(self, filename: str, offset: int, length: int) -> bytes:
+        """
+        Load `length` bytes of a file starting at `offset`.
+        The result is shorter than `length` when the range runs past the end of the file, and empty when
+        `offset` is at or past the end. Backends able to issue ranged reads should override this default,
+        which streams the file up to the end of the range.
+        """
+        _check_range(offset, length)
+        if length == 0:
+            return b""
+
+        end = offset + length
+        position = 0
+        parts: list[bytes] = []
+        for chunk in self.load_stream(filename):
+            chunk_end = position + len(chunk)
+            if chunk_end > offset:
+                parts.append(chunk[max(offset - position, 0) : end - position])
+            position = chunk_end
+            if position >= end:
+                break
+        return b"".join(parts)
+
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        """
+        Save a file from an iterable of byte chunks.
+        Backends able to upload without holding the whole file in memory should override this default,
+        which joins the chunks and calls `save`.
+        """
+        self.save(filename, b"".join(stream))
+
     @abstractmethod
     def download(self, filename: str, target_filepath: str) -> None:
         raise NotImplementedError
@@ -31,6 +66,30 @@ class BaseStorage(ABC):
     def delete(self, filename: str):
         raise NotImplementedError
 
+    def _download_in_parts(self, filename: str, target_filepath: str, size: int):
+        """
+        Download a file of known `size` by fetching parts of it concurrently with `load_range`.
+        Parts are written at their offset into a preallocated target file, so memory use is bounded by
+        the part size times the concurrency.
+        """
+        part_size = dify_config.STORAGE_MULTIPART_DOWNLOAD_PART_SIZE
+        write_lock = threading.Lock()
+
+        with open(target_filepath, "wb") as target:
+            target.truncate(size)
+
+            def fetch(offset: int):
+                data = self.load_range(filename, offset, min(part_size, size - offset))
+                if offset + len(data) < min(offset + part_size, size):
+                    raise OSError(f"file {filename} changed while being downloaded")
+                with write_lock:
+                    target.seek(offset)
+                    target.write(data)
+
+            with ThreadPoolExecutor(max_workers=dify_config.STORAGE_MULTIPART_DOWNLOAD_CONCURRENCY) as executor:
+                # list() re-raises the first failed part
+                list(executor.map(fetch, range(0, size, part_size)))
+
     def scan(self, path, files=True, directories=False) -> list[str]:
         """
         Scan files and directories in the given path.
@@ -38,3 +97,10 @@ class BaseStorage(ABC):
         If a storage backend doesn't support scanning, it will raise NotImplementedError.
         """
         raise NotImplementedError("This storage backend doesn't support scanning")
+
+
+def _check_range(offset: int, length: int):
+    if offset < 0:
+        raise ValueError(f"offset must not be negative, got {offset}")
+    if length < 0:
+        raise ValueError(f"length must not be negative, got {length}")
@@ -1,13 +1,14 @@
 import base64
 import io
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 from typing import Any
 
 from google.cloud import storage as google_cloud_storage  # type: ignore
+from google.cloud.storage import transfer_manager  # type: ignore
 from pydantic import TypeAdapter
 
 from configs import dify_config
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, _check_range
 
 _service_account_adapter: TypeAdapter[dict[str, Any]] = TypeAdapter(dict[str, Any])
 
@@ -52,12 +53,40 @@ class GoogleCloudStorage(BaseStorage):
             while chunk := blob_stream.read(4096):
                 yield chunk
 
+    def load_range(self, filename: str, offset: int, length: int) -> bytes:
+        _check_range(offset, length)
+        bucket = self.client.get_bucket(self.bucket_name)
+        blob = bucket.get_blob(filename)
+        if blob is None:
+            raise FileNotFoundError("File not found")
+        # ranges starting at or past the end of the blob are rejected by GCS
+        if length == 0 or offset >= blob.size:
+            return b""
+        data: bytes = blob.download_as_bytes(start=offset, end=offset + length - 1)
+        return data
+
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        bucket = self.client.get_bucket(self.bucket_name)
+        blob = bucket.blob(filename)
+        with blob.open(mode="wb") as blob_stream:
+            for chunk in stream:
+                blob_stream.write(chunk)
+
     def download(self, filename, target_filepath):
         bucket = self.client.get_bucket(self.bucket_name)
         blob = bucket.get_blob(filename)
         if blob is None:
             raise FileNotFoundError("File not found")
-        blob.download_to_filename(target_filepath)
+        if blob.size >= dify_config.STORAGE_MULTIPART_DOWNLOAD_THRESHOLD:
+            transfer_manager.download_chunks_concurrently(
+                blob,
+                target_filepath,
+                chunk_size=dify_config.STORAGE_MULTIPART_DOWNLOAD_PART_SIZE,
+                max_workers=dify_config.STORAGE_MULTIPART_DOWNLOAD_CONCURRENCY,
+                worker_type=transfer_manager.THREAD,
+            )
+        else:
+            blob.download_to_filename(target_filepath)
 
     def exists(self, filename):
         bucket = self.client.get_bucket(self.bucket_name)
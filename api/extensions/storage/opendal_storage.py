@@ -1,6 +1,6 @@
 import logging
 import os
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 from pathlib import Path
 from typing import Any
 
@@ -8,7 +8,8 @@ import opendal
 from dotenv import dotenv_values
 from opendal import Operator
 
-from extensions.storage.base_storage import BaseStorage
+from configs import dify_config
+from extensions.storage.base_storage import BaseStorage, _check_range
 
 logger = logging.getLogger(__name__)
 
@@ -67,11 +68,40 @@ class OpenDALStorage(BaseStorage):
                 yield chunk
         logger.debug("file %s loaded as stream", filename)
 
+    def load_range(self, filename: str, offset: int, length: int) -> bytes:
+        _check_range(offset, length)
+        if not self.exists(filename):
+            raise FileNotFoundError("File not found")
+        # reads past the end of the file are an error in OpenDAL, so clip the range to the file size
+        remaining = min(length, self.op.stat(path=filename).content_length - offset)
+        if remaining <= 0:
+            return b""
+
+        parts: list[bytes] = []
+        with self.op.open(path=filename, mode="rb") as file:
+            file.seek(offset)
+            while remaining > 0 and (chunk := file.read(remaining)):
+                parts.append(chunk)
+                remaining -= len(chunk)
+        logger.debug("file %s loaded from offset %s", filename, offset)
+        return b"".join(parts)
+
+    def save_stream(self, filename: str, stream: Iterable[bytes]):
+        with self.op.open(path=filename, mode="wb") as file:
+            for chunk in stream:
+                file.write(chunk)
+        logger.debug("file %s saved as stream", filename)
+
     def download(self, filename: str, target_filepath: str):
         if not self.exists(filename):
             raise FileNotFoundError("File not found")
 
-        Path(target_filepath).write_bytes(self.op.read(path=filename))
+        size = self.op.stat(path=filename).content_length
+        if size >= dify_config.STORAGE_MULTIPART_DOWNLOAD_THRESHOLD:
+            self._download_in_parts(filename, target_filepath, size)
+        else:
+            with open(target_filepath, "wb") as target:
+                target.writelines(self.load_stream(filename))
         logger.debug("file %s downloaded to %s", filename, target_filepath)
 
     def exists(self, filename: str) -> bool:
@@ -0,0 +1,114 @@
+"""
+Micro-batching of messages published to a topic.
+
+`CoalescingProducer` packs messages published in quick succession into one batch message, so a stream of
+small messages (e.g. LLM tokens) costs one Redis command per batch instead of one per message. The Redis
+subscriptions unpack batches with `unpack_batch`, subscribers still receive one message at a time.
+"""
+
+from __future__ import annotations
+
+import logging
+import struct
+import threading
+import time
+from collections.abc import Callable, Sequence
+
+from libs.broadcast_channel.channel import Producer
+
+logger = logging.getLogger(__name__)
+
+# A batch is `\x1d` followed by each message prefixed with its length as a 4 byte big-endian integer.
+_BATCH_MARKER = b"\x1d"
+_LENGTH = struct.Struct(">I")
+
+
+def pack_batch(payloads: Sequence[bytes]) -> bytes:
+    if len(payloads) == 1 and not payloads[0].startswith(_BATCH_MARKER):
+        return payloads[0]
+    return _BATCH_MARKER + b"".join(_LENGTH.pack(len(payload)) + payload for payload in payloads)
+
+
+def unpack_batch(message: bytes) -> list[bytes]:
+    if not message.startswith(_BATCH_MARKER):
+        return [message]
+    payloads: list[bytes] = []
+    offset = len(_BATCH_MARKER)
+    while offset < len(message):
+        (size,) = _LENGTH.unpack_from(message, offset)
+        offset += _LENGTH.size
+        payloads.append(message[offset : offset + size])
+        offset += size
+    return payloads
+
+
+class CoalescingProducer:
+    """
+    A producer writing bursts of messages as batches, adding at most `max_delay` seconds of latency.
+
+    A message is written right away when nothing was written within the last `max_delay` seconds, so a
+    slow stream is not delayed at all. Otherwise it is buffered until `max_delay` after the previous write,
+    or until `max_bytes` are buffered. A message `can_buffer` rejects (e.g. a terminal event) is written at
+    once together with the buffered ones, which keeps messages in order. A `max_delay` of 0 disables
+    batching. Call `close` once done publishing to write what is left.
+    """
+
+    def __init__(
+        self,
+        producer: Producer,
+        *,
+        max_delay: float,
+        max_bytes: int,
+        can_buffer: Callable[[bytes], bool] = lambda _: True,
+    ):
+        self._producer = producer
+        self._max_delay = max_delay
+        self._max_bytes = max_bytes
+        self._can_buffer = can_buffer
+        # held while writing, so a write from the timer cannot overtake one from the publishing thread
+        self._lock = threading.Lock()
+        self._buffer: list[bytes] = []
+        self._buffered_bytes = 0
+        self._last_write_at = float("-inf")
+        self._timer: threading.Timer | None = None
+
+    def publish(self, payload: bytes) -> None:
+        with self._lock:
+            self._buffer.append(payload)
+            self._buffered_bytes += len(payload)
+            now = time.monotonic()
+            if (
+                now - self._last_write_at >= self._max_delay
+                or self._buffered_bytes >= self._max_bytes
+                or not self._can_buffer(payload)
+            ):
+                self._write(now)
+            elif self._timer is None:
+                self._timer = threading.Timer(self._last_write_at + self._max_delay - now, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._buffer:
+                self._write(time.monotonic())
+
+    def close(self) -> None:
+        self.flush()
+
+    def _flush_on_timer(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to publish coalesced messages")
+
+    def _write(self, now: float) -> None:
+        """This method must be called with `_lock` held."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = pack_batch(self._buffer)
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._last_write_at = now
+        self._producer.publish(batch)
@@ -5,6 +5,7 @@ import types
 from collections.abc import Generator, Iterator
 from typing import Any, Self
 
+from libs.broadcast_channel.batching import unpack_batch
 from libs.broadcast_channel.channel import Subscription
 from libs.broadcast_channel.exc import SubscriptionClosedError
 from redis import Redis, RedisCluster
@@ -110,7 +111,8 @@ class RedisSubscriptionBase(Subscription):
                 )
                 continue
 
-            self._enqueue_message(payload_bytes)
+            for payload in unpack_batch(payload_bytes):
+                self._enqueue_message(payload)
 
         _logger.debug("%s listener thread stopped for channel %s", self._get_subscription_type().title(), self._topic)
         try:
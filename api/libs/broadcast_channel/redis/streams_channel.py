@@ -7,6 +7,7 @@ from collections.abc import Iterator
 from typing import Self
 
 from extensions.redis_names import serialize_redis_name
+from libs.broadcast_channel.batching import unpack_batch
 from libs.broadcast_channel.channel import Producer, Subscriber, Subscription
 from libs.broadcast_channel.exc import SubscriptionClosedError
 from redis import Redis, RedisCluster
@@ -113,7 +114,8 @@ class _StreamsSubscription(Subscription):
                         elif isinstance(data, (bytes, bytearray)):
                             data_bytes = bytes(data)
                         if data_bytes is not None:
-                            self._queue.put_nowait(data_bytes)
+                            for payload in unpack_batch(data_bytes):
+                                self._queue.put_nowait(payload)
                         last_id = entry_id
         finally:
             self._queue.put_nowait(self._SENTINEL)
@@ -10,7 +10,7 @@ import uuid
 from collections.abc import Callable, Generator, Mapping
 from datetime import datetime
 from hashlib import sha256
-from typing import TYPE_CHECKING, Annotated, Any, Protocol, cast
+from typing import TYPE_CHECKING, Annotated, Any, cast
 from uuid import UUID
 from zoneinfo import available_timezones
 
@@ -25,6 +25,7 @@ from core.app.features.rate_limiting.rate_limit import RateLimitGenerator
 from extensions.ext_redis import redis_client
 from graphon.file import helpers as file_helpers
 from graphon.model_runtime.utils.encoders import jsonable_encoder
+from libs.redis_rate_limiter import RedisScriptClient, SlidingWindowRateLimiter
 
 if TYPE_CHECKING:
     from models import Account
@@ -490,16 +491,6 @@ class TokenManager:
         return f"{token_type}:account:{account_id}"
 
 
-class _RateLimiterRedisClient(Protocol):
-    def zadd(self, name: str | bytes, mapping: dict[str | bytes | int | float, float | int | str | bytes]) -> int: ...
-
-    def zremrangebyscore(self, name: str | bytes, min: str | float, max: str | float) -> int: ...
-
-    def zcard(self, name: str | bytes) -> int: ...
-
-    def expire(self, name: str | bytes, time: int) -> bool: ...
-
-
 def _default_rate_limit_member_factory() -> str:
     current_time = int(time.time())
     return f"{current_time}:{secrets.token_urlsafe(nbytes=8)}"
@@ -512,33 +503,21 @@ class RateLimiter:
         max_attempts: int,
         time_window: int,
         member_factory: Callable[[], str] = _default_rate_limit_member_factory,
-        redis_client: _RateLimiterRedisClient = redis_client,
+        redis_client: RedisScriptClient = redis_client,
     ):
         self.prefix = prefix
         self.max_attempts = max_attempts
         self.time_window = time_window
         self._member_factory = member_factory
-        self._redis_client = redis_client
+        self._sliding_window = SlidingWindowRateLimiter(
+            limit=max_attempts, window=time_window, redis_client=redis_client
+        )
 
     def _get_key(self, email: str) -> str:
         return f"{self.prefix}:{email}"
 
     def is_rate_limited(self, email: str) -> bool:
-        key = self._get_key(email)
-        current_time = int(time.time())
-        window_start_time = current_time - self.time_window
-
-        self._redis_client.zremrangebyscore(key, "-inf", window_start_time)
-        attempts = self._redis_client.zcard(key)
-
-        if attempts and int(attempts) >= self.max_attempts:
-            return True
-        return False
+        return self._sliding_window.count(self._get_key(email)) >= self.max_attempts
 
     def increment_rate_limit(self, email: str):
-        key = self._get_key(email)
-        member = self._member_factory()
-        current_time = int(time.time())
-
-        self._redis_client.zadd(key, {member: current_time})
-        self._redis_client.expire(key, self.time_window * 2)
+        self._sliding_window.add(self._get_key(email), self._member_factory())
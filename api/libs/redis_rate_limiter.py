@@ -0,0 +1,260 @@
+"""
+Atomic Redis rate limiters.
+
+Every check is a single server-side Lua script, so the read-modify-write of a limit can neither race
+with other workers nor cost more than one round trip. Three primitives are provided:
+
+- `SlidingWindowRateLimiter`: at most `limit` hits within the last `window` seconds (sorted set).
+- `TokenBucketRateLimiter`: bursts of up to `capacity`, refilled at `refill_rate` tokens per second (hash).
+- `ConcurrencyLimiter`: at most `limit` leases held at once, stale leases are reclaimed (hash).
+
+A limit of None means unlimited and a limit of 0 or less rejects everything, both are answered locally
+without touching Redis.
+
+Keys are logical names and get the configured `REDIS_KEY_PREFIX`, like keys written through `redis_client`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from redis.exceptions import NoScriptError
+
+from extensions.ext_redis import redis_client
+from extensions.redis_names import serialize_redis_name
+
+
+class RedisScriptClient(Protocol):
+    def evalsha(self, sha: str, numkeys: int, *keys_and_args: Any) -> Any: ...
+
+    def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> Any: ...
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    # hits in the window, tokens left in the bucket or leases held, after this call
+    count: int
+    # seconds until the call would be allowed, 0 when allowed or unknown
+    retry_after: float = 0.0
+
+
+_UNLIMITED = RateLimitResult(allowed=True, count=0)
+
+
+class _LuaScript:
+    """A Lua script run by its digest, sending the source only when the server has not cached it yet."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.sha = hashlib.sha1(source.encode()).hexdigest()
+
+    def __call__(self, client: RedisScriptClient, key: str, *args: Any) -> Any:
+        name = serialize_redis_name(key)
+        try:
+            return client.evalsha(self.sha, 1, name, *args)
+        except NoScriptError:
+            return client.eval(self.source, 1, name, *args)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _to_result(reply: list[Any]) -> RateLimitResult:
+    allowed, count, retry_after_ms = reply
+    return RateLimitResult(allowed=bool(int(allowed)), count=int(count), retry_after=int(retry_after_ms) / 1000)
+
+
+# KEYS[1] = sorted set of hits scored by time in ms
+# ARGV[1] = now in ms, ARGV[2] = window in ms, ARGV[3] = limit, ARGV[4] = member of this hit
+_SLIDING_WINDOW_HIT = _LuaScript(
+    """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], window)
+    return {1, count + 1, 0}
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {0, count, tonumber(oldest[2]) + window - now}
+"""
+)
+
+# KEYS[1] = sorted set of hits scored by time in ms
+# ARGV[1] = now in ms, ARGV[2] = window in ms
+_SLIDING_WINDOW_COUNT = _LuaScript(
+    """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', tonumber(ARGV[1]) - tonumber(ARGV[2]))
+return redis.call('ZCARD', KEYS[1])
+"""
+)
+
+# KEYS[1] = sorted set of hits scored by time in ms
+# ARGV[1] = now in ms, ARGV[2] = window in ms, ARGV[3] = member of this hit
+_SLIDING_WINDOW_ADD = _LuaScript(
+    """
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[3])
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+)
+
+# KEYS[1] = hash holding the tokens left and the time in ms they were computed at
+# ARGV[1] = now in ms, ARGV[2] = capacity, ARGV[3] = refill rate in tokens per ms, ARGV[4] = tokens requested
+_TOKEN_BUCKET_ACQUIRE = _LuaScript(
+    """
+local now = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local rate = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+else
+    retry_after = math.ceil((requested - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate))
+return {allowed, math.floor(tokens), retry_after}
+"""
+)
+
+# KEYS[1] = hash of lease id -> time in seconds the lease was taken at
+# ARGV[1] = lease id, ARGV[2] = now in seconds, ARGV[3] = limit, ARGV[4] = lease timeout in seconds,
+# ARGV[5] = expiry of the hash in seconds
+_CONCURRENCY_ACQUIRE = _LuaScript(
+    """
+local now = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local count = redis.call('HLEN', KEYS[1])
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then
+    if count >= limit then
+        -- reclaim the leases of holders that went away without releasing them
+        local leases = redis.call('HGETALL', KEYS[1])
+        for i = 1, #leases, 2 do
+            if now - tonumber(leases[i + 1]) > tonumber(ARGV[4]) then
+                redis.call('HDEL', KEYS[1], leases[i])
+                count = count - 1
+            end
+        end
+        if count >= limit then
+            return {0, count, 0}
+        end
+    end
+    count = count + 1
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return {1, count, 0}
+"""
+)
+
+# KEYS[1] = hash of lease id -> time in seconds the lease was taken at
+# ARGV[1] = lease id
+_CONCURRENCY_RELEASE = _LuaScript("return redis.call('HDEL', KEYS[1], ARGV[1])")
+
+
+def _new_member(now_ms: int) -> str:
+    return f"{now_ms}:{secrets.token_urlsafe(6)}"
+
+
+class SlidingWindowRateLimiter:
+    """Allow at most `limit` hits per key within any `window` seconds."""
+
+    def __init__(self, limit: int | None, window: float, redis_client: RedisScriptClient = redis_client):
+        self.limit = limit
+        self.window = window
+        self._window_ms = int(window * 1000)
+        self._redis_client = redis_client
+
+    def hit(self, key: str) -> RateLimitResult:
+        """Record a hit if the limit allows it. Rejected hits are not recorded."""
+        if self.limit is None:
+            return _UNLIMITED
+        if self.limit <= 0:
+            return RateLimitResult(allowed=False, count=0)
+        now = _now_ms()
+        reply = _SLIDING_WINDOW_HIT(self._redis_client, key, now, self._window_ms, self.limit, _new_member(now))
+        return _to_result(reply)
+
+    def count(self, key: str) -> int:
+        """Count the hits within the window without recording one."""
+        return int(_SLIDING_WINDOW_COUNT(self._redis_client, key, _now_ms(), self._window_ms))
+
+    def add(self, key: str, member: str | None = None):
+        """Record a hit regardless of the limit, e.g. a failed attempt checked later with `count`."""
+        now = _now_ms()
+        _SLIDING_WINDOW_ADD(self._redis_client, key, now, self._window_ms, member or _new_member(now))
+
+
+class TokenBucketRateLimiter:
+    """Allow bursts of up to `capacity` per key, refilled at `refill_rate` tokens per second."""
+
+    def __init__(self, capacity: int | None, refill_rate: float, redis_client: RedisScriptClient = redis_client):
+        if refill_rate <= 0:
+            raise ValueError("refill_rate must be positive")
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self._redis_client = redis_client
+
+    def acquire(self, key: str, tokens: int = 1) -> RateLimitResult:
+        if self.capacity is None:
+            return _UNLIMITED
+        if tokens > self.capacity:
+            return RateLimitResult(allowed=False, count=0)
+        reply = _TOKEN_BUCKET_ACQUIRE(
+            self._redis_client, key, _now_ms(), self.capacity, self.refill_rate / 1000, tokens
+        )
+        return _to_result(reply)
+
+
+class ConcurrencyLimiter:
+    """
+    Allow at most `limit` leases per key to be held at once.
+
+    A lease not released within `lease_timeout` seconds is reclaimed once the limit is reached.
+    """
+
+    def __init__(
+        self,
+        limit: int | None,
+        lease_timeout: float,
+        ttl: int = 86400,
+        redis_client: RedisScriptClient = redis_client,
+    ):
+        self.limit = limit
+        self.lease_timeout = lease_timeout
+        self.ttl = ttl
+        self._redis_client = redis_client
+
+    def acquire(self, key: str, lease_id: str) -> RateLimitResult:
+        """Take a lease, acquiring a lease already held refreshes it."""
+        if self.limit is None:
+            return _UNLIMITED
+        if self.limit <= 0:
+            return RateLimitResult(allowed=False, count=0)
+        reply = _CONCURRENCY_ACQUIRE(
+            self._redis_client, key, lease_id, time.time(), self.limit, self.lease_timeout, self.ttl
+        )
+        return _to_result(reply)
+
+    def release(self, key: str, lease_id: str):
+        _CONCURRENCY_RELEASE(self._redis_client, key, lease_id)
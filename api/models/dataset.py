@@ -5,7 +5,6 @@ import hmac
 import json
 import logging
 import os
-import pickle
 import re
 import time
 from collections.abc import Sequence
@@ -14,11 +13,14 @@ from json import JSONDecodeError
 from typing import Any, TypedDict, cast
 from uuid import uuid4
 
+import numpy as np
+import numpy.typing as npt
 import sqlalchemy as sa
 from sqlalchemy import DateTime, String, func, select
 from sqlalchemy.orm import Mapped, Session, mapped_column
 
 from configs import dify_config
+from core.rag.embedding.embedding_codec import decode_stored_embedding, encode_stored_embedding
 from core.rag.entities import ParentMode, Rule
 from core.rag.index_processor.constant.built_in_field import BuiltInField, MetadataDataSource
 from core.rag.index_processor.constant.index_type import IndexStructureType, IndexTechniqueType
@@ -519,6 +521,8 @@ class Document(Base):
 
     # split
     splitting_completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # pages whose segments are saved while the document is split a page at a time, unset once splitting completes
+    split_page_count: Mapped[int | None] = mapped_column(sa.Integer, nullable=True)
 
     # indexing
     tokens: Mapped[int | None] = mapped_column(sa.Integer, nullable=True)
@@ -1223,6 +1227,31 @@ class DatasetKeywordTable(TypeBase):
                 return None
 
 
+class DatasetKeywordPosting(TypeBase):
+    """One keyword -> segment posting of the incremental keyword index."""
+
+    __tablename__ = "dataset_keyword_postings"
+    __table_args__ = (
+        sa.PrimaryKeyConstraint("id", name="dataset_keyword_posting_pkey"),
+        sa.UniqueConstraint("dataset_id", "keyword", "index_node_id", name="dataset_keyword_posting_keyword_idx"),
+        sa.Index("dataset_keyword_posting_node_idx", "dataset_id", "index_node_id"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        StringUUID,
+        primary_key=True,
+        insert_default=lambda: str(uuid4()),
+        default_factory=lambda: str(uuid4()),
+        init=False,
+    )
+    dataset_id: Mapped[str] = mapped_column(StringUUID, nullable=False)
+    keyword: Mapped[str] = mapped_column(String(255), nullable=False)
+    index_node_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.current_timestamp(), init=False
+    )
+
+
 class Embedding(TypeBase):
     __tablename__ = "embeddings"
     __table_args__ = (
@@ -1249,10 +1278,18 @@ class Embedding(TypeBase):
     provider_name: Mapped[str] = mapped_column(String(255), nullable=False, server_default=sa.text("''"))
 
     def set_embedding(self, embedding_data: list[float]):
-        self.embedding = pickle.dumps(embedding_data, protocol=pickle.HIGHEST_PROTOCOL)
+        self.embedding = encode_stored_embedding(
+            embedding_data,
+            dify_config.EMBEDDING_CACHE_STORAGE_DTYPE,
+            binary=dify_config.EMBEDDING_CACHE_BINARY_FORMAT_ENABLED,
+        )
 
     def get_embedding(self) -> list[float]:
-        return cast(list[float], pickle.loads(self.embedding))  # noqa: S301
+        return cast(list[float], self.get_embedding_array().tolist())
+
+    def get_embedding_array(self) -> npt.NDArray[np.floating]:
+        """Decode the stored vector, transparently reading legacy pickled rows."""
+        return decode_stored_embedding(self.embedding)
 
 
 class DatasetCollectionBinding(TypeBase):
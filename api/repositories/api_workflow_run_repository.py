@@ -131,6 +131,28 @@ class APIWorkflowRunRepository(WorkflowExecutionRepository, Protocol):
         """
         ...
 
+    def get_workflow_runs_by_ids(
+        self,
+        tenant_id: str,
+        app_id: str,
+        run_ids: Sequence[str],
+    ) -> Sequence[WorkflowRun]:
+        """
+        Get workflow runs by IDs in a single lookup.
+
+        Batch variant of get_workflow_run_by_id with the same tenant and app isolation.
+        IDs that do not exist are skipped, so callers must not rely on the result order.
+
+        Args:
+            tenant_id: Tenant identifier for multi-tenant isolation
+            app_id: Application identifier
+            run_ids: Workflow run identifiers
+
+        Returns:
+            Sequence of the WorkflowRun objects found
+        """
+        ...
+
     def get_workflow_run_by_id_without_tenant(
         self,
         run_id: str,
@@ -0,0 +1,43 @@
+"""
+Scheduled task to flush buffered document segment hit counts.
+
+Retrieval records segment hits in Redis (see SegmentHitCountService). This task
+runs periodically (default every 60 seconds) to add them to document_segments
+with batched updates.
+"""
+
+import logging
+import time
+
+import click
+from redis.exceptions import LockError
+
+import app
+from extensions.ext_redis import redis_client
+from services.segment_hit_count_service import SegmentHitCountService
+
+logger = logging.getLogger(__name__)
+
+
+@app.celery.task(queue="dataset")
+def flush_segment_hit_counts():
+    click.echo(click.style("flush_segment_hit_counts: start.", fg="green"))
+    start_at = time.perf_counter()
+
+    try:
+        with redis_client.lock("segment_hit_counts:flush_lock", timeout=600, blocking=False):
+            updated_count = SegmentHitCountService.flush()
+    except LockError:
+        click.echo(click.style("flush_segment_hit_counts: skipped, another flush is running.", fg="yellow"))
+        return
+    except Exception:
+        logger.exception("flush_segment_hit_counts failed")
+        return
+
+    elapsed = time.perf_counter() - start_at
+    click.echo(
+        click.style(
+            f"flush_segment_hit_counts: done. updated={updated_count}, elapsed={elapsed:.2f}s",
+            fg="green",
+        )
+    )
@@ -12,6 +12,7 @@ from extensions.ext_database import db
 from extensions.ext_redis import redis_client
 from libs.datetime_utils import naive_utc_now
 from libs.login import current_account_with_tenant
+from libs.redis_rate_limiter import ConcurrencyLimiter
 from models.model import App, AppAnnotationHitHistory, AppAnnotationSetting, Message, MessageAnnotation
 from services.feature_service import FeatureService
 from tasks.annotation.add_annotation_to_index_task import add_annotation_to_index_task
@@ -418,7 +419,7 @@ class AppAnnotationService:
         return {"deleted_count": deleted_count}
 
     @classmethod
-    def batch_import_app_annotations(cls, app_id, file: FileStorage):
+    def batch_import_app_annotations(cls, app_id, file: FileStorage, job_id: str | None = None):
         """
         Batch import annotations from CSV file with enhanced security checks.
 
@@ -428,6 +429,9 @@ class AppAnnotationService:
         - Memory-efficient CSV parsing
         - Subscription quota validation
         - Concurrency tracking
+
+        :param job_id: id of the concurrency lease taken by `annotation_import_concurrency_limit`, used as the
+            import job id. The lease is released here when the job is not started, and by the task otherwise.
         """
         from configs import dify_config
 
@@ -440,7 +444,8 @@ class AppAnnotationService:
         if not app:
             raise NotFound("App not found")
 
-        job_id: str | None = None  # Initialize to avoid unbound variable error
+        job_id = job_id or str(uuid.uuid4())
+        job_started = False
         try:
             # Quick row count check before full parsing (memory efficient)
             # Read only first chunk to estimate row count
@@ -520,34 +525,29 @@ class AppAnnotationService:
                 if annotation_quota_limit.limit < len(result) + annotation_quota_limit.size:
                     raise ValueError("The number of annotations exceeds the limit of your subscription.")
             # async job
-            job_id = str(uuid.uuid4())
             indexing_cache_key = f"app_annotation_batch_import_{str(job_id)}"
 
-            # Register job in active tasks list for concurrency tracking
-            current_time = int(naive_utc_now().timestamp() * 1000)
-            active_jobs_key = f"annotation_import_active:{current_tenant_id}"
-            redis_client.zadd(active_jobs_key, {job_id: current_time})
-            redis_client.expire(active_jobs_key, 7200)  # 2 hours TTL
-
             # Set job status
             redis_client.setnx(indexing_cache_key, "waiting")
             batch_import_annotations_task.delay(str(job_id), result, app_id, current_tenant_id, current_user.id)
+            job_started = True
 
         except ValueError as e:
             return {"error_msg": str(e)}
         except Exception as e:
-            # Clean up active job registration on error (only if job was created)
-            if job_id is not None:
-                try:
-                    active_jobs_key = f"annotation_import_active:{current_tenant_id}"
-                    redis_client.zrem(active_jobs_key, job_id)
-                except Exception:
-                    # Silently ignore cleanup errors - the job will be auto-expired
-                    logger.debug("Failed to clean up active job tracking during error handling")
-
             # Check if it's a CSV parsing error
             error_str = str(e)
             return {"error_msg": f"An error occurred while processing the file: {error_str}"}
+        finally:
+            if not job_started:
+                # Release the concurrency slot of the job that was not started
+                try:
+                    ConcurrencyLimiter(limit=dify_config.ANNOTATION_IMPORT_MAX_CONCURRENT, lease_timeout=120).release(
+                        f"annotation_import_leases:{current_tenant_id}", job_id
+                    )
+                except Exception:
+                    # Silently ignore cleanup errors - the lease will be reclaimed once it times out
+                    logger.debug("Failed to clean up active job tracking during error handling")
 
         return {"job_id": job_id, "job_status": "waiting", "record_count": len(result)}
 
@@ -8,6 +8,7 @@ from constants import HIDDEN_VALUE
 from core.entities.provider_configuration import ProviderConfiguration
 from core.helper import encrypter
 from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
+from core.helper.provider_configurations_cache import bump_provider_configurations_version
 from core.model_manager import LBModelManager
 from core.plugin.impl.model_runtime_factory import create_plugin_model_assembly, create_plugin_provider_manager
 from core.provider_manager import ProviderManager
@@ -67,6 +68,7 @@ class ModelLoadBalancingService:
 
         # Enable model load balancing
         provider_configuration.enable_model_load_balancing(model=model, model_type=ModelType.value_of(model_type))
+        bump_provider_configurations_version(tenant_id)
 
     def disable_model_load_balancing(self, tenant_id: str, provider: str, model: str, model_type: str):
         """
@@ -88,6 +90,7 @@ class ModelLoadBalancingService:
 
         # disable model load balancing
         provider_configuration.disable_model_load_balancing(model=model, model_type=ModelType.value_of(model_type))
+        bump_provider_configurations_version(tenant_id)
 
     def get_load_balancing_configs(
         self, tenant_id: str, provider: str, model: str, model_type: str, config_from: str = ""
@@ -329,6 +332,15 @@ class ModelLoadBalancingService:
         :param config_from: predefined-model or custom-model
         :return:
         """
+        try:
+            self._update_load_balancing_configs(tenant_id, provider, model, model_type, configs, config_from)
+        finally:
+            # configs are committed one by one, so invalidate even when a later one is rejected
+            bump_provider_configurations_version(tenant_id)
+
+    def _update_load_balancing_configs(
+        self, tenant_id: str, provider: str, model: str, model_type: str, configs: list[dict], config_from: str
+    ):
         # Get all provider configurations of the current workspace
         provider_configurations = self._get_provider_manager(tenant_id).get_configurations(tenant_id)
 
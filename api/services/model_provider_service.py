@@ -2,6 +2,7 @@ import logging
 from typing import Any
 
 from core.entities.model_entities import ModelWithProviderEntity, ProviderModelWithStatusEntity
+from core.helper.provider_configurations_cache import bump_provider_configurations_version
 from core.plugin.impl.model_runtime_factory import create_plugin_model_provider_factory, create_plugin_provider_manager
 from core.provider_manager import ProviderManager
 from graphon.model_runtime.entities.model_entities import ModelType, ParameterRule
@@ -207,6 +208,7 @@ class ModelProviderService:
         """
         provider_configuration = self._get_provider_configuration(tenant_id, provider)
         provider_configuration.create_provider_credential(credentials, credential_name)
+        bump_provider_configurations_version(tenant_id)
 
     def update_provider_credential(
         self,
@@ -232,6 +234,7 @@ class ModelProviderService:
             credentials=credentials,
             credential_name=credential_name,
         )
+        bump_provider_configurations_version(tenant_id)
 
     def remove_provider_credential(self, tenant_id: str, provider: str, credential_id: str):
         """
@@ -243,6 +246,7 @@ class ModelProviderService:
         """
         provider_configuration = self._get_provider_configuration(tenant_id, provider)
         provider_configuration.delete_provider_credential(credential_id=credential_id)
+        bump_provider_configurations_version(tenant_id)
 
     def switch_active_provider_credential(self, tenant_id: str, provider: str, credential_id: str):
         """
@@ -253,6 +257,7 @@ class ModelProviderService:
         """
         provider_configuration = self._get_provider_configuration(tenant_id, provider)
         provider_configuration.switch_active_provider_credential(credential_id=credential_id)
+        bump_provider_configurations_version(tenant_id)
 
     def get_model_credential(
         self, tenant_id: str, provider: str, model_type: str, model: str, credential_id: str | None
@@ -317,6 +322,7 @@ class ModelProviderService:
             credentials=credentials,
             credential_name=credential_name,
         )
+        bump_provider_configurations_version(tenant_id)
 
     def update_model_credential(
         self,
@@ -348,6 +354,7 @@ class ModelProviderService:
             credential_id=credential_id,
             credential_name=credential_name,
         )
+        bump_provider_configurations_version(tenant_id)
 
     def remove_model_credential(self, tenant_id: str, provider: str, model_type: str, model: str, credential_id: str):
         """
@@ -364,6 +371,7 @@ class ModelProviderService:
         provider_configuration.delete_custom_model_credential(
             model_type=ModelType.value_of(model_type), model=model, credential_id=credential_id
         )
+        bump_provider_configurations_version(tenant_id)
 
     def switch_active_custom_model_credential(
         self, tenant_id: str, provider: str, model_type: str, model: str, credential_id: str
@@ -382,6 +390,7 @@ class ModelProviderService:
         provider_configuration.switch_custom_model_credential(
             model_type=ModelType.value_of(model_type), model=model, credential_id=credential_id
         )
+        bump_provider_configurations_version(tenant_id)
 
     def add_model_credential_to_model_list(
         self, tenant_id: str, provider: str, model_type: str, model: str, credential_id: str
@@ -400,6 +409,7 @@ class ModelProviderService:
         provider_configuration.add_model_credential_to_model(
             model_type=ModelType.value_of(model_type), model=model, credential_id=credential_id
         )
+        bump_provider_configurations_version(tenant_id)
 
     def remove_model(self, tenant_id: str, provider: str, model_type: str, model: str):
         """
@@ -413,6 +423,7 @@ class ModelProviderService:
         """
         provider_configuration = self._get_provider_configuration(tenant_id, provider)
         provider_configuration.delete_custom_model(model_type=ModelType.value_of(model_type), model=model)
+        bump_provider_configurations_version(tenant_id)
 
     def get_models_by_model_type(self, tenant_id: str, model_type: str) -> list[ProviderWithModelsResponse]:
         """
@@ -578,6 +589,7 @@ class ModelProviderService:
 
         # Switch preferred provider type
         provider_configuration.switch_preferred_provider_type(preferred_provider_type_enum)
+        bump_provider_configurations_version(tenant_id)
 
     def enable_model(self, tenant_id: str, provider: str, model: str, model_type: str):
         """
@@ -591,6 +603,7 @@ class ModelProviderService:
         """
         provider_configuration = self._get_provider_configuration(tenant_id, provider)
         provider_configuration.enable_model(model=model, model_type=ModelType.value_of(model_type))
+        bump_provider_configurations_version(tenant_id)
 
     def disable_model(self, tenant_id: str, provider: str, model: str, model_type: str):
         """
@@ -604,3 +617,4 @@ class ModelProviderService:
         """
         provider_configuration = self._get_provider_configuration(tenant_id, provider)
         provider_configuration.disable_model(model=model, model_type=ModelType.value_of(model_type))
+        bump_provider_configurations_version(tenant_id)
@@ -13,6 +13,7 @@ from sqlalchemy import desc, select
 from sqlalchemy.orm import Session, sessionmaker
 
 from core.app.apps.message_generator import MessageGenerator
+from core.app.apps.streaming_utils import decode_topic_event
 from core.app.entities.task_entities import (
     MessageReplaceStreamResponse,
     NodeFinishStreamResponse,
@@ -411,8 +412,9 @@ def _start_buffering(subscription) -> BufferState:
                 event = _parse_event_message(msg)
                 if event is None:
                     continue
-                task_id = event.get("task_id")
-                if task_id and buffer_state.task_id_hint is None:
+                # only the first event carrying a task id is decoded, the rest are relayed as published
+                task_id = event.get("task_id") if buffer_state.task_id_hint is None else None
+                if task_id:
                     buffer_state.task_id_hint = str(task_id)
                     buffer_state.task_id_ready.set()
                 try:
@@ -440,11 +442,11 @@ def _start_buffering(subscription) -> BufferState:
 
 def _parse_event_message(message: bytes) -> Mapping[str, Any] | None:
     try:
-        event = json.loads(message)
+        event = decode_topic_event(message)
     except json.JSONDecodeError:
         logger.warning("Failed to decode workflow event payload")
         return None
-    if not isinstance(event, dict):
+    if not isinstance(event, Mapping):
         return None
     return event
 
@@ -6,11 +6,13 @@ from celery import shared_task
 from sqlalchemy import select
 from werkzeug.exceptions import NotFound
 
+from configs import dify_config
 from core.db.session_factory import session_factory
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.index_processor.constant.index_type import IndexTechniqueType
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
+from libs.redis_rate_limiter import ConcurrencyLimiter
 from models.dataset import Dataset
 from models.model import App, AppAnnotationSetting, MessageAnnotation
 from services.dataset_service import DatasetCollectionBindingService
@@ -32,7 +34,8 @@ def batch_import_annotations_task(job_id: str, content_list: list[dict], app_id:
     logger.info(click.style(f"Start batch import annotation: {job_id}", fg="green"))
     start_at = time.perf_counter()
     indexing_cache_key = f"app_annotation_batch_import_{str(job_id)}"
-    active_jobs_key = f"annotation_import_active:{tenant_id}"
+    active_jobs_key = f"annotation_import_leases:{tenant_id}"
+    active_jobs = ConcurrencyLimiter(limit=dify_config.ANNOTATION_IMPORT_MAX_CONCURRENT, lease_timeout=120)
 
     with session_factory.create_session() as session:
         # get app info
@@ -100,7 +103,7 @@ def batch_import_annotations_task(job_id: str, content_list: list[dict], app_id:
             finally:
                 # Clean up active job tracking to release concurrency slot
                 try:
-                    redis_client.zrem(active_jobs_key, job_id)
+                    active_jobs.release(active_jobs_key, job_id)
                     logger.debug("Released concurrency slot for job: %s", job_id)
                 except Exception as cleanup_error:
                     # Log but don't fail if cleanup fails - the job will be auto-expired
@@ -6,13 +6,14 @@ from enum import StrEnum
 from typing import Annotated, Any
 
 from celery import shared_task
-from flask import current_app, json
+from flask import current_app
 from pydantic import BaseModel, Discriminator, Field, Tag
 from sqlalchemy import Engine, select
 from sqlalchemy.orm import Session, sessionmaker
 
 from core.app.apps.advanced_chat.app_generator import AdvancedChatAppGenerator
 from core.app.apps.message_based_app_generator import MessageBasedAppGenerator
+from core.app.apps.streaming_utils import coalescing_topic_producer, encode_topic_event
 from core.app.apps.workflow.app_generator import WorkflowAppGenerator
 from core.app.entities.app_invoke_entities import (
     AdvancedChatAppGenerateEntity,
@@ -244,17 +245,18 @@ def _publish_streaming_response(
     app_mode: AppMode,
 ) -> None:
     topic = MessageBasedAppGenerator.get_response_topic(app_mode, workflow_run_id)
-    for event in response_stream:
-        try:
-            if isinstance(event, BaseModel):
-                payload = json.dumps(event.model_dump(mode="json"), ensure_ascii=False)
-            else:
-                payload = json.dumps(event, ensure_ascii=False, default=str)
-        except (TypeError, ValueError):
-            logger.exception("error while encoding event")
-            continue
-
-        topic.publish(payload.encode())
+    producer = coalescing_topic_producer(topic)
+    try:
+        for event in response_stream:
+            try:
+                payload = encode_topic_event(event.model_dump(mode="json") if isinstance(event, BaseModel) else event)
+            except (TypeError, ValueError):
+                logger.exception("error while encoding event")
+                continue
+
+            producer.publish(payload)
+    finally:
+        producer.close()
 
 
 @shared_task(queue=WORKFLOW_BASED_APP_EXECUTION_QUEUE)
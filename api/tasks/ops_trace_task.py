@@ -1,10 +1,11 @@
 import json
 import logging
+from typing import Any
 
 from celery import shared_task
 from flask import current_app
 
-from core.ops.entities.config_entity import OPS_FILE_PATH, OPS_TRACE_FAILED_KEY
+from core.ops.entities.config_entity import OPS_BATCH_FILE_PATH, OPS_FILE_PATH, OPS_TRACE_FAILED_KEY
 from core.ops.entities.trace_entity import trace_info_info_map
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
@@ -20,16 +21,56 @@ def process_trace_tasks(file_info):
     """
     Async process trace tasks
     Usage: process_trace_tasks.delay(tasks_data)
+
+    :param file_info: either a single trace manifest ``{"app_id", "file_id"}`` or a batch manifest
+        ``{"batch_id", "count"}`` pointing at an NDJSON object with one task data record per line
     """
-    from core.ops.ops_trace_manager import OpsTraceManager
+    if file_info.get("batch_id"):
+        _process_trace_batch(file_info["batch_id"])
+        return
 
     app_id = file_info.get("app_id")
     file_id = file_info.get("file_id")
     file_path = f"{OPS_FILE_PATH}{app_id}/{file_id}.json"
-    file_data = json.loads(storage.load(file_path))
+    try:
+        file_data = json.loads(storage.load(file_path))
+        _process_trace_data(app_id, file_data)
+    finally:
+        _delete_trace_file(file_path, app_id)
+
+
+def _process_trace_batch(batch_id: str):
+    from core.ops.ops_trace_manager import OpsTraceManager
+
+    file_path = f"{OPS_BATCH_FILE_PATH}{batch_id}.ndjson"
+    trace_instances: dict[str, Any] = {}
+    try:
+        content = storage.load(file_path)
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            app_id = None
+            # one bad record must not drop the rest of the batch, the file is deleted afterwards
+            try:
+                file_data = json.loads(line)
+                app_id = file_data.get("app_id")
+                if app_id not in trace_instances:
+                    trace_instances[app_id] = OpsTraceManager.get_ops_trace_instance(app_id)
+                _process_trace_data(app_id, file_data, trace_instances[app_id])
+            except Exception:
+                logger.exception("Processing trace batch record failed, batch_id: %s, app_id: %s", batch_id, app_id)
+                _record_trace_failure(app_id or batch_id)
+    finally:
+        _delete_trace_file(file_path, batch_id)
+
+
+def _process_trace_data(app_id, file_data: dict, trace_instance=None):
     trace_info = file_data.get("trace_info")
     trace_info_type = file_data.get("trace_info_type")
-    trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
+    if trace_instance is None:
+        from core.ops.ops_trace_manager import OpsTraceManager
+
+        trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
 
     if trace_info.get("message_data"):
         trace_info["message_data"] = Message.from_dict(data=trace_info["message_data"])
@@ -58,17 +99,25 @@ def process_trace_tasks(file_info):
                 trace_instance.trace(trace_info)
 
         logger.info("Processing trace tasks success, app_id: %s", app_id)
-    except Exception as e:
+    except Exception:
         logger.exception("Processing trace tasks failed, app_id: %s", app_id)
-        failed_key = f"{OPS_TRACE_FAILED_KEY}_{app_id}"
-        redis_client.incr(failed_key)
-    finally:
-        try:
-            storage.delete(file_path)
-        except Exception as e:
-            logger.warning(
-                "Failed to delete trace file %s for app_id %s: %s",
-                file_path,
-                app_id,
-                e,
-            )
+        _record_trace_failure(app_id)
+
+
+def _record_trace_failure(app_id):
+    try:
+        redis_client.incr(f"{OPS_TRACE_FAILED_KEY}_{app_id}")
+    except Exception:
+        logger.exception("Failed to record trace failure, app_id: %s", app_id)
+
+
+def _delete_trace_file(file_path: str, owner_id):
+    try:
+        storage.delete(file_path)
+    except Exception as e:
+        logger.warning(
+            "Failed to delete trace file %s for %s: %s",
+            file_path,
+            owner_id,
+            e,
+        )
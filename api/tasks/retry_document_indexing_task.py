@@ -78,12 +78,27 @@ def retry_document_indexing_task(dataset_id: str, document_ids: list[str], user_
                     logger.info(click.style(f"Document not found: {document_id}", fg="yellow"))
                     return
                 try:
-                    # clean old data
-                    index_processor = IndexProcessorFactory(document.doc_form).init_index_processor()
-
                     segments = session.scalars(
                         select(DocumentSegment).where(DocumentSegment.document_id == document_id)
                     ).all()
+                    if (
+                        dataset.runtime_mode != "rag_pipeline"
+                        and segments
+                        and (document.split_page_count is not None or document.splitting_completed_at is not None)
+                    ):
+                        # segments saved before the failure are kept, only the rest is split and indexed
+                        document.indexing_status = IndexingStatus.INDEXING
+                        document.error = None
+                        document.processing_started_at = naive_utc_now()
+                        session.add(document)
+                        session.commit()
+
+                        IndexingRunner().run_in_indexing_status(document)
+                        redis_client.delete(retry_indexing_cache_key)
+                        continue
+
+                    # clean old data
+                    index_processor = IndexProcessorFactory(document.doc_form).init_index_processor()
                     if segments:
                         index_node_ids = [segment.index_node_id for segment in segments]
                         # delete from vector index
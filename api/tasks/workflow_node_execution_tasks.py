@@ -83,6 +83,69 @@ def save_workflow_node_execution_task(
         raise self.retry(exc=e, countdown=60 * (2**self.request.retries))
 
 
+@shared_task(queue="workflow_storage", bind=True, max_retries=3, default_retry_delay=60)
+def save_workflow_node_executions_task(
+    self,
+    executions_data: list[dict[str, Any]],
+    tenant_id: str,
+    app_id: str,
+    triggered_from: str,
+    creator_user_id: str,
+    creator_user_role: str,
+) -> bool:
+    """
+    Asynchronously save or update a batch of workflow node executions in one transaction.
+
+    Args:
+        executions_data: Serialized WorkflowNodeExecution data, at most one entry per execution id
+        tenant_id: Tenant ID for multi-tenancy
+        app_id: Application ID
+        triggered_from: Source of the execution trigger
+        creator_user_id: ID of the user who created the executions
+        creator_user_role: Role of the user who created the executions
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        with session_factory.create_session() as session:
+            executions = [WorkflowNodeExecution.model_validate(data) for data in executions_data]
+
+            existing_executions = {
+                node_execution.id: node_execution
+                for node_execution in session.scalars(
+                    select(WorkflowNodeExecutionModel).where(
+                        WorkflowNodeExecutionModel.id.in_([execution.id for execution in executions])
+                    )
+                )
+            }
+
+            for execution in executions:
+                existing_execution = existing_executions.get(execution.id)
+                if existing_execution:
+                    _update_node_execution_from_domain(existing_execution, execution)
+                else:
+                    node_execution = _create_node_execution_from_domain(
+                        execution=execution,
+                        tenant_id=tenant_id,
+                        app_id=app_id,
+                        triggered_from=WorkflowNodeExecutionTriggeredFrom(triggered_from),
+                        creator_user_id=creator_user_id,
+                        creator_user_role=CreatorUserRole(creator_user_role),
+                    )
+                    session.add(node_execution)
+                    existing_executions[execution.id] = node_execution
+
+            session.commit()
+            logger.debug("Saved %d workflow node executions", len(executions))
+            return True
+
+    except Exception as e:
+        logger.exception("Failed to save %d workflow node executions", len(executions_data))
+        # Retry the task with exponential backoff
+        raise self.retry(exc=e, countdown=60 * (2**self.request.retries))
+
+
 def _create_node_execution_from_domain(
     execution: WorkflowNodeExecution,
     tenant_id: str,
@@ -0,0 +1,57 @@
+"""
+Integration tests for the Lua rate limiters using testcontainers Redis.
+
+Many threads hit the same key at once, exactly `limit` of them must be admitted.
+"""
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from libs.redis_rate_limiter import ConcurrencyLimiter, SlidingWindowRateLimiter, TokenBucketRateLimiter
+
+_THREADS = 16
+_CALLS = 200
+_LIMIT = 25
+
+
+def _run_concurrently(func) -> list[bool]:
+    with ThreadPoolExecutor(max_workers=_THREADS) as executor:
+        return list(executor.map(lambda i: func(i).allowed, range(_CALLS)))
+
+
+@pytest.mark.usefixtures("flask_app_with_containers")
+def test_sliding_window_admits_exactly_limit_under_concurrency():
+    key = f"test_sliding_window:{uuid.uuid4().hex}"
+    limiter = SlidingWindowRateLimiter(limit=_LIMIT, window=60)
+
+    results = _run_concurrently(lambda _: limiter.hit(key))
+
+    assert results.count(True) == _LIMIT
+    assert limiter.count(key) == _LIMIT
+
+
+@pytest.mark.usefixtures("flask_app_with_containers")
+def test_token_bucket_admits_exactly_capacity_under_concurrency():
+    key = f"test_token_bucket:{uuid.uuid4().hex}"
+    # refills one token an hour, so nothing is refilled while the test runs
+    limiter = TokenBucketRateLimiter(capacity=_LIMIT, refill_rate=1 / 3600)
+
+    results = _run_concurrently(lambda _: limiter.acquire(key))
+
+    assert results.count(True) == _LIMIT
+
+
+@pytest.mark.usefixtures("flask_app_with_containers")
+def test_concurrency_limiter_admits_exactly_limit_and_frees_released_leases():
+    key = f"test_concurrency:{uuid.uuid4().hex}"
+    limiter = ConcurrencyLimiter(limit=_LIMIT, lease_timeout=600)
+
+    results = _run_concurrently(lambda i: limiter.acquire(key, f"lease-{i}"))
+
+    assert results.count(True) == _LIMIT
+    granted = [i for i, allowed in enumerate(results) if allowed]
+    limiter.release(key, f"lease-{granted[0]}")
+    assert limiter.acquire(key, "new-lease").allowed is True
+    assert limiter.acquire(key, "another-lease").allowed is False
@@ -0,0 +1,66 @@
+"""
+Integration tests for SegmentHitCountService using real Redis and database containers.
+"""
+
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from extensions.ext_redis import redis_client
+from models.dataset import DocumentSegment
+from services.segment_hit_count_service import FLUSHING_HIT_COUNTS_KEY, HIT_COUNTS_KEY, SegmentHitCountService
+
+
+def _create_segment(db_session_with_containers: Session, hit_count: int = 0) -> DocumentSegment:
+    segment = DocumentSegment(
+        tenant_id=str(uuid4()),
+        dataset_id=str(uuid4()),
+        document_id=str(uuid4()),
+        position=1,
+        content="Test content",
+        word_count=10,
+        tokens=15,
+        created_by=str(uuid4()),
+    )
+    segment.hit_count = hit_count
+    db_session_with_containers.add(segment)
+    db_session_with_containers.commit()
+    return segment
+
+
+class TestSegmentHitCountService:
+    def test_flush_adds_buffered_hits_to_segments(self, flask_app_with_containers, db_session_with_containers):
+        redis_client.delete(HIT_COUNTS_KEY, FLUSHING_HIT_COUNTS_KEY)
+        hot = _create_segment(db_session_with_containers, hit_count=5)
+        cold = _create_segment(db_session_with_containers)
+        untouched = _create_segment(db_session_with_containers, hit_count=2)
+
+        for _ in range(3):
+            SegmentHitCountService.record_hits([hot.id])
+        SegmentHitCountService.record_hits([hot.id, cold.id])
+
+        assert SegmentHitCountService.flush(batch_size=1) == 2
+
+        db_session_with_containers.expire_all()
+        assert db_session_with_containers.get(DocumentSegment, hot.id).hit_count == 9
+        assert db_session_with_containers.get(DocumentSegment, cold.id).hit_count == 1
+        assert db_session_with_containers.get(DocumentSegment, untouched.id).hit_count == 2
+        assert not redis_client.exists(HIT_COUNTS_KEY, FLUSHING_HIT_COUNTS_KEY)
+
+    def test_hits_recorded_after_buffer_was_moved_wait_for_next_flush(
+        self, flask_app_with_containers, db_session_with_containers
+    ):
+        redis_client.delete(HIT_COUNTS_KEY, FLUSHING_HIT_COUNTS_KEY)
+        segment = _create_segment(db_session_with_containers)
+        SegmentHitCountService.record_hits([segment.id])
+        # a previous flush moved the buffer aside but failed before updating the database
+        redis_client.rename(HIT_COUNTS_KEY, FLUSHING_HIT_COUNTS_KEY)
+        SegmentHitCountService.record_hits([segment.id])
+
+        SegmentHitCountService.flush()
+        db_session_with_containers.expire_all()
+        assert db_session_with_containers.get(DocumentSegment, segment.id).hit_count == 1
+
+        SegmentHitCountService.flush()
+        db_session_with_containers.expire_all()
+        assert db_session_with_containers.get(DocumentSegment, segment.id).hit_count == 2
@@ -0,0 +1,63 @@
+import pickle
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from commands import convert_embedding_cache_format
+from core.rag.embedding.embedding_codec import decode_stored_embedding, is_encoded_embedding
+
+
+def _embedding(embedding_id: str, vector: list[float]) -> MagicMock:
+    embedding = MagicMock()
+    embedding.id = embedding_id
+    embedding.embedding = pickle.dumps(vector, protocol=pickle.HIGHEST_PROTOCOL)
+    return embedding
+
+
+def test_pages_through_embeddings_by_id():
+    first_page = [
+        _embedding("00000000-0000-0000-0000-000000000001", [0.1, 0.2]),
+        _embedding("00000000-0000-0000-0000-000000000002", [0.3, 0.4]),
+    ]
+    pages = iter([first_page, []])
+    statements = []
+
+    session = MagicMock()
+
+    def scalars(stmt):
+        statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        result = MagicMock()
+        result.all.return_value = next(pages)
+        return result
+
+    session.scalars.side_effect = scalars
+    session_factory = MagicMock()
+    session_factory.return_value.begin.return_value.__enter__.return_value = session
+
+    with (
+        patch("commands.vector.sessionmaker", session_factory),
+        patch("commands.vector.db"),
+        patch("commands.vector.dify_config.EMBEDDING_CACHE_BINARY_FORMAT_ENABLED", True),
+    ):
+        convert_embedding_cache_format.callback(batch_size=2)
+
+    # the first page must not compare the UUID column with a placeholder such as ""
+    assert "WHERE" not in statements[0]
+    assert "embeddings.id > %(id_1)s" in statements[1]
+    for embedding, expected in zip(first_page, ([0.1, 0.2], [0.3, 0.4])):
+        assert is_encoded_embedding(embedding.embedding)
+        assert list(decode_stored_embedding(embedding.embedding)) == pytest.approx(expected, abs=1e-3)
+
+
+def test_refuses_to_convert_before_binary_format_is_enabled():
+    session_factory = MagicMock()
+
+    with (
+        patch("commands.vector.sessionmaker", session_factory),
+        patch("commands.vector.db"),
+        patch("commands.vector.dify_config.EMBEDDING_CACHE_BINARY_FORMAT_ENABLED", False),
+    ):
+        convert_embedding_cache_format.callback(batch_size=2)
+
+    session_factory.assert_not_called()
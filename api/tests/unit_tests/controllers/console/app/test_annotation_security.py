@@ -14,6 +14,7 @@ from werkzeug.datastructures import FileStorage
 
 from configs import dify_config
 from controllers.console.wraps import annotation_import_concurrency_limit, annotation_import_rate_limit
+from libs.redis_rate_limiter import RateLimitResult
 from services.annotation_service import AppAnnotationService
 from tasks.annotation.batch_import_annotations_task import batch_import_annotations_task
 
@@ -22,10 +23,10 @@ class TestAnnotationImportRateLimiting:
     """Test rate limiting for annotation import operations."""
 
     @pytest.fixture
-    def mock_redis(self):
-        """Mock Redis client for testing."""
-        with patch("controllers.console.wraps.redis_client") as mock:
-            yield mock
+    def mock_limiter(self):
+        """Mock the Redis sliding window limiter for testing."""
+        with patch("controllers.console.wraps.SlidingWindowRateLimiter") as mock:
+            yield mock.return_value
 
     @pytest.fixture
     def mock_current_account(self):
@@ -34,12 +35,12 @@ class TestAnnotationImportRateLimiting:
             mock.return_value = (MagicMock(id="user_id"), "test_tenant_id")
             yield mock
 
-    def test_rate_limit_per_minute_enforced(self, mock_redis, mock_current_account):
+    def test_rate_limit_per_minute_enforced(self, mock_limiter, mock_current_account):
         """Test that per-minute rate limit is enforced."""
         # Simulate exceeding per-minute limit
-        mock_redis.zcard.side_effect = [
-            dify_config.ANNOTATION_IMPORT_RATE_LIMIT_PER_MINUTE + 1,  # Minute check
-            10,  # Hour check
+        mock_limiter.hit.side_effect = [
+            RateLimitResult(allowed=False, count=dify_config.ANNOTATION_IMPORT_RATE_LIMIT_PER_MINUTE),  # Minute check
+            RateLimitResult(allowed=True, count=10),  # Hour check
         ]
 
         @annotation_import_rate_limit
@@ -53,13 +54,13 @@ class TestAnnotationImportRateLimiting:
         # Verify it's a rate limit error
         assert "429" in str(exc_info.value) or "Too many" in str(exc_info.value)
 
-    def test_rate_limit_per_hour_enforced(self, mock_redis, mock_current_account):
+    def test_rate_limit_per_hour_enforced(self, mock_limiter, mock_current_account):
         """Test that per-hour rate limit is enforced."""
 
         # Simulate exceeding per-hour limit
-        mock_redis.zcard.side_effect = [
-            3,  # Minute check (under limit)
-            dify_config.ANNOTATION_IMPORT_RATE_LIMIT_PER_HOUR + 1,  # Hour check (over limit)
+        mock_limiter.hit.side_effect = [
+            RateLimitResult(allowed=True, count=3),  # Minute check (under limit)
+            RateLimitResult(allowed=False, count=dify_config.ANNOTATION_IMPORT_RATE_LIMIT_PER_HOUR),  # Hour check
         ]
 
         @annotation_import_rate_limit
@@ -72,11 +73,11 @@ class TestAnnotationImportRateLimiting:
 
         assert "429" in str(exc_info.value) or "Too many" in str(exc_info.value)
 
-    def test_rate_limit_within_limits_passes(self, mock_redis, mock_current_account):
+    def test_rate_limit_within_limits_passes(self, mock_limiter, mock_current_account):
         """Test that requests within limits are allowed."""
 
         # Simulate being under both limits
-        mock_redis.zcard.return_value = 2
+        mock_limiter.hit.return_value = RateLimitResult(allowed=True, count=2)
 
         @annotation_import_rate_limit
         def dummy_view():
@@ -86,19 +87,21 @@ class TestAnnotationImportRateLimiting:
         result = dummy_view()
         assert result == "success"
 
-        # Verify Redis operations were called
-        assert mock_redis.zadd.called
-        assert mock_redis.zremrangebyscore.called
+        # Verify both windows recorded the request
+        assert [call.args[0] for call in mock_limiter.hit.call_args_list] == [
+            "annotation_import_rate_limit:test_tenant_id:1min",
+            "annotation_import_rate_limit:test_tenant_id:1hour",
+        ]
 
 
 class TestAnnotationImportConcurrencyControl:
     """Test concurrency control for annotation import operations."""
 
     @pytest.fixture
-    def mock_redis(self):
-        """Mock Redis client for testing."""
-        with patch("controllers.console.wraps.redis_client") as mock:
-            yield mock
+    def mock_limiter(self):
+        """Mock the Redis concurrency limiter for testing."""
+        with patch("controllers.console.wraps.ConcurrencyLimiter") as mock:
+            yield mock.return_value
 
     @pytest.fixture
     def mock_current_account(self):
@@ -107,14 +110,16 @@ class TestAnnotationImportConcurrencyControl:
             mock.return_value = (MagicMock(id="user_id"), "test_tenant_id")
             yield mock
 
-    def test_concurrency_limit_enforced(self, mock_redis, mock_current_account):
+    def test_concurrency_limit_enforced(self, mock_limiter, mock_current_account):
         """Test that concurrent task limit is enforced."""
 
         # Simulate max concurrent tasks already running
-        mock_redis.zcard.return_value = dify_config.ANNOTATION_IMPORT_MAX_CONCURRENT
+        mock_limiter.acquire.return_value = RateLimitResult(
+            allowed=False, count=dify_config.ANNOTATION_IMPORT_MAX_CONCURRENT
+        )
 
         @annotation_import_concurrency_limit
-        def dummy_view():
+        def dummy_view(job_id):
             return "success"
 
         # Should abort with 429
@@ -122,34 +127,37 @@ class TestAnnotationImportConcurrencyControl:
             dummy_view()
 
         assert "429" in str(exc_info.value) or "concurrent" in str(exc_info.value).lower()
+        mock_limiter.release.assert_not_called()
 
-    def test_concurrency_within_limit_passes(self, mock_redis, mock_current_account):
-        """Test that requests within concurrency limits are allowed."""
+    def test_concurrency_within_limit_passes_lease_to_view(self, mock_limiter, mock_current_account):
+        """Test that requests within concurrency limits hold a lease named by the job id."""
 
-        # Simulate being under concurrent task limit
-        mock_redis.zcard.return_value = 1
+        mock_limiter.acquire.return_value = RateLimitResult(allowed=True, count=1)
 
         @annotation_import_concurrency_limit
-        def dummy_view():
-            return "success"
+        def dummy_view(job_id):
+            return job_id
 
-        # Should succeed
-        result = dummy_view()
-        assert result == "success"
+        job_id = dummy_view()
+
+        # the lease is released by the import task once the job completes
+        mock_limiter.acquire.assert_called_once_with("annotation_import_leases:test_tenant_id", job_id)
+        mock_limiter.release.assert_not_called()
 
-    def test_stale_jobs_are_cleaned_up(self, mock_redis, mock_current_account):
-        """Test that old/stale job entries are removed."""
+    def test_lease_released_when_view_fails(self, mock_limiter, mock_current_account):
+        """Test that the lease is released when no import job is started."""
 
-        mock_redis.zcard.return_value = 0
+        mock_limiter.acquire.return_value = RateLimitResult(allowed=True, count=1)
 
         @annotation_import_concurrency_limit
-        def dummy_view():
-            return "success"
+        def dummy_view(job_id):
+            raise ValueError("Invalid file type. Only CSV files are allowed")
 
-        dummy_view()
+        with pytest.raises(ValueError):
+            dummy_view()
 
-        # Verify cleanup was called
-        assert mock_redis.zremrangebyscore.called
+        job_id = mock_limiter.acquire.call_args.args[1]
+        mock_limiter.release.assert_called_once_with("annotation_import_leases:test_tenant_id", job_id)
 
 
 class TestAnnotationImportFileValidation:
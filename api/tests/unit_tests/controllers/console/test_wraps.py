@@ -16,6 +16,7 @@ from controllers.console.wraps import (
     only_edition_self_hosted,
     setup_required,
 )
+from libs.redis_rate_limiter import RateLimitResult
 from models.account import AccountStatus
 from services.feature_service import LicenseStatus
 
@@ -235,15 +236,15 @@ class TestBillingResourceLimits:
 class TestRateLimiting:
     """Test rate limiting decorator"""
 
-    @patch("controllers.console.wraps.redis_client")
+    @patch("controllers.console.wraps.SlidingWindowRateLimiter")
     @patch("controllers.console.wraps.db")
-    def test_should_allow_requests_within_rate_limit(self, mock_db, mock_redis):
+    def test_should_allow_requests_within_rate_limit(self, mock_db, mock_limiter):
         """Test that requests within rate limit are allowed"""
         # Arrange
         mock_rate_limit = MagicMock()
         mock_rate_limit.enabled = True
         mock_rate_limit.limit = 10
-        mock_redis.zcard.return_value = 5  # 5 requests in window
+        mock_limiter.return_value.hit.return_value = RateLimitResult(allowed=True, count=6)  # 6 requests in window
 
         @cloud_edition_billing_rate_limit_check("knowledge")
         def knowledge_request():
@@ -260,12 +261,12 @@ class TestRateLimiting:
 
         # Assert
         assert result == "knowledge_success"
-        mock_redis.zadd.assert_called_once()
-        mock_redis.zremrangebyscore.assert_called_once()
+        mock_limiter.assert_called_once_with(limit=10, window=60)
+        mock_limiter.return_value.hit.assert_called_once_with("rate_limit_tenant123")
 
-    @patch("controllers.console.wraps.redis_client")
+    @patch("controllers.console.wraps.SlidingWindowRateLimiter")
     @patch("controllers.console.wraps.db")
-    def test_should_reject_requests_over_rate_limit(self, mock_db, mock_redis):
+    def test_should_reject_requests_over_rate_limit(self, mock_db, mock_limiter):
         """Test that requests over rate limit are rejected and logged"""
         # Arrange
         app = create_app_with_login()
@@ -273,7 +274,7 @@ class TestRateLimiting:
         mock_rate_limit.enabled = True
         mock_rate_limit.limit = 10
         mock_rate_limit.subscription_plan = "pro"
-        mock_redis.zcard.return_value = 11  # Over limit
+        mock_limiter.return_value.hit.return_value = RateLimitResult(allowed=False, count=10)  # Over limit
 
         mock_session = MagicMock()
         mock_db.session = mock_session
@@ -21,6 +21,7 @@ from controllers.service_api.wraps import (
     validate_dataset_token,
 )
 from enums.cloud_plan import CloudPlan
+from libs.redis_rate_limiter import RateLimitResult
 from models.account import TenantStatus
 from models.model import ApiToken
 from tests.unit_tests.conftest import (
@@ -389,9 +390,8 @@ class TestCloudEditionBillingRateLimitCheck:
         mock_rate_limit.limit = 100
         mock_get_rate_limit.return_value = mock_rate_limit
 
-        # Mock redis operations
-        with patch("controllers.service_api.wraps.redis_client") as mock_redis:
-            mock_redis.zcard.return_value = 50  # Under limit
+        with patch("controllers.service_api.wraps.SlidingWindowRateLimiter") as mock_limiter:
+            mock_limiter.return_value.hit.return_value = RateLimitResult(allowed=True, count=51)  # Under limit
 
             @cloud_edition_billing_rate_limit_check("knowledge", "dataset")
             def knowledge_request():
@@ -403,8 +403,8 @@ class TestCloudEditionBillingRateLimitCheck:
 
             # Assert
             assert result == "success"
-            mock_redis.zadd.assert_called_once()
-            mock_redis.zremrangebyscore.assert_called_once()
+            mock_limiter.assert_called_once_with(limit=100, window=60)
+            mock_limiter.return_value.hit.assert_called_once_with("rate_limit_tenant123")
 
     @patch("controllers.service_api.wraps.validate_and_get_api_token")
     @patch("controllers.service_api.wraps.FeatureService.get_knowledge_rate_limit")
@@ -420,8 +420,8 @@ class TestCloudEditionBillingRateLimitCheck:
         mock_rate_limit.subscription_plan = "pro"
         mock_get_rate_limit.return_value = mock_rate_limit
 
-        with patch("controllers.service_api.wraps.redis_client") as mock_redis:
-            mock_redis.zcard.return_value = 15  # Over limit
+        with patch("controllers.service_api.wraps.SlidingWindowRateLimiter") as mock_limiter:
+            mock_limiter.return_value.hit.return_value = RateLimitResult(allowed=False, count=10)  # Over limit
 
             @cloud_edition_billing_rate_limit_check("knowledge", "dataset")
             def knowledge_request():
@@ -1,11 +1,16 @@
+from collections.abc import Mapping
 from types import SimpleNamespace
+from typing import Any
 from unittest.mock import patch
 
 import pytest
+from pydantic import BaseModel
 
-from core.app.apps.base_app_queue_manager import AppQueueManager, PublishFrom
+from core.app.apps.base_app_queue_manager import AppQueueManager, PublishFrom, _fields_accepting_arbitrary_values
 from core.app.entities.app_invoke_entities import InvokeFrom
-from core.app.entities.queue_entities import QueueErrorEvent
+from core.app.entities.queue_entities import QueueErrorEvent, QueueEvent, QueueLLMChunkEvent, QueuePingEvent
+from graphon.model_runtime.entities.llm_entities import LLMResultChunk, LLMResultChunkDelta
+from graphon.model_runtime.entities.message_entities import AssistantPromptMessage
 
 
 class DummyQueueManager(AppQueueManager):
@@ -17,6 +22,38 @@ class DummyQueueManager(AppQueueManager):
         self.published.append((event, pub_from))
 
 
+class ListeningQueueManager(AppQueueManager):
+    def _publish(self, event, pub_from):
+        self._q.put(event)
+
+
+class _Payload(BaseModel):
+    name: str
+    value: Any = None
+
+
+class _NestedEvent(QueuePingEvent):
+    payload: _Payload
+    metadata: Mapping[str, Any] | None = None
+    tags: list[str] = []
+
+
+def _make_manager(cls=DummyQueueManager):
+    with patch("core.app.apps.base_app_queue_manager.redis_client") as mock_redis:
+        mock_redis.setex.return_value = True
+        return cls(task_id="t1", user_id="u1", invoke_from=InvokeFrom.SERVICE_API)
+
+
+def _make_chunk_event(index: int = 0) -> QueueLLMChunkEvent:
+    return QueueLLMChunkEvent(
+        chunk=LLMResultChunk(
+            model="m",
+            prompt_messages=[],
+            delta=LLMResultChunkDelta(index=index, message=AssistantPromptMessage(content="token")),
+        )
+    )
+
+
 class TestBaseAppQueueManager:
     def test_init_requires_user_id(self):
         with pytest.raises(ValueError):
@@ -74,3 +111,76 @@ class TestBaseAppQueueManager:
         assert manager.graph_runtime_state is runtime_state
         assert list(manager.listen()) == []
         assert manager.graph_runtime_state is None
+
+    def test_fields_accepting_arbitrary_values_are_resolved_from_annotations(self):
+        assert _fields_accepting_arbitrary_values(_NestedEvent) == ("payload", "metadata")
+        assert _fields_accepting_arbitrary_values(QueuePingEvent) == ()
+        assert _fields_accepting_arbitrary_values(QueueErrorEvent) == ("error",)
+
+    @pytest.mark.parametrize(
+        "event",
+        [
+            QueueErrorEvent(error=SimpleNamespace(_sa_instance_state=True)),
+            _NestedEvent(payload=_Payload(name="p", value=[{"row": SimpleNamespace(_sa_instance_state=True)}])),
+            _NestedEvent(payload=_Payload(name="p"), metadata={"row": SimpleNamespace(_sa_instance_state=True)}),
+        ],
+    )
+    def test_publish_rejects_sqlalchemy_models(self, event):
+        manager = _make_manager()
+
+        with pytest.raises(TypeError):
+            manager.publish(event, PublishFrom.TASK_PIPELINE)
+
+        assert manager.published == []
+
+    def test_publish_accepts_plain_values(self):
+        manager = _make_manager()
+        event = _NestedEvent(payload=_Payload(name="p", value={"a": [1, "b"]}), metadata={"k": (1, 2)})
+
+        manager.publish(event, PublishFrom.TASK_PIPELINE)
+
+        assert manager.published == [(event, PublishFrom.TASK_PIPELINE)]
+
+    def test_publish_in_debug_checks_dumped_event(self):
+        manager = _make_manager()
+        # model_construct skips validation, so a closed `str` field ends up holding a model instance
+        event = _NestedEvent.model_construct(
+            event=QueueEvent.PING, payload=_Payload.model_construct(name=SimpleNamespace(_sa_instance_state=True))
+        )
+
+        with patch("core.app.apps.base_app_queue_manager.dify_config") as mock_config:
+            mock_config.DEBUG = True
+            with pytest.raises(TypeError):
+                manager.publish(event, PublishFrom.TASK_PIPELINE)
+
+    def test_published_chunk_events_are_listened_in_order(self):
+        manager = _make_manager(ListeningQueueManager)
+        events = [_make_chunk_event(i) for i in range(50)]
+
+        with patch("core.app.apps.base_app_queue_manager.redis_client") as mock_redis:
+            mock_redis.get.return_value = None
+            for event in events:
+                manager.publish(event, PublishFrom.APPLICATION_MANAGER)
+            manager.stop_listen()
+            received = list(manager.listen())
+
+        assert received == events
+
+    def test_publish_listen_throughput_benchmark(self, benchmark):
+        """Events/second of LLM chunk events through publish and listen."""
+        events = [_make_chunk_event(i) for i in range(5000)]
+
+        def publish_and_listen(manager):
+            for event in events:
+                manager.publish(event, PublishFrom.APPLICATION_MANAGER)
+            manager.stop_listen()
+            return sum(1 for _ in manager.listen())
+
+        with patch("core.app.apps.base_app_queue_manager.redis_client") as mock_redis:
+            mock_redis.get.return_value = None
+            received = benchmark.pedantic(
+                publish_and_listen, setup=lambda: ((_make_manager(ListeningQueueManager),), {}), rounds=5
+            )
+
+        assert received == len(events)
+        benchmark.extra_info["events_per_round"] = len(events)
@@ -5,8 +5,16 @@ import queue
 
 import pytest
 
+from configs import dify_config
+from core.app.apps.base_app_generator import BaseAppGenerator
 from core.app.apps.message_based_app_generator import MessageBasedAppGenerator
-from core.app.apps.streaming_utils import _normalize_terminal_events, stream_topic_events
+from core.app.apps.streaming_utils import (
+    EncodedStreamEvent,
+    _normalize_terminal_events,
+    decode_topic_event,
+    encode_topic_event,
+    stream_topic_events,
+)
 from core.app.entities.task_entities import StreamEvent
 from models.model import AppMode
 
@@ -106,3 +114,53 @@ def test_stream_topic_events_emits_ping_and_idle_timeout(monkeypatch):
     assert next(generator) == StreamEvent.PING.value
     # next receive yields None -> ping interval triggers
     assert next(generator) == StreamEvent.PING.value
+
+
+@pytest.fixture
+def event_envelope(monkeypatch):
+    monkeypatch.setattr(dify_config, "PUBSUB_EVENT_ENVELOPE_ENABLED", True)
+
+
+def test_events_are_plain_json_by_default():
+    message = {"event": "text_chunk", "data": {"text": "héllo"}}
+
+    # readable by API processes that predate the envelope
+    assert json.loads(encode_topic_event(message)) == message
+    assert decode_topic_event(encode_topic_event(message)) == message
+
+
+@pytest.mark.usefixtures("event_envelope")
+def test_encoded_events_are_relayed_without_decoding(monkeypatch):
+    topic = FakeTopic()
+    message = {"event": "text_chunk", "data": {"text": "héllo"}}
+    topic.publish(encode_topic_event(message))
+    topic.publish(encode_topic_event({"event": StreamEvent.WORKFLOW_FINISHED.value}))
+
+    def fail_loads(*args, **kwargs):
+        raise AssertionError("relayed events must not be decoded")
+
+    monkeypatch.setattr("core.app.apps.streaming_utils.json.loads", fail_loads)
+
+    stream = BaseAppGenerator.convert_to_event_stream(stream_topic_events(topic=topic, idle_timeout=0.5))
+
+    assert next(stream) == f"event: {StreamEvent.PING.value}\n\n"
+    assert next(stream) == b'data: {"event":"text_chunk","data":{"text":"h\xc3\xa9llo"}}\n\n'
+    assert next(stream) == b'data: {"event":"workflow_finished"}\n\n'
+    with pytest.raises(StopIteration):
+        next(stream)
+
+
+@pytest.mark.usefixtures("event_envelope")
+def test_encoded_event_decodes_lazily_as_mapping():
+    event = decode_topic_event(encode_topic_event({"event": "node_started", "task_id": "task-1"}))
+
+    assert isinstance(event, EncodedStreamEvent)
+    assert event["event"] == "node_started"
+    assert event._decoded is None
+    assert event.get("task_id") == "task-1"
+    assert dict(event) == {"event": "node_started", "task_id": "task-1"}
+
+
+def test_plain_json_messages_are_still_decoded():
+    assert decode_topic_event(json.dumps({"event": "node_started"}).encode()) == {"event": "node_started"}
+    assert decode_topic_event(encode_topic_event("ping")) == "ping"
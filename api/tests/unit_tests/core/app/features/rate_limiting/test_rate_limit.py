@@ -9,6 +9,28 @@ from core.app.features.rate_limiting.rate_limit import RateLimit
 from core.errors.error import AppInvokeQuotaExceededError
 
 
+def _script_args(redis_mock) -> list[tuple]:
+    """Keys and arguments of the limiter scripts run against the mocked Redis."""
+    return [call.args[2:] for call in redis_mock.evalsha.call_args_list]
+
+
+def _lease_scripts(lock: threading.Lock, hashes: dict[str, dict[str, str]]):
+    """Run the acquire and release scripts of the concurrency limiter against in-memory hashes."""
+
+    def evalsha(sha, numkeys, key, lease_id, *args):
+        with lock:
+            leases = hashes.setdefault(key, {})
+            if not args:
+                return int(leases.pop(lease_id, None) is not None)
+            now, limit = args[0], args[1]
+            if lease_id not in leases and len(leases) >= limit:
+                return [0, len(leases), 0]
+            leases[lease_id] = str(now)
+            return [1, len(leases), 0]
+
+    return evalsha
+
+
 class TestRateLimit:
     """Core rate limiting functionality tests."""
 
@@ -194,8 +216,7 @@ class TestRateLimitEnterExit:
             **{
                 "exists.return_value": False,
                 "setex.return_value": True,
-                "hlen.return_value": 2,
-                "hset.return_value": True,
+                "evalsha.return_value": [1, 3, 0],
             }
         )
 
@@ -203,7 +224,10 @@ class TestRateLimitEnterExit:
         request_id = rate_limit.enter()
 
         assert request_id != RateLimit._UNLIMITED_REQUEST_ID
-        redis_patch.hset.assert_called_once()
+        ((key, lease_id, _, limit, *_),) = _script_args(redis_patch)
+        assert key == "dify:rate_limit:test_client:active_requests"
+        assert lease_id == request_id
+        assert limit == 5
 
     def test_should_generate_request_id_if_not_provided(self, redis_patch):
         """Test auto-generation of request ID."""
@@ -211,8 +235,7 @@ class TestRateLimitEnterExit:
             **{
                 "exists.return_value": False,
                 "setex.return_value": True,
-                "hlen.return_value": 0,
-                "hset.return_value": True,
+                "evalsha.return_value": [1, 1, 0],
             }
         )
 
@@ -227,8 +250,7 @@ class TestRateLimitEnterExit:
             **{
                 "exists.return_value": False,
                 "setex.return_value": True,
-                "hlen.return_value": 0,
-                "hset.return_value": True,
+                "evalsha.return_value": [1, 1, 0],
             }
         )
 
@@ -242,14 +264,15 @@ class TestRateLimitEnterExit:
         """Test request removal on exit."""
         redis_patch.configure_mock(
             **{
-                "hdel.return_value": 1,
+                "evalsha.return_value": 1,
             }
         )
 
         rate_limit = RateLimit("test_client", 5)
+        redis_patch.evalsha.reset_mock()
         rate_limit.exit("test_request_id")
 
-        redis_patch.hdel.assert_called_once_with("dify:rate_limit:test_client:active_requests", "test_request_id")
+        assert _script_args(redis_patch) == [("dify:rate_limit:test_client:active_requests", "test_request_id")]
 
     def test_should_raise_quota_exceeded_when_at_limit(self, redis_patch):
         """Test quota exceeded error when at limit."""
@@ -257,7 +280,7 @@ class TestRateLimitEnterExit:
             **{
                 "exists.return_value": False,
                 "setex.return_value": True,
-                "hlen.return_value": 5,  # At limit
+                "evalsha.return_value": [0, 5, 0],  # At limit
             }
         )
 
@@ -275,9 +298,7 @@ class TestRateLimitEnterExit:
             **{
                 "exists.return_value": False,
                 "setex.return_value": True,
-                "hlen.return_value": 4,  # Under limit after exit
-                "hset.return_value": True,
-                "hdel.return_value": 1,
+                "evalsha.return_value": [1, 5, 0],  # Under limit after exit
             }
         )
 
@@ -296,7 +317,7 @@ class TestRateLimitEnterExit:
             **{
                 "exists.return_value": False,
                 "setex.return_value": True,
-                "hlen.return_value": 0,
+                "evalsha.return_value": [1, 1, 0],
             }
         )
 
@@ -324,7 +345,7 @@ class TestRateLimitEnterExit:
         rate_limit = RateLimit("test_client", 0)
         rate_limit.exit(RateLimit._UNLIMITED_REQUEST_ID)
 
-        redis_patch.hdel.assert_not_called()
+        redis_patch.evalsha.assert_not_called()
 
 
 class TestRateLimitGenerator:
@@ -336,7 +357,7 @@ class TestRateLimitGenerator:
             **{
                 "exists.return_value": False,
                 "setex.return_value": True,
-                "hdel.return_value": 1,
+                "evalsha.return_value": 1,
             }
         )
 
@@ -348,7 +369,7 @@ class TestRateLimitGenerator:
         result = list(wrapped_gen)
 
         assert result == ["item1", "item2", "item3"]
-        redis_patch.hdel.assert_called_once_with("dify:rate_limit:test_client:active_requests", request_id)
+        assert _script_args(redis_patch) == [("dify:rate_limit:test_client:active_requests", request_id)]
 
     def test_should_handle_mapping_input_directly(self, sample_mapping):
         """Test direct return of mapping input."""
@@ -363,7 +384,7 @@ class TestRateLimitGenerator:
             **{
                 "exists.return_value": False,
                 "setex.return_value": True,
-                "hdel.return_value": 1,
+                "evalsha.return_value": 1,
             }
         )
 
@@ -376,7 +397,7 @@ class TestRateLimitGenerator:
         with pytest.raises(ValueError):
             list(wrapped_gen)
 
-        redis_patch.hdel.assert_called_once_with("dify:rate_limit:test_client:active_requests", request_id)
+        assert _script_args(redis_patch) == [("dify:rate_limit:test_client:active_requests", request_id)]
 
     def test_should_cleanup_on_explicit_close(self, redis_patch, sample_generator):
         """Test cleanup on explicit generator close."""
@@ -384,7 +405,7 @@ class TestRateLimitGenerator:
             **{
                 "exists.return_value": False,
                 "setex.return_value": True,
-                "hdel.return_value": 1,
+                "evalsha.return_value": 1,
             }
         )
 
@@ -395,7 +416,7 @@ class TestRateLimitGenerator:
         wrapped_gen = rate_limit.generate(generator, request_id)
         wrapped_gen.close()
 
-        redis_patch.hdel.assert_called_once()
+        redis_patch.evalsha.assert_called_once()
 
     def test_should_handle_generator_without_close_method(self, redis_patch):
         """Test handling generator without close method."""
@@ -429,7 +450,7 @@ class TestRateLimitGenerator:
         wrapped_gen = rate_limit.generate(generator, "test_request")
         wrapped_gen.close()  # Should not raise error
 
-        redis_patch.hdel.assert_called_once()
+        redis_patch.evalsha.assert_called_once()
 
     def test_should_prevent_iteration_after_close(self, redis_patch, sample_generator):
         """Test StopIteration after generator is closed."""
@@ -437,7 +458,7 @@ class TestRateLimitGenerator:
             **{
                 "exists.return_value": False,
                 "setex.return_value": True,
-                "hdel.return_value": 1,
+                "evalsha.return_value": 1,
             }
         )
 
@@ -486,23 +507,11 @@ class TestRateLimitConcurrency:
     def test_should_handle_concurrent_enter_requests(self, redis_patch):
         """Test concurrent enter requests handling."""
         # Setup mock to simulate realistic Redis behavior
-        request_count = 0
-
-        def mock_hlen(key):
-            nonlocal request_count
-            return request_count
-
-        def mock_hset(key, field, value):
-            nonlocal request_count
-            request_count += 1
-            return True
-
         redis_patch.configure_mock(
             **{
                 "exists.return_value": False,
                 "setex.return_value": True,
-                "hlen.side_effect": mock_hlen,
-                "hset.side_effect": mock_hset,
+                "evalsha.side_effect": _lease_scripts(threading.Lock(), {}),
             }
         )
 
@@ -524,9 +533,9 @@ class TestRateLimitConcurrency:
         for t in threads:
             t.join()
 
-        # Should have some successful requests and some quota exceeded
-        assert len(results) + len(errors) == 5
-        assert len(errors) > 0  # Some should be rejected
+        # Admission is atomic, so exactly the limit gets in
+        assert len(results) == 3
+        assert len(errors) == 2
 
     @patch("time.time")
     def test_should_maintain_accurate_count_under_load(self, mock_time, redis_patch):
@@ -562,38 +571,8 @@ class TestRateLimitConcurrency:
 
     def _create_mock_redis(self):
         """Create a thread-safe mock Redis for concurrency tests."""
-        import threading
-
-        lock = threading.Lock()
-        data = {}
-        hashes = {}
-
-        def mock_hlen(key):
-            with lock:
-                return len(hashes.get(key, {}))
-
-        def mock_hset(key, field, value):
-            with lock:
-                if key not in hashes:
-                    hashes[key] = {}
-                hashes[key][field] = str(value).encode("utf-8")
-                return True
-
-        def mock_hdel(key, *fields):
-            with lock:
-                if key in hashes:
-                    count = 0
-                    for field in fields:
-                        if field in hashes[key]:
-                            del hashes[key][field]
-                            count += 1
-                    return count
-                return 0
-
         return {
             "exists.return_value": False,
             "setex.return_value": True,
-            "hlen.side_effect": mock_hlen,
-            "hset.side_effect": mock_hset,
-            "hdel.side_effect": mock_hdel,
+            "evalsha.side_effect": _lease_scripts(threading.Lock(), {}),
         }
@@ -38,6 +38,7 @@ class _RepoRecorder:
     def __init__(self) -> None:
         self.saved: list[object] = []
         self.saved_exec_data: list[object] = []
+        self.flush_count = 0
 
     def save(self, entity):
         self.saved.append(entity)
@@ -45,6 +46,9 @@ class _RepoRecorder:
     def save_execution_data(self, entity):
         self.saved_exec_data.append(entity)
 
+    def flush(self):
+        self.flush_count += 1
+
 
 def _naive_utc_now() -> datetime:
     return datetime.now(UTC).replace(tzinfo=None)
@@ -358,10 +362,12 @@ class TestWorkflowPersistenceLayer:
         assert layer._next_node_sequence() == 1
         assert layer._next_node_sequence() == 2
 
-    def test_on_graph_end_is_noop(self):
-        layer, _, _, _ = _make_layer()
+    def test_on_graph_end_flushes_node_execution_repository(self):
+        layer, workflow_execution_repo, node_repo, _ = _make_layer()
 
         assert layer.on_graph_end(error=None) is None
+        assert node_repo.flush_count == 1
+        assert workflow_execution_repo.flush_count == 0
 
     def test_on_event_dispatches_to_all_known_handlers(self):
         layer, _, _, _ = _make_layer()
@@ -0,0 +1,91 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+import core.helper.plugin_declaration_cache as cache_module
+from configs import dify_config
+from core.helper.plugin_declaration_cache import (
+    PluginDeclarationCache,
+    bump_plugin_declarations_version,
+    get_or_fetch_plugin_declaration,
+    get_plugin_declaration_cache,
+)
+
+
+@pytest.fixture
+def redis_client_mock(mocker):
+    redis_client = mocker.patch("core.helper.plugin_declaration_cache.redis_client")
+    redis_client.get.return_value = None
+    return redis_client
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    cache = PluginDeclarationCache(maxsize=8, ttl=60)
+    monkeypatch.setattr(cache_module, "_plugin_declaration_cache", cache)
+    monkeypatch.setattr(dify_config, "PLUGIN_DECLARATION_CACHE_ENABLED", True)
+    return cache
+
+
+def test_get_version_defaults_to_zero(redis_client_mock):
+    assert PluginDeclarationCache.get_version("tenant-1") == 0
+
+    redis_client_mock.get.return_value = b"3"
+    assert PluginDeclarationCache.get_version("tenant-1") == 3
+    redis_client_mock.get.assert_called_with("plugin_declarations_version:tenant-1")
+
+
+def test_fetches_once_per_tenant_and_version(redis_client_mock, shared_cache):
+    fetch = MagicMock(return_value=("declaration",))
+
+    assert get_or_fetch_plugin_declaration("tenant-1", "model_providers", fetch) == ("declaration",)
+    assert get_or_fetch_plugin_declaration("tenant-1", "model_providers", fetch) == ("declaration",)
+    assert fetch.call_count == 1
+
+    get_or_fetch_plugin_declaration("tenant-2", "model_providers", fetch)
+    get_or_fetch_plugin_declaration("tenant-1", "tool_provider:a/b", fetch)
+    redis_client_mock.get.return_value = b"1"
+    get_or_fetch_plugin_declaration("tenant-1", "model_providers", fetch)
+    assert fetch.call_count == 4
+
+
+def test_fetch_errors_are_not_cached(redis_client_mock, shared_cache):
+    fetch = MagicMock(side_effect=[ValueError("daemon unavailable"), "declaration"])
+
+    with pytest.raises(ValueError):
+        get_or_fetch_plugin_declaration("tenant-1", "model_providers", fetch)
+
+    assert get_or_fetch_plugin_declaration("tenant-1", "model_providers", fetch) == "declaration"
+
+
+def test_bypasses_cache_when_version_cannot_be_read(redis_client_mock, shared_cache):
+    redis_client_mock.get.side_effect = ConnectionError("redis down")
+    fetch = MagicMock(return_value="declaration")
+
+    get_or_fetch_plugin_declaration("tenant-1", "model_providers", fetch)
+    get_or_fetch_plugin_declaration("tenant-1", "model_providers", fetch)
+
+    assert fetch.call_count == 2
+
+
+def test_bump_version_invalidates_tenant(redis_client_mock, shared_cache):
+    shared_cache.set("tenant-1", 0, "model_providers", "declaration")
+    shared_cache.set("tenant-2", 0, "model_providers", "declaration")
+
+    bump_plugin_declarations_version("tenant-1")
+
+    redis_client_mock.incr.assert_called_once_with("plugin_declarations_version:tenant-1")
+    assert shared_cache.get("tenant-1", 0, "model_providers") is None
+    assert shared_cache.get("tenant-2", 0, "model_providers") == "declaration"
+
+
+def test_disabled_by_default(redis_client_mock, monkeypatch):
+    monkeypatch.setattr(cache_module, "_plugin_declaration_cache", None)
+    fetch = MagicMock(return_value="declaration")
+
+    assert get_plugin_declaration_cache() is None
+    get_or_fetch_plugin_declaration("tenant-1", "model_providers", fetch)
+    get_or_fetch_plugin_declaration("tenant-1", "model_providers", fetch)
+
+    assert fetch.call_count == 2
+    redis_client_mock.get.assert_not_called()
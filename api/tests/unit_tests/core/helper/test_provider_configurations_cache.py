@@ -0,0 +1,160 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+import core.helper.provider_configurations_cache as cache_module
+from core.entities.provider_configuration import ProviderConfiguration, ProviderConfigurations
+from core.entities.provider_entities import CustomConfiguration, CustomProviderConfiguration, SystemConfiguration
+from core.helper.provider_configurations_cache import (
+    ProviderConfigurationsCache,
+    bump_provider_configurations_version,
+    get_provider_configurations_cache,
+)
+from graphon.model_runtime.entities.common_entities import I18nObject
+from graphon.model_runtime.entities.model_entities import ModelType
+from graphon.model_runtime.entities.provider_entities import ConfigurateMethod, ProviderEntity
+from models.provider import ProviderType
+
+
+@pytest.fixture
+def redis_client_mock(mocker):
+    return mocker.patch("core.helper.provider_configurations_cache.redis_client")
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    cache = ProviderConfigurationsCache(maxsize=8, ttl=60)
+    monkeypatch.setattr(cache_module, "_provider_configurations_cache", cache)
+    return cache
+
+
+def test_get_version_defaults_to_zero(redis_client_mock):
+    redis_client_mock.get.return_value = None
+    assert ProviderConfigurationsCache.get_version("tenant-1") == 0
+
+    redis_client_mock.get.return_value = b"3"
+    assert ProviderConfigurationsCache.get_version("tenant-1") == 3
+    redis_client_mock.get.assert_called_with("provider_configurations_version:tenant-1")
+
+
+def test_get_version_bypasses_cache_when_redis_fails(redis_client_mock):
+    redis_client_mock.get.side_effect = ConnectionError("redis down")
+
+    assert ProviderConfigurationsCache.get_version("tenant-1") is None
+
+
+def test_entries_are_keyed_by_version(redis_client_mock, shared_cache):
+    configurations = ProviderConfigurations(tenant_id="tenant-1")
+    shared_cache.set("tenant-1", 0, configurations)
+
+    assert shared_cache.get("tenant-1", 0) is configurations
+    assert shared_cache.get("tenant-1", 1) is None
+    assert shared_cache.get("tenant-2", 0) is None
+    redis_client_mock.setex.assert_not_called()
+
+    stats = shared_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+
+def test_bump_version_invalidates_tenant(redis_client_mock, shared_cache):
+    shared_cache.set("tenant-1", 0, ProviderConfigurations(tenant_id="tenant-1"))
+    shared_cache.set("tenant-2", 0, ProviderConfigurations(tenant_id="tenant-2"))
+
+    bump_provider_configurations_version("tenant-1")
+
+    redis_client_mock.incr.assert_called_once_with("provider_configurations_version:tenant-1")
+    assert shared_cache.get("tenant-1", 0) is None
+    assert shared_cache.get("tenant-2", 0) is not None
+
+
+def test_bump_version_tolerates_redis_failure(redis_client_mock, shared_cache):
+    redis_client_mock.incr.side_effect = ConnectionError("redis down")
+    shared_cache.set("tenant-1", 0, ProviderConfigurations(tenant_id="tenant-1"))
+
+    bump_provider_configurations_version("tenant-1")
+
+    assert shared_cache.get("tenant-1", 0) is None
+
+
+def test_redis_tier_round_trip(redis_client_mock):
+    stored: dict[str, str] = {}
+    redis_client_mock.setex.side_effect = lambda key, ttl, value: stored.__setitem__(key, value)
+    redis_client_mock.get.side_effect = lambda key: stored.get(key)
+    writer = ProviderConfigurationsCache(maxsize=8, ttl=60, redis_enabled=True)
+    reader = ProviderConfigurationsCache(maxsize=8, ttl=60, redis_enabled=True)
+
+    writer.set("tenant-1", 2, ProviderConfigurations(tenant_id="tenant-1"))
+    loaded = reader.get("tenant-1", 2)
+
+    assert "provider_configurations:tenant-1:2" in stored
+    assert loaded is not None
+    assert loaded.tenant_id == "tenant-1"
+    assert reader.get("tenant-1", 2) is loaded
+    assert reader.stats()["redis_hits"] == 1
+    assert reader.stats()["hits"] == 1
+
+
+def test_redis_tier_round_trip_with_provider_configurations(redis_client_mock):
+    stored: dict[str, str] = {}
+    redis_client_mock.setex.side_effect = lambda key, ttl, value: stored.__setitem__(key, value)
+    redis_client_mock.get.side_effect = lambda key: stored.get(key)
+    configurations = ProviderConfigurations(tenant_id="tenant-1")
+    with patch("core.entities.provider_configuration.original_provider_configurate_methods", {}):
+        configurations["langgenius/openai/openai"] = ProviderConfiguration(
+            tenant_id="tenant-1",
+            provider=ProviderEntity(
+                provider="langgenius/openai/openai",
+                label=I18nObject(en_US="OpenAI"),
+                supported_model_types=[ModelType.LLM],
+                configurate_methods=[ConfigurateMethod.PREDEFINED_MODEL],
+            ),
+            preferred_provider_type=ProviderType.CUSTOM,
+            using_provider_type=ProviderType.CUSTOM,
+            system_configuration=SystemConfiguration(enabled=False),
+            custom_configuration=CustomConfiguration(
+                provider=CustomProviderConfiguration(credentials={"api_key": "encrypted"}), models=[]
+            ),
+            model_settings=[],
+        )
+
+        ProviderConfigurationsCache(maxsize=8, ttl=60, redis_enabled=True).set("tenant-1", 2, configurations)
+        loaded = ProviderConfigurationsCache(maxsize=8, ttl=60, redis_enabled=True).get("tenant-1", 2)
+
+    assert loaded is not None
+    assert list(loaded.configurations) == ["langgenius/openai/openai"]
+    assert loaded["langgenius/openai/openai"] == configurations["langgenius/openai/openai"]
+    assert loaded["langgenius/openai/openai"].custom_configuration.provider.credentials == {"api_key": "encrypted"}
+
+
+def test_redis_tier_discards_undecodable_payload(redis_client_mock):
+    redis_client_mock.get.return_value = b"not json"
+    cache = ProviderConfigurationsCache(maxsize=8, ttl=60, redis_enabled=True)
+
+    assert cache.get("tenant-1", 0) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_is_disabled_by_config(monkeypatch):
+    monkeypatch.setattr(cache_module, "_provider_configurations_cache", None)
+    monkeypatch.setattr(cache_module, "dify_config", SimpleNamespace(PROVIDER_CONFIGURATIONS_CACHE_ENABLED=False))
+
+    assert get_provider_configurations_cache() is None
+
+
+def test_cache_singleton(monkeypatch):
+    monkeypatch.setattr(cache_module, "_provider_configurations_cache", None)
+    monkeypatch.setattr(
+        cache_module,
+        "dify_config",
+        SimpleNamespace(
+            PROVIDER_CONFIGURATIONS_CACHE_ENABLED=True,
+            PROVIDER_CONFIGURATIONS_CACHE_MAX_SIZE=4,
+            PROVIDER_CONFIGURATIONS_CACHE_TTL=30,
+            PROVIDER_CONFIGURATIONS_CACHE_REDIS_ENABLED=False,
+        ),
+    )
+
+    assert get_provider_configurations_cache() is get_provider_configurations_cache()
@@ -1,5 +1,6 @@
 """Comprehensive unit tests for core/memory/token_buffer_memory.py"""
 
+import math
 from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
@@ -587,6 +588,8 @@ class TestGetHistoryPromptMessages:
         msg.parent_message_id = None
 
         mock_user_file = MagicMock()
+        mock_user_file.message_id = msg.id
+        mock_user_file.belongs_to = "user"
         mock_user_prompt = UserPromptMessage(content="from build")
         mock_assistant_prompt = AssistantPromptMessage(content="answer")
 
@@ -597,12 +600,9 @@ class TestGetHistoryPromptMessages:
             if call_count["n"] == 0:
                 # messages query
                 r.all.return_value = [msg]
-            elif call_count["n"] == 1:
-                # user files
-                r.all.return_value = [mock_user_file]
             else:
-                # assistant files
-                r.all.return_value = []
+                # message files of the whole thread
+                r.all.return_value = [mock_user_file]
             call_count["n"] += 1
             return r
 
@@ -637,6 +637,8 @@ class TestGetHistoryPromptMessages:
         msg.parent_message_id = None
 
         mock_assistant_file = MagicMock()
+        mock_assistant_file.message_id = msg.id
+        mock_assistant_file.belongs_to = "assistant"
         mock_user_prompt = UserPromptMessage(content="query")
         mock_assistant_prompt = AssistantPromptMessage(content="built")
 
@@ -646,10 +648,8 @@ class TestGetHistoryPromptMessages:
             r = MagicMock()
             if call_count["n"] == 0:
                 r.all.return_value = [msg]
-            elif call_count["n"] == 1:
-                r.all.return_value = []  # no user files
             else:
-                r.all.return_value = [mock_assistant_file]
+                r.all.return_value = [mock_assistant_file]  # only assistant files
             call_count["n"] += 1
             return r
 
@@ -677,8 +677,8 @@ class TestGetHistoryPromptMessages:
         conv = _make_conversation()
         conv.app = MagicMock()
 
-        # Model returns tokens that decrease only after removing pairs
-        token_values = [3000, 1500]  # first call over limit, second within
+        # full history is over the limit, the last message is kept without counting it
+        token_values = [3000]
         mi = MagicMock()
         mi.get_llm_num_tokens.side_effect = token_values
 
@@ -700,6 +700,7 @@ class TestGetHistoryPromptMessages:
 
         with (
             patch("core.memory.token_buffer_memory.db") as mock_db,
+            patch("core.memory.token_buffer_memory.redis_client") as mock_redis,
             patch(
                 "core.memory.token_buffer_memory.extract_thread_messages",
                 return_value=[msg],
@@ -710,6 +711,7 @@ class TestGetHistoryPromptMessages:
             ),
         ):
             mock_db.session.scalars.side_effect = scalars_side_effect
+            mock_redis.get.return_value = None
             result = mem.get_history_prompt_messages(max_token_limit=2000)
 
         # After pruning, we should have fewer than the 2 initial messages
@@ -742,6 +744,7 @@ class TestGetHistoryPromptMessages:
 
         with (
             patch("core.memory.token_buffer_memory.db") as mock_db,
+            patch("core.memory.token_buffer_memory.redis_client") as mock_redis,
             patch(
                 "core.memory.token_buffer_memory.extract_thread_messages",
                 return_value=[msg],
@@ -752,6 +755,7 @@ class TestGetHistoryPromptMessages:
             ),
         ):
             mock_db.session.scalars.side_effect = scalars_side_effect
+            mock_redis.get.return_value = None
             result = mem.get_history_prompt_messages(max_token_limit=1)
 
         # At least 1 message should remain
@@ -832,6 +836,176 @@ class TestGetHistoryPromptMessages:
         assert isinstance(ai_msg, AssistantPromptMessage)
         assert ai_msg.content == "My answer"
 
+    def test_message_files_loaded_in_one_query(self):
+        """Files of the whole thread are fetched once, regardless of history length."""
+        mem = self._make_memory()
+        messages = [_make_message() for _ in range(50)]
+
+        user_file = MagicMock(message_id=messages[0].id, belongs_to=None)
+        assistant_file = MagicMock(message_id=messages[1].id, belongs_to="assistant")
+
+        with (
+            patch("core.memory.token_buffer_memory.db") as mock_db,
+            patch("core.memory.token_buffer_memory.extract_thread_messages", return_value=list(messages)),
+            patch.object(
+                mem, "_build_prompt_message_with_files", return_value=UserPromptMessage(content="built")
+            ) as mock_build,
+        ):
+            mock_db.session.scalars.return_value.all.side_effect = [messages, [user_file, assistant_file]]
+            result = mem.get_history_prompt_messages()
+
+        assert mock_db.session.scalars.call_count == 2
+        assert len(result) == 100
+        built = {(c.kwargs["message"].id, c.kwargs["is_user_message"]) for c in mock_build.call_args_list}
+        assert built == {(messages[0].id, True), (messages[1].id, False)}
+
+    @pytest.mark.parametrize("mode", [AppMode.ADVANCED_CHAT, AppMode.WORKFLOW])
+    def test_workflow_file_configs_resolved_once_per_workflow(self, mode):
+        """Workflow runs are fetched in one batch and each workflow config is converted once."""
+        mem = self._make_memory(mode)
+        messages = [_make_message() for _ in range(3)]
+        message_files = [MagicMock(message_id=message.id, belongs_to="user") for message in messages]
+        workflow_runs = [MagicMock(id=message.workflow_run_id, workflow_id="wf-1") for message in messages]
+        workflow = MagicMock(id="wf-1", features_dict={})
+        file_config = MagicMock()
+
+        mem._workflow_run_repo = MagicMock()
+        mem._workflow_run_repo.get_workflow_runs_by_ids.return_value = workflow_runs
+
+        with (
+            patch("core.memory.token_buffer_memory.db") as mock_db,
+            patch("core.memory.token_buffer_memory.extract_thread_messages", return_value=list(messages)),
+            patch(
+                "core.memory.token_buffer_memory.FileUploadConfigManager.convert", return_value=file_config
+            ) as mock_convert,
+            patch("core.memory.token_buffer_memory.file_factory.build_from_message_file"),
+            patch(
+                "core.memory.token_buffer_memory.file_manager.to_prompt_message_content",
+                return_value=ImagePromptMessageContent(
+                    url="http://example.com/img.png", format="png", mime_type="image/png"
+                ),
+            ),
+        ):
+            mock_db.session.scalars.return_value.all.side_effect = [messages, message_files, [workflow]]
+            result = mem.get_history_prompt_messages()
+
+        mem._workflow_run_repo.get_workflow_runs_by_ids.assert_called_once()
+        mem._workflow_run_repo.get_workflow_run_by_id.assert_not_called()
+        mock_db.session.scalar.assert_not_called()
+        mock_convert.assert_called_once_with({}, is_vision=False)
+        assert mock_db.session.scalars.call_count == 3
+        assert all(isinstance(message.content, list) for message in result if message.role == PromptMessageRole.USER)
+
+
+# ===========================================================================
+# Tests for _prune_prompt_messages
+# ===========================================================================
+
+
+class TestPrunePromptMessages:
+    """Tests for pruning by searching the cut with whole-suffix token counts."""
+
+    @staticmethod
+    def _count_tokens(prompt_messages) -> int:
+        # fixed prompt overhead plus the size of every message
+        return 7 + sum(len(message.content) for message in prompt_messages)
+
+    @staticmethod
+    def _prune_by_recounting(count_tokens, prompt_messages, max_token_limit):
+        """Reference: drop one message at a time and re-count the remaining list."""
+        prompt_messages = list(prompt_messages)
+        while count_tokens(prompt_messages) > max_token_limit and len(prompt_messages) > 1:
+            prompt_messages.pop(0)
+        return prompt_messages
+
+    def _make_history(self, pairs: int):
+        history = []
+        for i in range(pairs):
+            history.append(UserPromptMessage(content="q" * (10 + i)))
+            history.append(AssistantPromptMessage(content="a" * (30 + 2 * i)))
+        return history
+
+    @staticmethod
+    def _fake_redis(mock_redis):
+        store: dict[str, bytes] = {}
+        mock_redis.get.side_effect = store.get
+        mock_redis.setex.side_effect = lambda name, ttl, value: store.__setitem__(name, value.encode())
+        return store
+
+    @pytest.mark.parametrize("max_token_limit", [1, 200, 1000, 2500, 10000])
+    def test_matches_recounting_after_every_drop(self, max_token_limit):
+        mi = MagicMock()
+        mi.get_llm_num_tokens.side_effect = self._count_tokens
+        mem = TokenBufferMemory(conversation=_make_conversation(), model_instance=mi)
+        history = self._make_history(250)
+
+        with patch("core.memory.token_buffer_memory.redis_client") as mock_redis:
+            mock_redis.get.return_value = None
+            result = mem._prune_prompt_messages(history, max_token_limit)
+
+        assert result == self._prune_by_recounting(self._count_tokens, history, max_token_limit)
+        # a cold 500-message history is searched, not counted once per dropped message
+        assert mi.get_llm_num_tokens.call_count <= 2 * math.ceil(math.log2(len(history))) + 1
+
+    def test_history_that_fits_is_counted_once(self):
+        mi = MagicMock()
+        mi.get_llm_num_tokens.side_effect = self._count_tokens
+        mem = TokenBufferMemory(conversation=_make_conversation(), model_instance=mi)
+        history = self._make_history(5)
+
+        with patch("core.memory.token_buffer_memory.redis_client") as mock_redis:
+            mock_redis.get.return_value = None
+            result = mem._prune_prompt_messages(history, 10000)
+
+        assert result == history
+        mi.get_llm_num_tokens.assert_called_once_with(history)
+        mock_redis.setex.assert_not_called()
+
+    def test_next_turn_starts_from_previous_cut(self):
+        mi = MagicMock()
+        mi.get_llm_num_tokens.side_effect = self._count_tokens
+        mem = TokenBufferMemory(conversation=_make_conversation(), model_instance=mi)
+        history = self._make_history(250)
+
+        with patch("core.memory.token_buffer_memory.redis_client") as mock_redis:
+            self._fake_redis(mock_redis)
+            mem._prune_prompt_messages(history, 2500)
+            for pairs in range(251, 256):
+                mi.get_llm_num_tokens.reset_mock()
+                history = self._make_history(pairs)
+
+                result = mem._prune_prompt_messages(history, 2500)
+
+                assert result == self._prune_by_recounting(self._count_tokens, history, 2500)
+                assert mi.get_llm_num_tokens.call_count <= 5
+
+    def test_stale_cut_still_matches_recounting(self):
+        mi = MagicMock()
+        mi.get_llm_num_tokens.side_effect = self._count_tokens
+        mem = TokenBufferMemory(conversation=_make_conversation(), model_instance=mi)
+        history = self._make_history(40)
+
+        with patch("core.memory.token_buffer_memory.redis_client") as mock_redis:
+            self._fake_redis(mock_redis)
+            mem._prune_prompt_messages(history, 200)
+            # the limit was raised, the previous cut now drops too much
+            result = mem._prune_prompt_messages(history, 2500)
+
+        assert result == self._prune_by_recounting(self._count_tokens, history, 2500)
+
+    def test_cache_failures_fall_back_to_searching(self):
+        mi = MagicMock()
+        mi.get_llm_num_tokens.side_effect = self._count_tokens
+        mem = TokenBufferMemory(conversation=_make_conversation(), model_instance=mi)
+        history = self._make_history(3)
+
+        with patch("core.memory.token_buffer_memory.redis_client") as mock_redis:
+            mock_redis.get.side_effect = ConnectionError("redis down")
+            mock_redis.setex.side_effect = ConnectionError("redis down")
+            result = mem._prune_prompt_messages(history, 100)
+
+        assert result == self._prune_by_recounting(self._count_tokens, history, 100)
+
 
 # ===========================================================================
 # Tests for get_history_prompt_text
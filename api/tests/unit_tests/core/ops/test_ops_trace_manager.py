@@ -1,6 +1,8 @@
 import contextlib
 import json
 import queue
+import threading
+from collections import Counter
 from datetime import datetime, timedelta
 from types import SimpleNamespace
 from unittest.mock import MagicMock
@@ -12,6 +14,7 @@ from core.ops.ops_trace_manager import (
     TraceQueueManager,
     TraceTask,
     TraceTaskName,
+    get_trace_queue_stats,
 )
 
 
@@ -58,19 +61,21 @@ class FakeProviderMap:
         raise KeyError(f"Unsupported tracing provider: {key}")
 
 
-class DummyTimer:
-    def __init__(self, interval, function):
-        self.interval = interval
-        self.function = function
-        self.name = ""
-        self.daemon = False
+class DummyThread:
+    instances: list["DummyThread"] = []
+
+    def __init__(self, target, name, daemon):
+        self.target = target
+        self.name = name
+        self.daemon = daemon
         self.started = False
+        DummyThread.instances.append(self)
 
     def start(self):
         self.started = True
 
     def is_alive(self):
-        return False
+        return self.started
 
 
 class FakeMessageFile:
@@ -213,9 +218,13 @@ def patch_provider_map(monkeypatch):
 
 @pytest.fixture(autouse=True)
 def patch_timer_and_current_app(monkeypatch):
-    monkeypatch.setattr("core.ops.ops_trace_manager.threading.Timer", DummyTimer)
+    DummyThread.instances.clear()
+    monkeypatch.setattr("core.ops.ops_trace_manager.threading.Thread", DummyThread)
+    monkeypatch.setattr("core.ops.ops_trace_manager.atexit.register", MagicMock())
     monkeypatch.setattr("core.ops.ops_trace_manager.trace_manager_queue", queue.Queue())
-    monkeypatch.setattr("core.ops.ops_trace_manager.trace_manager_timer", None)
+    monkeypatch.setattr("core.ops.ops_trace_manager.trace_manager_flusher", None)
+    monkeypatch.setattr("core.ops.ops_trace_manager.trace_manager_flush_event", threading.Event())
+    monkeypatch.setattr("core.ops.ops_trace_manager.trace_manager_stats", Counter())
 
     class FakeApp:
         def app_context(self):
@@ -583,3 +592,124 @@ def test_trace_queue_manager_send_to_celery(monkeypatch):
     manager.send_to_celery([task])
     storage_save.assert_called_once()
     process_delay.assert_called_once_with({"file_id": "file-123", "app_id": "app-id"})
+
+
+def test_trace_queue_manager_starts_single_daemon_flusher(monkeypatch):
+    monkeypatch.setattr(
+        "core.ops.ops_trace_manager.OpsTraceManager.get_ops_trace_instance", classmethod(lambda cls, aid: True)
+    )
+    TraceQueueManager(app_id="app-1", user_id="user")
+    TraceQueueManager(app_id="app-2", user_id="user")
+
+    assert len(DummyThread.instances) == 1
+    assert DummyThread.instances[0].daemon is True
+    assert DummyThread.instances[0].started is True
+
+
+def test_trace_queue_manager_drops_when_queue_full(monkeypatch):
+    monkeypatch.setattr(
+        "core.ops.ops_trace_manager.OpsTraceManager.get_ops_trace_instance", classmethod(lambda cls, aid: True)
+    )
+    monkeypatch.setattr("core.ops.ops_trace_manager.trace_manager_queue", queue.Queue(maxsize=1))
+    monkeypatch.setattr("core.ops.ops_trace_manager.trace_manager_put_timeout", 0)
+    manager = TraceQueueManager(app_id="app-id", user_id="user")
+
+    manager.add_trace_task(TraceTask(trace_type=TraceTaskName.CONVERSATION_TRACE))
+    manager.add_trace_task(TraceTask(trace_type=TraceTaskName.CONVERSATION_TRACE))
+
+    stats = get_trace_queue_stats()
+    assert stats["enqueued"] == 1
+    assert stats["dropped"] == 1
+    assert stats["pending"] == 1
+
+
+def test_trace_queue_manager_wakes_flusher_on_full_batch(monkeypatch):
+    monkeypatch.setattr(
+        "core.ops.ops_trace_manager.OpsTraceManager.get_ops_trace_instance", classmethod(lambda cls, aid: True)
+    )
+    monkeypatch.setattr("core.ops.ops_trace_manager.trace_manager_batch_size", 2)
+    flush_event = threading.Event()
+    monkeypatch.setattr("core.ops.ops_trace_manager.trace_manager_flush_event", flush_event)
+    manager = TraceQueueManager(app_id="app-id", user_id="user")
+
+    manager.add_trace_task(TraceTask(trace_type=TraceTaskName.CONVERSATION_TRACE))
+    assert not flush_event.is_set()
+    manager.add_trace_task(TraceTask(trace_type=TraceTaskName.CONVERSATION_TRACE))
+    assert flush_event.is_set()
+
+
+def test_trace_queue_manager_flush_drains_in_batches(monkeypatch):
+    monkeypatch.setattr(
+        "core.ops.ops_trace_manager.OpsTraceManager.get_ops_trace_instance", classmethod(lambda cls, aid: True)
+    )
+    monkeypatch.setattr("core.ops.ops_trace_manager.trace_manager_batch_size", 2)
+    sent: list[int] = []
+    monkeypatch.setattr(TraceQueueManager, "send_to_celery", lambda self, tasks: sent.append(len(tasks)))
+    manager = TraceQueueManager(app_id="app-id", user_id="user")
+    for _ in range(5):
+        manager.add_trace_task(TraceTask(trace_type=TraceTaskName.CONVERSATION_TRACE))
+
+    manager.flush()
+
+    assert sent == [2, 2, 1]
+    assert get_trace_queue_stats()["pending"] == 0
+
+
+def test_trace_queue_manager_send_batch_to_celery(monkeypatch):
+    monkeypatch.setattr(
+        "core.ops.ops_trace_manager.OpsTraceManager.get_ops_trace_instance", classmethod(lambda cls, aid: True)
+    )
+    monkeypatch.setattr("core.ops.ops_trace_manager.trace_manager_batch_dispatch", True)
+    storage_save = MagicMock()
+    process_delay = MagicMock()
+    monkeypatch.setattr("core.ops.ops_trace_manager.storage.save", storage_save)
+    monkeypatch.setattr("core.ops.ops_trace_manager.process_trace_tasks.delay", process_delay)
+    monkeypatch.setattr("core.ops.ops_trace_manager.uuid4", MagicMock(return_value=SimpleNamespace(hex="batch-123")))
+
+    manager = TraceQueueManager(app_id="app-id", user_id="user")
+
+    class DummyTraceInfo:
+        def __init__(self, value):
+            self.value = value
+
+        def model_dump(self):
+            return {"trace": self.value}
+
+    class DummyTask:
+        trace_type = TraceTaskName.CONVERSATION_TRACE
+
+        def __init__(self, app_id, value=None, kwargs=None):
+            self.app_id = app_id
+            self.value = value
+            self.kwargs = kwargs or {}
+
+        def execute(self):
+            if self.value is None:
+                raise RuntimeError("boom")
+            if self.value == "empty":
+                return None
+            return DummyTraceInfo(self.value)
+
+    tasks = [
+        DummyTask("app-1", "a"),
+        DummyTask(None, "b", kwargs={"tenant_id": "t-1"}),
+        DummyTask("app-2"),
+        DummyTask(None, "c"),
+        # nothing to trace, must not produce a record the worker cannot process
+        DummyTask("app-3", "empty"),
+    ]
+    manager.send_to_celery(tasks)
+
+    storage_save.assert_called_once()
+    file_path, content = storage_save.call_args[0]
+    assert file_path == "ops_trace/batches/batch-123.ndjson"
+    lines = [json.loads(line) for line in content.decode("utf-8").split("\n")]
+    assert [(line["app_id"], line["trace_info"]) for line in lines] == [
+        ("app-1", {"trace": "a"}),
+        ("tenant-t-1", {"trace": "b"}),
+    ]
+    process_delay.assert_called_once_with({"batch_id": "batch-123", "count": 2})
+    stats = get_trace_queue_stats()
+    assert stats["flushed"] == 2
+    assert stats["failed"] == 1
+    assert stats["batches"] == 1
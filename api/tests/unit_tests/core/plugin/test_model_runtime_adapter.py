@@ -7,6 +7,7 @@ from unittest.mock import Mock, sentinel
 
 import pytest
 
+from core.helper.plugin_declaration_cache import PluginDeclarationCache
 from core.plugin.entities.plugin_daemon import PluginModelProviderEntity
 from core.plugin.impl import model_runtime as model_runtime_module
 from core.plugin.impl.model import PluginModelClient
@@ -59,6 +60,38 @@ class TestPluginModelRuntime:
         assert providers[0].label.en_us == "OpenAI"
         client.fetch_model_providers.assert_called_once_with("tenant")
 
+    def test_fetch_model_providers_shares_declarations_across_runtimes(self, mocker) -> None:
+        mocker.patch(
+            "core.helper.plugin_declaration_cache.get_plugin_declaration_cache",
+            return_value=PluginDeclarationCache(maxsize=8, ttl=60),
+        )
+        mocker.patch("core.helper.plugin_declaration_cache.redis_client").get.return_value = None
+        client = Mock(spec=PluginModelClient)
+        client.fetch_model_providers.return_value = [
+            PluginModelProviderEntity(
+                id=uuid.uuid4().hex,
+                created_at=datetime.datetime.now(),
+                updated_at=datetime.datetime.now(),
+                provider="openai",
+                tenant_id="tenant",
+                plugin_unique_identifier="langgenius/openai/openai",
+                plugin_id="langgenius/openai",
+                declaration=ProviderEntity(
+                    provider="openai",
+                    label=I18nObject(en_US="OpenAI"),
+                    supported_model_types=[],
+                    configurate_methods=[ConfigurateMethod.PREDEFINED_MODEL],
+                ),
+            )
+        ]
+
+        first = PluginModelRuntime(tenant_id="tenant", user_id="user", client=client).fetch_model_providers()
+        second = PluginModelRuntime(tenant_id="tenant", user_id=None, client=client).fetch_model_providers()
+
+        assert [provider.provider for provider in second] == ["langgenius/openai/openai"]
+        assert first[0] is not second[0]
+        client.fetch_model_providers.assert_called_once_with("tenant")
+
     def test_fetch_model_providers_only_exposes_short_name_for_canonical_provider(self) -> None:
         client = Mock(spec=PluginModelClient)
         client.fetch_model_providers.return_value = [
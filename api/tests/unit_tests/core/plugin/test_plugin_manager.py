@@ -298,6 +298,44 @@ class TestPluginLoading:
             assert result is True
             mock_request.assert_called_once()
 
+    def test_uninstall_plugin_invalidates_cached_declarations(self, plugin_installer):
+        """Test that uninstalling a plugin invalidates the tenant's cached provider declarations."""
+        with (
+            patch.object(plugin_installer, "_request_with_plugin_daemon_response", return_value=True),
+            patch("core.plugin.impl.plugin.bump_plugin_declarations_version") as mock_bump,
+        ):
+            plugin_installer.uninstall("test-tenant", "install-123")
+
+            mock_bump.assert_called_once_with("test-tenant")
+
+    @pytest.mark.parametrize(
+        ("status", "invalidated"),
+        [
+            (PluginInstallTaskStatus.Running, False),
+            (PluginInstallTaskStatus.Success, True),
+            (PluginInstallTaskStatus.Failed, True),
+        ],
+    )
+    def test_finished_installation_task_invalidates_cached_declarations(self, plugin_installer, status, invalidated):
+        """Test that polling a finished installation task invalidates the tenant's cached provider declarations."""
+        mock_task = PluginInstallTask(
+            id="task-123",
+            created_at=datetime.datetime.now(),
+            updated_at=datetime.datetime.now(),
+            status=status,
+            total_plugins=1,
+            completed_plugins=1,
+            plugins=[],
+        )
+
+        with (
+            patch.object(plugin_installer, "_request_with_plugin_daemon_response", return_value=mock_task),
+            patch("core.plugin.impl.plugin.bump_plugin_declarations_version") as mock_bump,
+        ):
+            plugin_installer.fetch_plugin_installation_task("test-tenant", "task-123")
+
+            assert mock_bump.called is invalidated
+
     def test_upgrade_plugin_success(self, plugin_installer):
         """Test successful plugin upgrade."""
         # Arrange: Mock upgrade response
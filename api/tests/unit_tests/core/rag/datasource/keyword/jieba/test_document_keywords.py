@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from cachetools import LRUCache
+
+import core.rag.datasource.keyword.jieba.document_keywords as document_keywords_module
+from core.rag.datasource.keyword.jieba.document_keywords import (
+    clear_document_keywords_cache,
+    get_document_keywords,
+)
+from core.rag.models.document import Document
+
+
+@pytest.fixture
+def keywords_cache(monkeypatch):
+    cache: LRUCache[str, tuple[str, ...]] = LRUCache(maxsize=2)
+    monkeypatch.setattr(document_keywords_module, "_keywords_cache", cache)
+    monkeypatch.setattr(document_keywords_module, "dify_config", SimpleNamespace(DOCUMENT_KEYWORDS_CACHE_MAX_SIZE=2))
+    return cache
+
+
+@pytest.fixture
+def handler():
+    handler = MagicMock()
+    handler.extract_keywords.side_effect = lambda text, _: {f"kw-{text}"}
+    return handler
+
+
+def test_ignores_index_time_keywords(keywords_cache, handler):
+    document = Document(page_content="text", metadata={"doc_hash": "h1", "keywords": ["a", "b"]})
+
+    assert get_document_keywords(handler, document) == ["kw-text"]
+    handler.extract_keywords.assert_called_once_with("text", None)
+
+
+def test_tokenizes_once_per_segment_hash(keywords_cache, handler):
+    first = Document(page_content="one", metadata={"doc_hash": "h1", "keywords": []})
+    again = Document(page_content="one", metadata={"doc_hash": "h1"})
+
+    assert get_document_keywords(handler, first) == ["kw-one"]
+    assert get_document_keywords(handler, again) == ["kw-one"]
+    handler.extract_keywords.assert_called_once_with("one", None)
+    assert keywords_cache["h1"] == ("kw-one",)
+
+
+def test_cache_is_bounded(keywords_cache, handler):
+    for i in range(3):
+        get_document_keywords(handler, Document(page_content=str(i), metadata={"doc_hash": f"h{i}"}))
+
+    assert list(keywords_cache.keys()) == ["h1", "h2"]
+
+
+def test_documents_without_hash_are_not_cached(keywords_cache, handler):
+    document = Document(page_content="one", metadata={"doc_id": "node-1"})
+
+    get_document_keywords(handler, document)
+    get_document_keywords(handler, document)
+
+    assert handler.extract_keywords.call_count == 2
+    assert len(keywords_cache) == 0
+
+
+def test_cache_can_be_disabled(monkeypatch, handler):
+    monkeypatch.setattr(document_keywords_module, "_keywords_cache", None)
+    monkeypatch.setattr(document_keywords_module, "dify_config", SimpleNamespace(DOCUMENT_KEYWORDS_CACHE_MAX_SIZE=0))
+    document = Document(page_content="one", metadata={"doc_hash": "h1"})
+
+    get_document_keywords(handler, document)
+    get_document_keywords(handler, document)
+
+    assert handler.extract_keywords.call_count == 2
+    assert document_keywords_module._keywords_cache is None
+
+
+def test_clear_document_keywords_cache(keywords_cache, handler):
+    get_document_keywords(handler, Document(page_content="one", metadata={"doc_hash": "h1"}))
+
+    clear_document_keywords_cache()
+
+    assert len(keywords_cache) == 0
@@ -0,0 +1,166 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+import core.rag.datasource.keyword.jieba.jieba_postings as postings_module
+from core.rag.datasource.keyword.jieba.jieba_postings import JiebaPostings
+from core.rag.models.document import Document
+
+
+def _dataset(dataset_keyword_table=None, keyword_number=None):
+    return SimpleNamespace(
+        id="dataset-1",
+        tenant_id="tenant-1",
+        keyword_number=keyword_number,
+        dataset_keyword_table=dataset_keyword_table,
+    )
+
+
+@pytest.fixture
+def patched_runtime(monkeypatch):
+    session = MagicMock()
+    pg_insert = MagicMock()
+    handler = MagicMock()
+    monkeypatch.setattr(postings_module, "db", SimpleNamespace(session=session))
+    monkeypatch.setattr(postings_module, "pg_insert", pg_insert)
+    monkeypatch.setattr(postings_module, "dify_config", SimpleNamespace(SQLALCHEMY_DATABASE_URI_SCHEME="postgresql"))
+    monkeypatch.setattr(postings_module, "JiebaKeywordTableHandler", lambda: handler)
+    return SimpleNamespace(session=session, pg_insert=pg_insert, handler=handler)
+
+
+def _inserted_postings(pg_insert: MagicMock) -> set[tuple[str, str]]:
+    postings = set()
+    for call in pg_insert.return_value.values.call_args_list:
+        for row in call.args[0]:
+            assert row["dataset_id"] == "dataset-1"
+            postings.add((row["keyword"], row["index_node_id"]))
+    return postings
+
+
+def test_add_texts_inserts_postings_and_updates_segments(patched_runtime):
+    segment = SimpleNamespace(index_node_id="node-1", keywords=None)
+    patched_runtime.session.scalars.return_value.all.return_value = [segment]
+    patched_runtime.handler.extract_keywords.return_value = {"kw1", "kw2"}
+    keyword = JiebaPostings(_dataset(keyword_number=2))
+
+    keyword.add_texts(
+        [
+            Document(page_content="alpha", metadata={"doc_id": "node-1"}),
+            Document(page_content="beta", metadata={"doc_id": "node-2"}),
+        ],
+        keywords_list=[None, ["kw3", "kw3"]],
+    )
+
+    assert set(segment.keywords) == {"kw1", "kw2"}
+    assert _inserted_postings(patched_runtime.pg_insert) == {("kw1", "node-1"), ("kw2", "node-1"), ("kw3", "node-2")}
+    patched_runtime.pg_insert.return_value.values.return_value.on_conflict_do_nothing.assert_called_once_with(
+        index_elements=["dataset_id", "keyword", "index_node_id"]
+    )
+    patched_runtime.handler.extract_keywords.assert_called_once_with("alpha", 2)
+    patched_runtime.session.execute.assert_called_once()
+    patched_runtime.session.commit.assert_called_once()
+
+
+def test_create_returns_self(patched_runtime):
+    patched_runtime.session.scalars.return_value.all.return_value = []
+    patched_runtime.handler.extract_keywords.return_value = {"kw"}
+    keyword = JiebaPostings(_dataset())
+
+    assert keyword.create([Document(page_content="alpha", metadata={"doc_id": "node-1"})]) is keyword
+
+
+def test_add_texts_without_metadata_is_noop(patched_runtime):
+    keyword = JiebaPostings(_dataset())
+
+    keyword.add_texts([SimpleNamespace(page_content="ignored", metadata=None)])
+
+    patched_runtime.session.execute.assert_not_called()
+    patched_runtime.session.commit.assert_not_called()
+
+
+def test_text_exists_reads_single_posting(patched_runtime):
+    keyword = JiebaPostings(_dataset())
+
+    patched_runtime.session.scalar.return_value = "posting-1"
+    assert keyword.text_exists("node-1") is True
+
+    patched_runtime.session.scalar.return_value = None
+    assert keyword.text_exists("node-2") is False
+
+
+def test_delete_by_ids_deletes_only_given_nodes(patched_runtime):
+    keyword = JiebaPostings(_dataset())
+
+    keyword.delete_by_ids([])
+    patched_runtime.session.execute.assert_not_called()
+
+    keyword.delete_by_ids(["node-1", "node-2"])
+    patched_runtime.session.execute.assert_called_once()
+    patched_runtime.session.commit.assert_called_once()
+
+
+def test_delete_removes_legacy_keyword_table(monkeypatch, patched_runtime):
+    legacy_jieba = MagicMock()
+    monkeypatch.setattr(postings_module, "Jieba", MagicMock(return_value=legacy_jieba))
+    keyword = JiebaPostings(_dataset(dataset_keyword_table=SimpleNamespace()))
+
+    keyword.delete()
+
+    patched_runtime.session.execute.assert_called_once()
+    legacy_jieba.delete.assert_called_once()
+
+
+def test_search_ranks_by_matching_keywords(patched_runtime):
+    patched_runtime.handler.extract_keywords.return_value = {"kw1", "kw2"}
+    patched_runtime.session.execute.return_value = [
+        SimpleNamespace(index_node_id="node-2", hits=2),
+        SimpleNamespace(index_node_id="node-1", hits=1),
+    ]
+    patched_runtime.session.scalars.return_value.all.return_value = [
+        SimpleNamespace(
+            index_node_id="node-1", content="one", index_node_hash="h1", document_id="doc-1", dataset_id="dataset-1"
+        ),
+        SimpleNamespace(
+            index_node_id="node-2", content="two", index_node_hash="h2", document_id="doc-2", dataset_id="dataset-1"
+        ),
+    ]
+    keyword = JiebaPostings(_dataset())
+
+    documents = keyword.search("query", top_k=2, document_ids_filter=["doc-1", "doc-2"])
+
+    assert [document.page_content for document in documents] == ["two", "one"]
+    assert documents[0].metadata == {
+        "doc_id": "node-2",
+        "doc_hash": "h2",
+        "document_id": "doc-2",
+        "dataset_id": "dataset-1",
+    }
+    patched_runtime.session.execute.assert_called_once()
+
+
+def test_search_without_keywords_skips_database(patched_runtime):
+    patched_runtime.handler.extract_keywords.return_value = set()
+    keyword = JiebaPostings(_dataset())
+
+    assert keyword.search("query") == []
+    patched_runtime.session.execute.assert_not_called()
+    patched_runtime.session.scalars.assert_not_called()
+
+
+def test_migrate_from_keyword_table_copies_blob(patched_runtime):
+    keyword_table = SimpleNamespace(
+        keyword_table_dict={"__data__": {"table": {"kw1": {"node-1", "node-2"}, "kw2": {"node-1"}}}}
+    )
+    keyword = JiebaPostings(_dataset(dataset_keyword_table=keyword_table))
+
+    assert keyword.migrate_from_keyword_table() == 3
+    assert _inserted_postings(patched_runtime.pg_insert) == {("kw1", "node-1"), ("kw1", "node-2"), ("kw2", "node-1")}
+    patched_runtime.session.commit.assert_called_once()
+
+
+def test_migrate_from_keyword_table_without_blob(patched_runtime):
+    keyword = JiebaPostings(_dataset())
+
+    assert keyword.migrate_from_keyword_table() == 0
+    patched_runtime.session.execute.assert_not_called()
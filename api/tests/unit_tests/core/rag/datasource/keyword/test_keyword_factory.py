@@ -22,6 +22,18 @@ def test_get_keyword_factory_returns_jieba_factory(monkeypatch):
     assert Keyword.get_keyword_factory(KeyWordType.JIEBA) is FakeJieba
 
 
+def test_get_keyword_factory_returns_jieba_postings_factory(monkeypatch):
+    fake_module = types.ModuleType("core.rag.datasource.keyword.jieba.jieba_postings")
+
+    class FakeJiebaPostings:
+        pass
+
+    fake_module.JiebaPostings = FakeJiebaPostings
+    monkeypatch.setitem(sys.modules, "core.rag.datasource.keyword.jieba.jieba_postings", fake_module)
+
+    assert Keyword.get_keyword_factory(KeyWordType.JIEBA_POSTINGS) is FakeJiebaPostings
+
+
 def test_get_keyword_factory_raises_for_unsupported_type():
     with pytest.raises(ValueError, match="Keyword store unsupported is not supported"):
         Keyword.get_keyword_factory("unsupported")
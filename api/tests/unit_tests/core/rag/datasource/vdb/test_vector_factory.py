@@ -254,21 +254,22 @@ def test_create_batches_texts_and_skips_empty_input(vector_factory_module):
     vector._vector_processor = MagicMock()
 
     docs = [Document(page_content=f"doc-{i}", metadata={"doc_id": f"id-{i}"}) for i in range(1001)]
-    vector._embeddings.embed_documents.side_effect = [
-        [[0.1] for _ in range(1000)],
-        [[0.2]],
+    vector._embeddings.embed_documents_with_usage.side_effect = [
+        ([[0.1] for _ in range(1000)], 3000),
+        ([[0.2]], 3),
     ]
 
-    vector.create(texts=docs, trace_id="trace-1")
+    tokens = vector.create(texts=docs, trace_id="trace-1")
 
-    assert vector._embeddings.embed_documents.call_count == 2
+    assert tokens == 3003
+    assert vector._embeddings.embed_documents_with_usage.call_count == 2
     assert vector._vector_processor.create.call_count == 2
     assert vector._vector_processor.create.call_args_list[0].kwargs["trace_id"] == "trace-1"
 
-    vector._embeddings.embed_documents.reset_mock()
+    vector._embeddings.embed_documents_with_usage.reset_mock()
     vector._vector_processor.create.reset_mock()
-    vector.create(texts=None)
-    vector._embeddings.embed_documents.assert_not_called()
+    assert vector.create(texts=None) == 0
+    vector._embeddings.embed_documents_with_usage.assert_not_called()
     vector._vector_processor.create.assert_not_called()
 
 
@@ -333,9 +334,9 @@ def test_add_texts_with_optional_duplicate_check(vector_factory_module):
         Document(page_content="b", metadata={"doc_id": "id-2"}),
     ]
     vector._filter_duplicate_texts.return_value = [docs[0]]
-    vector._embeddings.embed_documents.return_value = [[0.1]]
+    vector._embeddings.embed_documents_with_usage.return_value = ([[0.1]], 1)
 
-    vector.add_texts(docs, duplicate_check=True, flag=True)
+    assert vector.add_texts(docs, duplicate_check=True, flag=True) == 1
 
     vector._filter_duplicate_texts.assert_called_once_with(docs)
     vector._vector_processor.create.assert_called_once_with(
@@ -344,7 +345,7 @@ def test_add_texts_with_optional_duplicate_check(vector_factory_module):
 
     vector._filter_duplicate_texts.reset_mock()
     vector._vector_processor.create.reset_mock()
-    vector._embeddings.embed_documents.return_value = [[0.2], [0.3]]
+    vector._embeddings.embed_documents_with_usage.return_value = ([[0.2], [0.3]], 2)
 
     vector.add_texts(docs, duplicate_check=False)
 
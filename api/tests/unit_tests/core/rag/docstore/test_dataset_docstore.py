@@ -225,6 +225,41 @@ class TestDatasetDocumentStoreAddDocuments:
 
                     mock_db.session.commit.assert_called()
 
+    def test_add_documents_without_commit(self):
+        """Test that commit=False leaves committing the saved documents to the caller."""
+
+        mock_dataset = MagicMock(spec=Dataset)
+        mock_dataset.id = "test-dataset-id"
+        mock_dataset.tenant_id = "tenant-1"
+        mock_dataset.indexing_technique = "economy"
+        mock_dataset.embedding_model_provider = None
+        mock_dataset.embedding_model = None
+
+        mock_docs = []
+        for index in range(2):
+            mock_doc = MagicMock(spec=Document)
+            mock_doc.page_content = f"Content {index}"
+            mock_doc.metadata = {"doc_id": f"doc-{index}", "doc_hash": f"hash-{index}"}
+            mock_doc.attachments = None
+            mock_doc.children = None
+            mock_docs.append(mock_doc)
+
+        with patch("core.rag.docstore.dataset_docstore.db") as mock_db:
+            mock_db.session.scalar.return_value = None
+
+            with patch.object(DatasetDocumentStore, "get_document_segment", return_value=None):
+                with patch.object(DatasetDocumentStore, "add_multimodel_documents_binding"):
+                    store = DatasetDocumentStore(
+                        dataset=mock_dataset,
+                        user_id="test-user-id",
+                        document_id="test-doc-id",
+                    )
+
+                    store.add_documents(mock_docs, commit=False)
+
+                    assert mock_db.session.add.call_count == 2
+                    mock_db.session.commit.assert_not_called()
+
     def test_add_documents_raises_when_not_allowed(self):
         """Test that adding existing doc without allow_update raises ValueError."""
 
@@ -7,6 +7,7 @@ This test file covers the methods not fully tested in test_embedding_service.py:
 """
 
 import base64
+import math
 from decimal import Decimal
 from unittest.mock import Mock, patch
 
@@ -15,8 +16,10 @@ import pytest
 from sqlalchemy.exc import IntegrityError
 
 from core.rag.embedding.cached_embedding import CacheEmbedding
+from core.rag.embedding.embedding_codec import is_encoded_embedding
 from graphon.model_runtime.entities.model_entities import ModelPropertyKey
 from graphon.model_runtime.entities.text_embedding_entities import EmbeddingResult, EmbeddingUsage
+from libs import helper
 from models.dataset import Embedding
 
 
@@ -69,7 +72,7 @@ class TestCacheEmbeddingMultimodalDocuments:
         documents = [{"file_id": "file123", "content": "test content"}]
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_multimodal_embedding.return_value = sample_multimodal_result
 
             result = cache_embedding.embed_multimodal_documents(documents)
@@ -79,7 +82,7 @@ class TestCacheEmbeddingMultimodalDocuments:
             assert len(result[0]) == 1536
 
             mock_model_instance.invoke_multimodal_embedding.assert_called_once()
-            mock_session.add.assert_called_once()
+            mock_session.execute.assert_called_once()
             mock_session.commit.assert_called_once()
 
     def test_embed_multiple_multimodal_documents_cache_miss(self, mock_model_instance):
@@ -114,7 +117,7 @@ class TestCacheEmbeddingMultimodalDocuments:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_multimodal_embedding.return_value = embedding_result
 
             result = cache_embedding.embed_multimodal_documents(documents)
@@ -134,7 +137,8 @@ class TestCacheEmbeddingMultimodalDocuments:
         mock_cached_embedding.get_embedding.return_value = normalized_cached
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = mock_cached_embedding
+            mock_cached_embedding.hash = "file123"
+            mock_session.scalars.return_value.all.return_value = [mock_cached_embedding]
 
             result = cache_embedding.embed_multimodal_documents(documents)
 
@@ -180,7 +184,8 @@ class TestCacheEmbeddingMultimodalDocuments:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.side_effect = [mock_cached_embedding, None, None]
+            mock_cached_embedding.hash = "cached_file"
+            mock_session.scalars.return_value.all.return_value = [mock_cached_embedding]
             mock_model_instance.invoke_multimodal_embedding.return_value = embedding_result
 
             result = cache_embedding.embed_multimodal_documents(documents)
@@ -213,7 +218,7 @@ class TestCacheEmbeddingMultimodalDocuments:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_multimodal_embedding.return_value = embedding_result
 
             with patch("core.rag.embedding.cached_embedding.logger") as mock_logger:
@@ -254,7 +259,7 @@ class TestCacheEmbeddingMultimodalDocuments:
             )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
 
             batch_results = [create_batch_result(10), create_batch_result(10), create_batch_result(5)]
             mock_model_instance.invoke_multimodal_embedding.side_effect = batch_results
@@ -270,7 +275,7 @@ class TestCacheEmbeddingMultimodalDocuments:
         documents = [{"file_id": "file123"}]
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_multimodal_embedding.side_effect = Exception("API Error")
 
             with pytest.raises(Exception) as exc_info:
@@ -287,7 +292,7 @@ class TestCacheEmbeddingMultimodalDocuments:
         documents = [{"file_id": "file123"}]
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_multimodal_embedding.return_value = sample_multimodal_result
 
             mock_session.commit.side_effect = IntegrityError("Duplicate key", None, None)
@@ -336,7 +341,7 @@ class TestCacheEmbeddingMultimodalQuery:
         )
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
-            mock_redis.get.return_value = None
+            mock_redis.get_and_expire.return_value = None
             mock_model_instance.invoke_multimodal_embedding.return_value = embedding_result
 
             result = cache_embedding.embed_multimodal_query(document)
@@ -345,6 +350,34 @@ class TestCacheEmbeddingMultimodalQuery:
             assert len(result) == 1536
             mock_redis.setex.assert_called_once()
 
+    @pytest.mark.parametrize(
+        ("binary_format", "expected_key"),
+        [(False, "openai_vision-embedding-model_file123"), (True, "openai_vision-embedding-model_file123:v1")],
+    )
+    def test_embed_multimodal_query_cache_format(self, mock_model_instance, binary_format, expected_key):
+        """Test binary query embeddings are only written, under a versioned key, once the format is enabled."""
+        cache_embedding = CacheEmbedding(mock_model_instance)
+        vector = np.random.randn(8)
+        normalized = vector / np.linalg.norm(vector)
+        mock_model_instance.invoke_multimodal_embedding.return_value = Mock(embeddings=[normalized.tolist()])
+
+        with (
+            patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis,
+            patch(
+                "core.rag.embedding.cached_embedding.dify_config.EMBEDDING_CACHE_BINARY_FORMAT_ENABLED", binary_format
+            ),
+        ):
+            mock_redis.get_and_expire.return_value = None
+
+            cache_embedding.embed_multimodal_query({"file_id": "file123"})
+
+            mock_redis.get_and_expire.assert_called_once_with(expected_key, 600)
+            key, _, value = mock_redis.setex.call_args.args
+            assert key == expected_key
+            assert is_encoded_embedding(value) is binary_format
+            if not binary_format:
+                np.testing.assert_allclose(np.frombuffer(base64.b64decode(value), dtype="float"), normalized)
+
     def test_embed_multimodal_query_cache_hit(self, mock_model_instance):
         """Test embedding multimodal query when Redis cache has the value."""
         cache_embedding = CacheEmbedding(mock_model_instance)
@@ -355,13 +388,13 @@ class TestCacheEmbeddingMultimodalQuery:
         encoded_vector = base64.b64encode(vector_bytes).decode("utf-8")
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
-            mock_redis.get.return_value = encoded_vector.encode()
+            mock_redis.get_and_expire.return_value = encoded_vector.encode()
 
             result = cache_embedding.embed_multimodal_query(document)
 
             assert isinstance(result, list)
             assert len(result) == 1536
-            mock_redis.expire.assert_called_once()
+            mock_redis.get_and_expire.assert_called_once()
             mock_model_instance.invoke_multimodal_embedding.assert_not_called()
 
     def test_embed_multimodal_query_nan_handling(self, mock_model_instance):
@@ -389,7 +422,7 @@ class TestCacheEmbeddingMultimodalQuery:
         document = {"file_id": "file123"}
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
-            mock_redis.get.return_value = None
+            mock_redis.get_and_expire.return_value = None
             mock_model_instance.invoke_multimodal_embedding.return_value = embedding_result
 
             with pytest.raises(ValueError) as exc_info:
@@ -403,7 +436,7 @@ class TestCacheEmbeddingMultimodalQuery:
         document = {"file_id": "file123"}
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
-            mock_redis.get.return_value = None
+            mock_redis.get_and_expire.return_value = None
             mock_model_instance.invoke_multimodal_embedding.side_effect = Exception("API Error")
 
             with patch("core.rag.embedding.cached_embedding.dify_config") as mock_config:
@@ -439,12 +472,13 @@ class TestCacheEmbeddingMultimodalQuery:
         )
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
-            mock_redis.get.return_value = None
+            mock_redis.get_and_expire.return_value = None
             mock_model_instance.invoke_multimodal_embedding.return_value = embedding_result
             mock_redis.setex.side_effect = RuntimeError("Redis Error")
 
             with patch("core.rag.embedding.cached_embedding.dify_config") as mock_config:
                 mock_config.DEBUG = True
+                mock_config.EMBEDDING_CACHE_STORAGE_DTYPE = "float32"
 
                 with pytest.raises(RuntimeError):
                     cache_embedding.embed_multimodal_query(document)
@@ -469,7 +503,7 @@ class TestCacheEmbeddingQueryErrors:
         query = "test query"
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
-            mock_redis.get.return_value = None
+            mock_redis.get_and_expire.return_value = None
             mock_model_instance.invoke_text_embedding.side_effect = RuntimeError("API Error")
 
             with patch("core.rag.embedding.cached_embedding.dify_config") as mock_config:
@@ -507,12 +541,13 @@ class TestCacheEmbeddingQueryErrors:
         )
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
-            mock_redis.get.return_value = None
+            mock_redis.get_and_expire.return_value = None
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
             mock_redis.setex.side_effect = RuntimeError("Redis Error")
 
             with patch("core.rag.embedding.cached_embedding.dify_config") as mock_config:
                 mock_config.DEBUG = True
+                mock_config.EMBEDDING_CACHE_STORAGE_DTYPE = "float32"
 
                 with patch("core.rag.embedding.cached_embedding.logger") as mock_logger:
                     with pytest.raises(RuntimeError):
@@ -521,6 +556,175 @@ class TestCacheEmbeddingQueryErrors:
                     mock_logger.exception.assert_called()
 
 
+class TestCacheEmbeddingBatchedCache:
+    """Test suite for the batched database cache path of CacheEmbedding."""
+
+    @pytest.fixture
+    def mock_model_instance(self):
+        """Create a mock ModelInstance that embeds any batch of texts."""
+        model_instance = Mock()
+        model_instance.model = "text-embedding-ada-002"
+        model_instance.model_name = "text-embedding-ada-002"
+        model_instance.provider = "openai"
+        model_instance.credentials = {"api_key": "test-key"}
+
+        model_type_instance = Mock()
+        model_instance.model_type_instance = model_type_instance
+
+        model_schema = Mock()
+        model_schema.model_properties = {ModelPropertyKey.MAX_CHUNKS: 100}
+        model_type_instance.get_model_schema.return_value = model_schema
+
+        usage = EmbeddingUsage(
+            tokens=1,
+            total_tokens=1,
+            unit_price=Decimal("0.0001"),
+            price_unit=Decimal(1000),
+            total_price=Decimal("0.0000001"),
+            currency="USD",
+            latency=0.1,
+        )
+
+        def invoke_text_embedding(texts, input_type):
+            return EmbeddingResult(
+                model="text-embedding-ada-002",
+                embeddings=[np.random.randn(8).tolist() for _ in texts],
+                usage=usage,
+            )
+
+        model_instance.invoke_text_embedding.side_effect = invoke_text_embedding
+        return model_instance
+
+    def test_cache_lookup_uses_single_query_for_small_batches(self, mock_model_instance):
+        """Test all hashes of a batch are resolved with one IN query."""
+        cache_embedding = CacheEmbedding(mock_model_instance)
+        texts = [f"text {i}" for i in range(50)]
+
+        cached = Mock(spec=Embedding)
+        cached.hash = helper.generate_text_hash(texts[0])
+        cached.get_embedding.return_value = [1.0] * 8
+
+        with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
+            mock_session.scalars.return_value.all.return_value = [cached]
+
+            result = cache_embedding.embed_documents(texts)
+
+            assert len(result) == 50
+            assert result[0] == [1.0] * 8
+            mock_session.scalars.assert_called_once()
+            mock_session.scalar.assert_not_called()
+            mock_session.execute.assert_called_once()
+            mock_session.commit.assert_called_once()
+
+    def test_embed_documents_with_usage_counts_embedding_calls_only(self, mock_model_instance):
+        """Test tokens come from the usage of the embedding calls, cached texts cost nothing."""
+        cache_embedding = CacheEmbedding(mock_model_instance)
+        texts = [f"text {i}" for i in range(150)]
+
+        cached = Mock(spec=Embedding)
+        cached.hash = helper.generate_text_hash(texts[0])
+        cached.get_embedding.return_value = [1.0] * 8
+
+        with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
+            mock_session.scalars.return_value.all.return_value = [cached]
+            embeddings, tokens = cache_embedding.embed_documents_with_usage(texts)
+
+            assert len(embeddings) == 150
+            # 149 misses embedded in two calls of 1 token each
+            assert tokens == 2
+
+            mock_session.scalars.return_value.all.return_value = [cached]
+            _, tokens = cache_embedding.embed_documents_with_usage(texts[:1])
+            assert tokens == 0
+
+    def test_cache_writes_deduplicated_rows_with_conflict_skip(self, mock_model_instance):
+        """Test misses are written once per hash with ON CONFLICT DO NOTHING."""
+        cache_embedding = CacheEmbedding(mock_model_instance)
+        texts = ["duplicate", "duplicate", "unique"]
+
+        with (
+            patch("core.rag.embedding.cached_embedding.db.session") as mock_session,
+            patch("core.rag.embedding.cached_embedding.dify_config") as mock_config,
+            patch("core.rag.embedding.cached_embedding.pg_insert") as mock_pg_insert,
+        ):
+            mock_config.SQLALCHEMY_DATABASE_URI_SCHEME = "postgresql"
+            mock_config.EMBEDDING_CACHE_STORAGE_DTYPE = "float32"
+            mock_session.scalars.return_value.all.return_value = []
+
+            result = cache_embedding.embed_documents(texts)
+
+            assert len(result) == 3
+            rows = mock_pg_insert.return_value.values.call_args.args[0]
+            assert [row["hash"] for row in rows] == [
+                helper.generate_text_hash("duplicate"),
+                helper.generate_text_hash("unique"),
+            ]
+            mock_pg_insert.return_value.values.return_value.on_conflict_do_nothing.assert_called_once_with(
+                index_elements=["model_name", "hash", "provider_name"]
+            )
+            mock_session.execute.assert_called_once()
+
+    def test_cache_writes_use_insert_ignore_on_mysql(self, mock_model_instance):
+        """Test MySQL-compatible databases skip duplicates with INSERT IGNORE."""
+        cache_embedding = CacheEmbedding(mock_model_instance)
+
+        with (
+            patch("core.rag.embedding.cached_embedding.db.session") as mock_session,
+            patch("core.rag.embedding.cached_embedding.dify_config") as mock_config,
+            patch("core.rag.embedding.cached_embedding.mysql_insert") as mock_mysql_insert,
+        ):
+            mock_config.SQLALCHEMY_DATABASE_URI_SCHEME = "mysql+pymysql"
+            mock_config.EMBEDDING_CACHE_STORAGE_DTYPE = "float32"
+            mock_session.scalars.return_value.all.return_value = []
+
+            cache_embedding.embed_documents(["text"])
+
+            mock_mysql_insert.return_value.values.return_value.prefix_with.assert_called_once_with("IGNORE")
+            mock_session.execute.assert_called_once()
+
+    def test_embed_multimodal_documents_uses_batched_cache(self):
+        """Test multimodal documents resolve their file ids with one IN query."""
+        model_instance = Mock()
+        model_instance.model_name = "vision-embedding-model"
+        model_instance.provider = "openai"
+
+        cache_embedding = CacheEmbedding(model_instance)
+        documents = [{"file_id": f"file{i}"} for i in range(5)]
+
+        cached_rows = []
+        for document in documents:
+            cached = Mock(spec=Embedding)
+            cached.hash = document["file_id"]
+            cached.get_embedding.return_value = [0.5] * 4
+            cached_rows.append(cached)
+
+        with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
+            mock_session.scalars.return_value.all.return_value = cached_rows
+
+            result = cache_embedding.embed_multimodal_documents(documents)
+
+            assert result == [[0.5] * 4] * 5
+            mock_session.scalars.assert_called_once()
+            mock_session.execute.assert_not_called()
+            model_instance.invoke_multimodal_embedding.assert_not_called()
+
+    @pytest.mark.parametrize("chunk_count", [100, 1000, 5000])
+    def test_query_count_grows_with_batches_not_chunks(self, mock_model_instance, chunk_count):
+        """Cache round trips stay within one query per lookup batch plus one statement per insert batch."""
+        cache_embedding = CacheEmbedding(mock_model_instance)
+        texts = [f"chunk {i}" for i in range(chunk_count)]
+
+        with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
+            mock_session.scalars.return_value.all.return_value = []
+
+            result = cache_embedding.embed_documents(texts)
+
+            assert len(result) == chunk_count
+            assert mock_session.scalar.call_count == 0
+            assert mock_session.scalars.call_count == math.ceil(chunk_count / 1000)
+            assert mock_session.execute.call_count == math.ceil(chunk_count / 500)
+
+
 class TestCacheEmbeddingInitialization:
     """Test suite for CacheEmbedding initialization."""
 
@@ -0,0 +1,99 @@
+"""Unit tests for the binary embedding cache codec."""
+
+import base64
+import pickle
+
+import numpy as np
+import pytest
+
+from core.rag.embedding.embedding_codec import (
+    EMBEDDING_CODEC_MAGIC,
+    decode_cached_query_embedding,
+    decode_embedding,
+    decode_stored_embedding,
+    encode_cached_query_embedding,
+    encode_embedding,
+    encode_stored_embedding,
+    is_encoded_embedding,
+)
+
+
+@pytest.fixture
+def vector() -> np.ndarray:
+    raw = np.random.randn(1536)
+    return raw / np.linalg.norm(raw)
+
+
+class TestEmbeddingCodec:
+    def test_float32_round_trip(self, vector):
+        data = encode_embedding(vector.tolist())
+
+        decoded = decode_embedding(data)
+
+        assert data.startswith(EMBEDDING_CODEC_MAGIC)
+        assert decoded.dtype == np.float32
+        assert decoded.shape == (1536,)
+        np.testing.assert_allclose(decoded, vector, atol=1e-6)
+
+    def test_float16_round_trip(self, vector):
+        data = encode_embedding(vector, "float16")
+
+        decoded = decode_embedding(data)
+
+        assert decoded.dtype == np.float32
+        np.testing.assert_allclose(decoded, vector, atol=1e-3)
+        assert len(data) < len(encode_embedding(vector, "float32"))
+
+    def test_encoded_payload_is_smaller_than_pickle(self, vector):
+        pickled = pickle.dumps(vector.tolist(), protocol=pickle.HIGHEST_PROTOCOL)
+
+        assert len(encode_embedding(vector)) * 2 < len(pickled)
+
+    def test_unsupported_dtype_raises(self, vector):
+        with pytest.raises(ValueError, match="Unsupported embedding storage dtype"):
+            encode_embedding(vector, "float64")  # type: ignore[arg-type]
+
+    def test_truncated_payload_is_not_recognized(self, vector):
+        data = encode_embedding(vector)
+
+        assert is_encoded_embedding(data)
+        assert not is_encoded_embedding(data[:-1])
+        with pytest.raises(ValueError):
+            decode_embedding(data[:-1])
+
+    def test_decode_stored_embedding_reads_legacy_pickle(self, vector):
+        legacy = pickle.dumps(vector.tolist(), protocol=pickle.HIGHEST_PROTOCOL)
+
+        np.testing.assert_allclose(decode_stored_embedding(legacy), vector)
+
+    def test_decode_cached_query_embedding_reads_legacy_base64(self, vector):
+        legacy = base64.b64encode(vector.tobytes())
+
+        np.testing.assert_allclose(decode_cached_query_embedding(legacy), vector)
+        np.testing.assert_allclose(decode_cached_query_embedding(legacy.decode("utf-8")), vector)
+
+    def test_decode_cached_query_embedding_reads_binary(self, vector):
+        np.testing.assert_allclose(decode_cached_query_embedding(encode_embedding(vector)), vector, atol=1e-6)
+
+    def test_legacy_stored_embedding_is_read_by_pickle(self, vector):
+        data = encode_stored_embedding(vector, "float32", binary=False)
+
+        assert pickle.loads(data) == vector.tolist()  # noqa: S301
+        np.testing.assert_allclose(decode_stored_embedding(data), vector)
+
+    def test_binary_stored_embedding(self, vector):
+        data = encode_stored_embedding(vector, "float16", binary=True)
+
+        assert is_encoded_embedding(data)
+        np.testing.assert_allclose(decode_stored_embedding(data), vector, atol=1e-3)
+
+    def test_legacy_cached_query_embedding_is_read_as_base64(self, vector):
+        data = encode_cached_query_embedding(vector.tolist(), "float32", binary=False)
+
+        np.testing.assert_array_equal(np.frombuffer(base64.b64decode(data), dtype="float"), vector)
+        np.testing.assert_array_equal(decode_cached_query_embedding(data), vector)
+
+    def test_binary_cached_query_embedding(self, vector):
+        data = encode_cached_query_embedding(vector, "float32", binary=True)
+
+        np.testing.assert_allclose(decode_cached_query_embedding(data), vector, atol=1e-6)
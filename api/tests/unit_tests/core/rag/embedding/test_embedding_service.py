@@ -60,6 +60,7 @@ from graphon.model_runtime.errors.invoke import (
     InvokeConnectionError,
     InvokeRateLimitError,
 )
+from libs import helper
 from models.dataset import Embedding
 
 
@@ -139,7 +140,7 @@ class TestCacheEmbeddingDocuments:
 
         # Mock database query to return no cached embedding (cache miss)
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
 
             # Mock model invocation
             mock_model_instance.invoke_text_embedding.return_value = sample_embedding_result
@@ -160,7 +161,7 @@ class TestCacheEmbeddingDocuments:
             )
 
             # Verify embedding was added to database cache
-            mock_session.add.assert_called_once()
+            mock_session.execute.assert_called_once()
             mock_session.commit.assert_called_once()
 
     def test_embed_multiple_documents_cache_miss(self, mock_model_instance):
@@ -203,7 +204,7 @@ class TestCacheEmbeddingDocuments:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Act
@@ -240,7 +241,8 @@ class TestCacheEmbeddingDocuments:
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
             # Mock database to return cached embedding (cache hit)
-            mock_session.scalar.return_value = mock_cached_embedding
+            mock_cached_embedding.hash = helper.generate_text_hash(texts[0])
+            mock_session.scalars.return_value.all.return_value = [mock_cached_embedding]
 
             # Act
             result = cache_embedding.embed_documents(texts)
@@ -253,7 +255,7 @@ class TestCacheEmbeddingDocuments:
             mock_model_instance.invoke_text_embedding.assert_not_called()
 
             # Verify no new cache entries were added
-            mock_session.add.assert_not_called()
+            mock_session.execute.assert_not_called()
 
     def test_embed_documents_partial_cache_hit(self, mock_model_instance):
         """Test embedding documents with mixed cache hits and misses.
@@ -313,7 +315,8 @@ class TestCacheEmbeddingDocuments:
                 mock_hash.side_effect = generate_hash
 
                 # Mock database to return cached embedding only for first text (hash_1)
-                mock_session.scalar.side_effect = [mock_cached_embedding, None, None]
+                mock_cached_embedding.hash = "hash_1"
+                mock_session.scalars.return_value.all.return_value = [mock_cached_embedding]
                 mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
                 # Act
@@ -380,7 +383,7 @@ class TestCacheEmbeddingDocuments:
             )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
 
             # Mock model to return appropriate batch results
             batch_results = [
@@ -443,7 +446,7 @@ class TestCacheEmbeddingDocuments:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             with patch("core.rag.embedding.cached_embedding.logger") as mock_logger:
@@ -477,7 +480,7 @@ class TestCacheEmbeddingDocuments:
         texts = ["Test text"]
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
 
             # Mock model to raise connection error
             mock_model_instance.invoke_text_embedding.side_effect = InvokeConnectionError("Failed to connect to API")
@@ -503,7 +506,7 @@ class TestCacheEmbeddingDocuments:
         texts = ["Test text"]
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
 
             # Mock model to raise rate limit error
             mock_model_instance.invoke_text_embedding.side_effect = InvokeRateLimitError("Rate limit exceeded")
@@ -527,7 +530,7 @@ class TestCacheEmbeddingDocuments:
         texts = ["Test text"]
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
 
             # Mock model to raise authorization error
             mock_model_instance.invoke_text_embedding.side_effect = InvokeAuthorizationError("Invalid API key")
@@ -552,7 +555,7 @@ class TestCacheEmbeddingDocuments:
         texts = ["Test text"]
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_text_embedding.return_value = sample_embedding_result
 
             # Mock database commit to raise IntegrityError
@@ -624,7 +627,7 @@ class TestCacheEmbeddingQuery:
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
             # Mock Redis cache miss
-            mock_redis.get.return_value = None
+            mock_redis.get_and_expire.return_value = None
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Act
@@ -673,7 +676,7 @@ class TestCacheEmbeddingQuery:
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
             # Mock Redis cache hit
-            mock_redis.get.return_value = encoded_vector
+            mock_redis.get_and_expire.return_value = encoded_vector
 
             # Act
             result = cache_embedding.embed_query(query)
@@ -686,8 +689,8 @@ class TestCacheEmbeddingQuery:
             mock_model_instance.invoke_text_embedding.assert_not_called()
 
             # Verify cache TTL was extended
-            mock_redis.expire.assert_called_once()
-            assert mock_redis.expire.call_args[0][1] == 600
+            mock_redis.get_and_expire.assert_called_once()
+            assert mock_redis.get_and_expire.call_args[0][1] == 600
 
     def test_embed_query_nan_handling(self, mock_model_instance):
         """Test handling of NaN values in query embeddings.
@@ -721,7 +724,7 @@ class TestCacheEmbeddingQuery:
         )
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
-            mock_redis.get.return_value = None
+            mock_redis.get_and_expire.return_value = None
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Act & Assert
@@ -742,7 +745,7 @@ class TestCacheEmbeddingQuery:
         query = "Test query"
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
-            mock_redis.get.return_value = None
+            mock_redis.get_and_expire.return_value = None
 
             # Mock model to raise connection error
             mock_model_instance.invoke_text_embedding.side_effect = InvokeConnectionError("Connection failed")
@@ -786,7 +789,7 @@ class TestCacheEmbeddingQuery:
         )
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
-            mock_redis.get.return_value = None
+            mock_redis.get_and_expire.return_value = None
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Mock Redis setex to raise error
@@ -872,7 +875,7 @@ class TestEmbeddingModelSwitching:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
 
             model_instance_ada.invoke_text_embedding.return_value = result_ada
             model_instance_3_small.invoke_text_embedding.return_value = result_3_small
@@ -952,7 +955,7 @@ class TestEmbeddingModelSwitching:
         )
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
-            mock_redis.get.return_value = None
+            mock_redis.get_and_expire.return_value = None
 
             model_instance_openai.invoke_text_embedding.return_value = result_openai
             model_instance_cohere.invoke_text_embedding.return_value = result_cohere
@@ -1035,7 +1038,7 @@ class TestEmbeddingDimensionValidation:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Act
@@ -1088,7 +1091,7 @@ class TestEmbeddingDimensionValidation:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Act
@@ -1174,7 +1177,7 @@ class TestEmbeddingDimensionValidation:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
 
             model_instance_ada.invoke_text_embedding.return_value = result_ada
             model_instance_cohere.invoke_text_embedding.return_value = result_cohere
@@ -1272,7 +1275,7 @@ class TestEmbeddingEdgeCases:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Act
@@ -1315,7 +1318,7 @@ class TestEmbeddingEdgeCases:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Act
@@ -1363,7 +1366,7 @@ class TestEmbeddingEdgeCases:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Act
@@ -1415,7 +1418,7 @@ class TestEmbeddingEdgeCases:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Act
@@ -1471,7 +1474,7 @@ class TestEmbeddingEdgeCases:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Act
@@ -1539,7 +1542,7 @@ class TestEmbeddingEdgeCases:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Act
@@ -1587,7 +1590,7 @@ class TestEmbeddingEdgeCases:
         )
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
-            mock_redis.get.return_value = None
+            mock_redis.get_and_expire.return_value = None
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Act
@@ -1637,7 +1640,7 @@ class TestEmbeddingEdgeCases:
         )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Act
@@ -1716,7 +1719,7 @@ class TestEmbeddingCachePerformance:
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
             # First call: cache miss
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
 
             usage = EmbeddingUsage(
                 tokens=5,
@@ -1744,7 +1747,8 @@ class TestEmbeddingCachePerformance:
             assert len(result1) == 1
 
             # Arrange - Second call: cache hit
-            mock_session.scalar.return_value = mock_cached_embedding
+            mock_cached_embedding.hash = helper.generate_text_hash(text)
+            mock_session.scalars.return_value.all.return_value = [mock_cached_embedding]
 
             # Act - Second call (cache hit)
             result2 = cache_embedding.embed_documents([text])
@@ -1804,7 +1808,7 @@ class TestEmbeddingCachePerformance:
             )
 
         with patch("core.rag.embedding.cached_embedding.db.session") as mock_session:
-            mock_session.scalar.return_value = None
+            mock_session.scalars.return_value.all.return_value = []
 
             # Mock model to return appropriate batch results
             batch_results = [
@@ -1867,7 +1871,7 @@ class TestEmbeddingCachePerformance:
 
         with patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis:
             # Test cache miss - sets TTL
-            mock_redis.get.return_value = None
+            mock_redis.get_and_expire.return_value = None
             mock_model_instance.invoke_text_embedding.return_value = embedding_result
 
             # Act
@@ -1882,11 +1886,11 @@ class TestEmbeddingCachePerformance:
             mock_redis.reset_mock()
             vector_bytes = np.array(normalized).tobytes()
             encoded_vector = base64.b64encode(vector_bytes).decode("utf-8")
-            mock_redis.get.return_value = encoded_vector
+            mock_redis.get_and_expire.return_value = encoded_vector
 
             # Act
             cache_embedding.embed_query(query)
 
             # Assert - TTL was extended
-            mock_redis.expire.assert_called_once()
-            assert mock_redis.expire.call_args[0][1] == 600
+            mock_redis.get_and_expire.assert_called_once()
+            assert mock_redis.get_and_expire.call_args[0][1] == 600
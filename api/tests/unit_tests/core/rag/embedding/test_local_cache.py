@@ -0,0 +1,159 @@
+"""Unit tests for the per-process query embedding cache tier."""
+
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+from cachetools import TTLCache
+
+from core.rag.embedding import local_cache
+from core.rag.embedding.cached_embedding import CacheEmbedding
+from core.rag.embedding.embedding_codec import encode_embedding
+from core.rag.embedding.local_cache import LocalEmbeddingCache, get_query_embedding_local_cache
+from graphon.model_runtime.entities.text_embedding_entities import EmbeddingResult, EmbeddingUsage
+
+
+class TestLocalEmbeddingCache:
+    def test_get_returns_copy_and_counts_hits(self):
+        cache = LocalEmbeddingCache(maxsize=4, ttl=60)
+        cache.set("key", np.array([0.5, 0.5], dtype=np.float32))
+
+        first = cache.get("key")
+        assert first == [0.5, 0.5]
+        first.append(1.0)
+
+        assert cache.get("key") == [0.5, 0.5]
+        assert cache.get("missing") is None
+        assert cache.stats() == {"size": 1, "hits": 2, "misses": 1, "hit_rate": pytest.approx(2 / 3)}
+
+    def test_evicts_least_recently_used_entry(self):
+        cache = LocalEmbeddingCache(maxsize=2, ttl=60)
+        cache.set("a", np.array([1.0]))
+        cache.set("b", np.array([2.0]))
+        cache.get("a")
+        cache.set("c", np.array([3.0]))
+
+        assert cache.get("a") == [1.0]
+        assert cache.get("b") is None
+        assert cache.get("c") == [3.0]
+
+    def test_entries_expire_after_ttl(self):
+        now = [0.0]
+        cache = LocalEmbeddingCache(maxsize=2, ttl=60)
+        cache._cache = TTLCache(maxsize=2, ttl=60, timer=lambda: now[0])
+        cache.set("key", np.array([1.0]))
+        assert cache.get("key") == [1.0]
+
+        now[0] = 61.0
+
+        assert cache.get("key") is None
+
+    def test_cached_arrays_are_read_only(self):
+        cache = LocalEmbeddingCache(maxsize=2, ttl=60)
+        vector = np.array([1.0, 2.0])
+        cache.set("key", vector)
+
+        vector[0] = 9.0
+
+        assert cache.get("key") == [1.0, 2.0]
+        with pytest.raises(ValueError):
+            cache._cache["key"][0] = 0.0
+
+    def test_clear_resets_entries_and_counters(self):
+        cache = LocalEmbeddingCache(maxsize=2, ttl=60)
+        cache.set("key", np.array([1.0]))
+        cache.get("key")
+
+        cache.clear()
+
+        assert cache.stats() == {"size": 0, "hits": 0, "misses": 0, "hit_rate": 0.0}
+
+
+class TestGetQueryEmbeddingLocalCache:
+    @pytest.fixture(autouse=True)
+    def reset_singleton(self):
+        local_cache._query_embedding_cache = None
+        yield
+        local_cache._query_embedding_cache = None
+
+    def test_returns_none_when_disabled(self):
+        with patch("core.rag.embedding.local_cache.dify_config") as mock_config:
+            mock_config.QUERY_EMBEDDING_LOCAL_CACHE_ENABLED = False
+
+            assert get_query_embedding_local_cache() is None
+
+    def test_returns_shared_instance_when_enabled(self):
+        with patch("core.rag.embedding.local_cache.dify_config") as mock_config:
+            mock_config.QUERY_EMBEDDING_LOCAL_CACHE_ENABLED = True
+            mock_config.QUERY_EMBEDDING_LOCAL_CACHE_MAX_SIZE = 8
+            mock_config.QUERY_EMBEDDING_LOCAL_CACHE_TTL = 30
+
+            cache = get_query_embedding_local_cache()
+
+            assert cache is not None
+            assert cache is get_query_embedding_local_cache()
+            assert cache._cache.maxsize == 8
+            assert cache._cache.ttl == 30
+
+
+class TestCacheEmbeddingLocalTier:
+    @pytest.fixture
+    def mock_model_instance(self):
+        model_instance = Mock()
+        model_instance.model_name = "text-embedding-ada-002"
+        model_instance.provider = "openai"
+
+        vector = np.random.randn(8)
+        usage = EmbeddingUsage(
+            tokens=5,
+            total_tokens=5,
+            unit_price=Decimal("0.0001"),
+            price_unit=Decimal(1000),
+            total_price=Decimal("0.0000005"),
+            currency="USD",
+            latency=0.3,
+        )
+        model_instance.invoke_text_embedding.return_value = EmbeddingResult(
+            model="text-embedding-ada-002",
+            embeddings=[(vector / np.linalg.norm(vector)).tolist()],
+            usage=usage,
+        )
+        return model_instance
+
+    def test_repeated_query_skips_redis(self, mock_model_instance):
+        cache = LocalEmbeddingCache(maxsize=8, ttl=60)
+        cache_embedding = CacheEmbedding(mock_model_instance)
+
+        with (
+            patch("core.rag.embedding.cached_embedding.get_query_embedding_local_cache", return_value=cache),
+            patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis,
+        ):
+            mock_redis.get_and_expire.return_value = None
+
+            first = cache_embedding.embed_query("What is Dify?")
+            second = cache_embedding.embed_query("What is Dify?")
+
+            assert second == pytest.approx(first, abs=1e-6)
+            mock_model_instance.invoke_text_embedding.assert_called_once()
+            mock_redis.get_and_expire.assert_called_once()
+            mock_redis.setex.assert_called_once()
+            assert cache.stats()["hits"] == 1
+
+    def test_redis_hit_populates_local_tier(self, mock_model_instance):
+        cache = LocalEmbeddingCache(maxsize=8, ttl=60)
+        cache_embedding = CacheEmbedding(mock_model_instance)
+        vector = np.array([0.6, 0.8])
+
+        with (
+            patch("core.rag.embedding.cached_embedding.get_query_embedding_local_cache", return_value=cache),
+            patch("core.rag.embedding.cached_embedding.redis_client") as mock_redis,
+        ):
+            mock_redis.get_and_expire.return_value = encode_embedding(vector)
+
+            first = cache_embedding.embed_query("hot query")
+            second = cache_embedding.embed_query("hot query")
+
+            assert first == second == pytest.approx([0.6, 0.8])
+            mock_redis.get_and_expire.assert_called_once()
+            mock_model_instance.invoke_text_embedding.assert_not_called()
@@ -67,6 +67,21 @@ class TestParentChildIndexProcessor:
         with pytest.raises(ValueError, match="No rules found in process rule"):
             processor.transform([Document(page_content="text", metadata={})], process_rule={"mode": "custom"})
 
+    def test_supports_incremental_transform_only_for_paragraph_parents(
+        self, processor: ParentChildIndexProcessor
+    ) -> None:
+        assert not processor.supports_incremental_transform({"mode": "hierarchical"})
+        for rules, expected in ((self._paragraph_rules(), True), (self._full_doc_rules(), False)):
+            with patch(
+                "core.rag.index_processor.processor.parent_child_index_processor.Rule.model_validate",
+                return_value=rules,
+            ):
+                assert processor.supports_incremental_transform({"mode": "hierarchical", "rules": {}}) is False
+                assert (
+                    processor.supports_incremental_transform({"mode": "hierarchical", "rules": {"enabled": True}})
+                    is expected
+                )
+
     def test_transform_paragraph_requires_segmentation(self, processor: ParentChildIndexProcessor) -> None:
         rules = SimpleNamespace(parent_mode=ParentMode.PARAGRAPH, segmentation=None)
 
@@ -48,6 +48,8 @@ for the full indexing pipeline are handled separately in the integration test su
 """
 
 import json
+import threading
+import time
 import uuid
 from typing import Any
 from unittest.mock import MagicMock, Mock, patch
@@ -55,6 +57,7 @@ from unittest.mock import MagicMock, Mock, patch
 import pytest
 from sqlalchemy.orm.exc import ObjectDeletedError
 
+from configs import dify_config
 from core.errors.error import ProviderTokenNotInitError
 from core.indexing_runner import (
     DocumentIsDeletedPausedError,
@@ -63,7 +66,7 @@ from core.indexing_runner import (
 )
 from core.rag.index_processor.constant.index_type import IndexStructureType, IndexTechniqueType
 from core.rag.models.document import ChildDocument, Document
-from graphon.model_runtime.entities.model_entities import ModelType
+from graphon.model_runtime.entities.model_entities import ModelPropertyKey, ModelType
 from libs.datetime_utils import naive_utc_now
 from models.dataset import Dataset, DatasetProcessRule
 from models.dataset import Document as DatasetDocument
@@ -668,7 +671,8 @@ class TestIndexingRunnerLoad:
             runner._load(mock_processor, sample_dataset, sample_dataset_document, sample_documents)
 
         # Assert
-        model_manager.get_model_instance.assert_called_once()
+        # Tokens come from the embedding calls, the model is not needed for counting them
+        model_manager.get_model_instance.assert_not_called()
         # Verify executor was used for parallel processing
         assert mock_executor_instance.submit.called
 
@@ -1461,16 +1465,15 @@ class TestIndexingRunnerProcessChunk:
         return app
 
     def test_process_chunk_counts_tokens(self, mock_dependencies, mock_flask_app):
-        """Test process chunk correctly counts tokens."""
+        """Test process chunk counts the tokens used by the embedding calls."""
         # Arrange
         from core.indexing_runner import IndexingRunner
 
         runner = IndexingRunner()
-        mock_embedding_instance = MagicMock()
-        # Mock to return an iterable that sums to 150 tokens
-        mock_embedding_instance.get_text_embedding_num_tokens.return_value = [75, 75]
 
         mock_processor = MagicMock()
+        # The embedding calls of the load used 150 tokens
+        mock_processor.load.return_value = 150
         chunk_documents = [
             Document(page_content="Chunk 1", metadata={"doc_id": "c1"}),
             Document(page_content="Chunk 2", metadata={"doc_id": "c2"}),
@@ -1503,7 +1506,6 @@ class TestIndexingRunnerProcessChunk:
             chunk_documents,
             mock_dataset,
             mock_dataset_document,
-            mock_embedding_instance,
         )
 
         # Assert
@@ -1516,7 +1518,6 @@ class TestIndexingRunnerProcessChunk:
         from core.indexing_runner import IndexingRunner
 
         runner = IndexingRunner()
-        mock_embedding_instance = MagicMock()
         mock_processor = MagicMock()
         chunk_documents = [Document(page_content="Chunk", metadata={"doc_id": "c1"})]
 
@@ -1541,5 +1542,336 @@ class TestIndexingRunnerProcessChunk:
                 chunk_documents,
                 mock_dataset,
                 mock_dataset_document,
-                mock_embedding_instance,
             )
+
+
+class TestIndexingRunnerPipeline:
+    """Unit tests for the page-at-a-time indexing pipeline.
+
+    Tests cover:
+    - Choosing between the pipeline and the materializing path
+    - Splitting pages one at a time
+    - Batching segments to the embedding workers
+    - Batch sizes rounded to embedding model calls
+    - Checkpointing split pages and resuming after them
+    """
+
+    @pytest.fixture
+    def mock_dependencies(self):
+        """Mock all external dependencies for pipeline tests."""
+        with (
+            patch("core.indexing_runner.db") as mock_db,
+            patch("core.indexing_runner.current_app") as mock_app,
+            patch("core.indexing_runner.DatasetDocumentStore") as mock_doc_store,
+        ):
+            yield {
+                "db": mock_db,
+                "app": mock_app,
+                "doc_store": mock_doc_store,
+            }
+
+    @staticmethod
+    def _saved_checkpoints(mock_db: MagicMock) -> list[int | None]:
+        checkpoints = []
+        for call in mock_db.session.execute.call_args_list:
+            params = call.args[0].compile().params
+            if "split_page_count" in params:
+                checkpoints.append(params["split_page_count"])
+        return checkpoints
+
+    @staticmethod
+    def _split_page(documents: list[Document], *args, **kwargs) -> list[Document]:
+        (page,) = documents
+        return [
+            Document(page_content=line, metadata={"doc_id": str(uuid.uuid4()), "doc_hash": line})
+            for line in page.page_content.splitlines()
+        ]
+
+    def test_transform_and_load_uses_pipeline_for_incremental_processors(self, monkeypatch):
+        """Test that high quality documents split by page-independent processors go through the pipeline."""
+        monkeypatch.setattr(dify_config, "INDEXING_PIPELINE_ENABLED", True)
+        runner = IndexingRunner()
+        dataset = create_mock_dataset(indexing_technique=IndexTechniqueType.HIGH_QUALITY)
+        dataset_document = create_mock_dataset_document()
+        mock_processor = MagicMock()
+        mock_processor.supports_incremental_transform.return_value = True
+
+        with (
+            patch.object(runner, "_run_pipeline") as mock_pipeline,
+            patch.object(runner, "_transform") as mock_transform,
+        ):
+            runner._transform_and_load(mock_processor, dataset, dataset_document, [], {"mode": "automatic"})
+
+        mock_pipeline.assert_called_once()
+        mock_transform.assert_not_called()
+
+    @pytest.mark.parametrize(
+        ("pipeline_enabled", "indexing_technique", "incremental"),
+        [
+            (False, IndexTechniqueType.HIGH_QUALITY, True),
+            (True, IndexTechniqueType.ECONOMY, True),
+            (True, IndexTechniqueType.HIGH_QUALITY, False),
+        ],
+    )
+    def test_transform_and_load_materializes_otherwise(
+        self, monkeypatch, pipeline_enabled: bool, indexing_technique: str, incremental: bool
+    ):
+        """Test that disabled pipelines, economy datasets and full-document processors split the whole document."""
+        monkeypatch.setattr(dify_config, "INDEXING_PIPELINE_ENABLED", pipeline_enabled)
+        runner = IndexingRunner()
+        dataset = create_mock_dataset(indexing_technique=indexing_technique)
+        dataset_document = create_mock_dataset_document()
+        mock_processor = MagicMock()
+        mock_processor.supports_incremental_transform.return_value = incremental
+
+        with (
+            patch.object(runner, "_run_pipeline") as mock_pipeline,
+            patch.object(runner, "_transform") as mock_transform,
+            patch.object(runner, "_load_segments") as mock_load_segments,
+            patch.object(runner, "_load") as mock_load,
+        ):
+            runner._transform_and_load(mock_processor, dataset, dataset_document, [], {"mode": "automatic"})
+
+        mock_pipeline.assert_not_called()
+        mock_transform.assert_called_once()
+        mock_load_segments.assert_called_once()
+        mock_load.assert_called_once()
+
+    def test_pipeline_splits_pages_one_at_a_time(self, mock_dependencies, monkeypatch):
+        """Test that pages are split in order and every segment is embedded exactly once in bounded batches."""
+        monkeypatch.setattr(dify_config, "INDEXING_EMBEDDING_CONCURRENCY", 2)
+        monkeypatch.setattr(dify_config, "INDEXING_EMBEDDING_BATCH_SIZE", 3)
+        runner = IndexingRunner()
+        dataset = create_mock_dataset()
+        dataset_document = create_mock_dataset_document()
+        pages = [Document(page_content="\n".join(f"page {p} chunk {c}" for c in range(5))) for p in range(4)]
+        mock_processor = MagicMock()
+        mock_processor.transform.side_effect = self._split_page
+
+        batches: list[list[str]] = []
+
+        def process_chunk(flask_app, index_processor, chunk_documents, *args):
+            batches.append([document.page_content for document in chunk_documents])
+            return len(chunk_documents)
+
+        with (
+            patch.object(runner, "_get_embedding_model_instance", return_value=None),
+            patch.object(runner, "_check_document_paused_status"),
+            patch.object(runner, "_update_document_index_status") as mock_update_status,
+            patch.object(runner, "_process_chunk", side_effect=process_chunk),
+        ):
+            runner._run_pipeline(mock_processor, dataset, dataset_document, list(pages), {"mode": "automatic"})
+
+        split_pages = [call.args[0] for call in mock_processor.transform.call_args_list]
+        assert split_pages == [[page] for page in pages]
+        assert mock_dependencies["doc_store"].return_value.add_documents.call_count == len(pages)
+
+        embedded = [content for batch in batches for content in batch]
+        assert sorted(embedded) == sorted(f"page {p} chunk {c}" for p in range(4) for c in range(5))
+        assert all(len(batch) <= 3 for batch in batches)
+
+        final_update = mock_update_status.call_args_list[-1].kwargs
+        assert final_update["after_indexing_status"] == "completed"
+        assert final_update["extra_update_params"][DatasetDocument.tokens] == 20
+
+    def test_pipeline_keeps_identical_chunks_in_one_worker(self, mock_dependencies, monkeypatch):
+        """Test that chunks with identical content are embedded by the same worker, one batch at a time."""
+        monkeypatch.setattr(dify_config, "INDEXING_EMBEDDING_CONCURRENCY", 4)
+        monkeypatch.setattr(dify_config, "INDEXING_EMBEDDING_BATCH_SIZE", 1)
+        runner = IndexingRunner()
+        pages = [Document(page_content="same\nsame\nsame")]
+        mock_processor = MagicMock()
+        mock_processor.transform.side_effect = self._split_page
+
+        in_flight = 0
+        max_in_flight = 0
+        lock = threading.Lock()
+
+        def process_chunk(*args):
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+            return 1
+
+        with (
+            patch.object(runner, "_get_embedding_model_instance", return_value=None),
+            patch.object(runner, "_check_document_paused_status"),
+            patch.object(runner, "_update_document_index_status"),
+            patch.object(runner, "_process_chunk", side_effect=process_chunk),
+        ):
+            runner._run_pipeline(
+                mock_processor, create_mock_dataset(), create_mock_dataset_document(), pages, {"mode": "automatic"}
+            )
+
+        assert max_in_flight == 1
+
+    def test_pipeline_stops_splitting_after_a_failed_batch(self, mock_dependencies, monkeypatch):
+        """Test that a failed batch stops splitting even if its worker is never handed another batch."""
+        monkeypatch.setattr(dify_config, "INDEXING_EMBEDDING_CONCURRENCY", 2)
+        monkeypatch.setattr(dify_config, "INDEXING_EMBEDDING_BATCH_SIZE", 1)
+        runner = IndexingRunner()
+        # "page 1" is routed to the second worker and every later page to the first one
+        pages = [Document(page_content=content) for content in ("page 1", "page 2", "page 3")]
+        mock_processor = MagicMock()
+        mock_processor.transform.side_effect = self._split_page
+        failed = threading.Event()
+
+        def process_chunk(flask_app, index_processor, chunk_documents, *args):
+            if chunk_documents[0].page_content == "page 1":
+                failed.set()
+                raise ValueError("embedding failed")
+            return len(chunk_documents)
+
+        def check_paused(*args):
+            if mock_processor.transform.called:
+                failed.wait(timeout=5)
+                time.sleep(0.05)
+
+        with (
+            patch.object(runner, "_get_embedding_model_instance", return_value=None),
+            patch.object(runner, "_check_document_paused_status", side_effect=check_paused),
+            patch.object(runner, "_update_document_index_status"),
+            patch.object(runner, "_process_chunk", side_effect=process_chunk),
+            pytest.raises(ValueError, match="embedding failed"),
+        ):
+            runner._run_pipeline(
+                mock_processor, create_mock_dataset(), create_mock_dataset_document(), pages, {"mode": "automatic"}
+            )
+
+        assert mock_processor.transform.call_count == 1
+
+    def test_embedding_batch_size_is_rounded_to_model_calls(self, monkeypatch):
+        """Test that batches hold a whole number of embedding calls."""
+        monkeypatch.setattr(dify_config, "INDEXING_EMBEDDING_BATCH_SIZE", 100)
+        embedding_model_instance = MagicMock()
+        model_schema = MagicMock()
+        model_schema.model_properties = {ModelPropertyKey.MAX_CHUNKS: 32}
+        embedding_model_instance.model_type_instance.get_model_schema.return_value = model_schema
+
+        assert IndexingRunner._get_embedding_batch_size(embedding_model_instance) == 128
+        assert IndexingRunner._get_embedding_batch_size(None) == 100
+
+    def test_pipeline_checkpoints_saved_pages(self, mock_dependencies):
+        """Test that the checkpoint is reset on a fresh run and advanced before the segments of each page are saved."""
+        runner = IndexingRunner()
+        pages = [Document(page_content=f"page {p}") for p in range(3)]
+        mock_processor = MagicMock()
+        mock_processor.transform.side_effect = self._split_page
+        mock_db = mock_dependencies["db"]
+        saved_with_checkpoint = []
+        mock_dependencies["doc_store"].return_value.add_documents.side_effect = lambda **kwargs: (
+            saved_with_checkpoint.append(self._saved_checkpoints(mock_db)[-1])
+        )
+
+        with (
+            patch.object(runner, "_get_embedding_model_instance", return_value=None),
+            patch.object(runner, "_check_document_paused_status"),
+            patch.object(runner, "_update_document_index_status") as mock_update_status,
+            patch.object(runner, "_process_chunk", return_value=1),
+        ):
+            runner._run_pipeline(
+                mock_processor, create_mock_dataset(), create_mock_dataset_document(), pages, {"mode": "automatic"}
+            )
+
+        assert self._saved_checkpoints(mock_db) == [None, 1, 2, 3]
+        assert saved_with_checkpoint == [1, 2, 3]
+        splitting_completed = mock_update_status.call_args_list[-2].kwargs["extra_update_params"]
+        assert splitting_completed[DatasetDocument.split_page_count] is None
+
+    def test_pipeline_rolls_back_a_partly_saved_page(self, mock_dependencies):
+        """Test that a page failing partway is not committed, so a resume splits it again."""
+        runner = IndexingRunner()
+        pages = [Document(page_content=f"page {p}\nsecond chunk {p}") for p in range(3)]
+        mock_processor = MagicMock()
+        mock_processor.transform.side_effect = self._split_page
+        mock_db = mock_dependencies["db"]
+        commits_before_failure = []
+
+        def add_documents(docs, save_child, commit):
+            assert not commit
+            if docs[0].page_content == "page 1":
+                # the first segment of the page is saved, the second one fails
+                commits_before_failure.append(mock_db.session.commit.call_count)
+                raise RuntimeError("database connection lost")
+
+        mock_dependencies["doc_store"].return_value.add_documents.side_effect = add_documents
+
+        with (
+            patch.object(runner, "_get_embedding_model_instance", return_value=None),
+            patch.object(runner, "_check_document_paused_status"),
+            patch.object(runner, "_update_document_index_status"),
+            patch.object(runner, "_process_chunk", return_value=1),
+            pytest.raises(RuntimeError, match="database connection lost"),
+        ):
+            runner._run_pipeline(
+                mock_processor, create_mock_dataset(), create_mock_dataset_document(), pages, {"mode": "automatic"}
+            )
+
+        # the checkpoint of the failed page was only written in the rolled back transaction
+        assert self._saved_checkpoints(mock_db) == [None, 1, 2]
+        assert mock_db.session.commit.call_count == commits_before_failure[0]
+        mock_db.session.rollback.assert_called_once()
+
+    def test_pipeline_resumes_after_checkpoint(self, mock_dependencies):
+        """Test that a resumed run indexes the unfinished saved segments and splits only the remaining pages."""
+        runner = IndexingRunner()
+        dataset_document = create_mock_dataset_document()
+        remaining_pages = [Document(page_content="page 2"), Document(page_content="page 3")]
+        unfinished = create_sample_documents(count=2)
+        mock_processor = MagicMock()
+        mock_processor.transform.side_effect = self._split_page
+        mock_db = mock_dependencies["db"]
+        mock_db.session.scalar.return_value = 40
+
+        embedded: list[str] = []
+
+        def process_chunk(flask_app, index_processor, chunk_documents, *args):
+            embedded.extend(document.page_content for document in chunk_documents)
+            return len(chunk_documents)
+
+        with (
+            patch.object(runner, "_get_embedding_model_instance", return_value=None),
+            patch.object(runner, "_check_document_paused_status"),
+            patch.object(runner, "_update_document_index_status") as mock_update_status,
+            patch.object(runner, "_process_chunk", side_effect=process_chunk),
+            patch.object(runner, "_get_completed_tokens", return_value=10),
+            patch.object(runner, "_get_unfinished_documents", return_value=unfinished),
+            patch.object(runner, "_update_segments_by_document") as mock_update_segments,
+        ):
+            runner._run_pipeline(
+                mock_processor,
+                create_mock_dataset(),
+                dataset_document,
+                remaining_pages,
+                {"mode": "automatic"},
+                start_page=2,
+            )
+
+        assert sorted(embedded) == sorted(["Sample chunk content 1", "Sample chunk content 2", "page 2", "page 3"])
+        assert self._saved_checkpoints(mock_db) == [3, 4]
+        assert mock_update_segments.call_args.kwargs["pending_only"] is True
+
+        final_update = mock_update_status.call_args_list[-1].kwargs["extra_update_params"]
+        assert final_update[DatasetDocument.tokens] == 10 + 4
+        splitting_completed = mock_update_status.call_args_list[-2].kwargs["extra_update_params"]
+        assert splitting_completed[DatasetDocument.word_count] == 40 + len("page 2") + len("page 3")
+
+    def test_run_in_indexing_status_resumes_splitting_after_checkpoint(self, mock_dependencies):
+        """Test that a document interrupted while split a page at a time continues splitting."""
+        runner = IndexingRunner()
+        dataset_document = create_mock_dataset_document()
+        dataset_document.split_page_count = 2
+        mock_dependencies["db"].session.get.return_value = dataset_document
+
+        with (
+            patch.object(runner, "run_in_splitting_status") as mock_splitting,
+            patch.object(runner, "_load") as mock_load,
+        ):
+            runner.run_in_indexing_status(dataset_document)
+
+        mock_splitting.assert_called_once_with(dataset_document)
+        mock_load.assert_not_called()
@@ -738,6 +738,24 @@ class TestWeightRerankRunner:
             doc_id = doc.metadata["doc_id"]
             assert doc.metadata["score"] == pytest.approx(expected_scores[doc_id], rel=1e-6)
 
+    def test_keyword_score_extracts_keywords_of_every_candidate(self, weights_config, mock_jieba_handler):
+        """Test that keyword search hits are scored on the same extraction as vector and full-text hits."""
+        runner = WeightRerankRunner(tenant_id="tenant123", weights=weights_config)
+        mock_handler_instance = MagicMock()
+        mock_handler_instance.extract_keywords.side_effect = lambda text, _: [text.lower()]
+        mock_jieba_handler.return_value = mock_handler_instance
+        documents = [
+            # index-time keywords are capped and user-editable, they must not be scored instead of the text
+            Document(page_content="Python", metadata={"doc_id": "doc1", "keywords": ["java"]}, provider="dify"),
+            Document(page_content="Java", metadata={"doc_id": "doc2"}, provider="dify"),
+        ]
+
+        scores = runner._calculate_keyword_score("python", documents)
+
+        assert mock_handler_instance.extract_keywords.call_count == 3
+        assert scores[0] > 0
+        assert scores[1] == 0.0
+
     def test_vector_score_calculation(
         self,
         weights_config,
@@ -0,0 +1,106 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from core.rag.rerank.tfidf_scorer import calculate_cosine_scores, calculate_tfidf_cosine_scores
+
+
+def _reference_tfidf_cosine_scores(query_keywords, documents_keywords, total_documents):
+    """Per-keyword scan used by the rerankers before the scorer was vectorized."""
+    query_keyword_counts = Counter(query_keywords)
+    all_keywords = set()
+    for document_keywords in documents_keywords:
+        all_keywords.update(document_keywords)
+
+    keyword_idf = {}
+    for keyword in all_keywords:
+        doc_count_containing_keyword = sum(1 for doc_keywords in documents_keywords if keyword in doc_keywords)
+        keyword_idf[keyword] = math.log((1 + total_documents) / (1 + doc_count_containing_keyword)) + 1
+
+    query_tfidf = {keyword: count * keyword_idf.get(keyword, 0) for keyword, count in query_keyword_counts.items()}
+    similarities = []
+    for document_keywords in documents_keywords:
+        document_tfidf = {
+            keyword: count * keyword_idf.get(keyword, 0) for keyword, count in Counter(document_keywords).items()
+        }
+        intersection = set(query_tfidf) & set(document_tfidf)
+        numerator = sum(query_tfidf[x] * document_tfidf[x] for x in intersection)
+        denominator = math.sqrt(sum(v**2 for v in query_tfidf.values())) * math.sqrt(
+            sum(v**2 for v in document_tfidf.values())
+        )
+        similarities.append(float(numerator) / denominator if denominator else 0.0)
+    return similarities
+
+
+def _random_corpus(document_count: int, vocabulary_size: int = 2000, keywords_per_document: int = 20, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    term_ids = rng.integers(vocabulary_size, size=(document_count, keywords_per_document))
+    documents_keywords = [[f"kw{i}" for i in row] for row in term_ids]
+    query_keywords = [f"kw{i}" for i in rng.choice(vocabulary_size, 5, replace=False)] + ["missing-keyword"]
+    return query_keywords, documents_keywords
+
+
+class TestCalculateTfidfCosineScores:
+    def test_matches_reference_implementation(self):
+        query_keywords, documents_keywords = _random_corpus(200, vocabulary_size=300)
+
+        scores = calculate_tfidf_cosine_scores(query_keywords, documents_keywords)
+
+        assert scores == pytest.approx(
+            _reference_tfidf_cosine_scores(query_keywords, documents_keywords, len(documents_keywords)), rel=1e-9
+        )
+
+    def test_total_documents_overrides_idf_corpus_size(self):
+        query_keywords = ["python", "code"]
+        documents_keywords = [["python", "python", "code"], ["java"], ["code", "rust"]]
+
+        scores = calculate_tfidf_cosine_scores(query_keywords, documents_keywords, total_documents=5)
+
+        assert scores == pytest.approx(_reference_tfidf_cosine_scores(query_keywords, documents_keywords, 5))
+
+    def test_returns_zero_without_overlap(self):
+        assert calculate_tfidf_cosine_scores(["python"], [["java"], []]) == [0.0, 0.0]
+        assert calculate_tfidf_cosine_scores([], [["java"]]) == [0.0]
+        assert calculate_tfidf_cosine_scores(["python"], [[]]) == [0.0]
+
+    def test_empty_documents(self):
+        assert calculate_tfidf_cosine_scores(["python"], []) == []
+
+    def test_accepts_keyword_sets(self):
+        scores = calculate_tfidf_cosine_scores({"python"}, [{"python", "code"}, {"java"}])
+
+        assert scores[0] > 0
+        assert scores[1] == 0.0
+
+
+class TestCalculateCosineScores:
+    def test_matches_per_document_cosine(self):
+        rng = np.random.default_rng(0)
+        query_vector = rng.random(16).tolist()
+        document_vectors = rng.random((10, 16)).tolist()
+
+        scores = calculate_cosine_scores(query_vector, document_vectors)
+
+        expected = [
+            np.dot(query_vector, vector) / (np.linalg.norm(query_vector) * np.linalg.norm(vector))
+            for vector in document_vectors
+        ]
+        assert scores == pytest.approx(expected)
+
+    def test_zero_vector_scores_zero(self):
+        assert calculate_cosine_scores([1.0, 0.0], [[0.0, 0.0], [1.0, 0.0]]) == [0.0, 1.0]
+
+    def test_empty_documents(self):
+        assert calculate_cosine_scores([1.0, 0.0], []) == []
+
+
+@pytest.mark.parametrize("document_count", [100, 1000, 10000])
+def test_tfidf_scoring_benchmark(benchmark, document_count: int):
+    """Latency of keyword scoring at typical and large candidate set sizes."""
+    query_keywords, documents_keywords = _random_corpus(document_count)
+
+    scores = benchmark(calculate_tfidf_cosine_scores, query_keywords, documents_keywords)
+
+    assert len(scores) == document_count
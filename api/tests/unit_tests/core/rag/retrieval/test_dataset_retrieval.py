@@ -35,6 +35,7 @@ from core.workflow.nodes.knowledge_retrieval import exc
 from core.workflow.nodes.knowledge_retrieval.retrieval import KnowledgeRetrievalRequest
 from graphon.model_runtime.entities.llm_entities import LLMUsage
 from graphon.model_runtime.entities.model_entities import ModelFeature
+from libs.redis_rate_limiter import RateLimitResult
 from models.dataset import Dataset
 from models.enums import CreatorUserRole
 
@@ -2077,8 +2078,8 @@ class TestCheckKnowledgeRateLimit:
     """
 
     @patch("core.rag.retrieval.dataset_retrieval.FeatureService")
-    @patch("core.rag.retrieval.dataset_retrieval.redis_client")
-    def test_rate_limit_disabled_no_exception(self, mock_redis, mock_feature_service):
+    @patch("core.rag.retrieval.dataset_retrieval.SlidingWindowRateLimiter")
+    def test_rate_limit_disabled_no_exception(self, mock_limiter, mock_feature_service):
         """
         Test that when rate limit is disabled, no exception is raised.
 
@@ -2107,26 +2108,21 @@ class TestCheckKnowledgeRateLimit:
         mock_feature_service.get_knowledge_rate_limit.assert_called_once_with(tenant_id)
 
         # Verify no Redis operations were performed
-        assert not mock_redis.zadd.called
-        assert not mock_redis.zremrangebyscore.called
-        assert not mock_redis.zcard.called
+        mock_limiter.assert_not_called()
 
     @patch("core.rag.retrieval.dataset_retrieval.session_factory")
     @patch("core.rag.retrieval.dataset_retrieval.FeatureService")
-    @patch("core.rag.retrieval.dataset_retrieval.redis_client")
-    @patch("core.rag.retrieval.dataset_retrieval.time")
-    def test_rate_limit_enabled_not_exceeded(self, mock_time, mock_redis, mock_feature_service, mock_session_factory):
+    @patch("core.rag.retrieval.dataset_retrieval.SlidingWindowRateLimiter")
+    def test_rate_limit_enabled_not_exceeded(self, mock_limiter, mock_feature_service, mock_session_factory):
         """
         Test that when rate limit is enabled but not exceeded, no exception is raised.
 
         This test simulates a tenant making requests within their rate limit.
-        The Redis sorted set stores timestamps of recent requests, and old
-        requests (older than 60 seconds) are removed.
+        The request is recorded in a 60 second sliding window keyed by tenant.
 
         Verifies:
-        - Redis zadd is called to track the request
-        - Redis zremrangebyscore removes old entries
-        - Redis zcard returns count within limit
+        - The sliding window is built from the tenant's limit
+        - The hit is recorded under the tenant's key
         - No exception is raised
         """
         # Arrange
@@ -2140,14 +2136,8 @@ class TestCheckKnowledgeRateLimit:
         mock_limit.subscription_plan = "professional"
         mock_feature_service.get_knowledge_rate_limit.return_value = mock_limit
 
-        # Mock time
-        current_time = 1234567890000  # Current time in milliseconds
-        mock_time.time.return_value = current_time / 1000  # Return seconds
-        mock_time.time.__mul__ = lambda self, x: int(self * x)  # Multiply to get milliseconds
-
-        # Mock Redis operations
-        # zcard returns 50 (within limit of 100)
-        mock_redis.zcard.return_value = 50
+        # 51 requests in the window (within limit of 100)
+        mock_limiter.return_value.hit.return_value = RateLimitResult(allowed=True, count=51)
 
         # Mock session_factory.create_session
         mock_session = MagicMock()
@@ -2158,17 +2148,15 @@ class TestCheckKnowledgeRateLimit:
         dataset_retrieval._check_knowledge_rate_limit(tenant_id)
 
         # Verify Redis operations
-        expected_key = f"rate_limit_{tenant_id}"
-        mock_redis.zadd.assert_called_once_with(expected_key, {current_time: current_time})
-        mock_redis.zremrangebyscore.assert_called_once_with(expected_key, 0, current_time - 60000)
-        mock_redis.zcard.assert_called_once_with(expected_key)
+        mock_limiter.assert_called_once_with(limit=100, window=60)
+        mock_limiter.return_value.hit.assert_called_once_with(f"rate_limit_{tenant_id}")
+        mock_session.add.assert_not_called()
 
     @patch("core.rag.retrieval.dataset_retrieval.session_factory")
     @patch("core.rag.retrieval.dataset_retrieval.FeatureService")
-    @patch("core.rag.retrieval.dataset_retrieval.redis_client")
-    @patch("core.rag.retrieval.dataset_retrieval.time")
+    @patch("core.rag.retrieval.dataset_retrieval.SlidingWindowRateLimiter")
     def test_rate_limit_enabled_exceeded_raises_exception(
-        self, mock_time, mock_redis, mock_feature_service, mock_session_factory
+        self, mock_limiter, mock_feature_service, mock_session_factory
     ):
         """
         Test that when rate limit is enabled and exceeded, RateLimitExceededError is raised.
@@ -2178,7 +2166,7 @@ class TestCheckKnowledgeRateLimit:
         a RateLimitLog should be created.
 
         Verifies:
-        - Redis zcard returns count exceeding limit
+        - The sliding window rejects the hit
         - RateLimitExceededError is raised with correct message
         - RateLimitLog is created in database
         - Session operations are performed correctly
@@ -2194,12 +2182,8 @@ class TestCheckKnowledgeRateLimit:
         mock_limit.subscription_plan = "professional"
         mock_feature_service.get_knowledge_rate_limit.return_value = mock_limit
 
-        # Mock time
-        current_time = 1234567890000
-        mock_time.time.return_value = current_time / 1000
-
-        # Mock Redis operations - return count exceeding limit
-        mock_redis.zcard.return_value = 150  # Exceeds limit of 100
+        # Window already holds the limit of 100
+        mock_limiter.return_value.hit.return_value = RateLimitResult(allowed=False, count=100)
 
         # Mock session_factory.create_session
         mock_session = MagicMock()
@@ -4055,13 +4039,12 @@ class TestDatasetRetrievalAdditionalHelpers:
     def test_check_knowledge_rate_limit(self, retrieval: DatasetRetrieval) -> None:
         with (
             patch("core.rag.retrieval.dataset_retrieval.FeatureService.get_knowledge_rate_limit") as mock_limit,
-            patch("core.rag.retrieval.dataset_retrieval.redis_client") as mock_redis,
-            patch("core.rag.retrieval.dataset_retrieval.time.time", return_value=100.0),
+            patch("core.rag.retrieval.dataset_retrieval.SlidingWindowRateLimiter") as mock_limiter,
         ):
             mock_limit.return_value = SimpleNamespace(enabled=True, limit=2, subscription_plan="pro")
-            mock_redis.zcard.return_value = 1
+            mock_limiter.return_value.hit.return_value = RateLimitResult(allowed=True, count=2)
             retrieval._check_knowledge_rate_limit("tenant-1")
-            mock_redis.zadd.assert_called_once()
+            mock_limiter.return_value.hit.assert_called_once_with("rate_limit_tenant-1")
 
         session = Mock()
         session_ctx = MagicMock()
@@ -4070,12 +4053,11 @@ class TestDatasetRetrievalAdditionalHelpers:
 
         with (
             patch("core.rag.retrieval.dataset_retrieval.FeatureService.get_knowledge_rate_limit") as mock_limit,
-            patch("core.rag.retrieval.dataset_retrieval.redis_client") as mock_redis,
-            patch("core.rag.retrieval.dataset_retrieval.time.time", return_value=100.0),
+            patch("core.rag.retrieval.dataset_retrieval.SlidingWindowRateLimiter") as mock_limiter,
             patch("core.rag.retrieval.dataset_retrieval.session_factory.create_session", return_value=session_ctx),
         ):
             mock_limit.return_value = SimpleNamespace(enabled=True, limit=1, subscription_plan="pro")
-            mock_redis.zcard.return_value = 2
+            mock_limiter.return_value.hit.return_value = RateLimitResult(allowed=False, count=1)
             with pytest.raises(exc.RateLimitExceededError):
                 retrieval._check_knowledge_rate_limit("tenant-1")
             session.add.assert_called_once()
@@ -4860,7 +4842,10 @@ class TestInternalHooksCoverage:
             retrieval._on_retrieval_end(flask_app=app, documents=[doc], message_id="m1", timer={"cost": 1})
         mock_trace.assert_called_once()
 
-    def test_on_retrieval_end_updates_segments_for_text_and_image(self, retrieval: DatasetRetrieval) -> None:
+    @pytest.mark.parametrize("buffer_hits", [True, False])
+    def test_on_retrieval_end_updates_segments_for_text_and_image(
+        self, retrieval: DatasetRetrieval, buffer_hits: bool
+    ) -> None:
         app = Flask(__name__)
         docs = [
             _doc(provider="dify", document_id="doc-a", doc_id="idx-a", extra={"doc_type": "text"}),
@@ -4900,11 +4885,18 @@ class TestInternalHooksCoverage:
         with (
             patch("core.rag.retrieval.dataset_retrieval.db", SimpleNamespace(engine=Mock())),
             patch("core.rag.retrieval.dataset_retrieval.sessionmaker", return_value=sessionmaker_ctx),
+            patch("core.rag.retrieval.dataset_retrieval.dify_config.ENABLE_SEGMENT_HIT_COUNT_FLUSH_TASK", buffer_hits),
+            patch("core.rag.retrieval.dataset_retrieval.SegmentHitCountService.record_hits") as mock_record_hits,
             patch.object(retrieval, "_send_trace_task") as mock_trace,
         ):
             retrieval._on_retrieval_end(flask_app=app, documents=docs, message_id="m1", timer={"cost": 1})
 
-        session.execute.assert_called_once()
+        if buffer_hits:
+            mock_record_hits.assert_called_once_with({"seg-a", "seg-b", "seg-c", "seg-d"})
+            session.execute.assert_not_called()
+        else:
+            mock_record_hits.assert_not_called()
+            session.execute.assert_called_once()
         mock_trace.assert_called_once()
 
     def test_retriever_variants(self, retrieval: DatasetRetrieval) -> None:
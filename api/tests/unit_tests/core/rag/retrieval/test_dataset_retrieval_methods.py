@@ -8,6 +8,7 @@ from core.rag.models.document import Document
 from core.rag.retrieval.dataset_retrieval import DatasetRetrieval
 from core.workflow.nodes.knowledge_retrieval import exc
 from core.workflow.nodes.knowledge_retrieval.retrieval import KnowledgeRetrievalRequest
+from libs.redis_rate_limiter import RateLimitResult
 from models.dataset import Dataset
 
 # ==================== Helper Functions ====================
@@ -111,8 +112,8 @@ class TestCheckKnowledgeRateLimit:
     """
 
     @patch("core.rag.retrieval.dataset_retrieval.FeatureService")
-    @patch("core.rag.retrieval.dataset_retrieval.redis_client")
-    def test_rate_limit_disabled_no_exception(self, mock_redis, mock_feature_service):
+    @patch("core.rag.retrieval.dataset_retrieval.SlidingWindowRateLimiter")
+    def test_rate_limit_disabled_no_exception(self, mock_limiter, mock_feature_service):
         """
         Test that when rate limit is disabled, no exception is raised.
 
@@ -141,26 +142,21 @@ class TestCheckKnowledgeRateLimit:
         mock_feature_service.get_knowledge_rate_limit.assert_called_once_with(tenant_id)
 
         # Verify no Redis operations were performed
-        assert not mock_redis.zadd.called
-        assert not mock_redis.zremrangebyscore.called
-        assert not mock_redis.zcard.called
+        mock_limiter.assert_not_called()
 
     @patch("core.rag.retrieval.dataset_retrieval.session_factory")
     @patch("core.rag.retrieval.dataset_retrieval.FeatureService")
-    @patch("core.rag.retrieval.dataset_retrieval.redis_client")
-    @patch("core.rag.retrieval.dataset_retrieval.time")
-    def test_rate_limit_enabled_not_exceeded(self, mock_time, mock_redis, mock_feature_service, mock_session_factory):
+    @patch("core.rag.retrieval.dataset_retrieval.SlidingWindowRateLimiter")
+    def test_rate_limit_enabled_not_exceeded(self, mock_limiter, mock_feature_service, mock_session_factory):
         """
         Test that when rate limit is enabled but not exceeded, no exception is raised.
 
         This test simulates a tenant making requests within their rate limit.
-        The Redis sorted set stores timestamps of recent requests, and old
-        requests (older than 60 seconds) are removed.
+        The request is recorded in a 60 second sliding window keyed by tenant.
 
         Verifies:
-        - Redis zadd is called to track the request
-        - Redis zremrangebyscore removes old entries
-        - Redis zcard returns count within limit
+        - The sliding window is built from the tenant's limit
+        - The hit is recorded under the tenant's key
         - No exception is raised
         """
         # Arrange
@@ -174,14 +170,8 @@ class TestCheckKnowledgeRateLimit:
         mock_limit.subscription_plan = "professional"
         mock_feature_service.get_knowledge_rate_limit.return_value = mock_limit
 
-        # Mock time
-        current_time = 1234567890000  # Current time in milliseconds
-        mock_time.time.return_value = current_time / 1000  # Return seconds
-        mock_time.time.__mul__ = lambda self, x: int(self * x)  # Multiply to get milliseconds
-
-        # Mock Redis operations
-        # zcard returns 50 (within limit of 100)
-        mock_redis.zcard.return_value = 50
+        # 51 requests in the window (within limit of 100)
+        mock_limiter.return_value.hit.return_value = RateLimitResult(allowed=True, count=51)
 
         # Mock session_factory.create_session
         mock_session = MagicMock()
@@ -192,17 +182,15 @@ class TestCheckKnowledgeRateLimit:
         dataset_retrieval._check_knowledge_rate_limit(tenant_id)
 
         # Verify Redis operations
-        expected_key = f"rate_limit_{tenant_id}"
-        mock_redis.zadd.assert_called_once_with(expected_key, {current_time: current_time})
-        mock_redis.zremrangebyscore.assert_called_once_with(expected_key, 0, current_time - 60000)
-        mock_redis.zcard.assert_called_once_with(expected_key)
+        mock_limiter.assert_called_once_with(limit=100, window=60)
+        mock_limiter.return_value.hit.assert_called_once_with(f"rate_limit_{tenant_id}")
+        mock_session.add.assert_not_called()
 
     @patch("core.rag.retrieval.dataset_retrieval.session_factory")
     @patch("core.rag.retrieval.dataset_retrieval.FeatureService")
-    @patch("core.rag.retrieval.dataset_retrieval.redis_client")
-    @patch("core.rag.retrieval.dataset_retrieval.time")
+    @patch("core.rag.retrieval.dataset_retrieval.SlidingWindowRateLimiter")
     def test_rate_limit_enabled_exceeded_raises_exception(
-        self, mock_time, mock_redis, mock_feature_service, mock_session_factory
+        self, mock_limiter, mock_feature_service, mock_session_factory
     ):
         """
         Test that when rate limit is enabled and exceeded, RateLimitExceededError is raised.
@@ -212,7 +200,7 @@ class TestCheckKnowledgeRateLimit:
         a RateLimitLog should be created.
 
         Verifies:
-        - Redis zcard returns count exceeding limit
+        - The sliding window rejects the hit
         - RateLimitExceededError is raised with correct message
         - RateLimitLog is created in database
         - Session operations are performed correctly
@@ -228,12 +216,8 @@ class TestCheckKnowledgeRateLimit:
         mock_limit.subscription_plan = "professional"
         mock_feature_service.get_knowledge_rate_limit.return_value = mock_limit
 
-        # Mock time
-        current_time = 1234567890000
-        mock_time.time.return_value = current_time / 1000
-
-        # Mock Redis operations - return count exceeding limit
-        mock_redis.zcard.return_value = 150  # Exceeds limit of 100
+        # Window already holds the limit of 100
+        mock_limiter.return_value.hit.return_value = RateLimitResult(allowed=False, count=100)
 
         # Mock session_factory.create_session
         mock_session = MagicMock()
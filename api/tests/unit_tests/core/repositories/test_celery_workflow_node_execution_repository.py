@@ -347,3 +347,127 @@ class TestCeleryWorkflowNodeExecutionRepository:
         assert len(result) == 2
         assert result[0].index == 2
         assert result[1].index == 1
+
+
+def _make_execution(workflow_execution_id: str, index: int) -> WorkflowNodeExecution:
+    return WorkflowNodeExecution(
+        id=str(uuid4()),
+        node_execution_id=str(uuid4()),
+        workflow_id="workflow-id",
+        workflow_execution_id=workflow_execution_id,
+        index=index,
+        node_id=f"node_{index}",
+        node_type=BuiltinNodeTypes.START,
+        title=f"Node {index}",
+        status=WorkflowNodeExecutionStatus.RUNNING,
+        created_at=naive_utc_now(),
+    )
+
+
+@patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_executions_task")
+@patch("core.repositories.celery_workflow_node_execution_repository.save_workflow_node_execution_task")
+class TestCeleryWorkflowNodeExecutionRepositoryBuffering:
+    """Test cases for the write-behind buffer of CeleryWorkflowNodeExecutionRepository."""
+
+    @pytest.fixture(autouse=True)
+    def buffer_config(self, monkeypatch):
+        monkeypatch.setattr(
+            "core.repositories.celery_workflow_node_execution_repository.dify_config.CELERY_WORKFLOW_NODE_EXECUTION_BUFFER_SIZE",
+            3,
+        )
+        monkeypatch.setattr(
+            "core.repositories.celery_workflow_node_execution_repository.dify_config.CELERY_WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL",
+            3600.0,
+        )
+
+    def _build_repo(self, session_factory, user, triggered_from=WorkflowNodeExecutionTriggeredFrom.WORKFLOW_RUN):
+        return CeleryWorkflowNodeExecutionRepository(
+            session_factory=session_factory,
+            user=user,
+            app_id="test-app",
+            triggered_from=triggered_from,
+        )
+
+    def test_updates_are_coalesced_per_execution(self, mock_task, mock_bulk_task, mock_session_factory, mock_account):
+        repo = self._build_repo(mock_session_factory, mock_account)
+        execution = _make_execution("run-1", 1)
+
+        repo.save(execution)
+        execution.status = WorkflowNodeExecutionStatus.SUCCEEDED
+        repo.save(execution)
+        repo.flush()
+
+        mock_task.delay.assert_not_called()
+        mock_bulk_task.delay.assert_called_once()
+        executions_data = mock_bulk_task.delay.call_args.kwargs["executions_data"]
+        assert len(executions_data) == 1
+        assert executions_data[0]["status"] == WorkflowNodeExecutionStatus.SUCCEEDED
+        # reads are still served from the in-memory cache while buffered
+        assert repo.get_by_workflow_execution("run-1") == [execution]
+
+    def test_flushes_when_buffer_is_full(self, mock_task, mock_bulk_task, mock_session_factory, mock_account):
+        repo = self._build_repo(mock_session_factory, mock_account)
+        executions = [_make_execution("run-1", index) for index in range(4)]
+
+        for execution in executions:
+            repo.save(execution)
+
+        mock_bulk_task.delay.assert_called_once()
+        call_kwargs = mock_bulk_task.delay.call_args.kwargs
+        assert [data["id"] for data in call_kwargs["executions_data"]] == [e.id for e in executions[:3]]
+        assert call_kwargs["tenant_id"] == mock_account.current_tenant_id
+        assert call_kwargs["app_id"] == "test-app"
+        assert call_kwargs["triggered_from"] == WorkflowNodeExecutionTriggeredFrom.WORKFLOW_RUN
+
+        repo.flush()
+        assert mock_bulk_task.delay.call_count == 2
+        assert [data["id"] for data in mock_bulk_task.delay.call_args.kwargs["executions_data"]] == [executions[3].id]
+
+    def test_flushes_when_interval_elapsed(
+        self, mock_task, mock_bulk_task, mock_session_factory, mock_account, monkeypatch
+    ):
+        repo = self._build_repo(mock_session_factory, mock_account)
+        repo.save(_make_execution("run-1", 1))
+        mock_bulk_task.delay.assert_not_called()
+
+        monkeypatch.setattr(repo, "_last_flushed_at", repo._last_flushed_at - 3600.0)
+        repo.save(_make_execution("run-1", 2))
+
+        mock_bulk_task.delay.assert_called_once()
+        assert len(mock_bulk_task.delay.call_args.kwargs["executions_data"]) == 2
+
+    def test_flush_without_pending_executions_is_noop(
+        self, mock_task, mock_bulk_task, mock_session_factory, mock_account
+    ):
+        repo = self._build_repo(mock_session_factory, mock_account)
+
+        repo.flush()
+
+        mock_bulk_task.delay.assert_not_called()
+
+    def test_single_step_saves_are_not_buffered(self, mock_task, mock_bulk_task, mock_session_factory, mock_account):
+        repo = self._build_repo(mock_session_factory, mock_account, WorkflowNodeExecutionTriggeredFrom.SINGLE_STEP)
+
+        repo.save(_make_execution("run-1", 1))
+
+        mock_task.delay.assert_called_once()
+        mock_bulk_task.delay.assert_not_called()
+
+    def test_broker_messages_drop_for_iterations(self, mock_task, mock_bulk_task, mock_session_factory, mock_account):
+        repo = self._build_repo(mock_session_factory, mock_account)
+        repo._buffer_size = 100
+
+        # an iteration over 500 items, each node saved when started and when finished
+        for index in range(500):
+            execution = _make_execution("run-1", index)
+            repo.save(execution)
+            execution.status = WorkflowNodeExecutionStatus.SUCCEEDED
+            repo.save(execution)
+        repo.flush()
+
+        # one message per ~100 executions instead of one per save (1000 unbuffered)
+        assert mock_bulk_task.delay.call_count <= 6
+        persisted = [data for call in mock_bulk_task.delay.call_args_list for data in call.kwargs["executions_data"]]
+        latest_status = {data["id"]: data["status"] for data in persisted}
+        assert len(latest_status) == 500
+        assert set(latest_status.values()) == {WorkflowNodeExecutionStatus.SUCCEEDED}
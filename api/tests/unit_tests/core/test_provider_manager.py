@@ -5,6 +5,7 @@ import pytest
 from pytest_mock import MockerFixture
 
 from core.entities.provider_entities import ModelSettings
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
 from core.provider_manager import ProviderManager
 from graphon.model_runtime.entities.common_entities import I18nObject
 from graphon.model_runtime.entities.model_entities import ModelType
@@ -444,6 +445,56 @@ def test_clear_configurations_cache_rebuilds_requested_tenant(mocker: MockerFixt
     provider_configuration_second.bind_model_runtime.assert_called_once_with(manager._model_runtime)
 
 
+def test_get_configurations_shares_assembly_across_managers(mocker: MockerFixture, mock_provider_entity):
+    first_manager = _build_provider_manager(mocker)
+    second_manager = _build_provider_manager(mocker)
+    third_manager = _build_provider_manager(mocker)
+    provider_factory = Mock()
+    provider_factory.get_providers.return_value = [mock_provider_entity]
+    custom_configuration = SimpleNamespace(provider=None, models=[])
+    system_configuration = SimpleNamespace(enabled=False, quota_configurations=[], current_quota_type=None)
+    provider_configuration = Mock()
+    shared_cache = ProviderConfigurationsCache(maxsize=8, ttl=60)
+    versions = iter([0, 0, 1])
+    mocker.patch("core.provider_manager.get_provider_configurations_cache", return_value=shared_cache)
+    mocker.patch.object(ProviderConfigurationsCache, "get_version", side_effect=lambda tenant_id: next(versions))
+    mock_get_all_providers = mocker.patch.object(ProviderManager, "_get_all_providers", return_value={"openai": []})
+
+    with (
+        patch.object(ProviderManager, "_init_trial_provider_records", return_value={"openai": []}),
+        patch.object(ProviderManager, "_get_all_provider_models", return_value={"openai": []}),
+        patch.object(ProviderManager, "_get_all_preferred_model_providers", return_value={}),
+        patch.object(ProviderManager, "_get_all_provider_model_settings", return_value={}),
+        patch.object(ProviderManager, "_get_all_provider_load_balancing_configs", return_value={}),
+        patch.object(ProviderManager, "_get_all_provider_model_credentials", return_value={}),
+        patch.object(ProviderManager, "_to_custom_configuration", return_value=custom_configuration),
+        patch.object(ProviderManager, "_to_system_configuration", return_value=system_configuration),
+        patch.object(ProviderManager, "_to_model_settings", return_value=[]),
+        patch("core.provider_manager.ModelProviderFactory", return_value=provider_factory),
+        patch("core.provider_manager.ProviderConfiguration", return_value=provider_configuration),
+    ):
+        first = first_manager.get_configurations("tenant-id")
+        second = second_manager.get_configurations("tenant-id")
+        # a write bumped the tenant version
+        third = third_manager.get_configurations("tenant-id")
+
+    assert first is not second
+    assert mock_get_all_providers.call_count == 2
+    # the shared entry is never bound, each manager binds its own copy
+    provider_configuration.bind_model_runtime.assert_not_called()
+    bound_runtimes = [
+        call.args[0] for call in provider_configuration.model_copy.return_value.bind_model_runtime.call_args_list
+    ]
+    assert bound_runtimes == [
+        first_manager._model_runtime,
+        second_manager._model_runtime,
+        third_manager._model_runtime,
+    ]
+    assert all(call.kwargs == {"deep": True} for call in provider_configuration.model_copy.call_args_list)
+    assert shared_cache.stats()["hits"] == 1
+    assert shared_cache.stats()["misses"] == 2
+
+
 def test_get_provider_model_bundle_returns_selected_model_type_instance(mocker: MockerFixture):
     manager = _build_provider_manager(mocker)
     provider_configuration = Mock()
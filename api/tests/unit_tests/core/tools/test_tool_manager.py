@@ -11,6 +11,7 @@ from unittest.mock import Mock, patch
 import pytest
 
 from core.app.entities.app_invoke_entities import InvokeFrom
+from core.helper.plugin_declaration_cache import PluginDeclarationCache
 from core.plugin.entities.plugin_daemon import CredentialType
 from core.tools.__base.tool_runtime import ToolRuntime
 from core.tools.entities.tool_entities import (
@@ -156,6 +157,27 @@ def test_get_plugin_provider_uses_context_cache():
     mock_manager_cls.return_value.fetch_tool_provider.assert_called_once()
 
 
+def test_get_plugin_provider_shares_declaration_across_requests():
+    declaration_cache = PluginDeclarationCache(maxsize=8, ttl=60)
+    provider_entity = SimpleNamespace(declaration=Mock(), plugin_id="pid", plugin_unique_identifier="uid")
+
+    with patch("core.helper.plugin_declaration_cache.get_plugin_declaration_cache", return_value=declaration_cache):
+        with patch("core.helper.plugin_declaration_cache.redis_client") as mock_redis:
+            mock_redis.get.return_value = None
+            with patch("core.tools.tool_manager.PluginToolManager") as mock_manager_cls:
+                mock_manager_cls.return_value.fetch_tool_provider.return_value = provider_entity
+                with patch("core.tools.tool_manager.PluginToolProviderController"):
+                    for _ in range(2):
+                        # every request starts with an empty context cache
+                        lock_context = _SimpleContextVar()
+                        lock_context.set(threading.Lock())
+                        with patch("core.tools.tool_manager.contexts.plugin_tool_providers", _SimpleContextVar()):
+                            with patch("core.tools.tool_manager.contexts.plugin_tool_providers_lock", lock_context):
+                                ToolManager.get_plugin_provider("provider-a", "tenant-1")
+
+    mock_manager_cls.return_value.fetch_tool_provider.assert_called_once_with("tenant-1", "provider-a")
+
+
 def test_get_plugin_provider_raises_when_provider_missing():
     provider_context = _SimpleContextVar()
     lock_context = _SimpleContextVar()
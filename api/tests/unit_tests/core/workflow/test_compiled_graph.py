@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from configs import dify_config
+from core.workflow import compiled_graph
+from core.workflow.compiled_graph import clear_compiled_workflow_graph_cache, get_compiled_workflow_graph
+from models.workflow import Workflow
+
+GRAPH = {"nodes": [{"id": "start", "data": {"type": "start"}}], "edges": []}
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_compiled_workflow_graph_cache()
+    yield
+    clear_compiled_workflow_graph_cache()
+
+
+def _workflow(graph: dict, workflow_id: str = "workflow-id") -> Workflow:
+    return Workflow(id=workflow_id, graph=json.dumps(graph))
+
+
+def test_returns_same_compiled_graph_for_same_workflow_version():
+    first = get_compiled_workflow_graph(_workflow(GRAPH))
+    second = get_compiled_workflow_graph(_workflow(GRAPH))
+
+    assert first is second
+    assert first.graph_config == GRAPH
+
+
+def test_changed_graph_is_compiled_again():
+    first = get_compiled_workflow_graph(_workflow(GRAPH))
+    edited = {**GRAPH, "edges": [{"source": "start", "target": "end"}]}
+
+    second = get_compiled_workflow_graph(_workflow(edited))
+
+    assert second is not first
+    assert second.graph_config == edited
+
+
+def test_workflows_with_same_graph_are_cached_separately():
+    assert get_compiled_workflow_graph(_workflow(GRAPH, "a")) is not get_compiled_workflow_graph(_workflow(GRAPH, "b"))
+
+
+def test_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(dify_config, "WORKFLOW_GRAPH_CACHE_MAX_SIZE", 0)
+    monkeypatch.setattr(compiled_graph, "_compiled_graphs", None)
+
+    first = get_compiled_workflow_graph(_workflow(GRAPH))
+    second = get_compiled_workflow_graph(_workflow(GRAPH))
+
+    assert first is not second
+    assert first.graph_config == second.graph_config == GRAPH
@@ -6,6 +6,7 @@ import pytest
 from core.app.entities.app_invoke_entities import DIFY_RUN_CONTEXT_KEY, DifyRunContext, InvokeFrom, UserFrom
 from core.workflow import node_factory
 from core.workflow import template_rendering as workflow_template_rendering
+from core.workflow.compiled_graph import CompiledWorkflowGraph
 from core.workflow.nodes.knowledge_index import KNOWLEDGE_INDEX_NODE_TYPE
 from graphon.entities.base_node_data import BaseNodeData
 from graphon.enums import BuiltinNodeTypes, NodeType
@@ -259,6 +260,7 @@ class TestDifyNodeFactoryInit:
         init.assert_called_once_with(
             graph_init_params=sentinel.graph_init_params,
             graph_runtime_state=sentinel.graph_runtime_state,
+            compiled_graph=None,
         )
 
     def test_init_builds_default_dependencies(self):
@@ -285,7 +287,7 @@ class TestDifyNodeFactoryInit:
             ) as resolve_dify_context,
             patch.object(
                 node_factory,
-                "CodeExecutorJinja2TemplateRenderer",
+                "build_jinja2_template_renderer",
                 return_value=jinja2_template_renderer,
             ) as renderer_factory,
             patch.object(
@@ -397,6 +399,7 @@ class TestDifyNodeFactoryCreateNode:
     @pytest.fixture
     def factory(self):
         factory = object.__new__(node_factory.DifyNodeFactory)
+        factory._compiled_graph = None
         factory.graph_init_params = sentinel.graph_init_params
         factory.graph_runtime_state = SimpleNamespace(variable_pool=MagicMock())
         factory._dify_context = SimpleNamespace(
@@ -488,6 +491,22 @@ class TestDifyNodeFactoryCreateNode:
         assert kwargs["graph_init_params"] is sentinel.graph_init_params
         assert kwargs["graph_runtime_state"] is factory.graph_runtime_state
 
+    def test_reuses_validated_node_data_of_compiled_graph(self, monkeypatch, factory):
+        constructor = _node_constructor(return_value=sentinel.node)
+        resolve_node_class = MagicMock(return_value=constructor)
+        monkeypatch.setattr(factory, "_resolve_node_class", resolve_node_class)
+        factory._compiled_graph = CompiledWorkflowGraph({})
+        node_config = {"id": "node-id", "data": {"type": BuiltinNodeTypes.START}}
+
+        assert factory.create_node(node_config) is sentinel.node
+        assert factory.create_node(node_config) is sentinel.node
+
+        resolve_node_class.assert_called_once()
+        assert constructor.call_count == 2
+        first_config, second_config = (call.kwargs["config"] for call in constructor.call_args_list)
+        assert first_config is second_config
+        assert factory._compiled_graph.get_node("node-id").node_data is first_config
+
     @pytest.mark.parametrize(
         ("node_type", "constructor_name"),
         [
@@ -0,0 +1,152 @@
+import time
+
+import pytest
+
+from configs import dify_config
+from core.workflow import template_rendering
+from core.workflow.template_rendering import (
+    CodeExecutorJinja2TemplateRenderer,
+    SandboxedJinja2TemplateRenderer,
+    build_jinja2_template_renderer,
+)
+from graphon.template_rendering import TemplateRenderError
+from graphon.variables.segments import StringSegment
+
+
+def _renderer(**overrides) -> SandboxedJinja2TemplateRenderer:
+    limits = {"cache_size": 16, "max_output_length": 1000, "max_loop_iterations": 100, "timeout": 5.0}
+    return SandboxedJinja2TemplateRenderer(**(limits | overrides))
+
+
+class TestSandboxedJinja2TemplateRenderer:
+    def test_renders_template(self):
+        rendered = _renderer().render_template(
+            "Hello {{ name }}!{% for item in items %} {{ loop.index }}.{{ item.title }}{% endfor %}",
+            {"name": StringSegment(value="workflow"), "items": [{"title": "a"}, {"title": "b"}]},
+        )
+
+        assert rendered == "Hello workflow! 1.a 2.b"
+
+    def test_reuses_compiled_template(self, monkeypatch):
+        renderer = _renderer()
+        renderer.render_template("{{ value }}", {"value": 1})
+        monkeypatch.setattr(renderer._environment, "from_string", lambda source: pytest.fail("compiled again"))
+
+        assert renderer.render_template("{{ value }}", {"value": 2}) == "2"
+
+    @pytest.mark.parametrize(
+        "template",
+        [
+            "{{ ''.__class__.__mro__ }}",
+            "{{ items.append(3) }}",
+            "{% for %}",
+            "{{ 1 / 0 }}",
+        ],
+    )
+    def test_rejected_templates_raise_render_error(self, template: str):
+        with pytest.raises(TemplateRenderError):
+            _renderer().render_template(template, {"items": [1, 2]})
+
+    def test_limits_output_length(self):
+        with pytest.raises(TemplateRenderError, match="exceeds the limit of 1000 characters"):
+            _renderer().render_template("{{ text }}{{ text }}", {"text": "x" * 600})
+
+    @pytest.mark.parametrize(
+        ("template", "variables"),
+        [
+            ("{% for i in range(101) %}{% endfor %}", {}),
+            ("{% for a in items %}{% for b in items %}{% endfor %}{% endfor %}", {"items": list(range(10))}),
+            ("{% for a in text %}{% for b in text %}{% endfor %}{% endfor %}", {"text": "x" * 10}),
+            ("{% for key, value in mapping.items() %}{% endfor %}", {"mapping": {str(i): i for i in range(101)}}),
+            ("{% for item in items|reverse %}{% endfor %}", {"items": list(range(101))}),
+        ],
+    )
+    def test_limits_loop_iterations(self, template: str, variables: dict):
+        with pytest.raises(TemplateRenderError, match="limit of 100 loop iterations"):
+            _renderer().render_template(template, variables)
+
+    @pytest.mark.parametrize(
+        ("template", "error"),
+        [
+            ("{{ 'a' * 10 ** 9 }}", "Repeated sequence exceeds the limit of 1000 items"),
+            ("{{ 10 ** 9 * [1] }}", "Repeated sequence exceeds the limit of 1000 items"),
+            ("{{ 2 ** (10 ** 8) }}", "Integer power exceeds the limit"),
+            ("{{ (2 ** 4000) * (2 ** 4000) }}", "Integer product exceeds the limit"),
+        ],
+    )
+    def test_limits_operator_results(self, template: str, error: str):
+        with pytest.raises(TemplateRenderError, match=error):
+            _renderer().render_template(template, {})
+
+    def test_bounded_operators_and_loops_render_as_before(self):
+        rendered = _renderer().render_template(
+            "{{ 'ab' * 3 }} {{ 2 ** 10 }} {{ 1.5 * 2 }}"
+            "{% for key, value in mapping.items() %} {{ key }}={{ value }}/{{ loop.length }}{% endfor %}",
+            {"mapping": {"a": 1, "b": 2}},
+        )
+
+        assert rendered == "ababab 1024 3.0 a=1/2 b=2/2"
+
+    @pytest.mark.parametrize(
+        ("template", "error"),
+        [
+            ("{{ 'a'.ljust(200000000)|length }}", "String result exceeds the limit of 1000 characters"),
+            ("{{ 'a'|center(200000000)|length }}", "String result exceeds the limit of 1000 characters"),
+            ("{{ '{:>200000000}'.format(1)|length }}", "Format spec '>200000000' exceeds the limit"),
+            ("{{ ('x'*400).replace('x','x'*1000)|length }}", "String result exceeds the limit of 1000 characters"),
+            ("{{ '1'.zfill(2000) }}", "String result exceeds the limit of 1000 characters"),
+            ("{{ ('\t' * 10).expandtabs(200) }}", "String result exceeds the limit of 1000 characters"),
+            ("{{ 'ab'.translate({97: 'x' * 999}) }}", "String result exceeds the limit of 1000 characters"),
+            ("{{ ('x' * 10).join(['a'] * 200) }}", "String result exceeds the limit of 1000 characters"),
+            ("{{ '{x:>{w}}'.format_map({'x': 1, 'w': 2000}) }}", "Format spec '>2000' exceeds the limit"),
+            ("{{ ('{0}' * 100).format('x' * 100) }}", "Formatted string exceeds the limit of 1000 characters"),
+            ("{{ '%2000s' % 1 }}", "String result exceeds the limit of 1000 characters"),
+            ("{{ '%2000s'|format(1) }}", "String result exceeds the limit of 1000 characters"),
+            ("{{ ('x\\n' * 300)|indent(10, true) }}", "String result exceeds the limit of 1000 characters"),
+            ("{{ 'a b c'|wordwrap(1, wrapstring='x' * 999) }}", "String result exceeds the limit of 1000 characters"),
+            ("{{ ('x' * 600)|replace('x', 'yy') }}", "String result exceeds the limit of 1000 characters"),
+            ("{{ (['x' * 100] * 20)|join }}", "String result exceeds the limit of 1000 characters"),
+            ("{% set a = 'x' * 600 %}{{ (a + a)|length }}", "Concatenated sequence exceeds the limit of 1000 items"),
+            ("{% set a = 'x' * 600 %}{{ (a ~ a)|length }}", "String result exceeds the limit of 1000 characters"),
+            (
+                "{% set a = 'x' * 600 %}{% set b %}{{ a }}{{ a }}{% endset %}{{ b|length }}",
+                "Captured output exceeds the limit of 1000 characters",
+            ),
+            ("{{ lipsum(100) }}", "'lipsum' is undefined"),
+        ],
+    )
+    def test_limits_string_results(self, template: str, error: str):
+        with pytest.raises(TemplateRenderError, match=error):
+            _renderer().render_template(template, {})
+
+    def test_bounded_strings_render_as_before(self):
+        rendered = _renderer().render_template(
+            "{{ 'a'.ljust(3) }}|{{ 'a'|center(3) }}|{{ '{:>3}'.format(1) }}|{{ 'abc'.replace('b', 'xx') }}"
+            "|{{ '%s=%03d' % ('a', 7) }}|{{ '%(a)s'|format(a=1) }}|{{ items|join('-') }}|{{ ', '.join(items) }}"
+            "|{{ 'a' ~ 1 ~ none }}|{{ 'a\nb'|indent(2, true) }}|{{ 'ab cd'|wordwrap(2) }}"
+            "|{% set b %}[{{ 1 }}]{% endset %}{{ b }}|{% macro m(x) %}<{{ x }}>{% endmacro %}{{ m(2) }}",
+            {"items": ["x", "y"]},
+        )
+
+        assert rendered == "a  | a |  1|axxc|a=007|1|x-y|x, y|a1None|  a\n  b|ab\ncd|[1]|<2>"
+
+    def test_limits_render_time(self, monkeypatch):
+        clock = iter(range(0, 1000, 3))
+        monkeypatch.setattr(time, "monotonic", lambda: next(clock))
+
+        with pytest.raises(TemplateRenderError, match="time limit of 5.0 seconds"):
+            _renderer().render_template("{% for i in range(10) %}{{ i }}{% endfor %}", {})
+
+
+class TestBuildJinja2TemplateRenderer:
+    def test_uses_code_executor_by_default(self):
+        assert isinstance(build_jinja2_template_renderer(), CodeExecutorJinja2TemplateRenderer)
+
+    def test_in_process_renderer_is_shared(self, monkeypatch):
+        monkeypatch.setattr(dify_config, "TEMPLATE_RENDERER", "in_process")
+        template_rendering._get_sandboxed_jinja2_template_renderer.cache_clear()
+
+        renderer = build_jinja2_template_renderer()
+
+        assert isinstance(renderer, SandboxedJinja2TemplateRenderer)
+        assert build_jinja2_template_renderer() is renderer
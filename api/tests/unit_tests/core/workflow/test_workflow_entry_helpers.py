@@ -133,6 +133,7 @@ class TestWorkflowChildEngineBuilder:
         dify_node_factory.assert_called_once_with(
             graph_init_params=graph_init_params,
             graph_runtime_state=child_graph_runtime_state,
+            compiled_graph=None,
         )
         graph_init.assert_called_once_with(
             graph_config={"nodes": [{"id": "root"}]},
@@ -185,7 +186,7 @@ class TestWorkflowChildEngineBuilder:
             patch.object(
                 workflow_entry,
                 "DifyNodeFactory",
-                side_effect=lambda graph_init_params, graph_runtime_state: SimpleNamespace(
+                side_effect=lambda graph_init_params, graph_runtime_state, compiled_graph: SimpleNamespace(
                     graph_init_params=graph_init_params,
                     graph_runtime_state=graph_runtime_state,
                 ),
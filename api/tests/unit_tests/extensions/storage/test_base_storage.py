@@ -0,0 +1,73 @@
+from collections.abc import Generator
+
+import pytest
+
+from extensions.storage.base_storage import BaseStorage
+
+
+class _ChunkedMemoryStorage(BaseStorage):
+    """Storage relying on the default range and stream implementations of BaseStorage."""
+
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+        self.files: dict[str, bytes] = {}
+        self.streamed_chunks = 0
+
+    def save(self, filename: str, data: bytes):
+        self.files[filename] = data
+
+    def load_once(self, filename: str) -> bytes:
+        return self.files[filename]
+
+    def load_stream(self, filename: str) -> Generator:
+        data = self.files[filename]
+        for start in range(0, len(data), self.chunk_size):
+            self.streamed_chunks += 1
+            yield data[start : start + self.chunk_size]
+
+    def download(self, filename: str, target_filepath: str) -> None:
+        raise NotImplementedError
+
+    def exists(self, filename: str) -> bool:
+        return filename in self.files
+
+    def delete(self, filename: str):
+        self.files.pop(filename, None)
+
+
+@pytest.mark.parametrize(
+    ("offset", "length"),
+    [(0, 0), (0, 3), (2, 5), (3, 3), (7, 100), (10, 1), (11, 1), (50, 5)],
+)
+def test_default_load_range_matches_slice(offset: int, length: int):
+    storage = _ChunkedMemoryStorage(chunk_size=3)
+    data = bytes(range(11))
+    storage.save("file", data)
+
+    assert storage.load_range("file", offset, length) == data[offset : offset + length]
+
+
+def test_default_load_range_stops_streaming_at_range_end():
+    storage = _ChunkedMemoryStorage(chunk_size=3)
+    storage.save("file", bytes(30))
+
+    storage.load_range("file", 4, 4)
+
+    assert storage.streamed_chunks == 3
+
+
+def test_default_load_range_rejects_negative_values():
+    storage = _ChunkedMemoryStorage(chunk_size=3)
+
+    with pytest.raises(ValueError):
+        storage.load_range("file", -1, 1)
+    with pytest.raises(ValueError):
+        storage.load_range("file", 0, -1)
+
+
+def test_default_save_stream_joins_chunks():
+    storage = _ChunkedMemoryStorage(chunk_size=3)
+
+    storage.save_stream("file", iter([b"ab", b"", b"cde"]))
+
+    assert storage.files["file"] == b"abcde"
@@ -0,0 +1,196 @@
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+from extensions.ext_storage import CachedStorage
+from extensions.storage.base_storage import BaseStorage
+
+
+class _CountingMemoryStorage(BaseStorage):
+    def __init__(self):
+        self.files: dict[str, bytes] = {}
+        self.reads = 0
+
+    def save(self, filename: str, data: bytes):
+        self.files[filename] = data
+
+    def load_once(self, filename: str) -> bytes:
+        self.reads += 1
+        if filename not in self.files:
+            raise FileNotFoundError("File not found")
+        return self.files[filename]
+
+    def load_stream(self, filename: str) -> Generator:
+        data = self.load_once(filename)
+        for start in range(0, len(data), 4):
+            yield data[start : start + 4]
+
+    def download(self, filename: str, target_filepath: str) -> None:
+        Path(target_filepath).write_bytes(self.load_once(filename))
+
+    def exists(self, filename: str) -> bool:
+        return filename in self.files
+
+    def delete(self, filename: str):
+        self.files.pop(filename, None)
+
+
+@pytest.fixture
+def backend() -> _CountingMemoryStorage:
+    return _CountingMemoryStorage()
+
+
+@pytest.fixture
+def cache_path(tmp_path: Path) -> Path:
+    return tmp_path / "cache"
+
+
+def _cached(backend: BaseStorage, cache_path: Path, max_size: int = 100, max_object_size: int = 100) -> CachedStorage:
+    return CachedStorage(
+        backend,
+        path=str(cache_path),
+        max_size=max_size,
+        max_object_size=max_object_size,
+        key_prefixes=["upload_files/"],
+    )
+
+
+def test_load_once_reads_backend_once(backend: _CountingMemoryStorage, cache_path: Path):
+    backend.save("upload_files/a", b"0123456789")
+    storage = _cached(backend, cache_path)
+
+    assert storage.load_once("upload_files/a") == b"0123456789"
+    assert storage.load_once("upload_files/a") == b"0123456789"
+    assert b"".join(storage.load_stream("upload_files/a")) == b"0123456789"
+    assert storage.load_range("upload_files/a", 3, 4) == b"3456"
+
+    assert backend.reads == 1
+    stats = storage.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["miss_bytes"] == 10
+    assert stats["hit_bytes"] == 24
+    assert stats["size"] == 10
+
+
+def test_load_stream_fills_cache(backend: _CountingMemoryStorage, cache_path: Path):
+    backend.save("upload_files/a", b"0123456789")
+    storage = _cached(backend, cache_path)
+
+    assert b"".join(storage.load_stream("upload_files/a")) == b"0123456789"
+    assert storage.load_once("upload_files/a") == b"0123456789"
+    assert backend.reads == 1
+
+
+def test_abandoned_stream_is_not_cached(backend: _CountingMemoryStorage, cache_path: Path):
+    backend.save("upload_files/a", b"0123456789")
+    storage = _cached(backend, cache_path)
+
+    stream = storage.load_stream("upload_files/a")
+    next(stream)
+    stream.close()
+
+    assert storage.stats()["entries"] == 0
+    assert list(cache_path.iterdir()) == []
+
+
+def test_download_fills_and_uses_cache(backend: _CountingMemoryStorage, cache_path: Path, tmp_path: Path):
+    backend.save("upload_files/a", b"0123456789")
+    storage = _cached(backend, cache_path)
+
+    storage.download("upload_files/a", str(tmp_path / "first"))
+    storage.download("upload_files/a", str(tmp_path / "second"))
+
+    assert (tmp_path / "second").read_bytes() == b"0123456789"
+    assert backend.reads == 1
+
+
+def test_keys_outside_prefixes_are_not_cached(backend: _CountingMemoryStorage, cache_path: Path):
+    backend.save("privkeys/a", b"secret")
+    storage = _cached(backend, cache_path)
+
+    storage.load_once("privkeys/a")
+    storage.load_once("privkeys/a")
+
+    assert backend.reads == 2
+    assert storage.stats()["misses"] == 0
+
+
+def test_save_and_delete_invalidate(backend: _CountingMemoryStorage, cache_path: Path):
+    storage = _cached(backend, cache_path)
+    storage.save("upload_files/a", b"old")
+    assert storage.load_once("upload_files/a") == b"old"
+
+    storage.save("upload_files/a", b"new")
+    assert storage.load_once("upload_files/a") == b"new"
+
+    storage.delete("upload_files/a")
+    assert not storage.exists("upload_files/a")
+    with pytest.raises(FileNotFoundError):
+        storage.load_once("upload_files/a")
+
+
+def test_least_recently_used_entries_are_evicted(backend: _CountingMemoryStorage, cache_path: Path):
+    for name in "abc":
+        backend.save(f"upload_files/{name}", name.encode() * 40)
+    storage = _cached(backend, cache_path)
+
+    storage.load_once("upload_files/a")
+    storage.load_once("upload_files/b")
+    storage.load_once("upload_files/a")
+    storage.load_once("upload_files/c")
+
+    stats = storage.stats()
+    assert stats["evictions"] == 1
+    assert stats["size"] == 80
+    reads = backend.reads
+    storage.load_once("upload_files/a")
+    assert backend.reads == reads
+    storage.load_once("upload_files/b")
+    assert backend.reads == reads + 1
+
+
+def test_large_objects_are_not_cached(backend: _CountingMemoryStorage, cache_path: Path):
+    backend.save("upload_files/a", b"x" * 20)
+    storage = _cached(backend, cache_path, max_object_size=10)
+
+    assert b"".join(storage.load_stream("upload_files/a")) == b"x" * 20
+    assert storage.load_once("upload_files/a") == b"x" * 20
+
+    assert backend.reads == 2
+    assert list(cache_path.iterdir()) == []
+
+
+def test_entries_survive_restart(backend: _CountingMemoryStorage, cache_path: Path):
+    backend.save("upload_files/a", b"0123456789")
+    _cached(backend, cache_path).load_once("upload_files/a")
+
+    storage = _cached(backend, cache_path)
+
+    assert storage.load_once("upload_files/a") == b"0123456789"
+    assert backend.reads == 1
+    assert storage.stats()["size"] == 10
+
+
+def test_entry_removed_by_another_process_is_refetched(backend: _CountingMemoryStorage, cache_path: Path):
+    backend.save("upload_files/a", b"0123456789")
+    storage = _cached(backend, cache_path)
+    storage.load_once("upload_files/a")
+
+    for entry in cache_path.iterdir():
+        entry.unlink()
+
+    assert storage.load_once("upload_files/a") == b"0123456789"
+    assert backend.reads == 2
+
+
+def test_exists_asks_backend(backend: _CountingMemoryStorage, cache_path: Path):
+    backend.save("upload_files/a", b"0123456789")
+    storage = _cached(backend, cache_path)
+    storage.load_once("upload_files/a")
+
+    # deleted by another process, which cannot invalidate this process's entry
+    backend.delete("upload_files/a")
+
+    assert not storage.exists("upload_files/a")
@@ -176,6 +176,8 @@ class TestCelerySSLConfiguration:
         mock_config.TRIGGER_PROVIDER_REFRESH_INTERVAL = 15
         mock_config.ENABLE_API_TOKEN_LAST_USED_UPDATE_TASK = False
         mock_config.API_TOKEN_LAST_USED_UPDATE_INTERVAL = 30
+        mock_config.ENABLE_SEGMENT_HIT_COUNT_FLUSH_TASK = False
+        mock_config.SEGMENT_HIT_COUNT_FLUSH_INTERVAL = 60
 
         with patch("extensions.ext_celery.dify_config", mock_config):
             from dify_app import DifyApp
@@ -226,6 +228,8 @@ class TestCelerySSLConfiguration:
         mock_config.TRIGGER_PROVIDER_REFRESH_INTERVAL = 15
         mock_config.ENABLE_API_TOKEN_LAST_USED_UPDATE_TASK = False
         mock_config.API_TOKEN_LAST_USED_UPDATE_INTERVAL = 30
+        mock_config.ENABLE_SEGMENT_HIT_COUNT_FLUSH_TASK = False
+        mock_config.SEGMENT_HIT_COUNT_FLUSH_INTERVAL = 60
         mock_config.ENTERPRISE_ENABLED = False
         mock_config.ENTERPRISE_TELEMETRY_ENABLED = False
 
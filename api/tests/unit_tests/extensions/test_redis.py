@@ -211,6 +211,24 @@ class TestRedisClientWrapperKeyPrefix:
         assert args == ("enterprise-a:zset:key", {"member": 1})
         assert kwargs["nx"] is False
 
+    def test_wrapper_get_and_expire_pipelines_prefixed_key(self):
+        mock_client = MagicMock()
+        mock_pipeline = mock_client.pipeline.return_value
+        mock_pipeline.execute.return_value = [b"value", True]
+        wrapper = RedisClientWrapper()
+        wrapper.initialize(mock_client)
+
+        with patch("extensions.ext_redis.dify_config") as mock_config:
+            mock_config.REDIS_KEY_PREFIX = "enterprise-a"
+
+            result = wrapper.get_and_expire("cache:key", 600)
+
+        assert result == b"value"
+        mock_client.pipeline.assert_called_once_with(transaction=False)
+        mock_pipeline.get.assert_called_once_with("enterprise-a:cache:key")
+        mock_pipeline.expire.assert_called_once_with("enterprise-a:cache:key", 600)
+        mock_pipeline.execute.assert_called_once()
+
     def test_wrapper_preserves_keys_when_prefix_is_empty(self):
         mock_client = MagicMock()
         wrapper = RedisClientWrapper()
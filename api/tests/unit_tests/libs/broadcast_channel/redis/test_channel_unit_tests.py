@@ -17,6 +17,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from libs.broadcast_channel.batching import pack_batch
 from libs.broadcast_channel.exc import BroadcastChannelError, SubscriptionClosedError
 from libs.broadcast_channel.redis.channel import (
     BroadcastChannel as RedisBroadcastChannel,
@@ -466,6 +467,20 @@ class TestRedisSubscription:
         assert not subscription._queue.empty()
         assert subscription._queue.get_nowait() == b"test payload"
 
+    def test_listener_thread_unpacks_batches(self, subscription: _RedisSubscription, mock_pubsub: MagicMock):
+        """Test that a batch published by a coalescing producer is received as separate messages."""
+        batch = pack_batch([b"first", b"second"])
+        mock_pubsub.get_message.side_effect = [{"type": "message", "channel": "test-topic", "data": batch}] + [
+            None
+        ] * 1000
+
+        subscription._start_if_needed()
+        time.sleep(0.1)
+
+        assert subscription._queue.get_nowait() == b"first"
+        assert subscription._queue.get_nowait() == b"second"
+        assert subscription._queue.empty()
+
     def test_listener_thread_ignores_subscribe_messages(self, subscription: _RedisSubscription, mock_pubsub: MagicMock):
         """Test that listener thread ignores subscribe/unsubscribe messages."""
         mock_message = {"type": "subscribe", "channel": "test-topic", "data": 1}
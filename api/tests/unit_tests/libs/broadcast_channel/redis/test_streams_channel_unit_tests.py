@@ -6,6 +6,7 @@ from unittest.mock import patch
 
 import pytest
 
+from libs.broadcast_channel.batching import pack_batch
 from libs.broadcast_channel.exc import SubscriptionClosedError
 from libs.broadcast_channel.redis.streams_channel import (
     StreamsBroadcastChannel,
@@ -210,6 +211,21 @@ class TestStreamsSubscription:
 
         assert received == [b"after-subscribe-1", b"after-subscribe-2"]
 
+    def test_batches_are_received_as_separate_messages(self, streams_channel: StreamsBroadcastChannel):
+        topic = streams_channel.topic("batched")
+        received: list[bytes] = []
+        with topic.subscribe() as sub:
+            assert sub.receive(timeout=0.05) is None
+            topic.publish(pack_batch([b"chunk-1", b"chunk-2"]))
+            topic.publish(b"end")
+            for _ in range(5):
+                msg = sub.receive(timeout=0.1)
+                if msg is None:
+                    break
+                received.append(msg)
+
+        assert received == [b"chunk-1", b"chunk-2", b"end"]
+
     def test_receive_timeout_returns_none(self, streams_channel: StreamsBroadcastChannel):
         topic = streams_channel.topic("delta")
         sub = topic.subscribe()
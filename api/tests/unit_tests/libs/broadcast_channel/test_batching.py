@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+
+from libs.broadcast_channel.batching import CoalescingProducer, pack_batch, unpack_batch
+
+
+class RecordingProducer:
+    def __init__(self):
+        self.messages: list[bytes] = []
+        self.published_at: dict[bytes, float] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, payload: bytes) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.messages.append(payload)
+            for message in unpack_batch(payload):
+                self.published_at[message] = now
+
+    @property
+    def payloads(self) -> list[bytes]:
+        return [message for batch in self.messages for message in unpack_batch(batch)]
+
+
+def _only_chunks(payload: bytes) -> bool:
+    return payload.startswith(b"chunk")
+
+
+class TestBatchEncoding:
+    @pytest.mark.parametrize(
+        "payloads",
+        [
+            [b"single"],
+            [b"first", b"", b"third"],
+            [b"\x1dlooks like a batch"],
+            ["ünïcödé".encode()] * 3,
+        ],
+    )
+    def test_roundtrip(self, payloads: list[bytes]):
+        assert unpack_batch(pack_batch(payloads)) == payloads
+
+    def test_single_message_is_published_as_is(self):
+        assert pack_batch([b'{"event":"message"}']) == b'{"event":"message"}'
+
+
+class TestCoalescingProducer:
+    def test_publishes_right_away_when_idle(self):
+        target = RecordingProducer()
+        producer = CoalescingProducer(target, max_delay=60, max_bytes=1024, can_buffer=_only_chunks)
+
+        producer.publish(b"chunk-1")
+
+        assert target.messages == [b"chunk-1"]
+
+    def test_buffers_burst_until_message_that_cannot_wait(self):
+        target = RecordingProducer()
+        producer = CoalescingProducer(target, max_delay=60, max_bytes=1024, can_buffer=_only_chunks)
+
+        for payload in (b"chunk-1", b"chunk-2", b"chunk-3", b"end"):
+            producer.publish(payload)
+
+        assert target.messages == [b"chunk-1", pack_batch([b"chunk-2", b"chunk-3", b"end"])]
+
+    def test_publishes_when_max_bytes_buffered(self):
+        target = RecordingProducer()
+        producer = CoalescingProducer(target, max_delay=60, max_bytes=10, can_buffer=_only_chunks)
+
+        for payload in (b"chunk-1", b"chunk-2", b"chunk-3"):
+            producer.publish(payload)
+
+        assert target.messages == [b"chunk-1", pack_batch([b"chunk-2", b"chunk-3"])]
+
+    def test_timer_publishes_buffered_messages_after_max_delay(self):
+        target = RecordingProducer()
+        producer = CoalescingProducer(target, max_delay=0.05, max_bytes=1024)
+
+        producer.publish(b"chunk-1")
+        producer.publish(b"chunk-2")
+        assert target.messages == [b"chunk-1"]
+
+        time.sleep(0.2)
+        assert target.messages == [b"chunk-1", b"chunk-2"]
+
+    def test_close_publishes_buffered_messages(self):
+        target = RecordingProducer()
+        producer = CoalescingProducer(target, max_delay=60, max_bytes=1024)
+
+        producer.publish(b"chunk-1")
+        producer.publish(b"chunk-2")
+        producer.close()
+
+        assert target.payloads == [b"chunk-1", b"chunk-2"]
+
+    def test_zero_max_delay_disables_batching(self):
+        target = RecordingProducer()
+        producer = CoalescingProducer(target, max_delay=0, max_bytes=1024)
+
+        for payload in (b"chunk-1", b"chunk-2"):
+            producer.publish(payload)
+
+        assert target.messages == [b"chunk-1", b"chunk-2"]
+
+
+def _stream_tokens(max_delay_ms: int) -> tuple[RecordingProducer, dict[bytes, float], float]:
+    target = RecordingProducer()
+    producer = CoalescingProducer(target, max_delay=max_delay_ms / 1000, max_bytes=16384, can_buffer=_only_chunks)
+    token_interval = 1 / 500
+    queued_at: dict[bytes, float] = {}
+
+    started_at = time.monotonic()
+    for i in range(250):
+        payload = f"chunk-{i}".encode()
+        queued_at[payload] = time.monotonic()
+        producer.publish(payload)
+        time.sleep(token_interval)
+    producer.publish(b"end")
+    producer.close()
+    return target, queued_at, time.monotonic() - started_at
+
+
+@pytest.mark.parametrize("max_delay_ms", [0, 20, 50])
+def test_coalescing_benchmark(benchmark, max_delay_ms: int):
+    """Redis commands per second and added latency for a stream of 500 tokens/s."""
+    target, queued_at, elapsed = benchmark.pedantic(_stream_tokens, args=(max_delay_ms,), rounds=3)
+
+    assert target.payloads == list(queued_at) + [b"end"]
+    delays = sorted(target.published_at[payload] - queued_at[payload] for payload in queued_at)
+    benchmark.extra_info["redis_ops_per_second"] = len(target.messages) / elapsed
+    benchmark.extra_info["tokens_per_second"] = len(queued_at) / elapsed
+    benchmark.extra_info["added_latency_avg_ms"] = sum(delays) / len(delays) * 1000
+    benchmark.extra_info["added_latency_p99_ms"] = delays[int(len(delays) * 0.99)] * 1000
+    if max_delay_ms:
+        assert len(target.messages) < len(queued_at) / 2
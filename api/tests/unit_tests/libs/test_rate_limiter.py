@@ -4,31 +4,26 @@ from libs import helper as helper_module
 
 
 class _FakeRedis:
+    """Runs the sliding window count and add scripts against in-memory sorted sets."""
+
     def __init__(self) -> None:
         self._zsets: dict[str, dict[str, float]] = {}
         self._expiry: dict[str, int] = {}
 
-    def zadd(self, key: str, mapping: dict[str, float]) -> int:
+    def evalsha(self, sha: str, numkeys: int, key: str, now: int, window: int, *args: str):
         zset = self._zsets.setdefault(key, {})
-        for member, score in mapping.items():
-            zset[str(member)] = float(score)
-        return len(mapping)
-
-    def zremrangebyscore(self, key: str, min_score: str | float, max_score: str | float) -> int:
-        zset = self._zsets.get(key, {})
-        min_value = float("-inf") if min_score == "-inf" else float(min_score)
-        max_value = float("inf") if max_score == "+inf" else float(max_score)
-        to_delete = [member for member, score in zset.items() if min_value <= score <= max_value]
-        for member in to_delete:
-            del zset[member]
-        return len(to_delete)
-
-    def zcard(self, key: str) -> int:
-        return len(self._zsets.get(key, {}))
+        if args:
+            (member,) = args
+            zset[member] = now
+            self._expiry[key] = window
+            return 1
+        for member, score in list(zset.items()):
+            if score <= now - window:
+                del zset[member]
+        return len(zset)
 
-    def expire(self, key: str, ttl: int) -> bool:
-        self._expiry[key] = ttl
-        return True
+    def eval(self, *args):
+        raise AssertionError("scripts are cached")
 
 
 def test_rate_limiter_counts_attempts_within_same_second(monkeypatch):
@@ -50,7 +45,7 @@ def test_rate_limiter_counts_attempts_within_same_second(monkeypatch):
 
 def test_rate_limiter_uses_injected_redis(monkeypatch):
     redis_client = MagicMock()
-    redis_client.zcard.return_value = 1
+    redis_client.evalsha.return_value = 1
     monkeypatch.setattr(helper_module.time, "time", lambda: 1000)
 
     limiter = helper_module.RateLimiter(
@@ -63,6 +58,5 @@ def test_rate_limiter_uses_injected_redis(monkeypatch):
     limiter.increment_rate_limit("203.0.113.10")
     limiter.is_rate_limited("203.0.113.10")
 
-    assert redis_client.zadd.called is True
-    assert redis_client.zremrangebyscore.called is True
-    assert redis_client.zcard.called is True
+    assert redis_client.evalsha.call_count == 2
+    assert {call.args[2] for call in redis_client.evalsha.call_args_list} == {"test_rate_limit:203.0.113.10"}
@@ -0,0 +1,118 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from redis.exceptions import NoScriptError
+
+from libs import redis_rate_limiter
+from libs.redis_rate_limiter import (
+    ConcurrencyLimiter,
+    RateLimitResult,
+    SlidingWindowRateLimiter,
+    TokenBucketRateLimiter,
+)
+
+
+@pytest.fixture
+def frozen_time():
+    with patch.object(redis_rate_limiter.time, "time", return_value=1_700_000_000.5):
+        yield
+
+
+class TestLocalFastPaths:
+    def test_unlimited_never_touches_redis(self):
+        client = MagicMock()
+
+        assert SlidingWindowRateLimiter(limit=None, window=60, redis_client=client).hit("k").allowed is True
+        assert TokenBucketRateLimiter(capacity=None, refill_rate=1, redis_client=client).acquire("k").allowed is True
+        assert ConcurrencyLimiter(limit=None, lease_timeout=60, redis_client=client).acquire("k", "lease").allowed
+
+        client.evalsha.assert_not_called()
+        client.eval.assert_not_called()
+
+    def test_non_positive_limit_rejects_without_redis(self):
+        client = MagicMock()
+
+        assert SlidingWindowRateLimiter(limit=0, window=60, redis_client=client).hit("k").allowed is False
+        assert ConcurrencyLimiter(limit=0, lease_timeout=60, redis_client=client).acquire("k", "lease").allowed is False
+        assert TokenBucketRateLimiter(capacity=2, refill_rate=1, redis_client=client).acquire("k", 3).allowed is False
+
+        client.evalsha.assert_not_called()
+
+    def test_token_bucket_requires_positive_refill_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucketRateLimiter(capacity=10, refill_rate=0)
+
+
+class TestScriptCalls:
+    def test_sliding_window_hit_passes_window_in_ms(self, frozen_time):
+        client = MagicMock()
+        client.evalsha.return_value = [1, 3, 0]
+
+        result = SlidingWindowRateLimiter(limit=5, window=60, redis_client=client).hit("rate_limit_tenant")
+
+        assert result == RateLimitResult(allowed=True, count=3)
+        sha, numkeys, key, now, window, limit, member = client.evalsha.call_args.args
+        assert sha == redis_rate_limiter._SLIDING_WINDOW_HIT.sha
+        assert (numkeys, key, now, window, limit) == (1, "rate_limit_tenant", 1_700_000_000_500, 60_000, 5)
+        assert member.startswith("1700000000500:")
+
+    def test_sliding_window_members_are_unique(self, frozen_time):
+        client = MagicMock()
+        client.evalsha.return_value = [1, 1, 0]
+        limiter = SlidingWindowRateLimiter(limit=5, window=60, redis_client=client)
+
+        limiter.hit("k")
+        limiter.hit("k")
+
+        first, second = (call.args[-1] for call in client.evalsha.call_args_list)
+        assert first != second
+
+    def test_rejected_hit_reports_retry_after(self):
+        client = MagicMock()
+        client.evalsha.return_value = [0, 5, 1500]
+
+        result = SlidingWindowRateLimiter(limit=5, window=60, redis_client=client).hit("k")
+
+        assert result == RateLimitResult(allowed=False, count=5, retry_after=1.5)
+
+    def test_keys_get_redis_key_prefix(self):
+        client = MagicMock()
+        client.evalsha.return_value = 0
+
+        with patch("extensions.redis_names.dify_config.REDIS_KEY_PREFIX", "tenant-a"):
+            SlidingWindowRateLimiter(limit=5, window=60, redis_client=client).count("k")
+
+        assert client.evalsha.call_args.args[2] == "tenant-a:k"
+
+    def test_token_bucket_passes_refill_rate_per_ms(self, frozen_time):
+        client = MagicMock()
+        client.evalsha.return_value = [1, 9, 0]
+
+        result = TokenBucketRateLimiter(capacity=10, refill_rate=2, redis_client=client).acquire("bucket")
+
+        assert result == RateLimitResult(allowed=True, count=9)
+        assert client.evalsha.call_args.args[2:] == ("bucket", 1_700_000_000_500, 10, 0.002, 1)
+
+    def test_concurrency_acquire_and_release(self, frozen_time):
+        client = MagicMock()
+        client.evalsha.return_value = [1, 1, 0]
+        limiter = ConcurrencyLimiter(limit=2, lease_timeout=600, ttl=3600, redis_client=client)
+
+        assert limiter.acquire("active", "request-1").allowed is True
+        limiter.release("active", "request-1")
+
+        acquire_call, release_call = client.evalsha.call_args_list
+        assert acquire_call.args[2:] == ("active", "request-1", 1_700_000_000.5, 2, 600, 3600)
+        assert release_call.args[0] == redis_rate_limiter._CONCURRENCY_RELEASE.sha
+        assert release_call.args[2:] == ("active", "request-1")
+
+    def test_falls_back_to_eval_when_script_not_cached(self):
+        client = MagicMock()
+        client.evalsha.side_effect = NoScriptError("NOSCRIPT No matching script.")
+        client.eval.return_value = 2
+
+        assert SlidingWindowRateLimiter(limit=5, window=60, redis_client=client).count("k") == 2
+
+        source, numkeys, key, *_ = client.eval.call_args.args
+        assert source == redis_rate_limiter._SLIDING_WINDOW_COUNT.source
+        assert (numkeys, key) == (1, "k")
@@ -15,6 +15,10 @@ from datetime import UTC, datetime
 from unittest.mock import Mock, patch
 from uuid import uuid4
 
+import numpy as np
+import pytest
+
+from core.rag.embedding.embedding_codec import is_encoded_embedding
 from core.rag.index_processor.constant.index_type import IndexTechniqueType
 from models.dataset import (
     AppDatasetJoin,
@@ -741,13 +745,13 @@ class TestEmbeddingStorage:
         retrieved_data = embedding.get_embedding()
 
         # Assert
-        assert retrieved_data == embedding_data
+        assert retrieved_data == pytest.approx(embedding_data)
         assert len(retrieved_data) == 5
-        assert retrieved_data[0] == 0.1
-        assert retrieved_data[4] == 0.5
+        assert retrieved_data[0] == pytest.approx(0.1)
+        assert retrieved_data[4] == pytest.approx(0.5)
 
-    def test_embedding_pickle_serialization(self):
-        """Test embedding data is properly pickled."""
+    def test_embedding_pickle_serialization_by_default(self):
+        """Test embedding data is stored as a pickled list, readable by earlier releases, by default."""
         # Arrange
         embedding_data = [0.1, 0.2, 0.3]
         embedding = Embedding(
@@ -761,11 +765,45 @@ class TestEmbeddingStorage:
         embedding.set_embedding(embedding_data)
 
         # Assert
-        # Verify the embedding is stored as pickled binary data
+        assert not is_encoded_embedding(embedding.embedding)
+        assert pickle.loads(embedding.embedding) == embedding_data  # noqa: S301
+
+    def test_embedding_binary_serialization(self):
+        """Test embedding data is stored in the compact binary format once it is enabled."""
+        # Arrange
+        embedding_data = [0.1, 0.2, 0.3]
+        embedding = Embedding(
+            model_name="text-embedding-ada-002",
+            hash="test_hash",
+            provider_name="openai",
+            embedding=b"",
+        )
+
+        # Act
+        with patch("models.dataset.dify_config.EMBEDDING_CACHE_BINARY_FORMAT_ENABLED", True):
+            embedding.set_embedding(embedding_data)
+
+        # Assert
         assert isinstance(embedding.embedding, bytes)
-        # Verify we can unpickle it
-        unpickled_data = pickle.loads(embedding.embedding)  # noqa: S301
-        assert unpickled_data == embedding_data
+        assert is_encoded_embedding(embedding.embedding)
+        assert embedding.get_embedding_array().dtype == np.float32
+
+    def test_embedding_reads_legacy_pickle_rows(self):
+        """Test rows written by the pickled format are still readable."""
+        # Arrange
+        embedding_data = [0.1, 0.2, 0.3]
+        embedding = Embedding(
+            model_name="text-embedding-ada-002",
+            hash="test_hash",
+            provider_name="openai",
+            embedding=pickle.dumps(embedding_data, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+
+        # Act
+        retrieved_data = embedding.get_embedding()
+
+        # Assert
+        assert retrieved_data == embedding_data
 
     def test_embedding_with_large_vector(self):
         """Test embedding with large dimension vector."""
@@ -5,7 +5,7 @@ from unittest.mock import MagicMock
 import pytest
 from _pytest.monkeypatch import MonkeyPatch
 from oss2 import Bucket
-from oss2.models import GetObjectResult, PutObjectResult
+from oss2.models import GetObjectResult, HeadObjectResult, PutObjectResult
 
 from tests.unit_tests.oss.__mock.base import (
     get_example_bucket,
@@ -62,9 +62,20 @@ class MockAliyunOssClass:
         assert key == self.key
 
         get_object_output = MagicMock(GetObjectResult)
-        get_object_output.read.return_value = self.content
+        if byte_range is None:
+            get_object_output.read.return_value = self.content
+        else:
+            start, end = byte_range
+            get_object_output.read.return_value = self.content[start : end + 1]
         return get_object_output
 
+    def head_object(self, key, headers=None, params=None):
+        assert key == self.key
+
+        head_object_output = MagicMock(HeadObjectResult)
+        head_object_output.content_length = len(self.content)
+        return head_object_output
+
     def get_object_to_file(
         self, key, filename, byte_range=None, headers=None, progress_callback=None, process=None, params=None
     ):
@@ -91,6 +102,7 @@ def setup_aliyun_oss_mock(monkeypatch: MonkeyPatch):
         monkeypatch.setattr(Bucket, "put_object", MockAliyunOssClass.put_object)
         monkeypatch.setattr(Bucket, "get_object", MockAliyunOssClass.get_object)
         monkeypatch.setattr(Bucket, "get_object_to_file", MockAliyunOssClass.get_object_to_file)
+        monkeypatch.setattr(Bucket, "head_object", MockAliyunOssClass.head_object)
         monkeypatch.setattr(Bucket, "object_exists", MockAliyunOssClass.object_exists)
         monkeypatch.setattr(Bucket, "delete_object", MockAliyunOssClass.delete_object)
 
@@ -7,6 +7,8 @@ from extensions.storage.aliyun_oss_storage import AliyunOssStorage
 from tests.unit_tests.oss.__mock.base import (
     BaseStorageTest,
     get_example_bucket,
+    get_example_data,
+    get_example_filename,
     get_example_folder,
 )
 
@@ -21,3 +23,7 @@ class TestAliyunOss(BaseStorageTest):
             self.storage = AliyunOssStorage()
         self.storage.bucket_name = get_example_bucket()
         self.storage.folder = get_example_folder()
+
+    def test_load_range(self):
+        assert self.storage.load_range(get_example_filename(), 1, 2) == get_example_data()[1:3]
+        assert self.storage.load_range(get_example_filename(), 1, 0) == b""
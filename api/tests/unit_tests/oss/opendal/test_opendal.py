@@ -3,6 +3,7 @@ from pathlib import Path
 
 import pytest
 
+from configs import dify_config
 from extensions.storage.opendal_storage import OpenDALStorage
 from tests.unit_tests.oss.__mock.base import (
     get_example_data,
@@ -11,6 +12,10 @@ from tests.unit_tests.oss.__mock.base import (
 )
 
 
+def _numbered_data(length: int) -> bytes:
+    return bytes(i % 251 for i in range(length))
+
+
 class TestOpenDAL:
     @pytest.fixture(autouse=True)
     def setup_method(self, *args, **kwargs):
@@ -86,3 +91,60 @@ class TestOpenDAL:
 
         self.storage.delete(filename)
         assert not self.storage.exists(filename)
+
+    @pytest.mark.parametrize(
+        ("offset", "length", "expected"),
+        [
+            (0, 4, slice(0, 4)),
+            (4096, 5000, slice(4096, 9096)),
+            (10_000, 1000, slice(10_000, 10_240)),
+            (10_240, 10, slice(0, 0)),
+            (20_000, 10, slice(0, 0)),
+            (100, 0, slice(0, 0)),
+        ],
+    )
+    def test_load_range(self, offset: int, length: int, expected: slice):
+        """Test loading a byte range, clipped at the end of the file."""
+        filename = get_example_filename()
+        data = _numbered_data(10_240)
+
+        self.storage.save(filename, data)
+        assert self.storage.load_range(filename, offset, length) == data[expected]
+
+    def test_load_range_rejects_negative_values(self):
+        with pytest.raises(ValueError):
+            self.storage.load_range(get_example_filename(), -1, 10)
+        with pytest.raises(ValueError):
+            self.storage.load_range(get_example_filename(), 0, -1)
+
+    def test_save_stream(self):
+        """Test saving data from an iterator of chunks."""
+        filename = get_example_filename()
+        data = _numbered_data(4096 * 3 + 17)
+
+        self.storage.save_stream(filename, (data[i : i + 4096] for i in range(0, len(data), 4096)))
+        assert self.storage.load_once(filename) == data
+
+    @pytest.mark.parametrize("length", [0, 1000, 4096, 4096 * 5 + 1])
+    def test_download_in_parts(self, monkeypatch, tmp_path, length: int):
+        """Test that files above the multipart threshold are downloaded in concurrently fetched parts."""
+        monkeypatch.setattr(dify_config, "STORAGE_MULTIPART_DOWNLOAD_THRESHOLD", 1)
+        monkeypatch.setattr(dify_config, "STORAGE_MULTIPART_DOWNLOAD_PART_SIZE", 4096)
+        monkeypatch.setattr(dify_config, "STORAGE_MULTIPART_DOWNLOAD_CONCURRENCY", 3)
+        filename = get_example_filename()
+        data = _numbered_data(length)
+        self.storage.save(filename, data)
+
+        ranges = []
+        load_range = self.storage.load_range
+
+        def recording_load_range(name: str, offset: int, size: int) -> bytes:
+            ranges.append((offset, size))
+            return load_range(name, offset, size)
+
+        monkeypatch.setattr(self.storage, "load_range", recording_load_range)
+        target = tmp_path / "downloaded"
+        self.storage.download(filename, str(target))
+
+        assert target.read_bytes() == data
+        assert sorted(ranges) == [(offset, min(4096, length - offset)) for offset in range(0, length, 4096)]
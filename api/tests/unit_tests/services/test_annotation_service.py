@@ -1042,8 +1042,6 @@ class TestAppAnnotationServiceBatchImport:
 
             # Assert
             assert result == {"job_id": "uuid-3", "job_status": "waiting", "record_count": 1}
-            mock_redis.zadd.assert_called_once()
-            mock_redis.expire.assert_called_once()
             mock_redis.setnx.assert_called_once_with("app_annotation_batch_import_uuid-3", "waiting")
             mock_task.delay.assert_called_once()
 
@@ -1063,24 +1061,27 @@ class TestAppAnnotationServiceBatchImport:
             patch("services.annotation_service.pd.read_csv", return_value=df),
             patch("services.annotation_service.FeatureService.get_features", return_value=features),
             patch("services.annotation_service.redis_client") as mock_redis,
-            patch("services.annotation_service.uuid.uuid4", return_value="uuid-4"),
-            patch("services.annotation_service.naive_utc_now", return_value=SimpleNamespace(timestamp=lambda: 1)),
+            patch("services.annotation_service.ConcurrencyLimiter") as mock_limiter_cls,
             patch("services.annotation_service.logger") as mock_logger,
             patch(
                 "configs.dify_config",
-                new=SimpleNamespace(ANNOTATION_IMPORT_MAX_RECORDS=5, ANNOTATION_IMPORT_MIN_RECORDS=1),
+                new=SimpleNamespace(
+                    ANNOTATION_IMPORT_MAX_RECORDS=5, ANNOTATION_IMPORT_MIN_RECORDS=1, ANNOTATION_IMPORT_MAX_CONCURRENT=2
+                ),
             ),
         ):
             mock_db.session.scalar.return_value = app
-            mock_redis.zadd.side_effect = RuntimeError("boom")
-            mock_redis.zrem.side_effect = RuntimeError("cleanup-failed")
+            mock_redis.setnx.side_effect = RuntimeError("boom")
+            mock_limiter_cls.return_value.release.side_effect = RuntimeError("cleanup-failed")
 
             # Act
-            result = AppAnnotationService.batch_import_app_annotations(app.id, file)
+            result = AppAnnotationService.batch_import_app_annotations(app.id, file, job_id="job-4")
 
             # Assert
             assert result["error_msg"] == "An error occurred while processing the file: boom"
-            mock_redis.zrem.assert_called_once_with(f"annotation_import_active:{tenant_id}", "uuid-4")
+            mock_limiter_cls.return_value.release.assert_called_once_with(
+                f"annotation_import_leases:{tenant_id}", "job-4"
+            )
             mock_logger.debug.assert_called_once()
 
 
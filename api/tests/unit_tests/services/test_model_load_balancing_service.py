@@ -19,6 +19,7 @@ from graphon.model_runtime.entities.provider_entities import (
     ProviderCredentialSchema,
 )
 from models.provider import LoadBalancingModelConfig
+from services import model_load_balancing_service as service_module
 from services.model_load_balancing_service import ModelLoadBalancingService
 
 
@@ -72,6 +73,7 @@ def service(mocker: MockerFixture) -> ModelLoadBalancingService:
     mocker.patch("services.model_load_balancing_service.create_plugin_provider_manager", return_value=provider_manager)
     model_assembly = SimpleNamespace(provider_manager=provider_manager, model_provider_factory=MagicMock())
     mocker.patch("services.model_load_balancing_service.create_plugin_model_assembly", return_value=model_assembly)
+    mocker.patch("services.model_load_balancing_service.bump_provider_configurations_version")
     svc = ModelLoadBalancingService()
     svc.provider_manager = provider_manager
     svc.model_assembly = model_assembly
@@ -110,6 +112,7 @@ def test_enable_disable_model_load_balancing_should_call_provider_configuration_
     getattr(provider_configuration, expected_provider_method).assert_called_once_with(
         model="gpt-4o-mini", model_type=ModelType.LLM
     )
+    service_module.bump_provider_configurations_version.assert_called_once_with("tenant-1")
 
 
 @pytest.mark.parametrize(
@@ -341,6 +344,27 @@ def test_update_load_balancing_configs_should_raise_value_error_when_provider_mi
         )
 
 
+def test_update_load_balancing_configs_should_bump_version_even_when_rejected(
+    service: ModelLoadBalancingService,
+) -> None:
+    # Arrange
+    service.provider_manager.get_configurations.return_value = {}
+
+    # Act
+    with pytest.raises(ValueError):
+        service.update_load_balancing_configs(
+            "tenant-1",
+            "openai",
+            "gpt-4o-mini",
+            ModelType.LLM.value,
+            [],
+            "custom-model",
+        )
+
+    # Assert
+    service_module.bump_provider_configurations_version.assert_called_once_with("tenant-1")
+
+
 def test_update_load_balancing_configs_should_raise_value_error_when_configs_is_not_list(
     service: ModelLoadBalancingService,
 ) -> None:
@@ -600,3 +600,40 @@ class TestModelProviderServiceListingsAndDefaults:
             model="gpt-4o",
             model_type=ModelType.LLM,
         )
+
+
+class TestModelProviderServiceConfigurationsInvalidation:
+    @pytest.mark.parametrize(
+        ("method_name", "method_kwargs"),
+        [
+            ("create_provider_credential", {"credentials": {}, "credential_name": "A"}),
+            ("remove_provider_credential", {"credential_id": "cred-1"}),
+            ("switch_preferred_provider", {"preferred_provider_type": ProviderType.SYSTEM.value}),
+            ("remove_model", {"model_type": ModelType.LLM.value, "model": "gpt-4o"}),
+            ("enable_model", {"model_type": ModelType.LLM.value, "model": "gpt-4o"}),
+        ],
+    )
+    def test_writes_should_bump_provider_configurations_version(
+        self,
+        method_name: str,
+        method_kwargs: dict[str, Any],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        service = ModelProviderService()
+        monkeypatch.setattr(service, "_get_provider_configuration", MagicMock(return_value=MagicMock()))
+        bump_mock = MagicMock()
+        monkeypatch.setattr(service_module, "bump_provider_configurations_version", bump_mock)
+
+        getattr(service, method_name)(tenant_id="tenant-1", provider="openai", **method_kwargs)
+
+        bump_mock.assert_called_once_with("tenant-1")
+
+    def test_reads_should_not_bump_provider_configurations_version(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        service = ModelProviderService()
+        monkeypatch.setattr(service, "_get_provider_configuration", MagicMock(return_value=MagicMock()))
+        bump_mock = MagicMock()
+        monkeypatch.setattr(service_module, "bump_provider_configurations_version", bump_mock)
+
+        service.get_provider_credential(tenant_id="tenant-1", provider="openai", credential_id="cred-1")
+
+        bump_mock.assert_not_called()
@@ -0,0 +1,91 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import services.segment_hit_count_service as service_module
+from services.segment_hit_count_service import (
+    FLUSHING_HIT_COUNTS_KEY,
+    HIT_COUNTS_KEY,
+    SegmentHitCountService,
+)
+
+
+@pytest.fixture
+def mock_redis():
+    with patch.object(service_module, "redis_client") as mock:
+        yield mock
+
+
+@pytest.fixture
+def mock_session():
+    session = MagicMock()
+    with (
+        patch.object(service_module, "db"),
+        patch.object(service_module, "sessionmaker") as mock_sessionmaker,
+    ):
+        mock_sessionmaker.return_value.begin.return_value.__enter__.return_value = session
+        yield session
+
+
+class TestRecordHits:
+    def test_increments_each_segment_in_one_pipeline(self, mock_redis):
+        pipeline = mock_redis.pipeline.return_value
+
+        SegmentHitCountService.record_hits(["seg-1", "seg-2"])
+
+        mock_redis.pipeline.assert_called_once_with(transaction=False)
+        assert [call.args for call in pipeline.hincrby.call_args_list] == [
+            (HIT_COUNTS_KEY, "seg-1", 1),
+            (HIT_COUNTS_KEY, "seg-2", 1),
+        ]
+        pipeline.execute.assert_called_once()
+
+    def test_skips_redis_without_segments(self, mock_redis):
+        SegmentHitCountService.record_hits([])
+
+        mock_redis.pipeline.assert_not_called()
+
+    def test_does_not_raise_when_redis_fails(self, mock_redis):
+        mock_redis.pipeline.return_value.execute.side_effect = Exception("redis unavailable")
+
+        SegmentHitCountService.record_hits(["seg-1"])
+
+
+class TestFlush:
+    def test_returns_zero_without_buffered_hits(self, mock_redis, mock_session):
+        mock_redis.exists.return_value = 0
+
+        assert SegmentHitCountService.flush() == 0
+
+        mock_redis.rename.assert_not_called()
+        mock_session.execute.assert_not_called()
+
+    def test_moves_buffer_aside_and_updates_in_batches(self, mock_redis, mock_session):
+        mock_redis.exists.side_effect = lambda key: key == HIT_COUNTS_KEY
+        mock_redis.hgetall.return_value = {b"seg-1": b"3", b"seg-2": b"1", b"seg-3": b"7"}
+
+        assert SegmentHitCountService.flush(batch_size=2) == 3
+
+        mock_redis.rename.assert_called_once_with(HIT_COUNTS_KEY, FLUSHING_HIT_COUNTS_KEY)
+        mock_redis.hgetall.assert_called_once_with(FLUSHING_HIT_COUNTS_KEY)
+        assert mock_session.execute.call_count == 2
+        mock_redis.delete.assert_called_once_with(FLUSHING_HIT_COUNTS_KEY)
+
+    def test_retries_buffer_left_by_failed_flush(self, mock_redis, mock_session):
+        mock_redis.exists.side_effect = lambda key: key == FLUSHING_HIT_COUNTS_KEY
+        mock_redis.hgetall.return_value = {b"seg-1": b"2"}
+
+        assert SegmentHitCountService.flush() == 1
+
+        mock_redis.rename.assert_not_called()
+        mock_redis.delete.assert_called_once_with(FLUSHING_HIT_COUNTS_KEY)
+
+    def test_keeps_buffer_when_database_update_fails(self, mock_redis, mock_session):
+        mock_redis.exists.side_effect = lambda key: key == HIT_COUNTS_KEY
+        mock_redis.hgetall.return_value = {b"seg-1": b"2"}
+        mock_session.execute.side_effect = Exception("database unavailable")
+
+        with pytest.raises(Exception, match="database unavailable"):
+            SegmentHitCountService.flush()
+
+        mock_redis.delete.assert_not_called()
@@ -646,6 +646,51 @@ class TestIntegrationScenarios:
         assert truncated_mapping == mapping
 
 
+def _wide_array_payload() -> dict[str, Any]:
+    rows = [{"id": i, "name": f"user-{i}", "email": f"user-{i}@example.com", "bio": "b" * 80} for i in range(80_000)]
+    return {"status_code": 200, "body": rows}
+
+
+def _deep_payload() -> dict[str, Any]:
+    node: dict[str, Any] = {"leaf": "y" * 100}
+    for level in range(200):
+        node = {"level": level, "payload": "p" * 50_000, "child": node}
+    return {"result": node}
+
+
+def _wide_object_payload() -> dict[str, Any]:
+    return {
+        "result": {
+            f"key_{i}": {"text": "t" * 200, "count": i, "nested": {"a": [1, 2, 3], "b": None}} for i in range(40_000)
+        }
+    }
+
+
+def _fitting_payload() -> dict[str, Any]:
+    def build(depth: int) -> dict[str, Any]:
+        if depth == 0:
+            return {"id": 1, "name": "item", "active": True, "score": 1.5, "tags": ["a", "b"], "meta": {"x": None}}
+        return {f"child_{i}": build(depth - 1) for i in range(4)}
+
+    return {"result": build(5)}
+
+
+@pytest.mark.parametrize(
+    "build_payload",
+    [_wide_array_payload, _deep_payload, _wide_object_payload, _fitting_payload],
+    ids=["wide_array", "deep", "wide_object", "fitting"],
+)
+def test_truncate_variable_mapping_benchmark(benchmark, build_payload):
+    """Latency of truncating large node outputs (~10MB wide, deep and fitting payloads)."""
+    payload = build_payload()
+    truncator = VariableTruncator()
+
+    result, truncated = benchmark(truncator.truncate_variable_mapping, payload)
+
+    assert truncated is (build_payload is not _fitting_payload)
+    assert len(_compact_json_dumps(result)) <= truncator._max_size_bytes
+
+
 def test_dummy_variable_truncator_methods():
     """Test DummyVariableTruncator methods work correctly."""
     truncator = DummyVariableTruncator()
@@ -0,0 +1,81 @@
+"""Unit tests for the ops trace Celery task."""
+
+import contextlib
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tasks.ops_trace_task import process_trace_tasks
+
+
+@pytest.fixture
+def trace_env():
+    storage = MagicMock()
+    instances = {"app-1": MagicMock(), "app-2": MagicMock()}
+    get_instance = MagicMock(side_effect=lambda app_id: instances.get(app_id))
+    fake_app = MagicMock()
+    fake_app.app_context.return_value = contextlib.nullcontext()
+    with (
+        patch("tasks.ops_trace_task.storage", storage),
+        patch("tasks.ops_trace_task.redis_client") as redis_client,
+        patch("tasks.ops_trace_task.current_app", fake_app),
+        patch("core.ops.ops_trace_manager.OpsTraceManager.get_ops_trace_instance", get_instance),
+        patch("extensions.ext_enterprise_telemetry.is_enabled", return_value=False),
+    ):
+        yield storage, instances, get_instance, redis_client
+
+
+def _line(app_id, value):
+    return json.dumps({"app_id": app_id, "trace_info_type": "UnknownTraceInfo", "trace_info": {"value": value}})
+
+
+def test_process_single_trace_file(trace_env):
+    storage, instances, _, _ = trace_env
+    storage.load.return_value = _line("app-1", "a").encode()
+
+    process_trace_tasks({"app_id": "app-1", "file_id": "file-1"})
+
+    storage.load.assert_called_once_with("ops_trace/app-1/file-1.json")
+    instances["app-1"].trace.assert_called_once_with({"value": "a"})
+    storage.delete.assert_called_once_with("ops_trace/app-1/file-1.json")
+
+
+def test_process_batch_manifest(trace_env):
+    storage, instances, get_instance, _ = trace_env
+    storage.load.return_value = "\n".join([_line("app-1", "a"), _line("app-2", "b"), _line("app-1", "c")]).encode()
+
+    process_trace_tasks({"batch_id": "batch-1", "count": 3})
+
+    storage.load.assert_called_once_with("ops_trace/batches/batch-1.ndjson")
+    assert [c.args[0] for c in instances["app-1"].trace.call_args_list] == [{"value": "a"}, {"value": "c"}]
+    instances["app-2"].trace.assert_called_once_with({"value": "b"})
+    assert get_instance.call_count == 2
+    storage.delete.assert_called_once_with("ops_trace/batches/batch-1.ndjson")
+
+
+def test_batch_failure_is_isolated_per_trace(trace_env):
+    storage, instances, _, redis_client = trace_env
+    instances["app-1"].trace.side_effect = RuntimeError("provider down")
+    storage.load.return_value = "\n".join([_line("app-1", "a"), _line("app-2", "b")]).encode()
+
+    process_trace_tasks({"batch_id": "batch-1", "count": 2})
+
+    redis_client.incr.assert_called_once_with("FAILED_OPS_TRACE_app-1")
+    instances["app-2"].trace.assert_called_once_with({"value": "b"})
+    storage.delete.assert_called_once_with("ops_trace/batches/batch-1.ndjson")
+
+
+def test_malformed_batch_records_do_not_drop_the_rest(trace_env):
+    storage, instances, _, redis_client = trace_env
+    empty_trace_info = json.dumps({"app_id": "app-1", "trace_info_type": "NoneType", "trace_info": None})
+    storage.load.return_value = "\n".join([empty_trace_info, "not json", _line("app-2", "b")]).encode()
+
+    process_trace_tasks({"batch_id": "batch-1", "count": 3})
+
+    instances["app-2"].trace.assert_called_once_with({"value": "b"})
+    assert [c.args[0] for c in redis_client.incr.call_args_list] == [
+        "FAILED_OPS_TRACE_app-1",
+        "FAILED_OPS_TRACE_batch-1",
+    ]
+    storage.delete.assert_called_once_with("ops_trace/batches/batch-1.ndjson")
@@ -0,0 +1,58 @@
+"""Unit tests for the bulk workflow node execution save task."""
+
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from graphon.entities.workflow_node_execution import WorkflowNodeExecution, WorkflowNodeExecutionStatus
+from graphon.enums import BuiltinNodeTypes
+from libs.datetime_utils import naive_utc_now
+from models import CreatorUserRole, WorkflowNodeExecutionModel
+from models.workflow import WorkflowNodeExecutionTriggeredFrom
+from tasks.workflow_node_execution_tasks import save_workflow_node_executions_task
+
+
+def _execution_data(status: WorkflowNodeExecutionStatus) -> dict:
+    return WorkflowNodeExecution(
+        id=str(uuid4()),
+        node_execution_id=str(uuid4()),
+        workflow_id="workflow-id",
+        workflow_execution_id="run-id",
+        index=1,
+        node_id="node",
+        node_type=BuiltinNodeTypes.START,
+        title="Node",
+        status=status,
+        created_at=naive_utc_now(),
+    ).model_dump()
+
+
+@patch("tasks.workflow_node_execution_tasks.session_factory")
+def test_bulk_save_inserts_new_and_updates_existing_in_one_transaction(mock_session_factory):
+    existing_data = _execution_data(WorkflowNodeExecutionStatus.SUCCEEDED)
+    new_data = _execution_data(WorkflowNodeExecutionStatus.RUNNING)
+    existing_model = WorkflowNodeExecutionModel()
+    existing_model.id = existing_data["id"]
+    existing_model.status = WorkflowNodeExecutionStatus.RUNNING
+
+    session = MagicMock()
+    session.scalars.return_value = [existing_model]
+    mock_session_factory.create_session.return_value.__enter__.return_value = session
+
+    result = save_workflow_node_executions_task(
+        executions_data=[existing_data, new_data],
+        tenant_id="tenant-id",
+        app_id="app-id",
+        triggered_from=WorkflowNodeExecutionTriggeredFrom.WORKFLOW_RUN.value,
+        creator_user_id="user-id",
+        creator_user_role=CreatorUserRole.ACCOUNT.value,
+    )
+
+    assert result is True
+    session.scalars.assert_called_once()
+    assert existing_model.status == WorkflowNodeExecutionStatus.SUCCEEDED
+    session.add.assert_called_once()
+    added = session.add.call_args.args[0]
+    assert added.id == new_data["id"]
+    assert added.tenant_id == "tenant-id"
+    assert added.app_id == "app-id"
+    session.commit.assert_called_once()
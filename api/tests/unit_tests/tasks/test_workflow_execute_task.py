@@ -7,7 +7,10 @@ from unittest.mock import MagicMock
 
 import pytest
 
+from configs import dify_config
+from core.app.apps.streaming_utils import decode_topic_event, encode_topic_event
 from core.app.entities.app_invoke_entities import AdvancedChatAppGenerateEntity, InvokeFrom
+from libs.broadcast_channel.batching import unpack_batch
 from models.enums import CreatorUserRole
 from models.model import App, AppMode, Conversation
 from models.workflow import Workflow, WorkflowRun
@@ -48,6 +51,12 @@ def mock_topic(mocker) -> MagicMock:
     return topic
 
 
+@pytest.fixture
+def event_envelope(monkeypatch):
+    monkeypatch.setattr(dify_config, "PUBSUB_EVENT_ENVELOPE_ENABLED", True)
+
+
+@pytest.mark.usefixtures("event_envelope")
 def test_publish_streaming_response_with_uuid(mock_topic: MagicMock):
     workflow_run_id = uuid.uuid4()
     response_stream = iter([{"event": "foo"}, "ping"])
@@ -55,7 +64,9 @@ def test_publish_streaming_response_with_uuid(mock_topic: MagicMock):
     _publish_streaming_response(response_stream, workflow_run_id, app_mode=AppMode.ADVANCED_CHAT)
 
     payloads = [call.args[0] for call in mock_topic.publish.call_args_list]
-    assert payloads == [json.dumps({"event": "foo"}).encode(), json.dumps("ping").encode()]
+    assert payloads == [b'\x1efoo\n{"event":"foo"}', json.dumps("ping").encode()]
+    assert dict(decode_topic_event(payloads[0])) == {"event": "foo"}
+    assert decode_topic_event(payloads[1]) == "ping"
 
 
 def test_publish_streaming_response_coerces_string_uuid(mock_topic: MagicMock):
@@ -64,7 +75,40 @@ def test_publish_streaming_response_coerces_string_uuid(mock_topic: MagicMock):
 
     _publish_streaming_response(response_stream, str(workflow_run_id), app_mode=AppMode.ADVANCED_CHAT)
 
-    mock_topic.publish.assert_called_once_with(json.dumps({"event": "bar"}).encode())
+    mock_topic.publish.assert_called_once_with(encode_topic_event({"event": "bar"}))
+
+
+@pytest.mark.usefixtures("event_envelope")
+def test_publish_streaming_response_coalesces_text_chunks(mock_topic: MagicMock, monkeypatch):
+    monkeypatch.setattr(dify_config, "PUBSUB_COALESCE_MAX_DELAY_MS", 60_000)
+    events = [{"event": "message", "answer": token} for token in ("a", "b", "c")] + [{"event": "message_end"}]
+
+    _publish_streaming_response(iter(events), uuid.uuid4(), app_mode=AppMode.ADVANCED_CHAT)
+
+    # the first chunk is published right away, the following ones wait for the terminal event
+    payloads = [call.args[0] for call in mock_topic.publish.call_args_list]
+    assert len(payloads) == 2
+    assert [dict(decode_topic_event(message)) for payload in payloads for message in unpack_batch(payload)] == events
+
+
+def test_publish_streaming_response_without_coalescing(mock_topic: MagicMock, monkeypatch):
+    monkeypatch.setattr(dify_config, "PUBSUB_COALESCE_MAX_DELAY_MS", 0)
+    events = [{"event": "message", "answer": token} for token in ("a", "b")]
+
+    _publish_streaming_response(iter(events), uuid.uuid4(), app_mode=AppMode.ADVANCED_CHAT)
+
+    assert [call.args[0] for call in mock_topic.publish.call_args_list] == [encode_topic_event(e) for e in events]
+
+
+def test_publish_streaming_response_without_envelope(mock_topic: MagicMock, monkeypatch):
+    monkeypatch.setattr(dify_config, "PUBSUB_EVENT_ENVELOPE_ENABLED", False)
+    monkeypatch.setattr(dify_config, "PUBSUB_COALESCE_MAX_DELAY_MS", 60_000)
+    events = [{"event": "message", "answer": token} for token in ("a", "b")] + [{"event": "message_end"}]
+
+    _publish_streaming_response(iter(events), uuid.uuid4(), app_mode=AppMode.ADVANCED_CHAT)
+
+    # plain JSON events are never held back for coalescing
+    assert [json.loads(call.args[0]) for call in mock_topic.publish.call_args_list] == events
 
 
 def test_resume_app_execution_queries_message_by_conversation_and_workflow_run(mocker):